@@ -10,7 +10,7 @@ from app.db.base import Base
 from app.models import (
     User, AudioFile, PreprocessingResult, STTResult,
     DiarizationResult, DetectedName, SpeakerMapping,
-    FinalTranscript, Summary
+    FinalTranscript, Summary, ProcessingJob
 )
 from app.core.config import settings
 
@@ -0,0 +1,51 @@
+"""add_file_uuid_to_audio_files
+
+Revision ID: a7b8c9d0e1f2
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import re
+from pathlib import PurePosixPath
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f1a2b3c4d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('audio_files', sa.Column('file_uuid', sa.String(length=36), nullable=True))
+
+    # 기존 행 채우기: 업로드 파일명(/app/uploads/{uuid}.ext)에서 UUID 추출
+    # 같은 UUID를 가리키는 행이 여럿이면 기존 LIKE 조회가 찾던 첫 행(가장 작은 id)에만 기록
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, file_path FROM audio_files ORDER BY id")).fetchall()
+    seen = set()
+    updates = []
+    for audio_file_id, file_path in rows:
+        stem = PurePosixPath(file_path or "").stem.lower()
+        if UUID_PATTERN.fullmatch(stem) and stem not in seen:
+            seen.add(stem)
+            updates.append({"id": audio_file_id, "file_uuid": stem})
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(
+            sa.text("UPDATE audio_files SET file_uuid = :file_uuid WHERE id = :id"),
+            updates[start:start + BATCH_SIZE],
+        )
+
+    op.create_index(op.f('ix_audio_files_file_uuid'), 'audio_files', ['file_uuid'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_audio_files_file_uuid'), table_name='audio_files')
+    op.drop_column('audio_files', 'file_uuid')
@@ -20,6 +20,7 @@ from app.models.preprocessing import PreprocessingResult
 from app.models.section import MeetingSection
 from app.models.keyword import KeyTerm
 from app.models.todo import TodoItem
+from app.services.file_resolver import forget_file_id
 from datetime import datetime, timedelta
 from typing import List, Optional
 import os
@@ -155,17 +156,9 @@ async def get_recent_files(
             SpeakerMapping.final_name != ""
         ).first() is not None
 
-        # file_path에서 UUID 추출 (예: /app/uploads/abc-123.m4a -> abc-123)
-        file_uuid = None
-        if file.file_path:
-            import re
-            match = re.search(r'([a-f0-9\-]{36})', file.file_path)
-            if match:
-                file_uuid = match.group(1)
-
         result.append({
             "id": file.id,
-            "file_uuid": file_uuid,  # UUID 추가
+            "file_uuid": file.file_uuid,  # 업로드 UUID (audio_files.file_uuid)
             "filename": file.original_filename,
             "status": file.status.value,
             "duration": round(file.duration, 2) if file.duration else None,
@@ -290,6 +283,7 @@ async def delete_audio_file(
 
     # DB에서 삭제
     from sqlalchemy import text
+    file_uuid = audio_file.file_uuid
     try:
         db.delete(audio_file)
         db.commit()
@@ -305,4 +299,5 @@ async def delete_audio_file(
             print(f"Raw SQL 삭제 실패: {sql_e}")
             raise HTTPException(status_code=500, detail=f"파일 삭제 중 오류가 발생했습니다: {str(sql_e)}")
 
+    forget_file_id(file_uuid)
     return {"message": "파일이 삭제되었습니다", "file_id": file_id}
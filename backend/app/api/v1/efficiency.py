@@ -7,6 +7,7 @@ from app.api.deps import get_db, get_current_user
 from app.models.efficiency import MeetingEfficiencyAnalysis
 from app.models.audio_file import AudioFile
 from app.services.efficiency_analyzer import EfficiencyAnalyzer
+from app.services.file_resolver import get_audio_file
 from typing import List, Optional
 import logging
 import os
@@ -345,15 +346,8 @@ def trigger_efficiency_analysis(
     - BackgroundTasks로 비동기 실행
     - 즉시 202 Accepted 반환
     """
-    # AudioFile 찾기 - ID(숫자)로 먼저 시도, 실패시 문자열 검색
-    audio_file = None
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+    # AudioFile 찾기 - DB ID 또는 UUID
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(
@@ -459,16 +453,9 @@ def get_efficiency_analysis(
     - 분석 결과가 없으면 404 반환
     - 프론트엔드에서 분석 트리거를 먼저 호출해야 함
     """
-    # AudioFile 찾기 - ID(숫자)로 먼저 시도, 실패시 문자열 검색
+    # AudioFile 찾기 - DB ID 또는 UUID
     print(f"[DEBUG] Searching for audio file with ID: {file_id}", flush=True)
-    audio_file = None
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         print(f"[DEBUG] Audio file NOT found for file_id={file_id}", flush=True)
@@ -564,14 +551,7 @@ def get_speaker_efficiency(
     - speaker_metrics에서 해당 화자만 추출
     """
     # AudioFile 찾기
-    audio_file = None
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(
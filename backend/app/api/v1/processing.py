@@ -7,12 +7,33 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks
 import torch.serialization
 if not hasattr(torch.serialization, "safe_globals"):
     torch.serialization.safe_globals = []
+import asyncio
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 from app.services.preprocessing import preprocess_audio
-from app.services.stt import run_stt_pipeline
-from app.services.diarization import run_diarization, merge_stt_with_diarization
+from app.services.voiced_index import intervals_path_for
+from app.services.pcm_store import ensure_pcm_store
+from app.services.artifact_cache import ArtifactCache, get_artifact_cache
+from app.services.alignment import label_rows
+from app.services.stt import (
+    run_stt_pipeline, partial_transcript_path, read_partial_transcript,
+    final_transcript_npz_path, load_final_transcript, estimate_stt_resources,
+)
+from app.services.diarization import (
+    run_diarization, merge_stt_with_diarization, estimate_diarization_resources,
+)
+from app.services.diarizer_pool import get_diarizer_pool
 from app.services.ner_service import get_ner_service
+from app.services.stage_dag import StageDAG, StageCancelled
+from app.services.stage_graph import STAGES, StageManifest, plan_stages, save_plan, load_plan
+from app.services.transcript import Transcript
+from app.services.job_queue import (
+    CANCELLED_ERROR, CANCELLED_MESSAGE, LeaseLost, enqueue_job, get_active_job, cancel_job, mark_file_stopped,
+    queue_position, queue_stats, set_file_stopped,
+)
+from app.services.progress_broker import LIVE_STATUS_ALIASES, get_progress_broker, running_job_status
+from app.services.file_resolver import get_audio_file, resolve_audio_file_id
 from app.core.config import settings
 from app.core.device import get_device
 import json
@@ -27,6 +48,7 @@ from app.models.stt import STTResult
 from app.models.diarization import DiarizationResult
 from app.models.tagging import DetectedName, SpeakerMapping
 from app.models.user_confirmation import UserConfirmation
+from app.models.processing_job import ProcessingJob, JobStatus
 
 
 router = APIRouter()
@@ -35,12 +57,19 @@ router = APIRouter()
 PROCESSING_STATUS: Dict[str, dict] = {}
 
 
+def cancelled_status() -> Dict:
+    """사용자 취소 상태 (실행 중 취소/대기 중 취소 공용, DB의 취소 기록을 조회한 결과와 같은 형태)"""
+    return {"status": "failed", "step": CANCELLED_MESSAGE, "progress": 0, "error": CANCELLED_ERROR}
+
+
 def process_audio_pipeline(
     file_id: str,
     user_id: int,
     whisper_mode: str = "local",
     diarization_mode: str = "senko",
-    skip_stt: bool = False
+    skip_stt: bool = False,
+    stage_gate: Callable[[str], Any] = None,
+    final_attempt: bool = True,
 ):
     """
     백그라운드에서 오디오 처리 파이프라인 실행
@@ -50,6 +79,8 @@ def process_audio_pipeline(
         user_id: 사용자 ID
         whisper_mode: Whisper 모드 ("local" 또는 "api")
         diarization_mode: 화자 분리 모델 ("senko" 또는 "nemo")
+        stage_gate: 스테이지 실행을 감싸는 훅 (작업 큐 워커: 취소 확인 + 스테이지 슬롯)
+        final_attempt: False면 실패해도 파일을 실패 상태로 바꾸지 않음 (작업 큐가 재시도 예정)
     """
     # 백그라운드 태스크용 새 DB 세션 생성
     from app.db.base import SessionLocal
@@ -70,10 +101,7 @@ def process_audio_pipeline(
         input_path = input_files[0]
 
         # DB에서 AudioFile 찾기 또는 생성
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+        audio_file = get_audio_file(db, file_id)
 
         if not audio_file:
             # upload.py의 UPLOADED_FILES에서 원본 파일명 가져오기
@@ -83,6 +111,7 @@ def process_audio_pipeline(
             # 새 파일이면 생성
             audio_file = AudioFile(
                 user_id=user_id,
+                file_uuid=file_id,
                 original_filename=original_name,
                 file_path=str(input_path),
                 file_size=input_path.stat().st_size,
@@ -92,520 +121,628 @@ def process_audio_pipeline(
             db.add(audio_file)
             db.flush()
 
-        # 상태 업데이트: 전처리 시작
-        audio_file.status = FileStatus.PROCESSING
-        audio_file.processing_step = "preprocessing"
-        audio_file.processing_progress = 10
-        audio_file.processing_message = "전처리 중..."
-        db.commit()
-
-        PROCESSING_STATUS[file_id] = {
-            "status": "preprocessing",
-            "step": "전처리 중...",
-            "progress": 10,
-            "device": device,
-            "model_size": model_size,
-        }
-
         # 작업 디렉토리 생성
         work_dir = Path(f"/app/temp/{file_id}")
         work_dir.mkdir(parents=True, exist_ok=True)
-
-        # 2) 전처리
         preprocessed_path = work_dir / "preprocessed.wav"
-        _, original_dur, processed_dur = preprocess_audio(input_path, preprocessed_path)
+        artifact_cache = get_artifact_cache()
 
-        # 상태 업데이트: 전처리 완료
-        audio_file.duration = original_dur
-        audio_file.processing_step = "preprocessing_complete"
-        audio_file.processing_progress = 30
-        audio_file.processing_message = "전처리 완료"
-        db.commit()
-
-        PROCESSING_STATUS[file_id] = {
-            "status": "preprocessing",
-            "step": "전처리 완료",
-            "progress": 30,
-            "original_duration": original_dur,
-            "processed_duration": processed_dur,
-        }
-
-        # 3) STT
         use_local = whisper_mode == "local"
         stt_method = f"{'로컬' if use_local else 'API'} Whisper ({model_size})"
+        diarization_method = "Senko" if diarization_mode == "senko" else "NeMo"
 
-        # 상태 업데이트: STT 시작
-        audio_file.processing_step = "stt"
-        audio_file.processing_progress = 40
-        audio_file.processing_message = f"STT 진행 중... ({stt_method})"
-        db.commit()
+        # 사용자 확정 화자 수 확인 (스테이지 스레드에서 DB를 조회하지 않도록 미리 조회)
+        confirmed_speaker_count = None
+        user_confirmation = db.query(UserConfirmation).filter(
+            UserConfirmation.audio_file_id == audio_file.id
+        ).first()
 
-        PROCESSING_STATUS[file_id] = {
-            "status": "stt",
-            "step": f"STT 진행 중... ({stt_method})",
-            "progress": 40,
-        }
+        if user_confirmation and user_confirmation.confirmed_speaker_count:
+            confirmed_speaker_count = user_confirmation.confirmed_speaker_count
+            print(f"🔍 사용자 확정 화자 수 적용: {confirmed_speaker_count}명")
+
+        # 스테이지 실행 계획: fingerprint가 바뀌었거나 산출물이 없는 스테이지(와 그 하류)만 다시 실행
+        # skip_stt(화자 수 확정 후 재분석)는 Whisper 설정이 달라도 기존 전사를 그대로 사용
+        manifest = StageManifest(work_dir)
+        preprocess_key = ArtifactCache.preprocess_key(input_path)
+        plan = plan_stages(manifest, {
+            "preprocess": {"key": preprocess_key},
+            "stt": {"key": ArtifactCache.stt_key(preprocess_key, whisper_mode, model_size, device)},
+            "diarization": {
+                "mode": diarization_mode,
+                "num_speakers": confirmed_speaker_count,
+                "device": device,
+                "windowed_min_seconds": settings.DIARIZATION_WINDOWED_MIN_SECONDS,
+                "window_seconds": settings.DIARIZATION_WINDOW_SECONDS,
+                "window_overlap": settings.DIARIZATION_WINDOW_OVERLAP,
+                "link_threshold": settings.DIARIZATION_LINK_THRESHOLD,
+            },
+            "keywords": {},
+            "merge": {},
+            "ner": {},
+        }, pinned=["stt"] if skip_stt else ())
+        save_plan(work_dir, plan)
+        print(f"🗺️ 스테이지 계획: {plan.summary()}")
+
+        # 상태 갱신 (STT와 화자 분리가 서로 다른 스레드에서 호출하므로 DB 세션 사용을 직렬화)
+        status_lock = threading.Lock()
+        progress_broker = get_progress_broker()
+        progress_state = {"progress": 0, "stt": 0.0, "stt_done": False, "diarization_done": False}
+
+        def update_status(status: str, step: str, progress: int, message: str = None, **extra):
+            with status_lock:
+                # 병렬 스테이지가 진행률을 되돌리지 않도록 단조 증가
+                progress = max(progress, progress_state["progress"])
+                progress_state["progress"] = progress
+                audio_file.processing_step = status
+                audio_file.processing_progress = progress
+                audio_file.processing_message = message or step
+                for key, value in extra.pop("audio_file_fields", {}).items():
+                    setattr(audio_file, key, value)
+                db.commit()
+
+                PROCESSING_STATUS[file_id] = {
+                    "status": status,
+                    "step": step,
+                    "progress": progress,
+                    **extra,
+                }
+                # SSE 구독자에게 바로 전달 (폴링 상태와 같은 형태)
+                progress_broker.publish(file_id, {
+                    **PROCESSING_STATUS[file_id],
+                    "status": LIVE_STATUS_ALIASES.get(status, status),
+                })
+
+        def update_parallel_status(**extra):
+            # STT(40 → 60)와 화자 분리(+10)가 함께 진행되는 구간: 둘 다 끝나면 70
+            progress = 40 + int(20 * progress_state["stt"]) + (10 if progress_state["diarization_done"] else 0)
+            if not progress_state["stt_done"]:
+                update_status(
+                    "stt", f"STT 진행 중... ({stt_method})", progress,
+                    message=extra.pop("message", None), **extra
+                )
+            else:
+                update_status("diarization", f"화자 분리 중... ({diarization_method})", progress, **extra)
+
+        # 2) 전처리 (같은 오디오 + 같은 설정이면 캐시 재사용)
+        def stage_preprocess(_):
+            update_status(
+                "preprocessing", "전처리 중...", 10,
+                audio_file_fields={"status": FileStatus.PROCESSING},
+                device=device, model_size=model_size,
+            )
+
+            if plan["preprocess"].reuse:
+                durations = manifest.get("preprocess")["meta"]
+            else:
+                durations = artifact_cache.fetch("preprocess", preprocess_key, work_dir) if artifact_cache else None
+                if durations is None:
+                    _, original_dur, processed_dur = preprocess_audio(
+                        input_path,
+                        preprocessed_path,
+                        streaming=settings.PREPROCESS_MODE == "streaming"
+                    )
+                    durations = {"original_duration": original_dur, "processed_duration": processed_dur}
+                    if artifact_cache:
+                        artifact_cache.store(
+                            "preprocess",
+                            preprocess_key,
+                            work_dir,
+                            [preprocessed_path.name, intervals_path_for(preprocessed_path).name],
+                            meta=durations,
+                        )
+                manifest.record("preprocess", plan["preprocess"].fingerprint, meta=durations)
+            # PCM 저장소는 캐시 항목에 없고 캐시 복사본 WAV는 mtime이 새로우므로,
+            # 병렬로 시작하는 STT/화자 분리가 동시에 다시 만들지 않도록 여기서 한 번 생성
+            ensure_pcm_store(preprocessed_path)
+            original_dur = durations["original_duration"]
+            processed_dur = durations["processed_duration"]
+
+            # 상태 업데이트: 전처리 완료
+            update_status(
+                "preprocessing_complete", "전처리 완료", 30,
+                audio_file_fields={"duration": original_dur},
+                original_duration=original_dur, processed_duration=processed_dur,
+            )
+            PROCESSING_STATUS[file_id]["status"] = "preprocessing"
+            return preprocess_key
 
-        # Whisper 전사 (로컬 또는 API)
-        # Whisper 전사 (로컬 또는 API)
-        if skip_stt:
-            print("⏩ STT 건너뛰기 (기존 결과 사용)")
-            # 기존 파일 찾기
-            possible_files = [
-                work_dir / "transcript.txt",
-                work_dir / f"{file_id}_transcript.txt",
-                work_dir / "final_transcript.txt"
-            ]
+        # 3) STT
+        def stage_stt(inputs):
+            preprocess_key = inputs["preprocess"]
+            decision = plan["stt"]
+            update_parallel_status()
+
+            # Whisper 전사 (로컬 또는 API)
+            stt_key = (
+                artifact_cache.stt_key(preprocess_key, whisper_mode, model_size, device)
+                if artifact_cache else None
+            )
             final_txt = None
-            for p in possible_files:
-                if p.exists():
-                    final_txt = p
-                    break
-            
+            if decision.reuse:
+                print(f"⏩ STT 건너뛰기 (기존 결과 사용: {decision.reason})")
+                final_txt = work_dir / "final_transcript.txt"
+
+            if not final_txt and artifact_cache and artifact_cache.fetch("stt", stt_key, work_dir) is not None:
+                final_txt = work_dir / "final_transcript.txt"
+
             if not final_txt:
-                print("⚠️ 기존 전사 파일을 찾을 수 없어 STT를 실행합니다.")
+                partial_count = {"segments": 0}
+
+                def publish_stt_chunk(chunk_index, total_chunks, segments):
+                    # 청크 완료마다 진행률과 임시 전사 세그먼트 수 갱신
+                    chunks_done = chunk_index + 1
+                    partial_count["segments"] += len(segments)
+                    progress_state["stt"] = chunks_done / total_chunks
+                    update_parallel_status(
+                        message=f"STT 진행 중... ({stt_method}, {chunks_done}/{total_chunks})",
+                        chunks_done=chunks_done,
+                        chunks_total=total_chunks,
+                        partial_segments=partial_count["segments"],
+                    )
+
                 final_txt = run_stt_pipeline(
                     preprocessed_path,
                     work_dir,
                     openai_api_key=settings.OPENAI_API_KEY if not use_local else None,
                     use_local_whisper=use_local,
                     model_size=model_size,
-                    device=device
+                    device=device,
+                    on_chunk=publish_stt_chunk
                 )
-        else:
-            final_txt = run_stt_pipeline(
-                preprocessed_path,
-                work_dir,
-                openai_api_key=settings.OPENAI_API_KEY if not use_local else None,
-                use_local_whisper=use_local,
-                model_size=model_size,
-                device=device
-            )
-
-        # STT 완료 후 메모리 정리 (Diarization 전 메모리 확보)
-        print("🧹 STT 완료, 메모리 정리 중...")
-        import gc
-        import torch
-        gc.collect()  # Python 가비지 컬렉션 강제 실행
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()  # CUDA 캐시 정리
-        print("✅ 메모리 정리 완료")
-
-        # --- [Keyword Extraction Start] ---
-        # STT 텍스트 확보
-        full_transcript_text = final_txt.read_text(encoding='utf-8')
-        
-        # 키워드 추출을 위한 별도 스레드 시작 (Diarization과 병렬 실행)
-        import threading
-        import asyncio
-        from app.services.keyword_extractor import extract_keywords_from_text, save_keywords_to_db
-
-        keyword_extraction_result = {"keywords": []}
-        
-        def run_keyword_extraction_thread(text, result_container):
+                if artifact_cache:
+                    stt_files = [
+                        str(p.relative_to(work_dir))
+                        for p in sorted((work_dir / "srt").glob("*.srt"))
+                    ]
+                    # npz는 TXT 뒤에 복원되도록 마지막에 둠 (load_final_transcript의 최신 여부 판단)
+                    stt_files += ["merged_transcript.txt", final_txt.name, final_transcript_npz_path(work_dir).name]
+                    artifact_cache.store("stt", stt_key, work_dir, stt_files)
+
+            if not decision.reuse:
+                manifest.record("stt", decision.fingerprint)
+
+            # STT 완료 후 메모리 정리
+            print("🧹 STT 완료, 메모리 정리 중...")
+            import gc
+            import torch
+            gc.collect()  # Python 가비지 컬렉션 강제 실행
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()  # CUDA 캐시 정리
+            print("✅ 메모리 정리 완료")
+
+            progress_state["stt"] = 1.0
+            progress_state["stt_done"] = True
+            if not progress_state["diarization_done"]:
+                update_parallel_status()
+            return final_txt
+
+        # 4) Diarization (화자 분리) - STT와 병렬 실행 (둘 다 전처리 결과만 사용)
+        diarization_attempts = {"count": 0}
+
+        def stage_diarization(_):
+            update_parallel_status()
+            diarization_json = work_dir / "diarization_result.json"
+            diarization_attempts["count"] += 1
             try:
-                # 새 이벤트 루프 생성 (스레드 내에서 비동기 실행)
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                keywords = loop.run_until_complete(extract_keywords_from_text(text))
-                result_container["keywords"] = keywords
-                loop.close()
+                if plan["diarization"].reuse:
+                    print(f"⏩ 화자 분리 건너뛰기 (기존 결과 사용: {plan['diarization'].reason})")
+                    with open(diarization_json, 'r', encoding='utf-8') as f:
+                        diarization_result = json.load(f)
+                else:
+                    diarization_result = run_diarization(
+                        preprocessed_path,
+                        device=device,
+                        mode=diarization_mode,
+                        num_speakers=confirmed_speaker_count
+                    )
+
+                    # Diarization 결과 저장
+                    with open(diarization_json, 'w', encoding='utf-8') as f:
+                        json.dump(diarization_result, f, ensure_ascii=False, indent=2)
+                    manifest.record("diarization", plan["diarization"].fingerprint)
+
+            except Exception as diarization_error:
+                import traceback
+                print(f"⚠️ Diarization failed: {diarization_error}")
+                print(traceback.format_exc())
+                # 재시도가 남아 있으면 예외를 올려 StageDAG가 화자 분리만 다시 실행
+                if diarization_attempts["count"] <= settings.JOB_STAGE_RETRIES:
+                    raise
+                # 마지막 시도까지 실패해도 STT 결과는 유지
+                diarization_result = None
+
+            progress_state["diarization_done"] = True
+            update_parallel_status()
+            return diarization_result
+
+        # 키워드 추출 (STT 텍스트만 사용하므로 화자 분리/병합과 병렬 실행)
+        def stage_keywords(inputs):
+            from app.services.keyword_extractor import extract_keywords_from_text
+
+            keywords_json = work_dir / "keywords.json"
+            try:
+                if plan["keywords"].reuse:
+                    with open(keywords_json, 'r', encoding='utf-8') as f:
+                        return json.load(f)
+
+                keywords = asyncio.run(extract_keywords_from_text(inputs["stt"].read_text(encoding='utf-8')))
                 print(f"✅ 키워드 추출 완료: {len(keywords)}개")
+                with open(keywords_json, 'w', encoding='utf-8') as f:
+                    json.dump(keywords, f, ensure_ascii=False)
+                manifest.record("keywords", plan["keywords"].fingerprint)
+                return keywords
             except Exception as e:
                 print(f"⚠️ 키워드 추출 실패: {e}")
+                return []
 
-        keyword_thread = threading.Thread(
-            target=run_keyword_extraction_thread,
-            args=(full_transcript_text, keyword_extraction_result)
-        )
-        keyword_thread.start()
-        print("🚀 키워드 추출 스레드 시작 (병렬 실행)")
-        # --- [Keyword Extraction End] ---
+        # STT + Diarization 병합
+        def stage_merge(inputs):
+            diarization_result = inputs["diarization"]
+            if not diarization_result:
+                return None
+            try:
+                if plan["merge"].reuse:
+                    return Transcript.load(work_dir / "merged_result.npz")
 
-        # 4) Diarization (화자 분리)
-        diarization_method = "Senko" if diarization_mode == "senko" else "NeMo"
+                # STT 결과 (컬럼형 Transcript, final_transcript.npz 우선)
+                stt_transcript = load_final_transcript(work_dir, inputs["stt"])
 
-        # 상태 업데이트: Diarization 시작
-        audio_file.processing_step = "diarization"
-        audio_file.processing_progress = 70
-        audio_file.processing_message = f"화자 분리 중... ({diarization_method})"
-        db.commit()
+                merged_result = merge_stt_with_diarization(stt_transcript, diarization_result)
 
-        PROCESSING_STATUS[file_id] = {
-            "status": "diarization",
-            "step": f"화자 분리 중... ({diarization_method})",
-            "progress": 70,
-        }
+                # 병합 결과 저장 (npz + 조회/디버깅용 JSON)
+                merged_result.save(work_dir / "merged_result.npz")
+                merged_json = work_dir / "merged_result.json"
+                with open(merged_json, 'w', encoding='utf-8') as f:
+                    json.dump(merged_result.to_dicts(), f, ensure_ascii=False)
+                manifest.record("merge", plan["merge"].fingerprint)
+                return merged_result
 
-        try:
-            # 사용자 확정 화자 수 확인
-            confirmed_speaker_count = None
-            user_confirmation = db.query(UserConfirmation).filter(
-                UserConfirmation.audio_file_id == audio_file.id
-            ).first()
-            
-            if user_confirmation and user_confirmation.confirmed_speaker_count:
-                confirmed_speaker_count = user_confirmation.confirmed_speaker_count
-                print(f"🔍 사용자 확정 화자 수 적용: {confirmed_speaker_count}명")
-
-            diarization_result = run_diarization(
-                preprocessed_path,
-                device=device,
-                mode=diarization_mode,
-                num_speakers=confirmed_speaker_count
-            )
-
-            # Diarization 결과 저장
-            diarization_json = work_dir / "diarization_result.json"
-            with open(diarization_json, 'w', encoding='utf-8') as f:
-                json.dump(diarization_result, f, ensure_ascii=False, indent=2)
-
-            # STT 결과 파싱
-            stt_segments = []
-            for line in full_transcript_text.splitlines():
-                if line.strip():
-                    # [00:00:00.000 - 00:00:02.800] 텍스트 형식 파싱
-                    import re
-                    match = re.match(r'\[(\d{2}:\d{2}:\d{2}\.\d{3}) - (\d{2}:\d{2}:\d{2}\.\d{3})\] (.+)', line)
-                    if match:
-                        start_str, end_str, text = match.groups()
-                        # 시간을 초로 변환
-                        def time_to_seconds(t):
-                            h, m, s = t.split(':')
-                            return int(h) * 3600 + int(m) * 60 + float(s)
-
-                        stt_segments.append({
-                            "text": text,
-                            "start": time_to_seconds(start_str),
-                            "end": time_to_seconds(end_str)
-                        })
-
-            # STT + Diarization 병합
-            merged_result = merge_stt_with_diarization(stt_segments, diarization_result)
-
-            # 병합 결과 저장
-            merged_json = work_dir / "merged_result.json"
-            with open(merged_json, 'w', encoding='utf-8') as f:
-                json.dump(merged_result, f, ensure_ascii=False, indent=2)
-
-        except Exception as diarization_error:
-            import traceback
-            print(f"⚠️ Diarization failed: {diarization_error}")
-            print(traceback.format_exc())
-            # Diarization 실패해도 STT 결과는 유지
-            diarization_result = None
-            merged_result = None
+            except Exception as merge_error:
+                import traceback
+                print(f"⚠️ Merge failed: {merge_error}")
+                print(traceback.format_exc())
+                return None
 
         # 5) NER (이름 추출 및 군집화) + 닉네임 태깅 (동시 처리)
-        # 상태 업데이트: NER 시작
-        audio_file.processing_step = "ner"
-        audio_file.processing_progress = 85
-        audio_file.processing_message = "이름 및 닉네임 추출 중..."
-        db.commit()
+        def stage_ner(inputs):
+            merged_result = inputs["merge"]
+            if not merged_result:
+                return None
 
-        PROCESSING_STATUS[file_id] = {
-            "status": "ner",
-            "step": "이름 및 닉네임 추출 중...",
-            "progress": 80,
-        }
+            # 상태 업데이트: NER 시작
+            update_status("ner", "이름 및 닉네임 추출 중...", 85)
+
+            ner_json = work_dir / "ner_result.json"
+            try:
+                if plan["ner"].reuse:
+                    with open(ner_json, 'r', encoding='utf-8') as f:
+                        return json.load(f)
 
-        ner_result = None
-        nickname_result = None
-        try:
-            if merged_result:
                 # NER 서비스 가져오기 (이름과 닉네임을 함께 처리)
                 ner_service = get_ner_service()
 
                 # NER 처리 (내부에서 닉네임도 함께 처리)
                 ner_result = ner_service.process_segments(merged_result)
 
-                # 닉네임 결과 추출
-                nickname_result = ner_result.get('nicknames', {})
-
                 # NER 결과 저장
-                ner_json = work_dir / "ner_result.json"
                 with open(ner_json, 'w', encoding='utf-8') as f:
                     json.dump(ner_result, f, ensure_ascii=False, indent=2)
+                manifest.record("ner", plan["ner"].fingerprint)
 
                 print(f"✅ NER 완료: {len(ner_result['final_namelist'])}개 대표명 추출")
+                nickname_result = ner_result.get('nicknames', {})
                 if nickname_result:
                     print(f"✅ 닉네임 태깅 완료: {len(nickname_result)}개 화자")
+                return ner_result
 
-        except Exception as ner_error:
-            print(f"⚠️ NER failed: {ner_error}")
-            # NER 실패해도 병합 결과는 유지
-            ner_result = None
-            nickname_result = None
+            except Exception as ner_error:
+                print(f"⚠️ NER failed: {ner_error}")
+                # NER 실패해도 병합 결과는 유지
+                return None
 
         # 6) DB 저장
-        # 상태 업데이트: DB 저장 시작
-        audio_file.processing_step = "saving"
-        audio_file.processing_progress = 90
-        audio_file.processing_message = "DB 저장 중..."
-        db.commit()
+        def stage_save(inputs):
+            diarization_result = inputs["diarization"]
+            merged_result = inputs["merge"]
+            ner_result = inputs["ner"]
+            nickname_result = ner_result.get('nicknames', {}) if ner_result else None
+            extracted_keywords = inputs["keywords"]
 
-        PROCESSING_STATUS[file_id] = {
-            "status": "saving",
-            "step": "DB 저장 중...",
-            "progress": 90,
-        }
+            # 상태 업데이트: DB 저장 시작
+            update_status("saving", "DB 저장 중...", 90)
 
-        # DB 저장 시작
-        if db:
-            try:
-                from app.models.diarization import DiarizationResult
-                from app.models.tagging import SpeakerMapping
-
-                audio_file_id_db = audio_file.id
-
-                # 6-1) 기존 결과 삭제 (중복 방지)
-                # 재분석 시 기존 데이터를 지우고 새로 저장해야 함
-                print(f"🧹 기존 분석 결과 삭제 중: audio_file_id={audio_file_id_db}")
-                db.query(STTResult).filter(STTResult.audio_file_id == audio_file_id_db).delete()
-                db.query(DiarizationResult).filter(DiarizationResult.audio_file_id == audio_file_id_db).delete()
-                db.query(DetectedName).filter(DetectedName.audio_file_id == audio_file_id_db).delete()
-                # SpeakerMapping은 사용자 확정 정보가 있을 수 있으므로 주의해야 하지만,
-                # 재분석(Diarization 다시 함)의 경우 화자 레이블이 바뀌므로 초기화하는 것이 맞음
-                # 단, UserConfirmation은 유지됨
-                db.query(SpeakerMapping).filter(SpeakerMapping.audio_file_id == audio_file_id_db).delete()
-                db.flush()
-
-                # 6-2) STTResult 저장 (merged_result의 각 세그먼트)
-                if merged_result:
-                    for idx, segment in enumerate(merged_result):
-                        stt_record = STTResult(
-                            audio_file_id=audio_file_id_db,
-                            word_index=idx,
-                            text=segment.get("text", ""),
-                            start_time=segment.get("start", 0.0),
-                            end_time=segment.get("end", 0.0),
-                            confidence=None  # Whisper doesn't provide word-level confidence
+            if db:
+                try:
+                    from app.models.diarization import DiarizationResult
+                    from app.models.tagging import SpeakerMapping
+                    from app.services.bulk_writer import BulkWriter
+
+                    audio_file_id_db = audio_file.id
+                    writer = BulkWriter(db)
+
+                    # 6-1) 기존 결과 삭제 후 새로 저장 (같은 트랜잭션, ORM 객체 없이 행 튜플로 배치 insert)
+                    # 재분석 시 기존 데이터를 지우고 새로 저장해야 함
+                    # SpeakerMapping은 사용자 확정 정보가 있을 수 있으므로 주의해야 하지만,
+                    # 재분석(Diarization 다시 함)의 경우 화자 레이블이 바뀌므로 초기화하는 것이 맞음
+                    # 단, UserConfirmation은 유지됨
+                    print(f"🧹 기존 분석 결과 교체 중: audio_file_id={audio_file_id_db}")
+
+                    # 6-2) STTResult 저장 (merged_result의 각 세그먼트)
+                    # confidence: Whisper doesn't provide word-level confidence
+                    stt_rows = []
+                    if merged_result:
+                        stt_rows = zip(
+                            range(len(merged_result)),
+                            merged_result.texts,
+                            merged_result.start_seconds().tolist(),
+                            merged_result.end_seconds().tolist(),
                         )
-                        db.add(stt_record)
-
-                # 6-3) DiarizationResult 저장 (화자별 임베딩)
-                if diarization_result and 'turns' in diarization_result:
-                    for segment in diarization_result['turns']:
-                        speaker_label = segment.get('speaker_label', 'UNKNOWN')
-
-                        # 해당 화자의 임베딩 가져오기
+                    writer.replace(
+                        STTResult, audio_file_id_db,
+                        ("word_index", "text", "start_time", "end_time"), stt_rows,
+                    )
+
+                    # 6-3) DiarizationResult 저장 (화자별 임베딩, JSON 형태로 저장)
+                    diar_rows = []
+                    if diarization_result and 'turns' in diarization_result:
                         embeddings = diarization_result.get('embeddings', {})
-                        embedding_vector = embeddings.get(speaker_label)
-
-                        diar_record = DiarizationResult(
-                            audio_file_id=audio_file_id_db,
-                            speaker_label=speaker_label,
-                            start_time=segment.get('start', 0.0),
-                            end_time=segment.get('end', 0.0),
-                            embedding=embedding_vector  # JSON 형태로 저장
-                        )
-                        db.add(diar_record)
-
-                # 6-4) DetectedName 저장 (NER로 감지된 이름들 - has_name: true인 세그먼트)
-                if ner_result:
-                    segments_with_names = ner_result.get('segments_with_names', [])
-
-                    # 이름이 감지된 세그먼트들만 필터링
-                    for idx, segment in enumerate(segments_with_names):
-                        if segment.get('has_name', False) and segment.get('name'):
-                            # 앞뒤 5문장 문맥 추출 (I,O.md 5a~5c)
-                            context_before_idx = max(0, idx - 5)
-                            context_after_idx = min(len(segments_with_names), idx + 6)
-
-                            context_before = [
-                                {
-                                    "index": i - idx,
-                                    "speaker": seg.get("speaker"),
-                                    "text": seg.get("text"),
-                                    "time": seg.get("start")
-                                }
-                                for i, seg in enumerate(segments_with_names[context_before_idx:idx], start=context_before_idx)
-                            ]
-
-                            context_after = [
-                                {
-                                    "index": i - idx,
-                                    "speaker": seg.get("speaker"),
-                                    "text": seg.get("text"),
-                                    "time": seg.get("start")
-                                }
-                                for i, seg in enumerate(segments_with_names[idx+1:context_after_idx], start=idx+1)
-                            ]
-
-                            # 이 세그먼트에서 감지된 각 이름에 대해 레코드 생성
-                            for detected_name in segment['name']:
-                                name_record = DetectedName(
-                                    audio_file_id=audio_file_id_db,
-                                    detected_name=detected_name,
-                                    speaker_label=segment.get('speaker', 'UNKNOWN'),
-                                    time_detected=segment.get('start', 0.0),
-                                    confidence=None,  # NER 신뢰도 (현재 미구현)
-                                    similarity_score=None,
-                                    context_before=context_before,  # 앞 5문장 (I,O.md 참조)
-                                    context_after=context_after,   # 뒤 5문장 (I,O.md 참조)
-                                    llm_reasoning=None,  # 멀티턴 LLM 추론 결과 (향후 구현)
-                                    is_consistent=None   # 이전 추론과 일치 여부 (향후 구현)
-                                )
-                                db.add(name_record)
-
-                # 6-5) SpeakerMapping 저장 (화자별 초기 레코드만 생성, 매핑은 나중에)
-                if diarization_result:
-                    # 화자별 고유 레이블 추출
-                    speaker_labels = list(diarization_result.get('embeddings', {}).keys())
-
-                    # 각 화자에 대해 SpeakerMapping 생성 (초기 제안 없이)
-                    for speaker_label in speaker_labels:
-                        # 이미 존재하는지 확인 (중복 방지)
-                        existing = db.query(SpeakerMapping).filter(
-                            SpeakerMapping.audio_file_id == audio_file_id_db,
-                            SpeakerMapping.speaker_label == speaker_label
-                        ).first()
-
-                        if not existing:
-                            # 닉네임 정보 가져오기 (NER 결과에서)
-                            nickname_info = nickname_result.get(speaker_label) if nickname_result else None
-                            
-                            mapping = SpeakerMapping(
-                                audio_file_id=audio_file_id_db,
-                                speaker_label=speaker_label,
-                                suggested_name=None,  # 초기 제안 없음 (향후 LLM이 추론)
-                                name_confidence=None,
-                                name_mentions=0,
-                                suggested_role=None,
-                                role_confidence=None,
-                                nickname=nickname_info.get('nickname') if nickname_info else None,
-                                nickname_metadata=nickname_info.get('nickname_metadata') if nickname_info else None,
-                                conflict_detected=False,
-                                needs_manual_review=True,  # 기본적으로 사용자 확인 필요
-                                final_name="",  # 사용자가 확정 전까지 빈 값
-                                is_modified=False
+                        diar_rows = [
+                            (
+                                segment.get('speaker_label', 'UNKNOWN'),
+                                segment.get('start', 0.0),
+                                segment.get('end', 0.0),
+                                embeddings.get(segment.get('speaker_label', 'UNKNOWN')),
                             )
-                            db.add(mapping)
-                        elif nickname_result and speaker_label in nickname_result:
-                            # 기존 레코드가 있으면 닉네임 정보만 업데이트 (NER 결과에서)
-                            nickname_info = nickname_result[speaker_label]
-                            existing.nickname = nickname_info.get('nickname')
-                            existing.nickname_metadata = nickname_info.get('nickname_metadata')
-
-                # 6-6) 키워드 저장 (스레드 조인 및 저장)
-                print("⏳ 키워드 추출 스레드 대기 중...")
-                keyword_thread.join(timeout=60) # 최대 60초 대기 (이미 완료되었을 가능성 높음)
-                if keyword_thread.is_alive():
-                    print("⚠️ 키워드 추출 스레드가 아직 실행 중입니다. (타임아웃)")
-                
-                extracted_keywords = keyword_extraction_result.get("keywords", [])
-                if extracted_keywords and merged_result:
-                    print(f"💾 키워드 {len(extracted_keywords)}개 DB 저장 중...")
-                    try:
-                        save_keywords_to_db(db, audio_file_id_db, extracted_keywords, merged_result)
-                    except Exception as kw_error:
-                        print(f"⚠️ 키워드 저장 실패 (무시함): {kw_error}")
-                        # 키워드 저장 실패는 전체 트랜잭션을 롤백하지 않도록 함
-                else:
-                    print("⚠️ 저장할 키워드가 없거나 병합 결과가 없습니다.")
-
-                # 6-7) AudioFile 상태 업데이트: 완료
-                audio_file.status = FileStatus.COMPLETED
-                audio_file.processing_step = "completed"
-                audio_file.processing_progress = 100
-                audio_file.processing_message = "처리 완료"
-
-                # 커밋
-                db.commit()
-                print(f"✅ DB 저장 완료: audio_file_id={audio_file_id_db}")
-
-                # 완료 시 메모리에서 제거하여 DB 조회를 유도 (즉시 반영)
-                if file_id in PROCESSING_STATUS:
-                    del PROCESSING_STATUS[file_id]
-                    print(f"🧹 메모리 상태 제거 완료 (DB 커밋 직후): {file_id}")
-
-                # DetectedName 개수 확인
-                detected_name_count = db.query(DetectedName).filter(
-                    DetectedName.audio_file_id == audio_file_id_db
-                ).count()
-                speaker_mapping_count = db.query(SpeakerMapping).filter(
-                    SpeakerMapping.audio_file_id == audio_file_id_db
-                ).count()
-                print(f"  - DetectedName 레코드: {detected_name_count}개")
-                print(f"  - STTResult 레코드: {len(merged_result) if merged_result else 0}개")
-                print(f"  - DiarizationResult 레코드: {len(diarization_result.get('turns', [])) if diarization_result else 0}개")
-                print(f"  - SpeakerMapping 레코드: {speaker_mapping_count}개")
-                print(f"  - KeyTerm 레코드: {len(extracted_keywords)}개")
+                            for segment in diarization_result['turns']
+                        ]
+                    writer.replace(
+                        DiarizationResult, audio_file_id_db,
+                        ("speaker_label", "start_time", "end_time", "embedding"), diar_rows,
+                    )
+
+                    # 6-4) DetectedName 저장 (NER로 감지된 이름들 - has_name: true인 세그먼트)
+                    # confidence / similarity_score / llm_reasoning / is_consistent는 향후 구현 (NULL)
+                    name_rows = []
+                    if ner_result:
+                        segments_with_names = ner_result.get('segments_with_names', [])
+
+                        # 이름이 감지된 세그먼트들만 필터링
+                        for idx, segment in enumerate(segments_with_names):
+                            if segment.get('has_name', False) and segment.get('name'):
+                                # 앞뒤 5문장 문맥 추출 (I,O.md 5a~5c)
+                                context_before_idx = max(0, idx - 5)
+                                context_after_idx = min(len(segments_with_names), idx + 6)
+
+                                context_before = [
+                                    {
+                                        "index": i - idx,
+                                        "speaker": seg.get("speaker"),
+                                        "text": seg.get("text"),
+                                        "time": seg.get("start")
+                                    }
+                                    for i, seg in enumerate(segments_with_names[context_before_idx:idx], start=context_before_idx)
+                                ]
+
+                                context_after = [
+                                    {
+                                        "index": i - idx,
+                                        "speaker": seg.get("speaker"),
+                                        "text": seg.get("text"),
+                                        "time": seg.get("start")
+                                    }
+                                    for i, seg in enumerate(segments_with_names[idx+1:context_after_idx], start=idx+1)
+                                ]
+
+                                # 이 세그먼트에서 감지된 각 이름에 대해 행 생성
+                                for detected_name in segment['name']:
+                                    name_rows.append((
+                                        detected_name,
+                                        segment.get('speaker', 'UNKNOWN'),
+                                        segment.get('start', 0.0),
+                                        context_before,  # 앞 5문장 (I,O.md 참조)
+                                        context_after,   # 뒤 5문장 (I,O.md 참조)
+                                    ))
+                    writer.replace(
+                        DetectedName, audio_file_id_db,
+                        ("detected_name", "speaker_label", "time_detected", "context_before", "context_after"),
+                        name_rows,
+                    )
+
+                    # 6-5) SpeakerMapping 저장 (화자별 초기 레코드만 생성, 매핑은 나중에)
+                    # 초기 제안 없음 (향후 LLM이 추론), 기본적으로 사용자 확인 필요, 사용자가 확정 전까지 final_name은 빈 값
+                    mapping_rows = []
+                    if diarization_result:
+                        # 화자별 고유 레이블 + 닉네임 정보 (NER 결과에서)
+                        for speaker_label in diarization_result.get('embeddings', {}).keys():
+                            nickname_info = (nickname_result.get(speaker_label) if nickname_result else None) or {}
+                            mapping_rows.append((
+                                speaker_label,
+                                nickname_info.get('nickname'),
+                                nickname_info.get('nickname_metadata'),
+                            ))
+                    writer.delete(SpeakerMapping, audio_file_id_db)
+                    writer.insert(
+                        SpeakerMapping,
+                        ("speaker_label", "nickname", "nickname_metadata"),
+                        mapping_rows,
+                        fixed={
+                            "audio_file_id": audio_file_id_db,
+                            "name_mentions": 0,
+                            "conflict_detected": False,
+                            "needs_manual_review": True,
+                            "final_name": "",
+                            "is_modified": False,
+                        },
+                    )
+
+                    # 6-6) 키워드 저장 (keywords 스테이지 결과)
+                    from app.services.keyword_extractor import save_keywords_to_db
+
+                    if extracted_keywords and merged_result:
+                        print(f"💾 키워드 {len(extracted_keywords)}개 DB 저장 중...")
+                        try:
+                            save_keywords_to_db(db, audio_file_id_db, extracted_keywords, merged_result)
+                        except Exception as kw_error:
+                            print(f"⚠️ 키워드 저장 실패 (무시함): {kw_error}")
+                            # 키워드 저장 실패는 전체 트랜잭션을 롤백하지 않도록 함
+                    else:
+                        print("⚠️ 저장할 키워드가 없거나 병합 결과가 없습니다.")
+
+                    # 6-7) AudioFile 상태 업데이트: 완료
+                    audio_file.status = FileStatus.COMPLETED
+                    audio_file.processing_step = "completed"
+                    audio_file.processing_progress = 100
+                    audio_file.processing_message = "처리 완료"
+
+                    # 커밋
+                    db.commit()
+                    print(f"✅ DB 저장 완료: audio_file_id={audio_file_id_db}")
+
+                    # 완료 시 메모리에서 제거하여 DB 조회를 유도 (즉시 반영)
+                    if file_id in PROCESSING_STATUS:
+                        del PROCESSING_STATUS[file_id]
+                        print(f"🧹 메모리 상태 제거 완료 (DB 커밋 직후): {file_id}")
+
+                    # SSE 구독자에게 완료 상태 전달 (방금 저장한 행에서 화자 수/이름/닉네임 집계)
+                    progress_broker.publish(file_id, {
+                        "status": "completed",
+                        "step": "완료",
+                        "progress": 100,
+                        "speaker_count": len(mapping_rows),
+                        "detected_names": list(dict.fromkeys(row[0] for row in name_rows)),
+                        "detected_nicknames": [row[1] for row in mapping_rows if row[1]],
+                    })
+
+                    # 저장 결과 (테이블별 행 수, 처리량)
+                    writer.report()
+                    saved = {stats["table"]: stats["rows"] for stats in writer.summary()}
+                    print(f"  - DetectedName 레코드: {saved.get('detected_names', 0)}개")
+                    print(f"  - STTResult 레코드: {saved.get('stt_results', 0)}개")
+                    print(f"  - DiarizationResult 레코드: {saved.get('diarization_results', 0)}개")
+                    print(f"  - SpeakerMapping 레코드: {saved.get('speaker_mappings', 0)}개")
+                    print(f"  - KeyTerm 레코드: {len(extracted_keywords)}개")
                 
-                # 6-8) 효율성 분석 트리거 (비동기)
-                # 재분석 시 효율성 지표도 갱신되어야 함
-                print(f"📊 효율성 분석 트리거: audio_file_id={audio_file_id_db}")
-                from app.api.v1.efficiency import run_efficiency_analysis
+                    # 6-8) 효율성 분석 트리거 (비동기)
+                    # 재분석 시 효율성 지표도 갱신되어야 함
+                    print(f"📊 효율성 분석 트리거: audio_file_id={audio_file_id_db}")
+                    from app.api.v1.efficiency import run_efficiency_analysis
                 
-                # 현재 스레드에서 바로 실행하지 않고, 별도 스레드/프로세스로 실행하거나
-                # 여기서는 간단히 함수 호출 (run_efficiency_analysis 내부에서 새 DB 세션 생성함)
-                # 주의: 이미 백그라운드 태스크 내부이므로, 동기적으로 호출해도 무방하나
-                # 시간이 걸릴 수 있으므로 별도 스레드로 실행하는 것이 좋음
+                    # 현재 스레드에서 바로 실행하지 않고, 별도 스레드/프로세스로 실행하거나
+                    # 여기서는 간단히 함수 호출 (run_efficiency_analysis 내부에서 새 DB 세션 생성함)
+                    # 주의: 이미 백그라운드 태스크 내부이므로, 동기적으로 호출해도 무방하나
+                    # 시간이 걸릴 수 있으므로 별도 스레드로 실행하는 것이 좋음
                 
-                # 여기서는 간단히 동기 호출 (어차피 백그라운드 태스크임)
-                try:
-                    run_efficiency_analysis(str(audio_file_id_db))
-                except Exception as eff_error:
-                    print(f"⚠️ 효율성 분석 실패 (무시함): {eff_error}")
-
-                # 6-9) 화자 태깅 에이전트 자동 실행 (재분석의 경우)
-                # 화자 수가 변경되어 재분석된 경우, 에이전트도 다시 실행해야 함
-                print(f"🤖 화자 태깅 에이전트 트리거: audio_file_id={audio_file_id_db}")
-                from app.api.v1.tagging import run_tagging_agent
-                import asyncio
+                    # 여기서는 간단히 동기 호출 (어차피 백그라운드 태스크임)
+                    try:
+                        run_efficiency_analysis(str(audio_file_id_db))
+                    except Exception as eff_error:
+                        print(f"⚠️ 효율성 분석 실패 (무시함): {eff_error}")
+
+                    # 6-9) 화자 태깅 에이전트 자동 실행 (재분석의 경우)
+                    # 화자 수가 변경되어 재분석된 경우, 에이전트도 다시 실행해야 함
+                    print(f"🤖 화자 태깅 에이전트 트리거: audio_file_id={audio_file_id_db}")
+                    from app.api.v1.tagging import run_tagging_agent
+                    import asyncio
                 
-                try:
-                    # run_tagging_agent는 async 함수이므로 동기 함수인 process_audio_pipeline에서 실행하려면 이벤트 루프 필요
-                    # 이미 다른 루프가 돌고 있을 수 있으므로 체크
                     try:
-                        loop = asyncio.get_event_loop()
-                    except RuntimeError:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
+                        # run_tagging_agent는 async 함수이므로 동기 함수인 process_audio_pipeline에서 실행하려면 이벤트 루프 필요
+                        # 이미 다른 루프가 돌고 있을 수 있으므로 체크
+                        try:
+                            loop = asyncio.get_event_loop()
+                        except RuntimeError:
+                            loop = asyncio.new_event_loop()
+                            asyncio.set_event_loop(loop)
                     
-                    if loop.is_running():
-                        # 이미 루프가 실행 중이면 (드문 경우) create_task 사용 불가 (동기 함수라)
-                        # 별도 스레드에서 실행
-                        import threading
-                        def run_async_in_thread():
-                            new_loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(new_loop)
-                            new_loop.run_until_complete(run_tagging_agent(str(file_id), audio_file_id_db, audio_file.user_id))
-                            new_loop.close()
+                        if loop.is_running():
+                            # 이미 루프가 실행 중이면 (드문 경우) create_task 사용 불가 (동기 함수라)
+                            # 별도 스레드에서 실행
+                            import threading
+                            def run_async_in_thread():
+                                new_loop = asyncio.new_event_loop()
+                                asyncio.set_event_loop(new_loop)
+                                new_loop.run_until_complete(run_tagging_agent(str(file_id), audio_file_id_db, audio_file.user_id))
+                                new_loop.close()
                         
-                        agent_thread = threading.Thread(target=run_async_in_thread)
-                        agent_thread.start()
-                        agent_thread.join(timeout=300) # 5분 대기
-                    else:
-                        loop.run_until_complete(run_tagging_agent(str(file_id), audio_file_id_db, audio_file.user_id))
+                            agent_thread = threading.Thread(target=run_async_in_thread)
+                            agent_thread.start()
+                            agent_thread.join(timeout=300) # 5분 대기
+                        else:
+                            loop.run_until_complete(run_tagging_agent(str(file_id), audio_file_id_db, audio_file.user_id))
                         
-                except Exception as agent_error:
-                    print(f"⚠️ 화자 태깅 에이전트 실행 실패 (무시함): {agent_error}")
+                    except Exception as agent_error:
+                        print(f"⚠️ 화자 태깅 에이전트 실행 실패 (무시함): {agent_error}")
+
+                except Exception as db_error:
+                    print(f"⚠️ DB 저장 실패: {db_error}")
+                    db.rollback()
+                    # DB 저장 실패해도 파일 결과는 유지
+
+        # 스테이지 그래프: preprocess → {stt, diarization} → merge → ner → save (keywords는 stt 이후 병렬)
+        stt_cpu, stt_memory, stt_gpu_memory = estimate_stt_resources(use_local, model_size, device)
+        diar_cpu, diar_memory, diar_gpu_memory = estimate_diarization_resources(diarization_mode, device)
+
+        # 실패 시 해당 스테이지만 재시도 (DB에 쓰는 save는 제외)
+        retries = settings.JOB_STAGE_RETRIES
+
+        dag = StageDAG(f"pipeline-{file_id}")
+        dag.add("preprocess", stage_preprocess, cpu=1, memory_mb=1024, retries=retries)
+        dag.add(
+            "stt", stage_stt, ["preprocess"],
+            cpu=stt_cpu, memory_mb=stt_memory, gpu_memory_mb=stt_gpu_memory, retries=retries
+        )
+        dag.add(
+            "diarization", stage_diarization, ["preprocess"],
+            cpu=diar_cpu, memory_mb=diar_memory, gpu_memory_mb=diar_gpu_memory, retries=retries
+        )
+        dag.add("keywords", stage_keywords, ["stt"], cpu=0, memory_mb=256)
+        dag.add("merge", stage_merge, ["stt", "diarization"], cpu=1, memory_mb=256)
+        dag.add("ner", stage_ner, ["merge"], cpu=1, memory_mb=2048, retries=retries)
+        dag.add("save", stage_save, ["diarization", "merge", "ner", "keywords"], cpu=1, memory_mb=512)
+
+        try:
+            dag.run(gate=stage_gate)
+        finally:
+            report = dag.report.to_dict()
+            with open(work_dir / "pipeline_timing.json", 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"⏱️ 크리티컬 패스: {dag.report.summary()}")
 
-            except Exception as db_error:
-                print(f"⚠️ DB 저장 실패: {db_error}")
-                db.rollback()
-                # DB 저장 실패해도 파일 결과는 유지
-
-        # 완료
-        # 닉네임 목록 추출
-        detected_nicknames_list = []
-        if nickname_result:
-            detected_nicknames_list = [info.get('nickname') for info in nickname_result.values() if info.get('nickname')]
-        
         # 완료 시 메모리에서 제거하여 DB 조회를 유도
         if file_id in PROCESSING_STATUS:
             del PROCESSING_STATUS[file_id]
             print(f"🧹 메모리 상태 제거 완료: {file_id}")
 
     except Exception as e:
+        # lease 상실: 다른 워커가 같은 작업을 이어서 실행하며 같은 행에 진행 상태를 쓰므로 그대로 중단
+        if isinstance(e, LeaseLost):
+            print(f"⚠️ lease 상실로 중단 (file_id={file_id}): {e}")
+            db.rollback()
+            raise
+
+        # 실행 중 취소: 대기 중 취소(cancel_processing)와 같은 사용자 취소 상태로 기록
+        if isinstance(e, StageCancelled):
+            print(f"🛑 처리 취소됨 (file_id={file_id}): {e}")
+            if 'audio_file' in locals() and audio_file:
+                db.rollback()
+                set_file_stopped(audio_file, cancelled=True)
+                db.commit()
+
+            PROCESSING_STATUS[file_id] = cancelled_status()
+            get_progress_broker().publish(file_id, PROCESSING_STATUS[file_id])
+            raise
+
+        # 작업 큐가 재시도할 예정이면 실패로 표시하지 않음 (취소는 위에서 항상 최종 처리)
+        if not final_attempt:
+            if 'audio_file' in locals() and audio_file:
+                db.rollback()
+                audio_file.processing_message = f"오류 발생, 재시도 대기 중: {e}"
+                db.commit()
+            raise
+
         # 에러 발생 시 DB 업데이트
         if 'audio_file' in locals() and audio_file:
-            audio_file.status = FileStatus.FAILED
-            audio_file.processing_step = "failed"
-            audio_file.processing_progress = 0
-            audio_file.processing_message = "오류 발생"
-            audio_file.error_message = str(e)
+            set_file_stopped(audio_file, cancelled=False, error=str(e))
             db.commit()
 
         PROCESSING_STATUS[file_id] = {
@@ -614,18 +751,84 @@ def process_audio_pipeline(
             "progress": 0,
             "error": str(e),
         }
+        get_progress_broker().publish(file_id, PROCESSING_STATUS[file_id])
         raise  # 에러를 다시 발생시켜 로그에 남김
     finally:
         # DB 세션 종료
         db.close()
 
 
+def submit_processing(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    file_id: str,
+    user_id: int,
+    whisper_mode: str,
+    diarization_mode: str,
+    skip_stt: bool = False,
+    priority: int = 0,
+) -> dict:
+    """
+    처리 요청 제출 (PROCESSING_BACKEND에 따라 작업 큐 등록 또는 API 프로세스 백그라운드 태스크)
+
+    Returns:
+        {"backend", "created", "job_id", "queue_position"} - created가 False면 이미 대기/실행 중인 작업이 있음
+    """
+    if settings.PROCESSING_BACKEND != "queue":
+        background_tasks.add_task(
+            process_audio_pipeline,
+            file_id=file_id,
+            user_id=user_id,
+            whisper_mode=whisper_mode,
+            diarization_mode=diarization_mode,
+            skip_stt=skip_stt,
+        )
+        return {"backend": "inline", "created": True, "job_id": None, "queue_position": None}
+
+    # 워커 프로세스는 upload.py의 메모리(UPLOADED_FILES)를 볼 수 없으므로 AudioFile을 먼저 만들어 둠
+    audio_file = get_audio_file(db, file_id)
+
+    if not audio_file:
+        from app.api.v1.upload import UPLOADED_FILES
+        input_path = next(Path("/app/uploads").glob(f"{file_id}.*"))
+        audio_file = AudioFile(
+            user_id=user_id,
+            file_uuid=file_id,
+            original_filename=UPLOADED_FILES.get(file_id, {}).get("filename", input_path.name),
+            file_path=str(input_path),
+            file_size=input_path.stat().st_size,
+            mimetype="audio/wav",
+            status=FileStatus.UPLOADED
+        )
+        db.add(audio_file)
+        db.flush()
+
+    job, created = enqueue_job(
+        db, file_id, user_id, whisper_mode, diarization_mode,
+        skip_stt=skip_stt, priority=priority, audio_file_id=audio_file.id
+    )
+    if created:
+        audio_file.processing_step = "queued"
+        audio_file.processing_progress = 0
+        audio_file.processing_message = "대기 중..."
+        audio_file.error_message = None
+        db.commit()
+
+    return {
+        "backend": "queue",
+        "created": created,
+        "job_id": job.id,
+        "queue_position": queue_position(db, job) if job.status == JobStatus.QUEUED else None,
+    }
+
+
 @router.post("/process/{file_id}")
 async def start_processing(
     file_id: str,
     background_tasks: BackgroundTasks,
     whisper_mode: str = None,  # "local" or "api" (None일 경우 설정값 사용)
     diarization_mode: str = None,  # "senko" or "nemo" (None일 경우 설정값 사용)
+    priority: int = 0,  # 작업 큐 우선순위 (클수록 먼저)
     db: Session = Depends(get_db),
     current_user: Any = Depends(get_current_user)
 ):
@@ -636,6 +839,7 @@ async def start_processing(
         file_id: 업로드된 파일 ID (UUID 또는 DB ID)
         whisper_mode: Whisper 모드 ("local" 또는 "api", 기본값: 설정값)
         diarization_mode: 화자 분리 모델 ("senko" 또는 "nemo", 기본값: 설정값)
+        priority: 작업 큐 우선순위 (PROCESSING_BACKEND=queue일 때)
 
     Returns:
         처리 시작 확인 메시지
@@ -646,19 +850,9 @@ async def start_processing(
         - senko: 빠름, 간단
         - nemo: 정확, 세밀한 설정
     """
-    import re
-
-    # 파일 존재 확인
+    # 파일 존재 확인 (숫자 ID인 경우 DB의 업로드 UUID 사용)
     upload_dir = Path("/app/uploads")
-    actual_file_id = file_id
-
-    # 숫자 ID인 경우 DB에서 UUID 추출
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-        if audio_file and audio_file.file_path:
-            match = re.search(r'([a-f0-9\-]{36})', audio_file.file_path)
-            if match:
-                actual_file_id = match.group(1)
+    actual_file_id = resolve_status_file_id(db, file_id)
 
     input_files = list(upload_dir.glob(f"{actual_file_id}.*"))
     if not input_files:
@@ -694,30 +888,41 @@ async def start_processing(
     # 디바이스 자동 감지
     detected_device = get_device()
 
-    # 백그라운드 작업 시작
-    PROCESSING_STATUS[actual_file_id] = {
-        "status": "queued",
-        "step": "대기 중...",
-        "progress": 0,
-        "whisper_mode": use_whisper_mode,
-        "diarization_mode": use_diarization_mode,
-        "model_size": "large-v3",
-        "device": detected_device,
-    }
-
-    # 백그라운드 태스크 시작 (내부에서 DB 세션 생성)
-    background_tasks.add_task(
-        process_audio_pipeline,
-        actual_file_id,
-        current_user.id,
-        use_whisper_mode,
-        use_diarization_mode
+    # 작업 큐 또는 백그라운드 태스크로 제출 (파이프라인 내부에서 DB 세션 생성)
+    submitted = submit_processing(
+        db, background_tasks, actual_file_id, current_user.id,
+        use_whisper_mode, use_diarization_mode, priority=priority
     )
 
+    if not submitted["created"]:
+        return {
+            "file_id": actual_file_id,
+            "message": "이미 처리 중입니다.",
+            "status": "queued",
+            "job_id": submitted["job_id"],
+            "queue_position": submitted["queue_position"],
+        }
+
+    if submitted["backend"] == "inline":
+        PROCESSING_STATUS[actual_file_id] = {
+            "status": "queued",
+            "step": "대기 중...",
+            "progress": 0,
+            "whisper_mode": use_whisper_mode,
+            "diarization_mode": use_diarization_mode,
+            "model_size": "large-v3",
+            "device": detected_device,
+        }
+    else:
+        # 워커 프로세스가 DB에 진행 상태를 기록 (이전 실행의 메모리 상태가 가리지 않도록 제거)
+        PROCESSING_STATUS.pop(actual_file_id, None)
+
     return {
         "file_id": actual_file_id,
         "message": "처리가 시작되었습니다.",
         "status": "queued",
+        "job_id": submitted["job_id"],
+        "queue_position": submitted["queue_position"],
         "whisper_mode": use_whisper_mode,
         "diarization_mode": use_diarization_mode,
         "model_size": "large-v3",
@@ -725,64 +930,141 @@ async def start_processing(
     }
 
 
-@router.get("/status/{file_id}")
-async def get_processing_status(file_id: str, db: Session = Depends(get_db)):
+@router.post("/process/{file_id}/cancel")
+async def cancel_processing(
+    file_id: str,
+    db: Session = Depends(get_db),
+    current_user: Any = Depends(get_current_user)
+):
     """
-    처리 상태 조회 (메모리 또는 DB)
+    처리 취소 (작업 큐)
+
+    대기 중인 작업은 바로 취소되고, 실행 중인 작업은 현재 스테이지가 끝난 뒤 다음 스테이지 전에 중단됩니다.
 
     Args:
-        file_id: 파일 ID (UUID 또는 DB ID)
+        file_id: 파일 ID (UUID)
 
     Returns:
-        현재 처리 상태
+        취소 후 작업 상태
     """
-    import re
+    job = get_active_job(db, file_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="대기 또는 실행 중인 작업이 없습니다.")
 
-    actual_file_id = file_id
+    status = cancel_job(db, job)
+    if status == JobStatus.CANCELLED:
+        mark_file_stopped(db, job.audio_file_id, cancelled=True)
+        db.commit()
+        get_progress_broker().publish(file_id, cancelled_status())
 
-    # 숫자 ID인 경우 DB에서 UUID 추출
+    return {
+        "file_id": file_id,
+        "job_id": job.id,
+        "status": status.value,
+        "message": "취소되었습니다." if status == JobStatus.CANCELLED else "현재 스테이지가 끝나면 중단됩니다.",
+    }
+
+
+@router.get("/jobs")
+async def get_jobs(limit: int = 50, db: Session = Depends(get_db)):
+    """
+    작업 큐 현황 (상태별 개수, 실행 중 작업, 최근 작업 목록)
+    """
+    recent = db.query(ProcessingJob).order_by(ProcessingJob.id.desc()).limit(limit).all()
+    return {
+        **queue_stats(db),
+        "jobs": [
+            {
+                "job_id": job.id,
+                "file_id": job.file_id,
+                "status": job.status.value,
+                "priority": job.priority,
+                "stage": job.current_stage,
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts,
+                "error": job.error_message,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+            }
+            for job in recent
+        ],
+    }
+
+
+def resolve_status_file_id(db: Session, file_id: str) -> str:
+    """숫자 ID인 경우 DB의 업로드 UUID로 변환 (메모리 상태/작업 큐/진행 스트림은 UUID 기준)"""
     if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-        if audio_file and audio_file.file_path:
-            match = re.search(r'([a-f0-9\-]{36})', audio_file.file_path)
-            if match:
-                actual_file_id = match.group(1)
+        row = db.query(AudioFile.file_uuid).filter(AudioFile.id == int(file_id)).first()
+        if row and row.file_uuid:
+            return row.file_uuid
+    return file_id
+
+
+def load_processing_status(db: Session, file_id: str) -> Dict:
+    """
+    처리 상태 조회 (메모리 또는 DB)
+
+    Args:
+        db: DB 세션
+        file_id: 파일 ID (UUID 또는 DB ID)
+
+    Returns:
+        현재 처리 상태 (파일이 없으면 HTTPException 404)
+    """
+    actual_file_id = resolve_status_file_id(db, file_id)
 
     # 메모리에 있으면 반환 (처리 중인 파일)
     if actual_file_id in PROCESSING_STATUS:
         status = PROCESSING_STATUS[actual_file_id]
         # 메모리에 닉네임이 없으면 DB에서 가져오기
         if status.get("status") == "completed" and "detected_nicknames" not in status:
-            audio_file = None
-            if file_id.isdigit():
-                audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-            if not audio_file:
-                audio_file = db.query(AudioFile).filter(
-                    (AudioFile.file_path.like(f"%{file_id}%")) |
-                    (AudioFile.original_filename.like(f"%{file_id}%"))
-                ).first()
+            audio_file = get_audio_file(db, file_id)
             if audio_file:
                 speaker_mappings = db.query(SpeakerMapping).filter(
                     SpeakerMapping.audio_file_id == audio_file.id
                 ).all()
                 detected_nicknames = [mapping.nickname for mapping in speaker_mappings if mapping.nickname]
                 status["detected_nicknames"] = detected_nicknames
-        print(f"[DEBUG] Memory Status for {actual_file_id}: {status.get('status')} (Step: {status.get('step')})")
         return status
 
-    # DB에서 조회 (완료된 파일) - ID(숫자)로 먼저 시도
-    audio_file = None
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+    # DB에서 조회 (완료된 파일) - DB ID 또는 UUID
+    audio_file = get_audio_file(db, file_id)
+
+    # 작업 큐에서 대기/실행 중 (워커 프로세스가 DB에 기록한 진행 상태)
+    job = get_active_job(db, actual_file_id)
+    if job is not None:
+        if job.status == JobStatus.QUEUED:
+            return {
+                "status": "queued",
+                "step": (audio_file.processing_message if audio_file else None) or "대기 중...",
+                "progress": (audio_file.processing_progress if audio_file else 0) or 0,
+                "job_id": job.id,
+                "queue_position": queue_position(db, job),
+                "attempts": job.attempts,
+            }
+        return running_job_status({
+            "processing_step": audio_file.processing_step if audio_file else None,
+            "processing_message": audio_file.processing_message if audio_file else None,
+            "processing_progress": audio_file.processing_progress if audio_file else None,
+            "job_id": job.id,
+            "job_status": job.status,
+            "current_stage": job.current_stage,
+            "attempts": job.attempts,
+            "cancel_requested": job.cancel_requested,
+        })
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="처리 정보를 찾을 수 없습니다.")
 
+    if audio_file.status == FileStatus.FAILED:
+        return {
+            "status": "failed",
+            "step": audio_file.processing_message or "오류 발생",
+            "progress": 0,
+            "error": audio_file.error_message,
+        }
+
     # 화자 수 조회
     speaker_count = db.query(func.count(SpeakerMapping.id)).filter(
         SpeakerMapping.audio_file_id == audio_file.id
@@ -804,7 +1086,6 @@ async def get_processing_status(file_id: str, db: Session = Depends(get_db)):
             detected_nicknames.append(mapping.nickname)
 
     # 완료된 파일의 상태 반환
-    print(f"[DEBUG] DB Status for {file_id}: {audio_file.status.value}")
     return {
         "status": audio_file.status.value if audio_file.status else "unknown",
         "step": "완료" if audio_file.status.value == "completed" else "처리 중",
@@ -815,6 +1096,78 @@ async def get_processing_status(file_id: str, db: Session = Depends(get_db)):
     }
 
 
+def fetch_processing_status(file_id: str) -> Dict:
+    """진행 스트림 폴러용: 새 DB 세션으로 상태 조회 (파일이 없으면 not_found 상태)"""
+    from app.db.base import SessionLocal
+    db = SessionLocal()
+    try:
+        return load_processing_status(db, file_id)
+    except HTTPException as e:
+        return {"status": "not_found", "step": e.detail, "progress": 0, "error": e.detail}
+    finally:
+        db.close()
+
+
+@router.get("/status/{file_id}")
+async def get_processing_status(file_id: str, db: Session = Depends(get_db)):
+    """
+    처리 상태 조회 (메모리 또는 DB)
+
+    진행 중 화면은 GET /status/{file_id}/stream (SSE) 구독을 권장합니다.
+
+    Args:
+        file_id: 파일 ID (UUID 또는 DB ID)
+
+    Returns:
+        현재 처리 상태
+    """
+    return load_processing_status(db, file_id)
+
+
+@router.get("/status/{file_id}/stream")
+async def stream_processing_status(file_id: str, db: Session = Depends(get_db)):
+    """
+    처리 상태 스트림 (Server-Sent Events)
+
+    상태가 바뀔 때마다 `event: progress` 로 GET /status/{file_id} 와 같은 형태의 JSON을 보내고,
+    completed / failed / not_found 상태를 보낸 뒤 연결을 닫습니다.
+    DB 확인은 브로커의 폴러 하나가 구독 중인 파일 전체에 대해 주기마다 한 번만 수행합니다.
+
+    Args:
+        file_id: 파일 ID (UUID 또는 DB ID)
+
+    Returns:
+        text/event-stream 응답
+    """
+    from fastapi.responses import StreamingResponse
+
+    actual_file_id = resolve_status_file_id(db, file_id)
+    audio_file_id = resolve_audio_file_id(db, file_id)
+    db.close()  # 스트림이 열려 있는 동안 커넥션을 잡지 않음
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        async for snapshot in get_progress_broker().subscribe(
+            actual_file_id, fetch_processing_status, audio_file_id=audio_file_id, render=running_job_status
+        ):
+            if snapshot is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: progress\ndata: {json.dumps(snapshot, ensure_ascii=False, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/progress/stats")
+async def get_progress_stats():
+    """진행 스트림 브로커 상태 (채널/구독자 수, publish/확인/조회 횟수)"""
+    return get_progress_broker().summary()
+
+
 @router.get("/transcript/{file_id}")
 async def get_transcript(file_id: str):
     """
@@ -845,6 +1198,140 @@ async def get_transcript(file_id: str):
     return {"file_id": file_id, "transcript": lines, "total_lines": len(lines)}
 
 
+@router.get("/transcript/{file_id}/partial")
+async def get_partial_transcript(file_id: str, offset: int = 0):
+    """
+    STT 진행 중 임시 전사 조회 (청크가 끝날 때마다 늘어남)
+
+    Args:
+        file_id: 파일 ID
+        offset: 건너뛸 세그먼트 수 (이전 응답의 next_offset을 넘기면 새 세그먼트만 반환)
+
+    Returns:
+        청크 진행 상황과 임시 세그먼트 목록 (시간은 전처리 오디오 기준, 중복 제거 전)
+    """
+    work_dir = Path(f"/app/temp/{file_id}")
+    if not partial_transcript_path(work_dir).exists():
+        raise HTTPException(status_code=404, detail="임시 전사 결과가 없습니다.")
+
+    segments = read_partial_transcript(work_dir, offset)
+    status = PROCESSING_STATUS.get(file_id, {})
+
+    return {
+        "file_id": file_id,
+        "status": status.get("status"),
+        "chunks_done": status.get("chunks_done"),
+        "chunks_total": status.get("chunks_total"),
+        "segments": segments,
+        "next_offset": offset + len(segments),
+    }
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    전처리/STT 산출물 캐시 통계 조회
+
+    Returns:
+        kind별 적중/실패 횟수 및 캐시 용량
+    """
+    artifact_cache = get_artifact_cache()
+    if not artifact_cache:
+        return {"enabled": False}
+
+    return {"enabled": True, **artifact_cache.stats()}
+
+
+@router.get("/diarizer/stats")
+async def get_diarizer_stats():
+    """
+    상주 화자 분리 모델 풀 통계 조회 (이 워커 프로세스 기준)
+
+    Returns:
+        상주 모델 목록, 로드/재사용/해제 횟수, 누적 로드/추론 시간, 모델별 마지막 요청 시간
+    """
+    return get_diarizer_pool().stats()
+
+
+@router.get("/pipeline/{file_id}/timing")
+async def get_pipeline_timing(file_id: str):
+    """
+    파이프라인 스테이지별 실행 시간과 크리티컬 패스 조회
+
+    Args:
+        file_id: 파일 ID
+
+    Returns:
+        전체 소요 시간, 병렬도, 크리티컬 패스, 스테이지별 대기/실행 시간
+    """
+    timing_path = Path(f"/app/temp/{file_id}") / "pipeline_timing.json"
+    if not timing_path.exists():
+        raise HTTPException(status_code=404, detail="파이프라인 실행 기록을 찾을 수 없습니다.")
+
+    with open(timing_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@router.get("/pipeline/{file_id}/stages")
+async def get_pipeline_stages(file_id: str):
+    """
+    스테이지 산출물 그래프 + 실행 기록 + 마지막 실행 계획 조회
+
+    Args:
+        file_id: 파일 ID
+
+    Returns:
+        stages: 스테이지 선언 (입력, 산출물, 버전) 및 기록된 fingerprint
+        last_plan: 마지막 파이프라인 실행 때 스테이지별 결정 (run / reuse / pinned, 이유)
+    """
+    work_dir = Path(f"/app/temp/{file_id}")
+    if not work_dir.exists():
+        raise HTTPException(status_code=404, detail="작업 디렉토리를 찾을 수 없습니다.")
+
+    entries = StageManifest(work_dir).load()
+    return {
+        "file_id": file_id,
+        "stages": [
+            {
+                **spec.to_dict(),
+                "fingerprint": entries.get(name, {}).get("fingerprint"),
+                "recorded_at": entries.get(name, {}).get("recorded_at"),
+                "outputs_exist": all((work_dir / out).exists() for out in spec.outputs) if spec.outputs else None,
+            }
+            for name, spec in STAGES.items()
+        ],
+        "last_plan": load_plan(work_dir),
+    }
+
+
+@router.get("/voiced-intervals/{file_id}")
+async def get_voiced_intervals(file_id: str):
+    """
+    전처리 유지 구간 인덱스 조회 (압축 시간 ↔ 원본 시간 매핑용)
+
+    Args:
+        file_id: 파일 ID
+
+    Returns:
+        유지 구간 목록 [[원본 시작(초), 원본 끝(초), 압축 오프셋(초)], ...]
+    """
+    from app.services.voiced_index import VoicedIntervalIndex, intervals_path_for
+
+    index_path = intervals_path_for(Path(f"/app/temp/{file_id}") / "preprocessed.wav")
+    if not index_path.exists():
+        raise HTTPException(status_code=404, detail="유지 구간 인덱스를 찾을 수 없습니다.")
+
+    index = VoicedIntervalIndex.load(index_path)
+    intervals = (index.intervals / index.sr).round(3).tolist()
+
+    return {
+        "file_id": file_id,
+        "intervals": intervals,
+        "total_intervals": len(intervals),
+        "condensed_duration": index.condensed_duration,
+    }
+
+
 @router.get("/ner/{file_id}")
 async def get_ner_result(file_id: str):
     """
@@ -936,10 +1423,7 @@ async def get_merged_result(file_id: str, db: Session = Depends(get_db)):
         화자 정보와 이름이 포함된 전사 결과
     """
     # 1. DB에서 조회 시도
-    audio_file = db.query(AudioFile).filter(
-        (AudioFile.file_path.like(f"%{file_id}%")) |
-        (AudioFile.original_filename.like(f"%{file_id}%"))
-    ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if audio_file:
         # STT 결과 조회 (시간순 정렬)
@@ -954,15 +1438,9 @@ async def get_merged_result(file_id: str, db: Session = Depends(get_db)):
 
         # STT와 Diarization 병합
         merged_segments = []
-        for stt in stt_results:
-            # 해당 STT 시간대에 겹치는 화자 찾기
-            speaker_label = "UNKNOWN"
-            for diar in diar_results:
-                # STT 시작 시간이 화자 구간 안에 있으면
-                if diar.start_time <= stt.start_time < diar.end_time:
-                    speaker_label = diar.speaker_label
-                    break
-
+        # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
+        speaker_labels = label_rows(stt_results, diar_results)
+        for stt, speaker_label in zip(stt_results, speaker_labels):
             merged_segments.append({
                 "speaker": speaker_label,
                 "start": stt.start_time,
@@ -1033,10 +1511,7 @@ async def export_merged_json(file_id: str, db: Session = Depends(get_db)):
         저장된 JSON 파일 경로
     """
     # get_merged_result와 동일한 로직으로 데이터 조회
-    audio_file = db.query(AudioFile).filter(
-        (AudioFile.file_path.like(f"%{file_id}%")) |
-        (AudioFile.original_filename.like(f"%{file_id}%"))
-    ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다.")
@@ -1059,13 +1534,9 @@ async def export_merged_json(file_id: str, db: Session = Depends(get_db)):
 
     # STT와 Diarization 병합
     merged_segments = []
-    for stt in stt_results:
-        speaker_label = "UNKNOWN"
-        for diar in diar_results:
-            if diar.start_time <= stt.start_time < diar.end_time:
-                speaker_label = diar.speaker_label
-                break
-
+    # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
+    speaker_labels = label_rows(stt_results, diar_results)
+    for stt, speaker_label in zip(stt_results, speaker_labels):
         merged_segments.append({
             "speaker": speaker_label,
             "start": stt.start_time,
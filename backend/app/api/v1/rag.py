@@ -13,6 +13,9 @@ from app.models.stt import STTResult
 from app.models.diarization import DiarizationResult
 from app.models.tagging import SpeakerMapping
 from app.services.rag_service import RAGService
+from app.services.alignment import label_rows
+from app.services.bulk_writer import BulkWriter
+from app.services.stage_graph import StageManifest, stage_fingerprint, final_transcript_params, work_dir_for
 
 router = APIRouter()
 rag_service = RAGService()
@@ -64,6 +67,7 @@ async def initialize_rag(
     ).order_by(FinalTranscript.segment_index).all()
 
     transcript_data = []
+    manifest = StageManifest(work_dir_for(audio_file))
     
     if final_transcripts:
         # FinalTranscript가 있으면 사용
@@ -122,13 +126,9 @@ async def initialize_rag(
         ).order_by(DiarizationResult.start_time).all()
 
         # STT와 Diarization 병합하여 최종 회의록 생성
-        for idx, stt in enumerate(stt_results):
-            speaker_label = "UNKNOWN"
-            for diar in diar_results:
-                if diar.start_time <= stt.start_time < diar.end_time:
-                    speaker_label = diar.speaker_label
-                    break
-
+        # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
+        speaker_labels = label_rows(stt_results, diar_results)
+        for idx, (stt, speaker_label) in enumerate(zip(stt_results, speaker_labels)):
             # final_name 또는 suggested_name 매핑 적용 (없으면 speaker_label 사용)
             speaker_name = mappings.get(speaker_label, speaker_label)
 
@@ -141,17 +141,21 @@ async def initialize_rag(
             })
         
         # 동적 생성한 결과를 FinalTranscript에 저장 (다음번에는 바로 사용)
-        for idx, data in enumerate(transcript_data):
-            final_transcript = FinalTranscript(
-                audio_file_id=file_id,
-                segment_index=idx,
-                speaker_name=data["speaker_name"],
-                start_time=data["start_time"],
-                end_time=data["end_time"],
-                text=data["text"]
-            )
-            db.add(final_transcript)
+        writer = BulkWriter(db)
+        writer.insert(
+            FinalTranscript,
+            ("segment_index", "speaker_name", "start_time", "end_time", "text"),
+            (
+                (idx, data["speaker_name"], data["start_time"], data["end_time"], data["text"])
+                for idx, data in enumerate(transcript_data)
+            ),
+            fixed={"audio_file_id": file_id},
+        )
         db.commit()
+        writer.report()
+        manifest.record("final_transcript", stage_fingerprint(
+            "final_transcript", final_transcript_params(mappings), {"merge": manifest.fingerprint("merge")}
+        ))
 
     if not transcript_data:
         raise HTTPException(
@@ -170,6 +174,11 @@ async def initialize_rag(
         audio_file.rag_initialized_at = datetime.now()
         db.commit()
 
+        # 인덱싱한 회의록 기준 기록 (화자명이 바뀌면 태깅 확정 시 재인덱싱 대상)
+        manifest.record("rag_index", stage_fingerprint(
+            "rag_index", {}, {"final_transcript": manifest.fingerprint("final_transcript")}
+        ))
+
         return InitializeResponse(
             success=True,
             message="RAG 시스템이 성공적으로 초기화되었습니다",
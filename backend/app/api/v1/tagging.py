@@ -3,12 +3,16 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.api.deps import get_db
 from langsmith import traceable
-from app.models.audio_file import AudioFile
 from app.models.tagging import DetectedName, SpeakerMapping
 from app.models.user_confirmation import UserConfirmation
 from app.models.stt import STTResult
 from app.models.diarization import DiarizationResult
 from app.services.agent_data_loader import load_agent_input_data_by_file_id
+from app.services.file_resolver import get_audio_file
+from app.services.alignment import label_rows
+from app.services.stage_graph import (
+    StageManifest, plan_stages, stage_fingerprint, final_transcript_params, work_dir_for,
+)
 from app.agents.graph import get_speaker_tagging_app
 from app.schemas.tagging import (
     TaggingSuggestionDetailResponse,
@@ -33,10 +37,7 @@ async def get_speaker_info(file_id: str, db: Session = Depends(get_db)):
     프로세싱 완료 후 사용자 확인을 위한 기본 정보 제공
     """
     # DB에서 audio_file 찾기
-    audio_file = db.query(AudioFile).filter(
-        (AudioFile.file_path.like(f"%{file_id}%")) |
-        (AudioFile.original_filename.like(f"%{file_id}%"))
-    ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
@@ -89,10 +90,7 @@ async def confirm_speaker_info(
         print(f"🔍 화자 정보 확정 요청: file_id={file_id}, speaker_count={speaker_count}, detected_names={detected_names}, detected_nicknames={detected_nicknames}")
 
         # DB에서 audio_file 찾기
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+        audio_file = get_audio_file(db, file_id)
 
         if not audio_file:
             print(f"❌ 파일을 찾을 수 없음: file_id={file_id}")
@@ -137,7 +135,7 @@ async def confirm_speaker_info(
             print(f"🔄 화자 수 최초 확정: {speaker_count}명")
 
         if should_reprocess:
-            from app.api.v1.processing import process_audio_pipeline, PROCESSING_STATUS
+            from app.api.v1.processing import submit_processing, PROCESSING_STATUS
             from app.models.audio_file import FileStatus
             
             # 상태 초기화
@@ -147,23 +145,25 @@ async def confirm_speaker_info(
             audio_file.processing_message = f"재분석 중 (화자 수: {speaker_count}명, STT 건너뜀)..."
             db.commit()
             
-            # 메모리 상태 초기화
-            PROCESSING_STATUS[file_id] = {
-                "status": "queued",
-                "step": f"재분석 대기 중 (화자 수: {speaker_count}명)...",
-                "progress": 0
-            }
-            
-            # 백그라운드 태스크 추가 (STT 건너뛰고 Diarization부터 다시 실행)
-            background_tasks.add_task(
-                process_audio_pipeline,
-                file_id=file_id,
-                user_id=audio_file.user_id, # Pass user_id
+            # 작업 큐 또는 백그라운드 태스크로 제출 (STT 건너뛰고 Diarization부터 다시 실행)
+            submitted = submit_processing(
+                db, background_tasks, file_id,
+                user_id=audio_file.user_id,
                 whisper_mode="local", # 기본값 사용
                 diarization_mode="nemo", # NeMo 강제 (화자 수 지정은 NeMo만 지원)
                 skip_stt=True # STT 건너뛰기
             )
             
+            # 메모리 상태 초기화 (API 프로세스에서 실행할 때만, 워커 실행 시에는 DB 상태를 조회)
+            if submitted["backend"] == "inline":
+                PROCESSING_STATUS[file_id] = {
+                    "status": "queued",
+                    "step": f"재분석 대기 중 (화자 수: {speaker_count}명)...",
+                    "progress": 0
+                }
+            else:
+                PROCESSING_STATUS.pop(file_id, None)
+            
             return {
                 "message": f"화자 정보가 저장되었으며, {speaker_count}명으로 재분석을 시작합니다. (STT 생략)",
                 "status": "reprocessing_started"
@@ -192,15 +192,8 @@ async def get_tagging_suggestion(file_id: str, db: Session = Depends(get_db)):
     화자 태깅 제안 조회
     I,O.md Step 5d - 시스템이 분석한 결과를 사용자에게 제안
     """
-    # AudioFile 찾기 - ID(숫자)로 먼저 시도, 실패시 문자열 검색
-    audio_file = None
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+    # AudioFile 찾기 - DB ID 또는 UUID
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
@@ -217,13 +210,9 @@ async def get_tagging_suggestion(file_id: str, db: Session = Depends(get_db)):
 
     # STT와 Diarization 병합
     merged_segments = []
-    for stt in stt_results:
-        speaker_label = "UNKNOWN"
-        for diar in diar_results:
-            if diar.start_time <= stt.start_time < diar.end_time:
-                speaker_label = diar.speaker_label
-                break
-
+    # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
+    speaker_labels = label_rows(stt_results, diar_results)
+    for stt, speaker_label in zip(stt_results, speaker_labels):
         merged_segments.append({
             "speaker": speaker_label,
             "start": stt.start_time,
@@ -299,10 +288,7 @@ async def analyze_speakers(
     I,O.md Step 5a~5c - 멀티턴 LLM 추론으로 화자 태깅
     """
     # AudioFile 찾기
-    audio_file = db.query(AudioFile).filter(
-        (AudioFile.file_path.like(f"%{file_id}%")) |
-        (AudioFile.original_filename.like(f"%{file_id}%"))
-    ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
@@ -461,45 +447,61 @@ async def confirm_tagging(
     화자 태깅 확정
     I,O.md Step 5e - 사용자가 최종 확정한 화자 이름 저장
     """
-    # AudioFile 찾기 - ID(숫자)로 먼저 시도, 실패시 문자열 검색
-    audio_file = None
-    if request.file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(request.file_id)).first()
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{request.file_id}%")) |
-            (AudioFile.original_filename.like(f"%{request.file_id}%"))
-        ).first()
+    # AudioFile 찾기 - DB ID 또는 UUID
+    audio_file = get_audio_file(db, request.file_id)
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
 
-    # 화자명 변경 감지 및 벡터 DB 삭제
-    needs_rag_reinit = False
-    if audio_file.rag_initialized:
-        # 기존 매핑과 비교하여 변경 여부 확인
-        existing_mappings = db.query(SpeakerMapping).filter(
-            SpeakerMapping.audio_file_id == audio_file.id
-        ).all()
-        existing_final_names = {sm.speaker_label: sm.final_name for sm in existing_mappings if sm.final_name}
-        
-        # 새로운 매핑과 비교
-        for mapping in request.mappings:
-            old_name = existing_final_names.get(mapping.speaker_label)
-            if old_name and old_name != mapping.final_name:
-                needs_rag_reinit = True
-                break
-        
-        # 벡터 DB 삭제
-        if needs_rag_reinit:
-            from app.services.rag_service import RAGService
-            rag_service = RAGService()
-            rag_service.delete_collection(str(audio_file.id))
-            audio_file.rag_initialized = False
-            audio_file.rag_collection_name = None
-            audio_file.rag_initialized_at = None
-
-    # SpeakerMapping 업데이트
+    from app.models.transcript import FinalTranscript
+    from app.models.efficiency import MeetingEfficiencyAnalysis
+
+    # 스테이지 계획: 확정 화자명(또는 병합 결과)이 바뀐 경우에만 최종 회의록과 그 하류(RAG 인덱스, 효율성 분석)를 다시 만듦
+    manifest = StageManifest(work_dir_for(audio_file))
+    existing_names = {
+        sm.speaker_label: sm.final_name
+        for sm in db.query(SpeakerMapping).filter(SpeakerMapping.audio_file_id == audio_file.id).all()
+    }
+    if manifest.get("final_transcript") is None and any(existing_names.values()):
+        # 스테이지 기록 이전에 확정된 파일: 현재 DB 상태를 기준으로 기록
+        baseline = stage_fingerprint(
+            "final_transcript", final_transcript_params(existing_names), {"merge": manifest.fingerprint("merge")}
+        )
+        manifest.record("final_transcript", baseline)
+        if audio_file.rag_initialized and manifest.get("rag_index") is None:
+            manifest.record("rag_index", stage_fingerprint("rag_index", {}, {"final_transcript": baseline}))
+
+    confirmed_names = {**existing_names, **{m.speaker_label: m.final_name for m in request.mappings}}
+    plan = plan_stages(manifest, {
+        "final_transcript": final_transcript_params(confirmed_names),
+        "rag_index": {},
+        "efficiency": {},
+    }, available={
+        "final_transcript": lambda: db.query(FinalTranscript.id).filter(
+            FinalTranscript.audio_file_id == audio_file.id
+        ).first() is not None,
+        "rag_index": lambda: bool(audio_file.rag_initialized),
+        "efficiency": lambda: db.query(MeetingEfficiencyAnalysis.id).filter(
+            MeetingEfficiencyAnalysis.audio_file_id == audio_file.id
+        ).first() is not None,
+    })
+    print(f"🗺️ 태깅 확정 스테이지 계획: {plan.summary()}")
+
+    # 인덱싱된 회의록이 바뀌면 벡터 DB 삭제
+    needs_rag_reinit = audio_file.rag_initialized and plan["rag_index"].action == "run"
+    if needs_rag_reinit:
+        from app.services.rag_service import RAGService
+        rag_service = RAGService()
+        rag_service.delete_collection(str(audio_file.id))
+        audio_file.rag_initialized = False
+        audio_file.rag_collection_name = None
+        audio_file.rag_initialized_at = None
+        manifest.invalidate(["rag_index"])
+
+    # SpeakerMapping 업데이트 (없는 화자는 한 번에 bulk insert)
+    from app.services.bulk_writer import BulkWriter
+    writer = BulkWriter(db)
+    new_mapping_rows = []
     for mapping in request.mappings:
         speaker_mapping = db.query(SpeakerMapping).filter(
             SpeakerMapping.audio_file_id == audio_file.id,
@@ -514,31 +516,24 @@ async def confirm_tagging(
             speaker_mapping.is_modified = is_modified
         else:
             # 새로 생성
-            speaker_mapping = SpeakerMapping(
-                audio_file_id=audio_file.id,
-                speaker_label=mapping.speaker_label,
-                suggested_name=None,
-                name_confidence=None,
-                name_mentions=0,
-                suggested_role=None,
-                role_confidence=None,
-                conflict_detected=False,
-                needs_manual_review=False,
-                final_name=mapping.final_name,
-                is_modified=True
-            )
-            db.add(speaker_mapping)
+            new_mapping_rows.append((mapping.speaker_label, mapping.final_name))
+    writer.insert(
+        SpeakerMapping,
+        ("speaker_label", "final_name"),
+        new_mapping_rows,
+        fixed={
+            "audio_file_id": audio_file.id,
+            "name_mentions": 0,
+            "conflict_detected": False,
+            "needs_manual_review": False,
+            "is_modified": True,
+        },
+    )
 
     # FinalTranscript 생성/업데이트 (Step 5f)
-    from app.models.transcript import FinalTranscript
     from app.models.stt import STTResult
     from app.models.diarization import DiarizationResult
     
-    # 기존 FinalTranscript 삭제 (재생성을 위해)
-    db.query(FinalTranscript).filter(
-        FinalTranscript.audio_file_id == audio_file.id
-    ).delete()
-    
     # STT 결과 조회
     stt_results = db.query(STTResult).filter(
         STTResult.audio_file_id == audio_file.id
@@ -549,34 +544,31 @@ async def confirm_tagging(
         DiarizationResult.audio_file_id == audio_file.id
     ).order_by(DiarizationResult.start_time).all()
 
-    # SpeakerMapping에서 final_name 가져오기
-    speaker_mappings = db.query(SpeakerMapping).filter(
-        SpeakerMapping.audio_file_id == audio_file.id
-    ).all()
-    mappings = {sm.speaker_label: sm.final_name for sm in speaker_mappings if sm.final_name}
-
-    # FinalTranscript 생성
-    for idx, stt in enumerate(stt_results):
-        speaker_label = "UNKNOWN"
-        for diar in diar_results:
-            if diar.start_time <= stt.start_time < diar.end_time:
-                speaker_label = diar.speaker_label
-                break
+    if plan["final_transcript"].action == "run":
+        # SpeakerMapping에서 final_name 가져오기
+        db.flush()
+        speaker_mappings = db.query(SpeakerMapping).filter(
+            SpeakerMapping.audio_file_id == audio_file.id
+        ).all()
+        mappings = {sm.speaker_label: sm.final_name for sm in speaker_mappings if sm.final_name}
 
+        # FinalTranscript 재생성 (기존 행 삭제 + bulk insert, 같은 트랜잭션)
+        # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
         # final_name 매핑 적용 (없으면 speaker_label 사용)
-        speaker_name = mappings.get(speaker_label, speaker_label)
-
-        final_transcript = FinalTranscript(
-            audio_file_id=audio_file.id,
-            segment_index=idx,
-            speaker_name=speaker_name,
-            start_time=stt.start_time,
-            end_time=stt.end_time,
-            text=stt.text
+        speaker_labels = label_rows(stt_results, diar_results)
+        writer.replace(
+            FinalTranscript, audio_file.id,
+            ("segment_index", "speaker_name", "start_time", "end_time", "text"),
+            (
+                (idx, mappings.get(speaker_label, speaker_label), stt.start_time, stt.end_time, stt.text)
+                for idx, (stt, speaker_label) in enumerate(zip(stt_results, speaker_labels))
+            ),
         )
-        db.add(final_transcript)
 
     db.commit()
+    writer.report()
+    if plan["final_transcript"].action == "run":
+        manifest.record("final_transcript", plan["final_transcript"].fingerprint)
 
     # 화자 프로필 자동 저장
     from app.models.speaker_profile import SpeakerProfile
@@ -659,20 +651,24 @@ async def confirm_tagging(
     if profiles_saved > 0:
         print(f"✅ {profiles_saved}개 화자 프로필 자동 저장 완료")
 
-    # 화자 태깅 완료 후 효율성 분석 자동 실행
+    # 화자 태깅 완료 후 효율성 분석 자동 실행 (최종 회의록이 바뀌었거나 결과가 없을 때만)
     from app.api.v1.efficiency import run_efficiency_analysis
-    from app.models.efficiency import MeetingEfficiencyAnalysis
-    
-    # 기존 효율성 분석 결과 삭제 (재분석 시 stale data 방지)
-    # 삭제하면 프론트엔드는 404를 받고 로컬 계산(올바른 이름)으로 폴백함
-    db.query(MeetingEfficiencyAnalysis).filter(
-        MeetingEfficiencyAnalysis.audio_file_id == audio_file.id
-    ).delete()
-    db.commit()
-    print(f"🧹 기존 효율성 분석 결과 삭제 완료: {audio_file.id}")
 
-    print(f"🚀 [Tagging] Triggering background efficiency analysis for file {audio_file.id}")
-    background_tasks.add_task(run_efficiency_analysis, str(audio_file.id))
+    if plan["efficiency"].action == "run":
+        # 기존 효율성 분석 결과 삭제 (재분석 시 stale data 방지)
+        # 삭제하면 프론트엔드는 404를 받고 로컬 계산(올바른 이름)으로 폴백함
+        db.query(MeetingEfficiencyAnalysis).filter(
+            MeetingEfficiencyAnalysis.audio_file_id == audio_file.id
+        ).delete()
+        db.commit()
+        print(f"🧹 기존 효율성 분석 결과 삭제 완료: {audio_file.id}")
+
+        print(f"🚀 [Tagging] Triggering background efficiency analysis for file {audio_file.id}")
+        background_tasks.add_task(run_efficiency_analysis, str(audio_file.id))
+        # 분석이 실패하면 결과 행이 없으므로 다음 확정 때 다시 실행됨
+        manifest.record("efficiency", plan["efficiency"].fingerprint)
+    else:
+        print(f"⏩ 효율성 분석 건너뛰기 ({plan['efficiency'].reason}): {audio_file.id}")
 
     # 구간 분석(템플릿 피팅) 자동 실행
     from app.services.template_generator import run_template_generation_background
@@ -695,16 +691,8 @@ async def get_tagging_result(file_id: str, db: Session = Depends(get_db)):
     확정된 태깅 결과 조회
     I,O.md Step 5f - 사용자가 확정한 화자 이름이 적용된 최종 대본
     """
-    # AudioFile 찾기 - ID(숫자)로 먼저 시도, 실패시 문자열 검색
-    audio_file = None
-    if file_id.isdigit():
-        audio_file = db.query(AudioFile).filter(AudioFile.id == int(file_id)).first()
-
-    if not audio_file:
-        audio_file = db.query(AudioFile).filter(
-            (AudioFile.file_path.like(f"%{file_id}%")) |
-            (AudioFile.original_filename.like(f"%{file_id}%"))
-        ).first()
+    # AudioFile 찾기 - DB ID 또는 UUID
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
@@ -735,13 +723,9 @@ async def get_tagging_result(file_id: str, db: Session = Depends(get_db)):
 
     # STT와 Diarization 병합하여 최종 대본 생성
     final_transcript = []
-    for stt in stt_results:
-        speaker_label = "UNKNOWN"
-        for diar in diar_results:
-            if diar.start_time <= stt.start_time < diar.end_time:
-                speaker_label = diar.speaker_label
-                break
-
+    # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
+    speaker_labels = label_rows(stt_results, diar_results)
+    for stt, speaker_label in zip(stt_results, speaker_labels):
         # final_name 매핑 적용
         speaker_name = mappings.get(speaker_label, "Unknown")
 
@@ -45,14 +45,68 @@ class Settings(BaseSettings):
 
     # OpenAI
     OPENAI_API_KEY: Optional[str] = None
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
 
     # Whisper Settings
     WHISPER_MODE: str = "local"  # "local" or "api"
     WHISPER_MODEL_SIZE: str = "large-v3"  # tiny, base, small, medium, large, large-v3
     WHISPER_DEVICE: str = "cpu"  # cpu or cuda
+    WHISPER_LOCAL_BACKEND: str = "openai-whisper"  # openai-whisper, torch-int8, faster-whisper
+    WHISPER_COMPUTE_TYPE: str = "int8"  # faster-whisper CPU 연산 타입 (int8, int8_float32, float32)
+    WHISPER_LOCAL_WORKERS: int = 1  # CPU 로컬 전사 프로세스 수 (워커마다 모델 1개 상주)
+    WHISPER_THREADS_PER_WORKER: int = 0  # 워커당 torch 스레드 수 (0이면 코어 수 / 워커 수)
+    STT_CHUNK_SECONDS: int = 600  # 목표 청크 길이 (실제 경계는 근처 무음 지점)
+    STT_API_CHUNK_SECONDS: int = 1500  # API 모드 목표 청크 길이 (실제로는 업로드 바이트 상한 안에서 결정)
+    WHISPER_API_UPLOAD_FORMAT: str = "flac"  # API 업로드 포맷: wav, flac (무손실), opus (손실)
+    WHISPER_API_OPUS_BITRATE: str = "32k"  # opus 업로드 비트레이트
+    WHISPER_API_CONCURRENCY: int = 4  # API 최대 동시 요청 수 (429 수신 시 자동으로 줄였다가 회복)
+    WHISPER_API_MAX_RETRIES: int = 5  # 청크별 최대 재시도 횟수 (429/5xx/타임아웃)
+    WHISPER_API_TIMEOUT: float = 1800.0  # 요청 타임아웃 (초)
+    STT_DEDUP_WINDOW: int = 0  # 중복 라인 비교 대상 최근 라인 수 (0이면 전체와 비교)
+
+    # Preprocessing Settings
+    PREPROCESS_MODE: str = "batch"  # "batch" or "streaming" (장시간 녹음용, 메모리 사용량 일정)
+
+    # Artifact Cache (전처리/STT 결과 재사용)
+    ARTIFACT_CACHE_ENABLED: bool = True
+    ARTIFACT_CACHE_DIR: str = "/app/temp/cache"
+    ARTIFACT_CACHE_MAX_MB: int = 10240  # LRU 삭제 기준 용량
 
     # Diarization Settings
     DIARIZATION_MODE: str = "nemo"  # "senko" (fast) or "nemo" (accurate)
+    DIARIZER_IDLE_TIMEOUT: float = 1800.0  # 상주 화자 분리 모델 해제까지 유휴 시간 (초, 0이면 매 요청 후 해제)
+    DIARIZATION_WINDOWED_MIN_SECONDS: float = 10800.0  # 이 길이(초) 이상이면 윈도우 화자 분리 (0이면 사용 안 함)
+    DIARIZATION_WINDOW_SECONDS: float = 1800.0  # 윈도우 길이 (초)
+    DIARIZATION_WINDOW_OVERLAP: float = 30.0  # 인접 윈도우 겹침 (초)
+    DIARIZATION_WINDOW_WORKERS: int = 2  # 윈도우 병렬 프로세스 수 (CPU만, 워커마다 모델 1개 상주)
+    DIARIZATION_LINK_THRESHOLD: float = 0.5  # 윈도우 화자 연결 코사인 거리 기준
+
+    # Pipeline Stage Scheduling (STT/화자 분리 등 독립 스테이지 병렬 실행 예산, 0이면 자동 감지)
+    PIPELINE_CPU_BUDGET: float = 0  # 코어 수
+    PIPELINE_MEMORY_BUDGET_MB: int = 0  # 물리 메모리의 75%
+    PIPELINE_GPU_MEMORY_BUDGET_MB: int = 0  # CUDA 메모리의 90%
+
+    # Job Queue (처리 작업을 DB 큐에 넣고 별도 워커 프로세스가 실행: python -m app.worker)
+    PROCESSING_BACKEND: str = "queue"  # "queue" (워커 프로세스) or "inline" (API 프로세스 BackgroundTasks)
+    JOB_WORKER_CONCURRENCY: int = 1  # 워커 프로세스당 동시 작업 수
+    JOB_POLL_INTERVAL: float = 2.0  # 대기 작업 폴링 간격 (초)
+    JOB_LEASE_SECONDS: float = 120.0  # lease 길이 (heartbeat가 끊긴 채 이 시간이 지나면 다른 워커가 가져감)
+    JOB_HEARTBEAT_SECONDS: float = 30.0  # heartbeat 간격 (초)
+    JOB_MAX_ATTEMPTS: int = 3  # 작업당 최대 실행 횟수 (재시도 시 캐시된 전처리/STT 결과 재사용)
+    JOB_RETRY_BACKOFF: float = 30.0  # 재시도 대기 (초, 시도마다 2배)
+    JOB_STAGE_RETRIES: int = 1  # 실패한 스테이지만 같은 작업 안에서 다시 실행할 횟수
+    JOB_STAGE_CONCURRENCY: str = "stt=1,diarization=1"  # 스테이지별 전체 워커 동시 실행 수 (없으면 제한 없음)
+    JOB_LOCK_DIR: str = "/app/temp/locks"  # 스테이지 슬롯 잠금 파일 (워커끼리 공유하는 볼륨)
+
+    # Bulk Insert (STT/화자 분리/이름/최종 회의록 결과 저장)
+    BULK_INSERT_BATCH_SIZE: int = 1000  # executemany 한 번에 보낼 최대 행 수 (MySQL max_allowed_packet 고려)
+
+    # Progress Stream (GET /status/{file_id}/stream, Server-Sent Events)
+    PROGRESS_POLL_INTERVAL: float = 1.0  # 구독 중인 파일들의 DB 진행 상태 확인 간격 (전체 파일을 쿼리 1회로 확인, 초)
+    PROGRESS_KEEPALIVE_SECONDS: float = 15.0  # 상태 변화가 없을 때 연결 유지용 주석 전송 간격 (초)
+
+    # File Lookup (file_id → AudioFile)
+    FILE_ID_CACHE_SIZE: int = 4096  # 업로드 UUID → DB ID 프로세스 내 LRU 크기 (0이면 캐시 안 함)
 
     class Config:
         env_file = ".env"
@@ -9,6 +9,7 @@ from app.models.todo import TodoItem, TodoPriority
 from app.models.speaker_profile import SpeakerProfile
 from app.models.keyword import KeyTerm
 from app.models.section import MeetingSection
+from app.models.processing_job import ProcessingJob, JobStatus
 
 __all__ = [
     "User",
@@ -28,4 +29,6 @@ __all__ = [
     "SpeakerProfile",
     "KeyTerm",
     "MeetingSection",
+    "ProcessingJob",
+    "JobStatus",
 ]
@@ -20,6 +20,9 @@ class AudioFile(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
+    # 업로드 UUID (/app/uploads/{file_uuid}.ext, 작업 디렉토리 /app/temp/{file_uuid}) - API의 file_id
+    file_uuid = Column(String(36), nullable=True, unique=True, index=True)
+
     # 파일 정보
     original_filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
@@ -0,0 +1,63 @@
+"""
+처리 작업 큐 모델 (워커 프로세스가 가져가 실행하는 파이프라인 작업)
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Text, Boolean, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base import Base
+import enum
+
+
+class JobStatus(str, enum.Enum):
+    """작업 상태"""
+    QUEUED = "queued"  # 대기 (available_at 이후 실행 가능)
+    RUNNING = "running"  # 워커가 lease를 잡고 실행 중
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"  # 재시도 횟수 소진
+    CANCELLED = "cancelled"
+
+
+class ProcessingJob(Base):
+    """처리 작업 모델"""
+    __tablename__ = "processing_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    audio_file_id = Column(Integer, ForeignKey("audio_files.id", ondelete="CASCADE"), nullable=True, index=True)
+    file_id = Column(String(64), nullable=False, index=True)  # 업로드 UUID
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # 파이프라인 옵션
+    whisper_mode = Column(String(20), nullable=False)
+    diarization_mode = Column(String(20), nullable=False)
+    skip_stt = Column(Boolean, default=False, nullable=False)
+
+    # 스케줄링
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    priority = Column(Integer, default=0, nullable=False)  # 클수록 먼저
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # 재시도 대기
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+
+    # 실행 중 상태 (lease가 만료되면 다른 워커가 다시 가져감)
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    current_stage = Column(String(50), nullable=True)
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+    error_message = Column(Text, nullable=True)
+
+    # 타임스탬프
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    audio_file = relationship("AudioFile")
+
+    __table_args__ = (
+        # 워커 폴링: 상태별 우선순위 순 (같은 우선순위는 id = 등록 순)
+        Index("ix_processing_jobs_status_priority", "status", "priority"),
+    )
+
+    def __repr__(self):
+        return f"<ProcessingJob(id={self.id}, file_id='{self.file_id}', status='{self.status}')>"
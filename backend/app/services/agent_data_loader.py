@@ -9,6 +9,8 @@ from app.models.stt import STTResult
 from app.models.diarization import DiarizationResult
 from app.models.tagging import DetectedName
 from app.models.user_confirmation import UserConfirmation
+from app.services.alignment import label_rows
+from app.services.file_resolver import get_audio_file
 
 
 def load_agent_input_data(audio_file_id: int, db: Session) -> Dict:
@@ -51,14 +53,9 @@ def load_agent_input_data(audio_file_id: int, db: Session) -> Dict:
     stt_result = []
     detected_name_times = {dn.time_detected for dn in detected_names}  # 이름 언급 시간 집합
     
-    for stt in stt_results:
-        # 해당 STT 시간대에 겹치는 화자 찾기
-        speaker_label = "UNKNOWN"
-        for diar in diar_results:
-            if diar.start_time <= stt.start_time < diar.end_time:
-                speaker_label = diar.speaker_label
-                break
-
+    # 화자 배정: 겹치는 시간이 가장 긴 화자 (겹치는 구간이 없으면 가장 가까운 구간)
+    speaker_labels = label_rows(stt_results, diar_results)
+    for stt, speaker_label in zip(stt_results, speaker_labels):
         # has_name 플래그 설정 (DetectedName과 매칭)
         # 시간이 정확히 일치하지 않을 수 있으므로 근사치로 확인 (±0.5초)
         has_name = False
@@ -157,11 +154,8 @@ def load_agent_input_data_by_file_id(file_id: str, db: Session) -> Dict:
     Returns:
         load_agent_input_data와 동일한 형식
     """
-    # file_id로 AudioFile 찾기
-    audio_file = db.query(AudioFile).filter(
-        (AudioFile.file_path.like(f"%{file_id}%")) |
-        (AudioFile.original_filename.like(f"%{file_id}%"))
-    ).first()
+    # file_id로 AudioFile 찾기 (audio_files.file_uuid 인덱스)
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         raise ValueError(f"AudioFile을 찾을 수 없습니다: {file_id}")
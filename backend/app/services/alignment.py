@@ -0,0 +1,281 @@
+"""
+STT 세그먼트 ↔ 화자 구간(turn) 정렬 엔진
+
+정렬된 numpy 배열 + searchsorted로 각 STT 세그먼트를 화자에 배정합니다 (O((n + m) log m)).
+- 세그먼트와 겹치는 시간이 가장 긴 화자에 배정 (같은 화자의 여러 구간에 걸치면 겹친 시간을 합산)
+- 겹치는 구간이 없으면 가장 가까운 구간의 화자에 배정 → 텍스트를 버리지 않음
+- 선택적으로 화자가 바뀌는 지점에서 세그먼트를 나눔 (겹친 시간 비율로 단어 분배)
+
+화자 구간은 서로 겹칠 수 있으며 정렬되어 있지 않아도 됩니다 (내부에서 시작 시간순 정렬).
+시간 단위는 세그먼트와 구간이 같기만 하면 됩니다 (초 또는 밀리초).
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.transcript import NO_SPEAKER, Transcript
+
+
+def _candidate_pairs(
+    seg_start: np.ndarray, seg_end: np.ndarray,
+    turn_start: np.ndarray, turn_end: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    겹칠 수 있는 (세그먼트, 구간) 쌍 (구간은 시작 시간순 정렬되어 있어야 함)
+
+    구간 [lo, hi): hi = 세그먼트 끝 이전에 시작한 구간 수,
+    lo = 끝 시간 누적 최댓값이 세그먼트 시작을 넘는 첫 구간 → 그 앞 구간은 모두 세그먼트 전에 끝남
+
+    Returns:
+        (세그먼트 인덱스, 구간 인덱스, 겹친 시간) - 겹친 시간 > 0인 쌍만
+    """
+    end_cummax = np.maximum.accumulate(turn_end)
+    hi = np.searchsorted(turn_start, seg_end, side="left")
+    lo = np.searchsorted(end_cummax, seg_start, side="right")
+    counts = np.maximum(hi - lo, 0)
+
+    total = int(counts.sum())
+    seg_idx = np.repeat(np.arange(len(seg_start)), counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    turn_idx = np.arange(total) - offsets + np.repeat(lo, counts)
+
+    overlap = (
+        np.minimum(seg_end[seg_idx], turn_end[turn_idx])
+        - np.maximum(seg_start[seg_idx], turn_start[turn_idx])
+    )
+    keep = overlap > 0
+    return seg_idx[keep], turn_idx[keep], overlap[keep]
+
+
+def _nearest_turns(
+    seg_start: np.ndarray, seg_end: np.ndarray,
+    turn_start: np.ndarray, turn_end: np.ndarray
+) -> np.ndarray:
+    """
+    세그먼트마다 가장 가까운 구간 (시작 시간순 정렬된 구간 기준 인덱스)
+
+    후보: 세그먼트 끝 이전에 시작한 구간 중 가장 늦게 끝나는 구간, 세그먼트 끝 이후 처음 시작하는 구간
+    """
+    m = len(turn_start)
+    end_cummax = np.maximum.accumulate(turn_end)
+    # 누적 최댓값을 만든 구간 인덱스
+    argcummax = np.maximum.accumulate(np.where(turn_end == end_cummax, np.arange(m), 0))
+
+    hi = np.searchsorted(turn_start, seg_end, side="left")
+    prev_idx = argcummax[np.maximum(hi - 1, 0)]
+    next_idx = np.minimum(hi, m - 1)
+
+    prev_gap = np.where(hi > 0, np.maximum(seg_start - turn_end[prev_idx], 0), np.inf)
+    next_gap = np.where(hi < m, np.maximum(turn_start[next_idx] - seg_end, 0), np.inf)
+    return np.where(prev_gap <= next_gap, prev_idx, next_idx)
+
+
+def assign_turns(
+    seg_start: Sequence[float], seg_end: Sequence[float],
+    turn_start: Sequence[float], turn_end: Sequence[float],
+    turn_codes: Sequence[int], max_gap: Optional[float] = None
+) -> np.ndarray:
+    """
+    세그먼트마다 배정할 화자 구간 선택
+
+    1) 겹친 시간의 화자별 합이 가장 큰 화자 (동률이면 코드가 작은 화자)
+    2) 그 화자의 구간 중 겹친 시간이 가장 긴 구간
+    3) 겹치는 구간이 없으면 가장 가까운 구간
+
+    Args:
+        seg_start, seg_end: 세그먼트 시작/끝
+        turn_start, turn_end: 화자 구간 시작/끝
+        turn_codes: 구간별 화자 코드 (0 이상 정수)
+        max_gap: 겹치지 않는 세그먼트를 가장 가까운 구간에 배정할 최대 거리 (None이면 무제한)
+
+    Returns:
+        구간 인덱스 배열 (입력 구간 순서 기준, 배정 불가 시 -1)
+    """
+    seg_start = np.asarray(seg_start, dtype=np.float64)
+    seg_end = np.maximum(np.asarray(seg_end, dtype=np.float64), seg_start)
+    n, m = len(seg_start), len(turn_start)
+    result = np.full(n, -1, dtype=np.int64)
+    if n == 0 or m == 0:
+        return result
+
+    order = np.argsort(np.asarray(turn_start, dtype=np.float64), kind="stable")
+    t_start = np.asarray(turn_start, dtype=np.float64)[order]
+    t_end = np.asarray(turn_end, dtype=np.float64)[order]
+    t_codes = np.asarray(turn_codes, dtype=np.int64)[order]
+
+    # 1) 겹치는 쌍 → 화자별 겹친 시간 합
+    p_seg, p_turn, p_overlap = _candidate_pairs(seg_start, seg_end, t_start, t_end)
+    if len(p_seg):
+        n_codes = int(t_codes.max()) + 1
+        keys = p_seg * n_codes + t_codes[p_turn]
+        _, inverse = np.unique(keys, return_inverse=True)
+        speaker_total = np.bincount(inverse, weights=p_overlap)[inverse]
+
+        # 2) 세그먼트별 (화자 합, 구간 겹침, -코드, -구간) 최대인 쌍
+        best = np.lexsort((p_turn, t_codes[p_turn], -p_overlap, -speaker_total, p_seg))
+        first = np.ones(len(best), dtype=bool)
+        first[1:] = p_seg[best][1:] != p_seg[best][:-1]
+        chosen = best[first]
+        result[p_seg[chosen]] = p_turn[chosen]
+
+    # 3) 겹치지 않는 세그먼트 → 가장 가까운 구간
+    missing = np.flatnonzero(result < 0)
+    if len(missing):
+        nearest = _nearest_turns(seg_start[missing], seg_end[missing], t_start, t_end)
+        if max_gap is not None:
+            gap = np.maximum(
+                np.maximum(t_start[nearest] - seg_end[missing], seg_start[missing] - t_end[nearest]), 0
+            )
+            nearest = np.where(gap <= max_gap, nearest, -1)
+        result[missing] = nearest
+
+    # 정렬 순서 → 입력 순서 인덱스
+    return np.where(result >= 0, order[np.maximum(result, 0)], -1)
+
+
+def turns_to_transcript(turns: Sequence[Dict]) -> Transcript:
+    """
+    화자 분리 결과 turns → 텍스트 없는 Transcript (밀리초, 화자 코드는 처음 등장 순서)
+    """
+    return Transcript.from_dicts(
+        {"speaker": turn["speaker_label"], "start": turn["start"], "end": turn["end"], "text": ""}
+        for turn in turns
+    )
+
+
+def _split_at_turns(transcript: Transcript, turns: Transcript) -> Transcript:
+    """
+    여러 화자에 걸친 세그먼트를 화자 경계에서 나누기 (transcript.speakers == turns.speakers)
+
+    겹친 구간을 시간순으로 이어 같은 화자끼리 합친 뒤, 겹친 시간 비율로 단어를 나눠 줍니다.
+    단어가 배정되지 않은 조각은 만들지 않으므로 텍스트는 그대로 보존됩니다.
+    """
+    order = np.argsort(turns.start_ms, kind="stable")
+    t_start = turns.start_ms[order].astype(np.float64)
+    t_end = turns.end_ms[order].astype(np.float64)
+    t_codes = turns.speaker_codes[order]
+
+    seg_start = transcript.start_ms.astype(np.float64)
+    seg_end = np.maximum(transcript.end_ms.astype(np.float64), seg_start)
+    p_seg, p_turn, _ = _candidate_pairs(seg_start, seg_end, t_start, t_end)
+
+    if not len(p_seg):
+        return transcript
+
+    # 화자가 둘 이상인 세그먼트만 분할 대상 (세그먼트별 쌍 그룹에서 화자 코드 최소 != 최대)
+    pair_codes = t_codes[p_turn]
+    group_start = np.concatenate(([0], np.flatnonzero(np.diff(p_seg)) + 1))
+    group_end = np.append(group_start[1:], len(p_seg))
+    multi = np.flatnonzero(
+        np.minimum.reduceat(pair_codes, group_start) != np.maximum.reduceat(pair_codes, group_start)
+    )
+    if not len(multi):
+        return transcript
+
+    # 분할 조각 [세그먼트 인덱스, 조각 순번, 시작, 끝, 화자, 텍스트]
+    pieces_out = []
+    for g in multi.tolist():
+        i = int(p_seg[group_start[g]])
+        s0, e0 = int(transcript.start_ms[i]), int(transcript.end_ms[i])
+        words = transcript.texts[i].split()
+        if not words:
+            continue
+
+        # 시간순 조각 [시작, 화자, 겹친 시간] (같은 화자 연속 구간은 합침)
+        pieces = []
+        for t in p_turn[group_start[g]:group_end[g]].tolist():
+            start, end = max(s0, t_start[t]), min(e0, t_end[t])
+            if pieces and pieces[-1][1] == t_codes[t]:
+                pieces[-1][2] += end - start
+            else:
+                pieces.append([int(start), int(t_codes[t]), end - start])
+
+        # 겹친 시간 비율로 단어 분배 → 단어가 있는 조각만 출력, 조각 끝 = 다음 조각 시작
+        weights = np.cumsum([piece[2] for piece in pieces])
+        cuts = np.round(weights / weights[-1] * len(words)).astype(int).tolist()
+        emitted = []
+        prev_cut = 0
+        for piece, cut in zip(pieces, cuts):
+            if cut > prev_cut:
+                emitted.append([piece[0], piece[1], " ".join(words[prev_cut:cut])])
+                prev_cut = cut
+        emitted[0][0] = s0
+        for k, (start, code, text) in enumerate(emitted):
+            end = emitted[k + 1][0] if k + 1 < len(emitted) else e0
+            pieces_out.append((i, k, start, end, code, text))
+
+    if not pieces_out:
+        return transcript
+
+    # 분할하지 않은 세그먼트 + 조각을 원래 순서대로 합치기
+    split_segments = np.array(sorted({row[0] for row in pieces_out}), dtype=np.int64)
+    keep = np.setdiff1d(np.arange(len(transcript)), split_segments)
+    seg_index = np.concatenate((keep, [row[0] for row in pieces_out])).astype(np.int64)
+    sub_index = np.concatenate((np.zeros(len(keep), dtype=np.int64), [row[1] for row in pieces_out])).astype(np.int64)
+    starts = np.concatenate((transcript.start_ms[keep], [row[2] for row in pieces_out])).astype(np.int64)
+    ends = np.concatenate((transcript.end_ms[keep], [row[3] for row in pieces_out])).astype(np.int64)
+    codes = np.concatenate((transcript.speaker_codes[keep], [row[4] for row in pieces_out])).astype(np.int32)
+    texts = [transcript.texts[k] for k in keep.tolist()] + [row[5] for row in pieces_out]
+
+    order = np.lexsort((sub_index, seg_index))
+    return Transcript(
+        starts[order], ends[order], [texts[k] for k in order.tolist()], codes[order], list(transcript.speakers)
+    )
+
+
+def align_transcript(
+    transcript: Transcript, turns: Transcript,
+    split_at_turns: bool = False, max_gap_ms: Optional[int] = None
+) -> Tuple[Transcript, np.ndarray]:
+    """
+    STT Transcript의 세그먼트마다 화자 배정
+
+    Args:
+        transcript: STT 결과 (화자 없음)
+        turns: 화자 구간 (turns_to_transcript 결과)
+        split_at_turns: 여러 화자에 걸친 세그먼트를 화자 경계에서 나눌지
+        max_gap_ms: 겹치지 않는 세그먼트를 가까운 구간에 배정할 최대 거리 (None이면 무제한)
+
+    Returns:
+        (화자가 채워진 Transcript (speakers는 turns와 같음), 세그먼트별 배정 구간 인덱스 (-1 = 없음))
+    """
+    turn_idx = assign_turns(
+        transcript.start_ms, transcript.end_ms,
+        turns.start_ms, turns.end_ms, turns.speaker_codes, max_gap=max_gap_ms
+    )
+    codes = np.where(turn_idx >= 0, turns.speaker_codes[np.maximum(turn_idx, 0)], NO_SPEAKER).astype(np.int32)
+    aligned = Transcript(transcript.start_ms, transcript.end_ms, list(transcript.texts), codes, list(turns.speakers))
+
+    if split_at_turns and len(turns):
+        aligned = _split_at_turns(aligned, turns)
+        turn_idx = assign_turns(
+            aligned.start_ms, aligned.end_ms,
+            turns.start_ms, turns.end_ms, turns.speaker_codes, max_gap=max_gap_ms
+        )
+    return aligned, turn_idx
+
+
+def label_rows(stt_rows: Sequence, diar_rows: Sequence, unknown: str = "UNKNOWN") -> List[str]:
+    """
+    DB 행(STTResult, DiarizationResult) 기준 화자 라벨 배정 (REST 엔드포인트용)
+
+    Args:
+        stt_rows: start_time/end_time 속성이 있는 STT 행
+        diar_rows: start_time/end_time/speaker_label 속성이 있는 화자 구간 행
+        unknown: 화자 구간이 없을 때 라벨
+
+    Returns:
+        stt_rows 순서의 화자 라벨 리스트
+    """
+    if not diar_rows:
+        return [unknown] * len(stt_rows)
+
+    labels: Dict[str, int] = {}
+    turn_codes = [labels.setdefault(d.speaker_label, len(labels)) for d in diar_rows]
+    turn_idx = assign_turns(
+        [s.start_time for s in stt_rows], [s.end_time for s in stt_rows],
+        [d.start_time for d in diar_rows], [d.end_time for d in diar_rows],
+        turn_codes,
+    )
+    names = list(labels)
+    return [names[turn_codes[t]] if t >= 0 else unknown for t in turn_idx.tolist()]
@@ -0,0 +1,272 @@
+"""
+전처리/STT 산출물 캐시 (내용 주소 기반)
+
+같은 오디오를 다시 분석할 때(화자 수 확정 후 재분석 등) 전처리와 STT를 건너뛰기 위한 캐시
+- 키: 입력 오디오 SHA-256 + 전처리 상수 (+ STT는 Whisper 모드/모델/디바이스)
+- 저장 위치: /app/temp/cache/{kind}/{key}/
+- 용량 상한 초과 시 가장 오래 사용되지 않은 항목부터 삭제 (LRU)
+- 적중/실패 카운터 (stats.json)
+- 여러 워커 프로세스가 같은 캐시 디렉토리를 공유하므로 삭제(LRU)는 배타 파일 잠금, 복사(fetch)는 공유 잠금 안에서 실행
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+
+
+_HASH_BLOCK_BYTES = 1024 * 1024
+_META_FILE = "meta.json"
+_STATS_FILE = "stats.json"
+_EVICT_LOCK = ".evict.lock"
+_STATS_LOCK = ".stats.lock"
+
+
+def sha256_file(path: Path) -> str:
+    """파일 내용 SHA-256 (블록 단위로 읽음)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _digest(parts: Dict) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """
+    kind("preprocess", "stt")별 산출물 디렉토리 캐시
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        """
+        Args:
+            root: 캐시 루트 디렉토리
+            max_bytes: 전체 캐시 용량 상한 (bytes)
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # ---------- 키 ----------
+
+    @staticmethod
+    def preprocess_key(input_path: Path, audio_hash: Optional[str] = None) -> str:
+        """입력 오디오 해시 + 전처리 상수로 전처리 키 생성"""
+        from app.services import preprocessing as pp
+
+        return _digest({
+            "audio": audio_hash or sha256_file(input_path),
+            "sr": pp.SR,
+            "hpf_cutoff": pp.HPF_CUTOFF,
+            "hpf_order": pp.HPF_ORDER,
+            "vad_aggr": pp.VAD_AGGR,
+            "frame_ms": pp.FRAME_MS,
+            "pad_ms": pp.PAD_MS,
+            "target_peak": pp.TARGET_PEAK,
+            "mode": settings.PREPROCESS_MODE,
+        })
+
+    @staticmethod
+    def stt_key(
+        preprocess_key: str, whisper_mode: str, model_size: str, device: str,
+        backend: Optional[str] = None,
+    ) -> str:
+        """전처리 키 + Whisper 설정(로컬 백엔드 포함)으로 STT 키 생성"""
+        parts = {
+            "preprocess": preprocess_key,
+            "whisper_mode": whisper_mode,
+            "model_size": model_size,
+            "device": device,
+        }
+        if whisper_mode == "local":
+            parts["backend"] = backend or settings.WHISPER_LOCAL_BACKEND
+            if parts["backend"] == "faster-whisper":
+                parts["compute_type"] = settings.WHISPER_COMPUTE_TYPE
+        elif settings.WHISPER_API_UPLOAD_FORMAT == "opus":
+            # 손실 압축 업로드는 결과가 달라질 수 있음 (wav/flac은 같은 PCM)
+            parts["upload"] = f"opus-{settings.WHISPER_API_OPUS_BITRATE}"
+        return _digest(parts)
+
+    # ---------- 잠금 ----------
+
+    @contextmanager
+    def _flock(self, name: str, shared: bool = False):
+        """프로세스 간 파일 잠금 (같은 프로세스의 스레드끼리도 서로 다른 파일 디스크립터라 배제됨)"""
+        with open(self.root / name, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ---------- 조회/저장 ----------
+
+    def _entry_dir(self, kind: str, key: str) -> Path:
+        return self.root / kind / key
+
+    def fetch(self, kind: str, key: str, dest_dir: Path) -> Optional[Dict]:
+        """
+        캐시 항목을 dest_dir로 복사
+
+        Returns:
+            적중 시 저장 당시의 meta 딕셔너리, 실패 시 None
+        """
+        entry = self._entry_dir(kind, key)
+        meta_path = entry / _META_FILE
+        if not meta_path.exists():
+            self._count(kind, hit=False)
+            return None
+
+        # 복사하는 동안 다른 워커가 이 항목을 삭제(LRU)하지 못하도록 공유 잠금
+        with self._flock(_EVICT_LOCK, shared=True):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                dest_dir.mkdir(parents=True, exist_ok=True)
+                for rel in meta.get("files", []):
+                    src = entry / rel
+                    if not src.exists():
+                        # 손상된 항목은 삭제 후 miss 처리
+                        shutil.rmtree(entry, ignore_errors=True)
+                        self._count(kind, hit=False)
+                        return None
+                    dst = dest_dir / rel
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(src, dst)
+
+                # LRU 기준 시각 갱신
+                os.utime(meta_path, None)
+            except (OSError, ValueError) as e:
+                # 잠금 전에 삭제됐거나 meta가 깨진 항목 → miss
+                print(f"⚠️ 캐시 항목 읽기 실패, miss 처리: {kind}/{key[:12]} ({e})")
+                self._count(kind, hit=False)
+                return None
+
+        self._count(kind, hit=True)
+        print(f"♻️ 캐시 적중: {kind}/{key[:12]}")
+        return meta.get("meta", {})
+
+    def store(self, kind: str, key: str, base_dir: Path, rel_paths: Iterable[str], meta: Optional[Dict] = None):
+        """
+        base_dir 기준 상대 경로 파일들을 캐시에 저장 (임시 디렉토리에 쓴 뒤 rename)
+        """
+        entry = self._entry_dir(kind, key)
+        if (entry / _META_FILE).exists():
+            return
+
+        rel_paths = [str(rel) for rel in rel_paths if (base_dir / rel).exists()]
+        tmp = self.root / kind / f".tmp-{uuid.uuid4().hex}"
+        try:
+            for rel in rel_paths:
+                dst = tmp / rel
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(base_dir / rel, dst)
+            (tmp / _META_FILE).write_text(
+                json.dumps({"files": rel_paths, "meta": meta or {}, "created_at": time.time()}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.rename(tmp, entry)
+        except OSError:
+            # 다른 워커가 먼저 저장한 경우 등
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        try:
+            self.evict()
+        except OSError as e:
+            # 저장은 끝났으므로 용량 정리 실패로 스테이지를 실패시키지 않음 (다음 저장 때 다시 시도)
+            print(f"⚠️ 캐시 용량 정리 실패: {e}")
+
+    # ---------- 용량 관리 ----------
+
+    def _entries(self):
+        """(항목 디렉토리, meta 수정 시각, 크기) - 도중에 다른 프로세스가 삭제/이름 변경한 항목은 건너뜀"""
+        for kind_dir in self.root.iterdir():
+            if not kind_dir.is_dir():
+                continue
+            try:
+                entries = list(kind_dir.iterdir())
+            except OSError:
+                continue
+            for entry in entries:
+                meta_path = entry / _META_FILE
+                try:
+                    if not (entry.is_dir() and meta_path.exists()):
+                        continue
+                    size = sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+                    yield entry, meta_path.stat().st_mtime, size
+                except OSError:
+                    continue
+
+    def evict(self):
+        """용량 상한을 넘으면 가장 오래 사용되지 않은 항목부터 삭제 (프로세스 간 배타 잠금)"""
+        with self._lock, self._flock(_EVICT_LOCK):
+            entries = sorted(self._entries(), key=lambda e: e[1])
+            total = sum(size for _, _, size in entries)
+            for entry, _, size in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                print(f"🧹 캐시 삭제 (LRU): {entry.parent.name}/{entry.name[:12]}")
+
+    # ---------- 통계 ----------
+
+    def _count(self, kind: str, hit: bool):
+        """stats.json 카운터 갱신 (파일 잠금 안에서 읽고 tmp → os.replace로 기록)"""
+        stats_path = self.root / _STATS_FILE
+        try:
+            with self._flock(_STATS_LOCK):
+                try:
+                    stats = json.loads(stats_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    stats = {}
+                counter = stats.setdefault(kind, {"hits": 0, "misses": 0})
+                counter["hits" if hit else "misses"] += 1
+                tmp = stats_path.with_name(f".tmp-{os.getpid()}-{_STATS_FILE}")
+                tmp.write_text(json.dumps(stats), encoding="utf-8")
+                os.replace(tmp, stats_path)
+        except OSError as e:
+            print(f"⚠️ 캐시 통계 기록 실패: {e}")
+
+    def stats(self) -> Dict:
+        """kind별 적중/실패 횟수 + 현재 용량"""
+        try:
+            stats = json.loads((self.root / _STATS_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stats = {}
+        stats["size_bytes"] = sum(size for _, _, size in self._entries())
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_artifact_cache_instance: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """
+    산출물 캐시 싱글톤 인스턴스 반환 (비활성화 시 None)
+    """
+    global _artifact_cache_instance
+
+    if not settings.ARTIFACT_CACHE_ENABLED:
+        return None
+
+    if _artifact_cache_instance is None:
+        _artifact_cache_instance = ArtifactCache(
+            Path(settings.ARTIFACT_CACHE_DIR),
+            settings.ARTIFACT_CACHE_MAX_MB * 1024 * 1024,
+        )
+
+    return _artifact_cache_instance
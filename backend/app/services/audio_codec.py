@@ -0,0 +1,137 @@
+"""
+API 업로드용 청크 인코딩
+
+Whisper API는 요청당 25MB 제한이 있으므로, 16kHz PCM WAV(약 1.9MB/분) 대신
+압축 포맷으로 인코딩해 업로드하면 같은 상한 안에서 더 긴 청크를 보낼 수 있습니다.
+- wav: 16bit PCM (기존 동작)
+- flac: 무손실 (soundfile, 메모리 내 인코딩)
+- opus: 손실 압축, 비트레이트 설정 가능 (ffmpeg 파이프, Ogg 컨테이너)
+
+청크 계획은 인코딩된 바이트 기준으로 잡습니다 (estimate_bytes_per_second로 바이트레이트 추정).
+"""
+import io
+import subprocess
+from typing import NamedTuple
+
+import numpy as np
+import soundfile as sf
+
+
+SR = 16000
+
+UPLOAD_FORMATS = ("wav", "flac", "opus")
+
+# 추정 바이트레이트 여유 (청크 내용에 따라 압축률이 달라지므로)
+BYTES_MARGIN = 1.15
+
+# 바이트레이트 추정용 구간 (개수, 길이)
+_PROBE_WINDOWS = 4
+_PROBE_SECONDS = 20
+
+
+class EncodedChunk(NamedTuple):
+    """인코딩된 업로드 데이터"""
+    data: bytes
+    filename: str
+    mimetype: str
+
+
+_SUFFIX = {"wav": ".wav", "flac": ".flac", "opus": ".ogg"}
+_MIMETYPE = {"wav": "audio/wav", "flac": "audio/flac", "opus": "audio/ogg"}
+
+
+def upload_suffix(fmt: str) -> str:
+    return _SUFFIX[fmt]
+
+
+def upload_mimetype(fmt: str) -> str:
+    return _MIMETYPE[fmt]
+
+
+def _encode_opus(pcm_i16: np.ndarray, sr: int, bitrate: str) -> bytes:
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-f",
+            "s16le",
+            "-ar",
+            str(sr),
+            "-ac",
+            "1",
+            "-i",
+            "-",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            bitrate,
+            "-application",
+            "voip",
+            "-f",
+            "ogg",
+            "-",
+        ],
+        input=np.ascontiguousarray(pcm_i16, dtype=np.int16).tobytes(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg Opus 인코딩 실패: {result.stderr.decode('utf-8', errors='ignore')}")
+    return result.stdout
+
+
+def encode_pcm(pcm_i16: np.ndarray, fmt: str = "flac", sr: int = SR, bitrate: str = "32k") -> bytes:
+    """
+    int16 PCM 구간을 업로드 포맷으로 인코딩 (메모리 내)
+
+    Args:
+        pcm_i16: int16 샘플 (memmap 슬라이스 가능)
+        fmt: wav, flac, opus
+        sr: 샘플레이트
+        bitrate: Opus 비트레이트 (예: "24k", "32k")
+
+    Returns:
+        인코딩된 바이트
+    """
+    if fmt == "opus":
+        return _encode_opus(pcm_i16, sr, bitrate)
+    if fmt not in ("wav", "flac"):
+        raise ValueError(f"Unknown upload format: {fmt} (choices: {', '.join(UPLOAD_FORMATS)})")
+
+    buf = io.BytesIO()
+    sf.write(buf, np.asarray(pcm_i16), sr, format=fmt.upper(), subtype="PCM_16")
+    return buf.getvalue()
+
+
+def encode_chunk(
+    pcm_i16: np.ndarray, stem: str, fmt: str = "flac", sr: int = SR, bitrate: str = "32k"
+) -> EncodedChunk:
+    """청크 인코딩 + 업로드 파일명/MIME 타입"""
+    return EncodedChunk(encode_pcm(pcm_i16, fmt, sr, bitrate), f"{stem}{_SUFFIX[fmt]}", _MIMETYPE[fmt])
+
+
+def estimate_bytes_per_second(pcm_i16: np.ndarray, fmt: str = "flac", sr: int = SR, bitrate: str = "32k") -> float:
+    """
+    인코딩 바이트레이트 추정 (오디오 전체에 고르게 분포한 구간 몇 개를 실제로 인코딩)
+
+    구간 중 가장 큰 값에 BYTES_MARGIN을 곱해 반환하므로, 청크 계획의 바이트 상한이 보수적으로 잡힙니다.
+
+    Returns:
+        초당 바이트 수
+    """
+    if fmt == "wav":
+        return float(sr * 2)
+
+    total = len(pcm_i16)
+    window = min(total, _PROBE_SECONDS * sr)
+    if window == 0:
+        return float(sr * 2)
+
+    starts = np.linspace(0, total - window, _PROBE_WINDOWS).astype(np.int64)
+    rates = []
+    for start in sorted(set(starts.tolist())):
+        data = encode_pcm(pcm_i16[start: start + window], fmt, sr, bitrate)
+        rates.append(len(data) / (window / sr))
+    return max(rates) * BYTES_MARGIN
@@ -0,0 +1,139 @@
+"""
+분석 결과 bulk 저장
+
+STT 세그먼트, 화자 구간, 감지된 이름, 화자 매핑, 최종 회의록처럼 한 번에 수천 행이 생기는 결과를
+ORM 객체 없이 (컬럼 이름, 행 튜플 목록)으로 받아 insert() executemany로 배치 저장합니다.
+세션에 객체를 쌓지 않으므로 긴 회의에서도 메모리/flush 비용이 행 수에 비례해 늘지 않고,
+기존 행 삭제와 새 행 저장이 호출자의 같은 트랜잭션 안에서 실행됩니다 (커밋은 호출자가 담당).
+
+    writer = BulkWriter(db)
+    writer.replace(STTResult, audio_file_id, ("word_index", "text", ...), rows)
+    db.commit()
+    writer.report()
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+class BulkStats:
+    """테이블별 저장 통계"""
+
+    __slots__ = ("table", "rows", "batches", "deleted", "seconds")
+
+    def __init__(self, table: str):
+        self.table = table
+        self.rows = 0
+        self.batches = 0
+        self.deleted = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "table": self.table,
+            "rows": self.rows,
+            "batches": self.batches,
+            "deleted": self.deleted,
+            "seconds": round(self.seconds, 4),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+class BulkWriter:
+    """
+    세션 트랜잭션 안에서 테이블별 bulk insert (삭제 → 배치 insert)
+
+    Args:
+        db: SQLAlchemy 세션 (커밋/롤백은 호출자가 담당)
+        batch_size: executemany 한 번에 보낼 최대 행 수 (기본: BULK_INSERT_BATCH_SIZE)
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = max(1, batch_size or settings.BULK_INSERT_BATCH_SIZE)
+        self.stats: Dict[str, BulkStats] = {}
+
+    def _stats(self, model) -> BulkStats:
+        table = model.__tablename__
+        if table not in self.stats:
+            self.stats[table] = BulkStats(table)
+        return self.stats[table]
+
+    def delete(self, model, audio_file_id: int) -> int:
+        """audio_file_id의 기존 행 삭제"""
+        started = time.perf_counter()
+        deleted = self.db.query(model).filter(
+            model.audio_file_id == audio_file_id
+        ).delete(synchronize_session=False)
+        stats = self._stats(model)
+        stats.deleted += deleted
+        stats.seconds += time.perf_counter() - started
+        return deleted
+
+    def insert(
+        self,
+        model,
+        columns: Sequence[str],
+        rows: Iterable[Tuple],
+        fixed: Optional[Dict] = None,
+    ) -> int:
+        """
+        행 튜플을 배치 단위 executemany로 저장
+
+        Args:
+            model: 저장할 모델 클래스 (테이블과 Python 쪽 컬럼 기본값만 사용)
+            columns: 행 튜플의 컬럼 이름 순서
+            rows: 행 튜플 (리스트가 아니어도 됨, 배치 크기만큼씩 소비)
+            fixed: 모든 행에 같은 값으로 들어가는 컬럼 (예: audio_file_id)
+
+        Returns:
+            저장한 행 수
+        """
+        fixed = fixed or {}
+        columns = tuple(columns)
+        statement = model.__table__.insert()
+        stats = self._stats(model)
+        started = time.perf_counter()
+
+        inserted = 0
+        batch: List[Dict] = []
+        for row in rows:
+            values = dict(zip(columns, row))
+            values.update(fixed)
+            batch.append(values)
+            if len(batch) >= self.batch_size:
+                self.db.execute(statement, batch)
+                inserted += len(batch)
+                stats.batches += 1
+                batch = []
+        if batch:
+            self.db.execute(statement, batch)
+            inserted += len(batch)
+            stats.batches += 1
+
+        stats.rows += inserted
+        stats.seconds += time.perf_counter() - started
+        return inserted
+
+    def replace(self, model, audio_file_id: int, columns: Sequence[str], rows: Iterable[Tuple]) -> int:
+        """audio_file_id의 기존 행을 지우고 새 행 저장 (같은 트랜잭션)"""
+        self.delete(model, audio_file_id)
+        return self.insert(model, columns, rows, fixed={"audio_file_id": audio_file_id})
+
+    def summary(self) -> List[Dict]:
+        return [stats.to_dict() for stats in self.stats.values()]
+
+    def report(self):
+        """테이블별 저장 행 수와 처리량 출력"""
+        for stats in self.stats.values():
+            print(
+                f"💾 bulk insert {stats.table}: {stats.rows}행 ({stats.batches}배치, 삭제 {stats.deleted}행), "
+                f"{stats.seconds * 1000:.1f}ms ({stats.rows_per_sec:,.0f}행/초)"
+            )
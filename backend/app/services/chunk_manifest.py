@@ -0,0 +1,167 @@
+"""
+STT 청크 매니페스트 (청크 단위 체크포인트)
+
+work_dir/chunks/manifest.json에 청크별 상태를 기록해 두고, 작업이 중간에 죽은 경우
+다음 실행에서 완료된 청크는 건너뛰고 누락/무효 청크만 다시 전사합니다.
+
+청크 항목: index, start, end (샘플), audio_hash (청크 샘플 SHA-256), status, output, segments
+청크 결과: work_dir/chunks/chunk_XXXX.segments.json (청크 기준 [[start_ms, end_ms, text], ...])
+
+완료 청크는 다음을 모두 만족할 때만 재사용합니다.
+- 매니페스트의 전사 설정(model, 목표 청크 길이 포함)이 현재 설정과 같음
+- 결과 파일이 존재하고 읽을 수 있음
+- 청크 샘플 해시가 현재 전처리 오디오와 같음
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.chunk_planner import ChunkPlan
+
+
+MANIFEST_VERSION = 1
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+
+
+def manifest_path_for(work_dir: Path) -> Path:
+    return work_dir / "chunks" / "manifest.json"
+
+
+def chunk_audio_hash(pcm: np.ndarray, start: int, end: int) -> str:
+    """청크 샘플 SHA-256 (memmap 구간을 그대로 해시)"""
+    return hashlib.sha256(np.ascontiguousarray(pcm[start:end]).data).hexdigest()
+
+
+def _atomic_write_json(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".tmp-{path.name}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+
+
+class ChunkManifest:
+    """
+    청크 계획 + 청크별 전사 상태
+    """
+
+    def __init__(self, work_dir: Path, plan: ChunkPlan, model: Dict, chunks: List[Dict]):
+        """
+        Args:
+            work_dir: 작업 디렉토리
+            plan: 청크 계획
+            model: 전사 설정 (모드, 모델, 백엔드, 디바이스 등)
+            chunks: 청크별 항목 리스트 (plan과 같은 순서)
+        """
+        self.work_dir = work_dir
+        self.path = manifest_path_for(work_dir)
+        self.plan = plan
+        self.model = model
+        self.chunks = chunks
+
+    # ---------- 생성/로드 ----------
+
+    @classmethod
+    def create(cls, work_dir: Path, plan: ChunkPlan, pcm: np.ndarray, model: Dict) -> "ChunkManifest":
+        chunks = [
+            {
+                "index": c.index,
+                "start": c.start,
+                "end": c.end,
+                "audio_hash": chunk_audio_hash(pcm, c.start, c.end),
+                "status": STATUS_PENDING,
+                "output": f"chunk_{c.index:04d}.segments.json",
+                "segments": None,
+            }
+            for c in plan
+        ]
+        manifest = cls(work_dir, plan, model, chunks)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, work_dir: Path) -> Optional["ChunkManifest"]:
+        """저장된 매니페스트 로드 (없거나 손상/버전 불일치 시 None)"""
+        path = manifest_path_for(work_dir)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        plan = ChunkPlan.from_dict(data["plan"])
+        return cls(work_dir, plan, data["model"], data["chunks"])
+
+    @classmethod
+    def resume_or_create(
+        cls, work_dir: Path, pcm: np.ndarray, model: Dict, build_plan
+    ) -> "ChunkManifest":
+        """
+        같은 오디오/설정의 매니페스트가 있으면 이어서 사용, 아니면 새로 생성
+
+        Args:
+            build_plan: 새로 만들 때 호출할 청크 계획 생성 함수 (인자 없음)
+        """
+        manifest = cls.load(work_dir)
+        if (
+            manifest is not None
+            and manifest.model == model
+            and manifest.plan.total_samples == len(pcm)
+        ):
+            return manifest
+        return cls.create(work_dir, build_plan(), pcm, model)
+
+    def save(self):
+        _atomic_write_json(self.path, {
+            "version": MANIFEST_VERSION,
+            "model": self.model,
+            "plan": self.plan.to_dict(),
+            "chunks": self.chunks,
+        })
+
+    # ---------- 청크 상태 ----------
+
+    def output_path(self, index: int) -> Path:
+        return self.path.parent / self.chunks[index]["output"]
+
+    def load_segments(self, index: int, pcm: np.ndarray) -> Optional[List[list]]:
+        """
+        완료 청크 결과 로드 (무효하면 None)
+        """
+        entry = self.chunks[index]
+        if entry["status"] != STATUS_DONE:
+            return None
+        try:
+            segments = json.loads(self.output_path(index).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(segments, list) or len(segments) != entry.get("segments"):
+            return None
+        if chunk_audio_hash(pcm, entry["start"], entry["end"]) != entry["audio_hash"]:
+            return None
+        return segments
+
+    def mark_done(self, index: int, segments: Sequence[Sequence]):
+        """청크 결과 저장 후 매니페스트 갱신 (둘 다 임시 파일 → rename)"""
+        _atomic_write_json(self.output_path(index), [list(seg) for seg in segments])
+        entry = self.chunks[index]
+        entry["status"] = STATUS_DONE
+        entry["segments"] = len(segments)
+        self.save()
+
+    def mark_pending(self, index: int):
+        entry = self.chunks[index]
+        entry["status"] = STATUS_PENDING
+        entry["segments"] = None
+
+    def summary(self) -> Dict:
+        done = sum(1 for c in self.chunks if c["status"] == STATUS_DONE)
+        return {"total": len(self.chunks), "done": done, "pending": len(self.chunks) - done}
@@ -0,0 +1,165 @@
+"""
+STT 청크 계획 (STT Step 1)
+
+고정 10분 경계 대신, 목표 경계 주변에서 에너지가 가장 낮은 프레임(무음)을 골라 자릅니다.
+- 청크 수를 먼저 정하고 경계를 균등 배치 (마지막 자투리 청크 없음)
+- 전처리 유지 구간 이음매(voiced_index.junctions)는 우선 후보
+- API 모드는 청크당 바이트 상한(MAX_TARGET_MB) 준수
+- 결과 ChunkPlan은 로컬/API 전사 경로가 같이 사용 (JSON 저장/로드 가능)
+"""
+import json
+import math
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+import numpy as np
+
+from app.services.vad import frame_rms_dbfs, frame_view
+
+
+FRAME_MS = 20
+SEARCH_SECONDS = 15.0  # 목표 경계 앞뒤 탐색 범위
+MIN_CHUNK_SECONDS = 30.0  # 병렬화를 위해 쪼갤 때도 이보다 짧게는 자르지 않음
+JUNCTION_BONUS_DB = 6.0  # 유지 구간 이음매 프레임 가산점
+WAV_HEADER_BYTES = 44
+
+
+class ChunkSpec(NamedTuple):
+    """청크 하나 (샘플 단위 [start, end))"""
+    index: int
+    start: int
+    end: int
+
+    @property
+    def num_samples(self) -> int:
+        return self.end - self.start
+
+
+class ChunkPlan:
+    """
+    청크 계획
+
+    청크 오프셋/길이는 모두 샘플 수 계산으로 구하므로 청크 파일을 다시 읽을 필요가 없습니다.
+    """
+
+    def __init__(self, chunks: List[ChunkSpec], sr: int, total_samples: int):
+        self.chunks = chunks
+        self.sr = sr
+        self.total_samples = total_samples
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def __iter__(self) -> Iterator[ChunkSpec]:
+        return iter(self.chunks)
+
+    def __getitem__(self, i: int) -> ChunkSpec:
+        return self.chunks[i]
+
+    def offsets_ms(self) -> List[int]:
+        return [round(c.start * 1000 / self.sr) for c in self.chunks]
+
+    def durations_sec(self) -> List[float]:
+        return [c.num_samples / self.sr for c in self.chunks]
+
+    def to_dict(self) -> dict:
+        return {
+            "sr": self.sr,
+            "total_samples": self.total_samples,
+            "chunks": [[c.start, c.end] for c in self.chunks],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChunkPlan":
+        chunks = [ChunkSpec(i, int(s), int(e)) for i, (s, e) in enumerate(data["chunks"])]
+        return cls(chunks, int(data["sr"]), int(data["total_samples"]))
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "ChunkPlan":
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def plan_chunks(
+    pcm: np.ndarray,
+    sr: int,
+    target_seconds: float,
+    search_seconds: float = SEARCH_SECONDS,
+    max_bytes: Optional[int] = None,
+    bytes_per_second: Optional[float] = None,
+    min_chunks: int = 1,
+    junctions: Optional[np.ndarray] = None,
+) -> ChunkPlan:
+    """
+    무음 정렬 청크 계획 생성
+
+    Args:
+        pcm: int16 오디오 (memmap 가능)
+        sr: 샘플레이트
+        target_seconds: 목표 청크 길이 (초)
+        search_seconds: 경계 탐색 범위 (초, 목표 경계 ± 범위)
+        max_bytes: 청크당 최대 바이트 (API 업로드 제한, None이면 제한 없음)
+        bytes_per_second: 청크 인코딩 바이트레이트 (기본값: 16bit PCM WAV)
+        min_chunks: 최소 청크 수 (병렬 전사 시 워커 수, MIN_CHUNK_SECONDS 이상일 때만 적용)
+        junctions: 우선 후보 경계 (샘플 단위, voiced_index.junctions())
+
+    Returns:
+        ChunkPlan
+    """
+    total = len(pcm)
+    if total == 0:
+        return ChunkPlan([], sr, 0)
+
+    frame_len = int(sr * FRAME_MS / 1000)
+    target = int(target_seconds * sr)
+
+    # 바이트 상한 → 샘플 상한
+    max_samples = None
+    if max_bytes:
+        bps = bytes_per_second or sr * 2
+        max_samples = int((max_bytes - WAV_HEADER_BYTES) / bps * sr)
+        target = min(target, max_samples)
+
+    n_chunks = max(1, math.ceil(total / target))
+    min_samples = int(MIN_CHUNK_SECONDS * sr)
+    if min_chunks > n_chunks:
+        n_chunks = max(n_chunks, min(min_chunks, total // max(min_samples, 1)))
+
+    if n_chunks == 1:
+        return ChunkPlan([ChunkSpec(0, 0, total)], sr, total)
+
+    # 프레임 에너지 (dB) + 이음매 가산점
+    cost = frame_rms_dbfs(frame_view(pcm, frame_len)).astype(np.float32)
+    if junctions is not None and len(junctions):
+        j = (np.asarray(junctions, dtype=np.int64) // frame_len)
+        j = j[(j >= 0) & (j < len(cost))]
+        cost[j] -= JUNCTION_BONUS_DB
+
+    search = int(search_seconds * sr)
+    cuts = [0]
+    for k in range(1, n_chunks):
+        prev = cuts[-1]
+        remaining = n_chunks - k + 1
+        ideal = prev + (total - prev) // remaining
+
+        lo = max(prev + frame_len, ideal - search)
+        hi = min(total - frame_len, ideal + search)
+        if max_samples:
+            hi = min(hi, prev + max_samples)
+        lo_f, hi_f = lo // frame_len, hi // frame_len
+        if hi_f <= lo_f:
+            cut = min(ideal, prev + max_samples) if max_samples else ideal
+        else:
+            cut = (lo_f + int(np.argmin(cost[lo_f:hi_f]))) * frame_len
+        cuts.append(int(cut))
+
+    # 마지막 청크가 상한을 넘으면 (탐색 범위가 경계를 뒤로 밀어낸 경우) 추가 분할
+    while max_samples and total - cuts[-1] > max_samples:
+        cuts.append(cuts[-1] + max_samples)
+
+    cuts.append(total)
+    chunks = [ChunkSpec(i, s, e) for i, (s, e) in enumerate(zip(cuts[:-1], cuts[1:]))]
+    return ChunkPlan(chunks, sr, total)
@@ -6,7 +6,7 @@
 """
 import app.patch_torch  # Apply monkey patch first
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import numpy as np
 
 try:
@@ -16,10 +16,38 @@ except ImportError:
     SENKO_AVAILABLE = False
     print("⚠️ Senko not installed. Install with: pip install git+https://github.com/narcotic-sh/senko.git")
 
+from app.core.config import settings
 from app.core.device import get_device
+from app.services.alignment import align_transcript, turns_to_transcript
+from app.services.diarizer_pool import get_diarizer_pool
+from app.services.transcript import Transcript
 
 
-def run_diarization(audio_path: Path, device: str = None, mode: str = "senko", num_speakers: int = None) -> Dict:
+def estimate_diarization_resources(mode: str, device: str) -> Tuple[float, int, int]:
+    """
+    화자 분리 스테이지가 점유할 자원 추정 (파이프라인 스테이지 스케줄링용)
+
+    Returns:
+        (cpu 코어 수, memory_mb, gpu_memory_mb)
+    """
+    memory_mb = 4096 if mode == "nemo" else 2048
+    if device == "cuda":
+        return 1.0, 1024, memory_mb
+    return 2.0, memory_mb, 0
+
+
+def use_windowed_diarization(audio_path: Path) -> bool:
+    """길이가 DIARIZATION_WINDOWED_MIN_SECONDS 이상이면 윈도우 화자 분리 사용 (0이면 사용 안 함)"""
+    import soundfile as sf
+
+    threshold = settings.DIARIZATION_WINDOWED_MIN_SECONDS
+    return threshold > 0 and sf.info(str(audio_path)).duration >= threshold
+
+
+def run_diarization(
+    audio_path: Path, device: str = None, mode: str = "senko", num_speakers: int = None,
+    windowed: bool = None
+) -> Dict:
     """
     화자 분리 통합 인터페이스
 
@@ -27,10 +55,18 @@ def run_diarization(audio_path: Path, device: str = None, mode: str = "senko", n
         audio_path: 오디오 파일 경로
         device: 디바이스 ("cuda", "cpu", None=auto)
         mode: 화자 분리 모델 ("senko" or "nemo")
+        num_speakers: 확정 화자 수
+        windowed: 윈도우 화자 분리 사용 여부 (None이면 길이로 결정, diarization_windowed 참고)
 
     Returns:
         화자 분리 결과 (turns + embeddings)
     """
+    if windowed is None:
+        windowed = use_windowed_diarization(audio_path)
+    if windowed:
+        from app.services.diarization_windowed import run_diarization_windowed
+        return run_diarization_windowed(audio_path, device, mode=mode, num_speakers=num_speakers)
+
     if mode == "nemo":
         # NeMo 모델 사용
         from app.services.diarization_nemo import run_diarization_nemo
@@ -40,6 +76,43 @@ def run_diarization(audio_path: Path, device: str = None, mode: str = "senko", n
         return run_diarization_senko(audio_path, device)
 
 
+def run_diarization_batch(
+    audio_paths: Sequence[Path],
+    device: str = None,
+    mode: str = "nemo",
+    num_speakers: Optional[Sequence[Optional[int]]] = None,
+    work_dir: Path = None,
+) -> List[Union[Dict, Exception]]:
+    """
+    여러 파일 화자 분리 (야간 재분석 등 배치용)
+
+    - nemo: 매니페스트 하나로 묶어 모델 인스턴스 하나로 처리 (임베딩 배치 공유)
+    - senko: 상주 모델 하나로 파일을 순서대로 처리
+
+    Args:
+        audio_paths: 전처리된 WAV 경로 리스트
+        device: 디바이스 ("cuda", "cpu", None=auto)
+        mode: 화자 분리 모델 ("senko" or "nemo")
+        num_speakers: 파일별 확정 화자 수 (nemo만 사용)
+        work_dir: NeMo 배치 작업 디렉토리
+
+    Returns:
+        입력 순서대로 화자 분리 결과 (turns + embeddings) 또는 해당 파일의 예외
+    """
+    if mode == "nemo":
+        from app.services.diarization_nemo import run_diarization_nemo_batch
+        return run_diarization_nemo_batch(audio_paths, device, num_speakers=num_speakers, work_dir=work_dir)
+
+    results = []
+    for audio_path in audio_paths:
+        try:
+            results.append(run_diarization_senko(Path(audio_path), device))
+        except Exception as e:
+            print(f"⚠️ [Diarization] {audio_path} failed: {e}")
+            results.append(e)
+    return results
+
+
 def run_diarization_senko(audio_path: Path, device: str = None) -> Dict:
     """
     Senko를 사용한 화자 분리
@@ -83,34 +156,40 @@ def run_diarization_senko(audio_path: Path, device: str = None) -> Dict:
     print(f"[Diarization] Using device: {device}")
     print(f"[Diarization] Processing: {audio_path}")
 
-    # 메모리 정리 (Diarization 시작 전)
-    import gc
-    gc.collect()
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-
-    # Senko Diarizer 초기화 (warmup은 메모리를 많이 사용하므로 CPU에서는 비활성화)
-    warmup = device != "cpu"  # CPU에서는 warmup 비활성화로 메모리 절약
-    print(f"[Diarization] Warmup: {warmup}")
-    diarizer = senko.Diarizer(device=device, warmup=warmup, quiet=False)
-
-    # 화자 분리 실행
-    senko_result = diarizer.diarize(str(audio_path), generate_colors=False)
+    # 모델은 프로세스에 상주 (같은 디바이스의 다음 회의는 초기화 없이 바로 추론)
+    with get_diarizer_pool().use("senko", device, lambda: _load_senko_diarizer(device)) as lease:
+        senko_result = lease.model.diarize(str(audio_path), generate_colors=False)
 
     # 결과 변환
     result = convert_senko_to_custom_format(senko_result)
-
-    # Diarization 완료 후 메모리 정리
-    del diarizer
     del senko_result
-    gc.collect()
 
+    print(
+        f"[Diarization] 모델 로드 {lease.load_seconds:.1f}s"
+        f"{' (상주 모델 재사용)' if lease.reused else ''}, 추론 {lease.inference_seconds:.1f}s"
+    )
     print(f"[Diarization] Detected {len(result['embeddings'])} speakers")
     print(f"[Diarization] {len(result['turns'])} segments")
 
     return result
 
 
+def _load_senko_diarizer(device: str):
+    """Senko Diarizer 생성 (상주 풀 loader)"""
+    # 메모리 정리 (모델 로드 전)
+    import gc
+    import torch
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+    # warmup은 메모리를 많이 사용하므로 모델을 상주시키지 않는 CPU 설정에서는 비활성화
+    # (상주 시에는 한 번만 실행되므로 CPU에서도 활성화)
+    warmup = device != "cpu" or settings.DIARIZER_IDLE_TIMEOUT > 0
+    print(f"[Diarization] Warmup: {warmup}")
+    return senko.Diarizer(device=device, warmup=warmup, quiet=False)
+
+
 def convert_senko_to_custom_format(senko_result: Dict) -> Dict:
     """
     Senko 결과를 우리 프로젝트 형식으로 변환
@@ -153,61 +232,52 @@ def convert_senko_to_custom_format(senko_result: Dict) -> Dict:
 
 
 def merge_stt_with_diarization(
-    stt_segments: List[Dict], diarization_result: Dict
-) -> List[Dict]:
+    stt_segments: Union[Transcript, List[Dict]], diarization_result: Dict,
+    split_at_turns: bool = False
+) -> Transcript:
     """
     STT 결과와 화자 분리 결과 병합
 
+    STT 세그먼트마다 겹치는 시간이 가장 긴 화자 구간(turn)을 찾고 (겹치는 구간이 없으면 가장 가까운 구간),
+    같은 구간에 배정된 연속 세그먼트의 텍스트를 이어 붙여 구간당 한 행으로 만듭니다.
+    구간 밖에서 시작하는 세그먼트도 버리지 않습니다 (alignment.assign_turns 참고).
+
     Args:
-        stt_segments: STT 결과
-            [{"text": str, "start": float, "end": float}, ...]
+        stt_segments: STT 결과 (Transcript 또는 [{"text": str, "start": float, "end": float}, ...])
         diarization_result: 화자 분리 결과
             {"turns": [...], "embeddings": {...}}
+        split_at_turns: 여러 화자에 걸친 STT 세그먼트를 화자 경계에서 나눌지
 
     Returns:
-        [
-            {
-                "speaker": "speaker_00",
-                "start": 0.0,
-                "end": 5.2,
-                "text": "안녕하세요"
-            },
-            ...
-        ]
+        화자별 발화 Transcript (to_dicts() 시
+        [{"speaker": "speaker_00", "start": 0.0, "end": 5.2, "text": "안녕하세요"}, ...])
     """
-    merged = []
-    stt_idx = 0
-
-    for turn in diarization_result['turns']:
-        speaker = turn['speaker_label']
-        start_turn = turn['start']
-        end_turn = turn['end']
-
-        segment_text = ""
-
-        # STT 세그먼트 탐색
-        while stt_idx < len(stt_segments):
-            stt = stt_segments[stt_idx]
-            start_stt = stt['start']
-            end_stt = stt['end']
-
-            # STT 세그먼트가 현재 화자 구간 내에 있는 경우
-            if start_stt >= start_turn and start_stt < end_turn:
-                segment_text += stt['text'].strip() + " "
-                stt_idx += 1
-            elif start_stt >= end_turn:
-                # 다음 화자 구간으로 이동
-                break
-            else:
-                stt_idx += 1
+    if not isinstance(stt_segments, Transcript):
+        stt_segments = Transcript.from_dicts(stt_segments)
+
+    turns = turns_to_transcript(diarization_result['turns'])
+    if not len(turns):
+        return Transcript.empty()
+
+    aligned, turn_idx = align_transcript(stt_segments, turns, split_at_turns=split_at_turns)
+
+    # 같은 구간에 배정된 연속 세그먼트 → 한 행
+    run_starts = np.flatnonzero(np.diff(turn_idx, prepend=-2))
+    run_ends = np.append(run_starts[1:], len(turn_idx))
 
+    rows, merged_texts = [], []
+    for lo, hi in zip(run_starts.tolist(), run_ends.tolist()):
+        segment_text = " ".join(text.strip() for text in aligned.texts[lo:hi]).strip()
         # 텍스트가 있는 경우만 추가
-        if segment_text.strip():
-            merged.append({
-                "speaker": speaker,
-                "start": start_turn,
-                "end": end_turn,
-                "text": segment_text.strip()
-            })
-
-    return merged
+        if segment_text:
+            rows.append(turn_idx[lo])
+            merged_texts.append(segment_text)
+
+    rows = np.array(rows, dtype=np.int64)
+    return Transcript(
+        turns.start_ms[rows],
+        turns.end_ms[rows],
+        merged_texts,
+        turns.speaker_codes[rows],
+        list(turns.speakers),
+    )
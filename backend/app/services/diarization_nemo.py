@@ -3,16 +3,18 @@ NeMo 기반 화자 분리 서비스
 - NVIDIA NeMo Toolkit 사용
 - TitaNet 모델 (192차원 임베딩)
 - Multi-scale 분석 지원
+- 배치 모드: 여러 파일을 매니페스트 하나로 묶어 같은 모델 인스턴스로 처리
 """
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Union
 import numpy as np
 import json
 import os
+import re
+import shutil
 
 try:
     import torch
-    import torchaudio
     from omegaconf import OmegaConf
     from nemo.collections.asr.models.msdd_models import NeuralDiarizer
     from nemo.collections.asr.models import EncDecSpeakerLabelModel
@@ -22,31 +24,20 @@ except ImportError:
     print("⚠️ NeMo not installed. Install with: pip install nemo-toolkit[asr]")
 
 from app.core.device import get_device
+from app.services.diarizer_pool import get_diarizer_pool
+from app.services.pcm_store import open_pcm, slice_seconds, to_float32
 
 
-def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int = None) -> Dict:
-    """
-    NeMo를 사용한 화자 분리 (고급 모드)
+SPEAKER_MODEL_NAME = "titanet_large"
 
-    Args:
-        audio_path: 오디오 파일 경로 (전처리된 WAV)
-        device: 디바이스 ("cuda", "cpu", None=auto)
 
-    Returns:
-        {
-            "turns": [
-                {"speaker_label": "SPEAKER_00", "start": 0.0, "end": 5.2},
-                ...
-            ],
-            "embeddings": {
-                "SPEAKER_00": [0.1, 0.2, ...],  # 192차원 벡터
-                ...
-            }
-        }
-    """
-    if not NEMO_AVAILABLE:
-        raise ImportError("NeMo is not installed. Please install it first.")
+def load_speaker_model(device: str):
+    """TitaNet 화자 임베딩 모델 로드 (상주 풀 loader)"""
+    return EncDecSpeakerLabelModel.from_pretrained(SPEAKER_MODEL_NAME).eval().to(device)
+
 
+def resolve_nemo_device(device: str = None) -> str:
+    """요청 디바이스 → NeMo에서 실제 사용할 디바이스"""
     # 디바이스 자동 감지
     if device is None:
         device = get_device()
@@ -61,33 +52,77 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
         print("⚠️ NeMo does not support MPS. Using CPU instead.")
         device = "cpu"
 
-    # cuDNN 비활성화 (NeMo 호환성)
-    torch.backends.cudnn.enabled = False
+    return device
 
-    print(f"[Diarization-NeMo] Using device: {device}")
-    print(f"[Diarization-NeMo] Processing: {audio_path}")
 
-    # 작업 디렉토리 생성
-    work_dir = audio_path.parent / "nemo_work"
-    work_dir.mkdir(exist_ok=True)
+def batch_file_ids(audio_paths: Sequence[Path]) -> List[str]:
+    """
+    배치 내 파일별 고유 ID (NeMo는 파일명(stem)으로 결과를 구분)
+
+    전처리 결과는 모두 preprocessed.wav이므로 stem이 겹치면 상위 디렉토리 이름(file_id)을 붙입니다.
+    """
+    stems = [p.stem for p in audio_paths]
+    if len(set(stems)) == len(stems):
+        return stems
+
+    ids = []
+    seen = set()
+    for p in audio_paths:
+        uid = re.sub(r"[^0-9A-Za-z_.-]", "_", f"{p.parent.name}_{p.stem}")
+        base, n = uid, 1
+        while uid in seen:
+            n += 1
+            uid = f"{base}_{n}"
+        seen.add(uid)
+        ids.append(uid)
+    return ids
+
+
+def _link_input(audio_path: Path, link_path: Path) -> Path:
+    """고유 이름으로 입력 연결 (심볼릭 링크, 실패 시 복사)"""
+    link_path.parent.mkdir(parents=True, exist_ok=True)
+    if link_path.is_symlink() or link_path.exists():
+        link_path.unlink()
+    try:
+        os.symlink(audio_path.resolve(), link_path)
+    except OSError:
+        shutil.copyfile(audio_path, link_path)
+    return link_path
+
+
+def write_nemo_manifest(manifest_path: Path, entries: Sequence[Dict]) -> Path:
+    """
+    NeMo 입력 매니페스트 (JSON Lines, 파일당 1줄)
 
-    # 1. Manifest 파일 생성 (NeMo 입력 형식)
-    manifest_path = work_dir / "manifest.json"
+    Args:
+        entries: [{"audio_filepath": str, "num_speakers": int | None}, ...]
+    """
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
     with open(manifest_path, 'w') as f:
-        json.dump({
-            "audio_filepath": str(audio_path),
-            "offset": 0,
-            "duration": None,
-            "label": "infer",
-            "text": "-",
-            "num_speakers": num_speakers,
-            "rttm_filepath": None,
-            "uem_filepath": None
-        }, f)
-        f.write('\n')
-
-    # 2. NeMo 설정 (포괄적 인식 모드)
-    config = OmegaConf.create({
+        for entry in entries:
+            json.dump({
+                "audio_filepath": entry["audio_filepath"],
+                "offset": 0,
+                "duration": None,
+                "label": "infer",
+                "text": "-",
+                "num_speakers": entry.get("num_speakers"),
+                "rttm_filepath": None,
+                "uem_filepath": None
+            }, f)
+            f.write('\n')
+    return manifest_path
+
+
+def build_nemo_config(manifest_path: Path, out_dir: Path, device: str, num_speakers: Optional[int] = None):
+    """
+    NeMo 설정 (포괄적 인식 모드)
+
+    Args:
+        num_speakers: None이면 자동 감지 (최대 10명), 지정하면 매니페스트의 파일별 화자 수 사용
+            (배치에서는 지정 파일 중 최대값을 max_num_speakers로 사용)
+    """
+    return OmegaConf.create({
         'device': device,
         'num_workers': 0,
         'sample_rate': 16000,
@@ -96,13 +131,13 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
 
         'diarizer': {
             'manifest_filepath': str(manifest_path),
-            'out_dir': str(work_dir),
+            'out_dir': str(out_dir),
             'oracle_vad': False,
             'collar': 0.25,
             'ignore_overlap': False,  # 동시 발화 처리
 
             'speaker_embeddings': {
-                'model_path': 'titanet_large',
+                'model_path': SPEAKER_MODEL_NAME,
                 'parameters': {
                     'window_length_in_sec': [2.0, 1.5, 1.0, 0.5],
                     'shift_length_in_sec': [1.0, 0.75, 0.5, 0.25],
@@ -140,28 +175,13 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
         }
     })
 
-    print("[Diarization-NeMo] Configuration:")
-    print(f"   - Max speakers: 10 (auto detect)")
-    print(f"   - Multi-scale: 4 levels (2.0s → 0.5s)")
-    print(f"   - VAD: High sensitivity")
-
-    # 3. 화자 분리 실행
-    print("[Diarization-NeMo] Running diarization...")
-    from nemo.collections.asr.models import ClusteringDiarizer
-
-    diarizer = ClusteringDiarizer(cfg=config)
-    diarizer.diarize()
-
-    # 4. RTTM 파일 읽기
-    rttm_file = audio_path.stem + ".rttm"
-    rttm_path = work_dir / "pred_rttms" / rttm_file
 
+def read_rttm(rttm_path: Path) -> List[Dict]:
+    """RTTM → [{"start", "end", "speaker"}, ...]"""
     if not rttm_path.exists():
         raise FileNotFoundError(f"RTTM file not found: {rttm_path}")
 
     speaker_timestamps = []
-    detected_speakers = set()
-
     with open(rttm_path, 'r') as f:
         for line in f:
             parts = line.strip().split()
@@ -175,18 +195,24 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
                     'end': start_time + duration,
                     'speaker': speaker_id
                 })
-                detected_speakers.add(speaker_id)
-
-    print(f"[Diarization-NeMo] Detected {len(detected_speakers)} speakers")
+    return speaker_timestamps
 
-    # 5. 화자별 임베딩 추출
-    print("[Diarization-NeMo] Extracting speaker embeddings...")
 
-    speaker_model = EncDecSpeakerLabelModel.from_pretrained("titanet_large")
-    speaker_model = speaker_model.eval().to(device)
+def extract_speaker_embeddings(
+    speaker_model, audio_path: Path, speaker_timestamps: List[Dict], device: str
+) -> Dict[str, List[float]]:
+    """
+    화자별 임베딩 (가장 긴 세그먼트 3개의 TitaNet 임베딩 평균, L2 정규화)
 
+    Returns:
+        {SPEAKER_ID(대문자): [192차원 벡터]}
+    """
     embeddings_dict = {}
 
+    # 세그먼트 오디오는 PCM 저장소(memmap)에서 바로 잘라 씀 (세그먼트마다 WAV 재디코딩 없음)
+    pcm = open_pcm(audio_path)
+
+    detected_speakers = sorted({ts['speaker'] for ts in speaker_timestamps})
     for speaker_id in detected_speakers:
         # 해당 화자의 가장 긴 세그먼트 3개 선택
         speaker_segments = [ts for ts in speaker_timestamps if ts['speaker'] == speaker_id]
@@ -198,11 +224,9 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
         for seg in top_segments:
             try:
                 # 오디오 로드
-                waveform, sr = torchaudio.load(
-                    str(audio_path),
-                    frame_offset=int(seg['start'] * 16000),
-                    num_frames=int((seg['end'] - seg['start']) * 16000)
-                )
+                waveform = torch.from_numpy(
+                    to_float32(slice_seconds(pcm, seg['start'], seg['end']))
+                ).unsqueeze(0)
 
                 # 최소 길이 체크
                 if waveform.shape[1] < 1600:  # 0.1초 미만
@@ -242,7 +266,11 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
 
         print(f"   ✓ {speaker_id.upper()}: {len(segment_embeddings)} segments averaged, dim={len(mean_embedding)}")
 
-    # 6. 결과 변환
+    return embeddings_dict
+
+
+def build_nemo_result(speaker_timestamps: List[Dict], embeddings_dict: Dict[str, List[float]]) -> Dict:
+    """RTTM 구간 + 화자 임베딩 → {"turns", "embeddings"}"""
     turns = []
     for ts in speaker_timestamps:
         turns.append({
@@ -253,19 +281,167 @@ def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int
 
     turns.sort(key=lambda x: x['start'])
 
-    result = {
+    return {
         "turns": turns,
         "embeddings": embeddings_dict
     }
 
-    # 메모리 정리
-    del diarizer
-    del speaker_model
-    import gc
-    gc.collect()
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
 
-    print(f"[Diarization-NeMo] Completed: {len(turns)} segments, {len(embeddings_dict)} speakers")
+def run_diarization_nemo(audio_path: Path, device: str = None, num_speakers: int = None) -> Dict:
+    """
+    NeMo를 사용한 화자 분리 (고급 모드)
+
+    Args:
+        audio_path: 오디오 파일 경로 (전처리된 WAV)
+        device: 디바이스 ("cuda", "cpu", None=auto)
+        num_speakers: 확정 화자 수 (None이면 자동 감지)
 
+    Returns:
+        {
+            "turns": [
+                {"speaker_label": "SPEAKER_00", "start": 0.0, "end": 5.2},
+                ...
+            ],
+            "embeddings": {
+                "SPEAKER_00": [0.1, 0.2, ...],  # 192차원 벡터
+                ...
+            }
+        }
+    """
+    result = run_diarization_nemo_batch(
+        [audio_path], device, num_speakers=[num_speakers], work_dir=audio_path.parent / "nemo_work"
+    )[0]
+    if isinstance(result, Exception):
+        raise result
     return result
+
+
+def run_diarization_nemo_batch(
+    audio_paths: Sequence[Path],
+    device: str = None,
+    num_speakers: Optional[Sequence[Optional[int]]] = None,
+    work_dir: Path = None,
+) -> List[Union[Dict, Exception]]:
+    """
+    여러 파일을 매니페스트 하나로 묶어 NeMo 화자 분리 (모델 로드 1회, 임베딩 배치 공유)
+
+    화자 수가 지정된 파일과 자동 감지 파일은 클러스터링 설정이 달라 매니페스트를 나눠 실행하지만,
+    TitaNet 모델 인스턴스는 배치 전체에서 하나를 사용합니다.
+
+    Args:
+        audio_paths: 전처리된 WAV 경로 리스트
+        device: 디바이스 ("cuda", "cpu", None=auto)
+        num_speakers: 파일별 확정 화자 수 (None 또는 항목 None이면 자동 감지)
+        work_dir: NeMo 작업 디렉토리 (None이면 첫 파일 상위의 nemo_batch)
+
+    Returns:
+        입력 순서대로 결과 딕셔너리 ({"turns", "embeddings"}) 또는 해당 파일의 예외
+    """
+    if not NEMO_AVAILABLE:
+        raise ImportError("NeMo is not installed. Please install it first.")
+
+    audio_paths = [Path(p) for p in audio_paths]
+    if not audio_paths:
+        return []
+    if num_speakers is None:
+        num_speakers = [None] * len(audio_paths)
+    if len(num_speakers) != len(audio_paths):
+        raise ValueError("num_speakers must have the same length as audio_paths")
+
+    device = resolve_nemo_device(device)
+
+    # cuDNN 비활성화 (NeMo 호환성)
+    torch.backends.cudnn.enabled = False
+
+    print(f"[Diarization-NeMo] Using device: {device}")
+    if len(audio_paths) == 1:
+        print(f"[Diarization-NeMo] Processing: {audio_paths[0]}")
+    else:
+        print(f"[Diarization-NeMo] Batch: {len(audio_paths)} files")
+
+    # 작업 디렉토리 생성
+    if work_dir is None:
+        work_dir = audio_paths[0].parent.parent / "nemo_batch"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1. 파일별 고유 ID (같은 이름이면 고유 이름으로 링크) + 클러스터링 설정별 그룹
+    file_ids = batch_file_ids(audio_paths)
+    groups: Dict[bool, List[int]] = {}
+    entries = []
+    for i, (audio_path, uid) in enumerate(zip(audio_paths, file_ids)):
+        if uid != audio_path.stem:
+            audio_path = _link_input(audio_path, work_dir / "inputs" / f"{uid}.wav")
+        entries.append({"audio_filepath": str(audio_path), "num_speakers": num_speakers[i]})
+        groups.setdefault(num_speakers[i] is not None, []).append(i)
+
+    results: List[Union[Dict, Exception]] = [None] * len(audio_paths)
+
+    with get_diarizer_pool().use(
+        SPEAKER_MODEL_NAME, device, lambda: load_speaker_model(device)
+    ) as lease:
+        speaker_model = lease.model
+
+        for oracle, indices in sorted(groups.items()):
+            # 2. Manifest 파일 생성 (NeMo 입력 형식) + 설정
+            if len(groups) == 1:
+                manifest_path = work_dir / "manifest.json"
+            else:
+                manifest_path = work_dir / f"manifest_{'oracle' if oracle else 'auto'}.json"
+            write_nemo_manifest(manifest_path, [entries[i] for i in indices])
+            max_speakers = max(num_speakers[i] for i in indices) if oracle else None
+            config = build_nemo_config(manifest_path, work_dir, device, max_speakers)
+
+            print("[Diarization-NeMo] Configuration:")
+            print(f"   - Files: {len(indices)}")
+            print(f"   - Max speakers: {max_speakers if oracle else '10 (auto detect)'}")
+            print(f"   - Multi-scale: 4 levels (2.0s → 0.5s)")
+            print(f"   - VAD: High sensitivity")
+
+            # 3. 화자 분리 실행
+            print("[Diarization-NeMo] Running diarization...")
+            from nemo.collections.asr.models import ClusteringDiarizer
+
+            # 이전 실행(같은 work_dir 재사용)의 RTTM이 NeMo가 건너뛴 파일의 결과로 읽히지 않도록 비움
+            shutil.rmtree(work_dir / "pred_rttms", ignore_errors=True)
+
+            # 상주 TitaNet을 클러스터링 임베딩과 화자별 임베딩 추출에 함께 사용 (요청마다 다시 로드하지 않음)
+            try:
+                diarizer = ClusteringDiarizer(cfg=config, speaker_model=speaker_model)
+                diarizer.diarize()
+                del diarizer
+            except Exception as e:
+                # 이 그룹 파일만 실패 처리하고 다른 그룹은 계속 진행
+                print(f"⚠️ [Diarization-NeMo] 그룹({len(indices)}개 파일) 화자 분리 실패: {e}")
+                for i in indices:
+                    results[i] = e
+                continue
+
+            # 4. 파일별 RTTM 읽기 + 5. 화자별 임베딩 추출
+            for i in indices:
+                try:
+                    speaker_timestamps = read_rttm(work_dir / "pred_rttms" / f"{file_ids[i]}.rttm")
+                    detected = {ts['speaker'] for ts in speaker_timestamps}
+                    print(f"[Diarization-NeMo] {file_ids[i]}: Detected {len(detected)} speakers")
+
+                    print("[Diarization-NeMo] Extracting speaker embeddings...")
+                    embeddings_dict = extract_speaker_embeddings(
+                        speaker_model, audio_paths[i], speaker_timestamps, device
+                    )
+
+                    # 6. 결과 변환
+                    results[i] = build_nemo_result(speaker_timestamps, embeddings_dict)
+                    print(
+                        f"[Diarization-NeMo] Completed: {len(results[i]['turns'])} segments, "
+                        f"{len(embeddings_dict)} speakers"
+                    )
+                except Exception as e:
+                    print(f"⚠️ [Diarization-NeMo] {audio_paths[i]} failed: {e}")
+                    results[i] = e
+
+    print(
+        f"[Diarization-NeMo] 임베딩 모델 로드 {lease.load_seconds:.1f}s"
+        f"{' (상주 모델 재사용)' if lease.reused else ''}, 추론 {lease.inference_seconds:.1f}s"
+        + (f" ({len(audio_paths)}개 파일)" if len(audio_paths) > 1 else "")
+    )
+
+    return results
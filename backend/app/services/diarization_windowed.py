@@ -0,0 +1,326 @@
+"""
+장시간 녹음용 윈도우 화자 분리
+
+파일 전체를 한 번에 화자 분리하면 메모리와 시간이 녹음 길이에 따라 늘어나 종일 워크숍 같은 녹음은
+CPU 워커가 OOM으로 죽습니다. 이 모드는
+1) 전처리 오디오를 겹치는 윈도우(DIARIZATION_WINDOW_SECONDS, 겹침 DIARIZATION_WINDOW_OVERLAP)로 나누고
+2) 윈도우마다 독립적으로 화자 분리 (Senko/NeMo, 프로세스 풀 병렬, 워커마다 모델 상주)
+3) 윈도우 지역 화자의 중심 임베딩(192차원)을 계층적 군집화(average, 코사인 거리)로 묶어 전역 화자로 연결
+4) 겹침 구간은 가운데에서 잘라 각 윈도우가 맡은 구간(core)의 발화만 사용
+합니다. 결과는 기존과 같은 {"turns", "embeddings"} 형식입니다.
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import soundfile as sf
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+from app.core.config import settings
+from app.services.pcm_store import SR, open_pcm, pcm_path_for, slice_seconds
+
+# 같은 윈도우의 두 화자 사이 거리 (코사인 거리 최댓값 → 서로 다른 화자로 유지)
+_SAME_WINDOW_DISTANCE = 2.0
+
+# 윈도우 경계에서 같은 화자 구간을 이어 붙일 최대 틈 (초)
+_JOIN_GAP = 0.05
+
+
+def plan_windows(duration: float, window: float, overlap: float) -> List[Tuple[float, float]]:
+    """
+    겹치는 윈도우 구간 계획
+
+    Args:
+        duration: 전체 길이 (초)
+        window: 윈도우 길이 (초)
+        overlap: 인접 윈도우 겹침 (초)
+
+    Returns:
+        [(시작, 끝), ...] (마지막 윈도우가 너무 짧으면 앞 윈도우에 합침)
+    """
+    if duration <= window:
+        return [(0.0, duration)]
+
+    step = max(window - overlap, 1.0)
+    starts = np.arange(0.0, duration - overlap, step)
+    windows = [(float(s), float(min(s + window, duration))) for s in starts]
+    if len(windows) > 1 and windows[-1][1] - windows[-1][0] < overlap * 2:
+        windows[-2] = (windows[-2][0], duration)
+        windows.pop()
+    return windows
+
+
+def window_cores(windows: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """윈도우별 담당 구간 (겹침 구간의 가운데에서 자름)"""
+    cores = []
+    for i, (start, end) in enumerate(windows):
+        core_start = (start + windows[i - 1][1]) / 2 if i > 0 else start
+        core_end = (windows[i + 1][0] + end) / 2 if i + 1 < len(windows) else end
+        cores.append((core_start, core_end))
+    return cores
+
+
+def _init_window_worker(threads: int):
+    """프로세스 풀 워커 초기화: torch 스레드 수 설정 (모델은 워커의 DiarizerPool에 상주)"""
+    import torch
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    print(f"📥 [diarization worker {os.getpid()}] threads={threads}")
+
+
+def _diarize_window(args) -> Dict:
+    window_path, device, mode, work_dir = args
+    if mode == "nemo":
+        # NeMo 매니페스트/VAD/RTTM은 작업 디렉토리에 기록되므로 병렬 워커끼리 겹치지 않게 윈도우마다 따로 사용
+        from app.services.diarization_nemo import run_diarization_nemo_batch
+        result = run_diarization_nemo_batch([Path(window_path)], device, work_dir=Path(work_dir))[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    from app.services.diarization import run_diarization
+    return run_diarization(Path(window_path), device=device, mode=mode, windowed=False)
+
+
+# 상주 프로세스 풀 (같은 설정이면 요청 간 재사용 → 워커별 모델 재로딩 없음)
+_window_pool = None
+_window_pool_key = None
+
+
+def get_window_pool(workers: int, threads: int):
+    """
+    윈도우 화자 분리 프로세스 풀 반환 (설정이 바뀌면 기존 풀 종료 후 재생성)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing as mp
+
+    global _window_pool, _window_pool_key
+
+    pool_key = (workers, threads)
+    if _window_pool is not None and _window_pool_key != pool_key:
+        _window_pool.shutdown(wait=True)
+        _window_pool = None
+
+    if _window_pool is None:
+        # torch는 fork 이후 스레드 풀이 꼬일 수 있으므로 spawn 사용
+        _window_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_window_worker,
+            initargs=(threads,),
+        )
+        _window_pool_key = pool_key
+
+    return _window_pool
+
+
+def link_window_speakers(
+    window_results: Sequence[Dict],
+    num_speakers: Optional[int] = None,
+    threshold: float = None,
+) -> Tuple[Dict[Tuple[int, str], int], Dict[int, np.ndarray]]:
+    """
+    윈도우 지역 화자 → 전역 화자 연결
+
+    지역 화자마다 중심 임베딩을 L2 정규화해 코사인 거리로 average linkage 군집화합니다.
+    같은 윈도우의 두 화자는 서로 다른 사람이므로 거리를 최대로 둡니다.
+
+    Args:
+        window_results: 윈도우별 화자 분리 결과
+        num_speakers: 확정 화자 수 (있으면 그 수로 군집, 없으면 threshold 거리로 자름)
+        threshold: 군집 거리 기준 (None이면 settings.DIARIZATION_LINK_THRESHOLD)
+
+    Returns:
+        ({(윈도우 인덱스, 지역 라벨): 전역 화자 인덱스}, {전역 화자 인덱스: 발화 길이 가중 평균 임베딩})
+    """
+    threshold = settings.DIARIZATION_LINK_THRESHOLD if threshold is None else threshold
+
+    keys, vectors, weights, windows_of = [], [], [], []
+    orphans = []  # 임베딩이 없는 지역 화자 (각자 별도 전역 화자)
+    for w, result in enumerate(window_results):
+        spoken: Dict[str, float] = {}
+        for turn in result.get("turns", []):
+            spoken[turn["speaker_label"]] = spoken.get(turn["speaker_label"], 0.0) + turn["end"] - turn["start"]
+        for label in spoken:
+            embedding = result.get("embeddings", {}).get(label)
+            if embedding is None:
+                orphans.append((w, label))
+                continue
+            keys.append((w, label))
+            vectors.append(np.asarray(embedding, dtype=np.float64))
+            weights.append(spoken[label])
+            windows_of.append(w)
+
+    mapping: Dict[Tuple[int, str], int] = {}
+    centroids: Dict[int, np.ndarray] = {}
+    if keys:
+        X = np.stack(vectors)
+        Xn = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+        if len(keys) == 1:
+            clusters = np.array([1])
+        else:
+            dist = np.clip(1.0 - Xn @ Xn.T, 0.0, 2.0)
+            windows_of = np.array(windows_of)
+            dist[windows_of[:, None] == windows_of[None, :]] = _SAME_WINDOW_DISTANCE
+            np.fill_diagonal(dist, 0.0)
+            Z = linkage(squareform(dist, checks=False), method="average")
+            if num_speakers:
+                clusters = fcluster(Z, num_speakers, criterion="maxclust")
+            else:
+                clusters = fcluster(Z, threshold, criterion="distance")
+
+        weights = np.array(weights)
+        for cluster_id in np.unique(clusters):
+            members = np.flatnonzero(clusters == cluster_id)
+            global_idx = len(centroids)
+            w = weights[members]
+            centroids[global_idx] = (X[members] * (w / max(w.sum(), 1e-12))[:, None]).sum(axis=0)
+            for m in members.tolist():
+                mapping[keys[m]] = global_idx
+
+    for i, key in enumerate(orphans):
+        mapping[key] = len(centroids) + i
+
+    return mapping, centroids
+
+
+def stitch_window_results(
+    window_results: Sequence[Dict],
+    windows: Sequence[Tuple[float, float]],
+    num_speakers: Optional[int] = None,
+    threshold: float = None,
+) -> Dict:
+    """
+    윈도우별 결과 → 전역 {"turns", "embeddings"}
+
+    Args:
+        window_results: 윈도우별 화자 분리 결과 (윈도우 기준 시간)
+        windows: 윈도우 구간 (plan_windows 결과)
+        num_speakers: 확정 화자 수
+        threshold: 군집 거리 기준
+
+    Returns:
+        {"turns": [{"speaker_label", "start", "end"}, ...], "embeddings": {"speaker_00": [...], ...}}
+    """
+    cores = window_cores(windows)
+    mapping, centroids = link_window_speakers(window_results, num_speakers, threshold)
+
+    # 담당 구간으로 자르고 전역 시간으로 이동
+    turns = []  # (시작, 끝, 전역 화자)
+    for w, result in enumerate(window_results):
+        offset = windows[w][0]
+        core_start, core_end = cores[w]
+        for turn in result.get("turns", []):
+            start = max(turn["start"] + offset, core_start)
+            end = min(turn["end"] + offset, core_end)
+            if end > start:
+                turns.append((start, end, mapping[(w, turn["speaker_label"])]))
+    turns.sort()
+
+    # 윈도우 경계에서 잘린 같은 화자 구간 이어 붙이기
+    joined: List[List] = []
+    for start, end, speaker in turns:
+        if joined and joined[-1][2] == speaker and start - joined[-1][1] <= _JOIN_GAP:
+            joined[-1][1] = max(joined[-1][1], end)
+        else:
+            joined.append([start, end, speaker])
+
+    # 전역 화자 라벨: 처음 등장 순서대로 speaker_00, speaker_01, ...
+    labels: Dict[int, str] = {}
+    for _, _, speaker in joined:
+        labels.setdefault(speaker, f"speaker_{len(labels):02d}")
+
+    return {
+        "turns": [
+            {"speaker_label": labels[speaker], "start": round(start, 3), "end": round(end, 3)}
+            for start, end, speaker in joined
+        ],
+        "embeddings": {
+            labels[speaker]: centroids[speaker].tolist()
+            for speaker in labels
+            if speaker in centroids
+        },
+    }
+
+
+def run_diarization_windowed(
+    audio_path: Path,
+    device: str = None,
+    mode: str = "senko",
+    num_speakers: int = None,
+    window: float = None,
+    overlap: float = None,
+    workers: int = None,
+) -> Dict:
+    """
+    윈도우 단위 화자 분리 + 전역 화자 연결
+
+    Args:
+        audio_path: 전처리된 16kHz mono WAV
+        device: 디바이스 ("cuda", "cpu", None=auto)
+        mode: 윈도우별 화자 분리 모델 ("senko" or "nemo")
+        num_speakers: 확정 화자 수 (전역 군집에만 사용, 윈도우에는 일부 화자만 있을 수 있음)
+        window: 윈도우 길이 (초, None이면 settings.DIARIZATION_WINDOW_SECONDS)
+        overlap: 윈도우 겹침 (초, None이면 settings.DIARIZATION_WINDOW_OVERLAP)
+        workers: 병렬 프로세스 수 (None이면 settings.DIARIZATION_WINDOW_WORKERS, GPU는 1)
+
+    Returns:
+        화자 분리 결과 (turns + embeddings)
+    """
+    import time
+    from app.core.device import get_device
+
+    audio_path = Path(audio_path)
+    device = device or get_device()
+    window = window or settings.DIARIZATION_WINDOW_SECONDS
+    overlap = settings.DIARIZATION_WINDOW_OVERLAP if overlap is None else overlap
+    workers = 1 if device != "cpu" else max(1, workers or settings.DIARIZATION_WINDOW_WORKERS)
+
+    pcm = open_pcm(audio_path)
+    duration = len(pcm) / SR
+    windows = plan_windows(duration, window, overlap)
+    workers = min(workers, len(windows))
+    print(
+        f"[Diarization] 윈도우 화자 분리: {duration / 60:.1f}분 → {len(windows)}개 윈도우 "
+        f"({window:.0f}s, 겹침 {overlap:.0f}s, 워커 {workers})"
+    )
+
+    # 윈도우 WAV 기록 (memmap 슬라이스 → 파일, 전체 오디오를 메모리에 올리지 않음)
+    window_dir = audio_path.parent / "diarization_windows"
+    window_dir.mkdir(parents=True, exist_ok=True)
+    window_paths = []
+    for i, (start, end) in enumerate(windows):
+        path = window_dir / f"window_{i:04d}.wav"
+        sf.write(str(path), slice_seconds(pcm, start, end), SR, subtype="PCM_16")
+        window_paths.append(path)
+    del pcm
+
+    started = time.time()
+    work_dirs = [window_dir / f"nemo_{i:04d}" for i in range(len(window_paths))]
+    tasks = [(str(path), device, mode, str(work)) for path, work in zip(window_paths, work_dirs)]
+    try:
+        if workers > 1:
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            window_results = list(get_window_pool(workers, threads).map(_diarize_window, tasks))
+        else:
+            window_results = [_diarize_window(task) for task in tasks]
+    finally:
+        # 윈도우 WAV + 화자 분리 중 생긴 PCM 저장소(window_XXXX.pcm.npy) + NeMo 작업 디렉토리 정리
+        for path, work in zip(window_paths, work_dirs):
+            path.unlink(missing_ok=True)
+            pcm_path_for(path).unlink(missing_ok=True)
+            shutil.rmtree(work, ignore_errors=True)
+        try:
+            window_dir.rmdir()
+        except OSError:
+            pass
+    print(f"[Diarization] 윈도우 {len(windows)}개 완료 ({time.time() - started:.1f}초)")
+
+    result = stitch_window_results(window_results, windows, num_speakers=num_speakers)
+    print(f"[Diarization] 전역 화자 {len(result['embeddings'])}명, 구간 {len(result['turns'])}개")
+    return result
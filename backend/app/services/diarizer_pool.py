@@ -0,0 +1,225 @@
+"""
+화자 분리 모델 상주 풀 (프로세스당 1개)
+
+화자 분리 요청마다 모델을 새로 만들고 지우면 회의마다 모델 로드 비용을 다시 냅니다.
+이 풀은 (모델 이름, 디바이스)별로 모델을 한 번만 로드해 두고 재사용합니다.
+- 같은 모델은 한 번에 한 요청만 사용 (모델별 lock)
+- 마지막 사용 후 DIARIZER_IDLE_TIMEOUT초 동안 쓰이지 않으면 해제 (gc + CUDA 캐시 정리)
+  0 이하면 상주하지 않고 사용 직후 해제 (기존 동작)
+- 요청마다 모델 로드 시간과 추론 시간을 따로 기록
+"""
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+
+def _release_memory():
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+class _PoolEntry:
+    __slots__ = ("model", "lock", "last_used", "load_seconds", "in_use")
+
+    def __init__(self):
+        self.model = None
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.load_seconds = 0.0
+        self.in_use = 0
+
+
+class DiarizerLease:
+    """풀에서 빌린 모델 + 이번 요청의 로드/추론 시간"""
+
+    __slots__ = ("name", "device", "model", "reused", "load_seconds", "inference_seconds")
+
+    def __init__(self, name: str, device: str, model, reused: bool, load_seconds: float):
+        self.name = name
+        self.device = device
+        self.model = model
+        self.reused = reused
+        self.load_seconds = load_seconds
+        self.inference_seconds = 0.0
+
+    def timing(self) -> Dict:
+        return {
+            "model": self.name,
+            "device": self.device,
+            "reused": self.reused,
+            "load_seconds": round(self.load_seconds, 3),
+            "inference_seconds": round(self.inference_seconds, 3),
+        }
+
+
+class DiarizerPool:
+    """
+    (모델 이름, 디바이스)별 상주 모델 풀
+    """
+
+    def __init__(self, idle_timeout: float):
+        """
+        Args:
+            idle_timeout: 미사용 모델 해제까지 대기 시간 (초, 0 이하면 사용 직후 해제)
+        """
+        self.idle_timeout = idle_timeout
+        self._entries: Dict[Tuple[str, str], _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+        # 통계
+        self.loads = 0
+        self.reuses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self.inference_seconds = 0.0
+        self.last_timing: Dict[str, Dict] = {}
+
+    @contextmanager
+    def use(self, name: str, device: str, loader: Callable[[], object]) -> Iterator[DiarizerLease]:
+        """
+        모델을 빌려 사용 (없으면 loader()로 로드)
+
+        with 블록 실행 시간이 추론 시간으로 기록됩니다.
+
+        Args:
+            name: 모델 이름 (예: "senko", "titanet_large")
+            device: 디바이스
+            loader: 모델 생성 함수 (인자 없음)
+        """
+        key = (name, device)
+        with self._lock:
+            entry = self._entries.setdefault(key, _PoolEntry())
+            entry.in_use += 1
+
+        try:
+            with entry.lock:
+                reused = entry.model is not None
+                if reused:
+                    load_seconds = 0.0
+                else:
+                    print(f"📦 화자 분리 모델 로드: {name} ({device})")
+                    start = time.perf_counter()
+                    entry.model = loader()
+                    load_seconds = time.perf_counter() - start
+                    entry.load_seconds = load_seconds
+
+                lease = DiarizerLease(name, device, entry.model, reused, load_seconds)
+                start = time.perf_counter()
+                try:
+                    yield lease
+                finally:
+                    lease.inference_seconds = time.perf_counter() - start
+                    entry.last_used = time.monotonic()
+                    self._record(lease)
+                    if self.idle_timeout <= 0:
+                        entry.model = None
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+            if self.idle_timeout <= 0:
+                _release_memory()
+            else:
+                self._ensure_reaper()
+
+    def _record(self, lease: DiarizerLease):
+        with self._lock:
+            if lease.reused:
+                self.reuses += 1
+            else:
+                self.loads += 1
+            self.load_seconds += lease.load_seconds
+            self.inference_seconds += lease.inference_seconds
+            self.last_timing[lease.name] = lease.timing()
+
+    # ---------- 해제 ----------
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper is None or not self._reaper.is_alive():
+                self._reaper = threading.Thread(target=self._reap_loop, name="diarizer-pool-reaper", daemon=True)
+                self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1.0, min(self.idle_timeout / 4, 30.0))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+            with self._lock:
+                if not any(e.model is not None for e in self._entries.values()):
+                    # 상주 모델이 없으면 종료 (다음 사용 시 다시 시작)
+                    self._reaper = None
+                    return
+
+    def evict_idle(self, force: bool = False) -> int:
+        """
+        idle_timeout 동안 쓰이지 않은 모델 해제
+
+        Args:
+            force: True면 사용 중이 아닌 모델을 모두 해제
+
+        Returns:
+            해제한 모델 수
+        """
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.model is None or entry.in_use:
+                    continue
+                if force or now - entry.last_used >= self.idle_timeout:
+                    entry.model = None
+                    evicted.append(key)
+            self.evictions += len(evicted)
+        if evicted:
+            _release_memory()
+            for name, device in evicted:
+                print(f"🧹 유휴 화자 분리 모델 해제: {name} ({device})")
+        return len(evicted)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            resident = [
+                {
+                    "model": name,
+                    "device": device,
+                    "idle_seconds": round(time.monotonic() - entry.last_used, 1),
+                    "load_seconds": round(entry.load_seconds, 3),
+                }
+                for (name, device), entry in self._entries.items()
+                if entry.model is not None
+            ]
+            return {
+                "idle_timeout": self.idle_timeout,
+                "resident": resident,
+                "loads": self.loads,
+                "reuses": self.reuses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 3),
+                "inference_seconds": round(self.inference_seconds, 3),
+                "last": dict(self.last_timing),
+            }
+
+
+_diarizer_pool_instance: Optional[DiarizerPool] = None
+
+
+def get_diarizer_pool() -> DiarizerPool:
+    """
+    화자 분리 모델 풀 싱글톤 인스턴스 반환 (프로세스당 1개)
+    """
+    global _diarizer_pool_instance
+
+    if _diarizer_pool_instance is None:
+        _diarizer_pool_instance = DiarizerPool(settings.DIARIZER_IDLE_TIMEOUT)
+
+    return _diarizer_pool_instance
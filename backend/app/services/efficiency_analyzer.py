@@ -9,6 +9,7 @@ from app.models.tagging import SpeakerMapping
 from app.models.diarization import DiarizationResult
 from app.models.stt import STTResult
 from app.models.efficiency import MeetingEfficiencyAnalysis
+from app.services.file_resolver import get_audio_file
 from collections import defaultdict
 import numpy as np
 import logging
@@ -109,22 +110,7 @@ class EfficiencyAnalyzer:
 
     def _load_audio_file(self) -> AudioFile:
         """오디오 파일 정보 로드 - int 또는 str UUID 모두 지원"""
-        # Try by ID first (integer)
-        audio_file = None
-        try:
-            audio_file_id_int = int(self.audio_file_id)
-            audio_file = self.db.query(AudioFile).filter(
-                AudioFile.id == audio_file_id_int
-            ).first()
-        except (ValueError, TypeError):
-            pass
-
-        # If not found or not an integer, try by file_path containing UUID
-        if not audio_file:
-            audio_file = self.db.query(AudioFile).filter(
-                (AudioFile.file_path.like(f"%{self.audio_file_id}%")) |
-                (AudioFile.original_filename.like(f"%{self.audio_file_id}%"))
-            ).first()
+        audio_file = get_audio_file(self.db, self.audio_file_id)
 
         if not audio_file:
             raise ValueError(f"AudioFile {self.audio_file_id} not found")
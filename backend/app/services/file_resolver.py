@@ -0,0 +1,139 @@
+"""
+file_id → AudioFile 조회
+
+API의 file_id는 업로드 UUID(/app/uploads/{uuid}.ext) 또는 DB ID(숫자) 두 가지가 섞여 들어옵니다.
+예전에는 file_path/original_filename에 LIKE '%uuid%'를 걸어 audio_files 전체를 스캔했지만,
+이제 audio_files.file_uuid(unique 인덱스)로 한 번에 찾고 UUID → DB ID를 프로세스 내 LRU에 보관합니다.
+
+- 숫자: DB ID로 바로 사용
+- UUID: LRU → 없으면 file_uuid 인덱스 조회 (찾은 경우만 캐시)
+- 캐시된 ID의 행이 사라졌으면 (다른 프로세스에서 삭제) 캐시에서 빼고 다시 조회
+
+    audio_file = get_audio_file(db, file_id)
+    if not audio_file:
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audio_file import AudioFile
+
+
+class FileIdCache:
+    """
+    업로드 UUID → DB ID LRU (스레드 안전)
+
+    Args:
+        max_size: 최대 항목 수 (0이면 캐시 안 함)
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = settings.FILE_ID_CACHE_SIZE if max_size is None else max(0, max_size)
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, int]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, file_uuid: str) -> Optional[int]:
+        with self._lock:
+            audio_file_id = self._items.get(file_uuid)
+            if audio_file_id is None:
+                self.stats["misses"] += 1
+                return None
+            self._items.move_to_end(file_uuid)
+            self.stats["hits"] += 1
+            return audio_file_id
+
+    def put(self, file_uuid: str, audio_file_id: int):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._items[file_uuid] = audio_file_id
+            self._items.move_to_end(file_uuid)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def discard(self, file_uuid: str):
+        with self._lock:
+            self._items.pop(file_uuid, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {"size": len(self._items), "max_size": self.max_size, **self.stats}
+
+
+_file_id_cache_instance: Optional[FileIdCache] = None
+
+
+def get_file_id_cache() -> FileIdCache:
+    """프로세스 전역 UUID → DB ID 캐시"""
+    global _file_id_cache_instance
+    if _file_id_cache_instance is None:
+        _file_id_cache_instance = FileIdCache()
+    return _file_id_cache_instance
+
+
+def resolve_audio_file_id(db: Session, file_id: Union[str, int]) -> Optional[int]:
+    """
+    file_id(DB ID 또는 업로드 UUID) → audio_files.id
+
+    Args:
+        db: DB 세션
+        file_id: 숫자 DB ID 또는 업로드 UUID
+
+    Returns:
+        audio_files.id (UUID에 해당하는 행이 없으면 None, 숫자는 존재 여부를 확인하지 않음)
+    """
+    file_id = str(file_id).strip()
+    if file_id.isdigit():
+        return int(file_id)
+
+    cache = get_file_id_cache()
+    audio_file_id = cache.get(file_id)
+    if audio_file_id is not None:
+        return audio_file_id
+
+    row = db.query(AudioFile.id).filter(AudioFile.file_uuid == file_id).first()
+    if row is None:
+        return None
+    cache.put(file_id, row.id)
+    return row.id
+
+
+def get_audio_file(db: Session, file_id: Union[str, int]) -> Optional[AudioFile]:
+    """
+    file_id(DB ID 또는 업로드 UUID) → AudioFile
+
+    Args:
+        db: DB 세션
+        file_id: 숫자 DB ID 또는 업로드 UUID
+
+    Returns:
+        AudioFile (없으면 None)
+    """
+    audio_file_id = resolve_audio_file_id(db, file_id)
+    if audio_file_id is None:
+        return None
+
+    audio_file = db.query(AudioFile).filter(AudioFile.id == audio_file_id).first()
+    if audio_file is None and not str(file_id).strip().isdigit():
+        # 캐시된 행이 그 사이 삭제됨 → 캐시를 비우고 인덱스로 다시 조회
+        forget_file_id(file_id)
+        audio_file_id = resolve_audio_file_id(db, file_id)
+        if audio_file_id is not None:
+            audio_file = db.query(AudioFile).filter(AudioFile.id == audio_file_id).first()
+    return audio_file
+
+
+def forget_file_id(file_uuid: Optional[str]):
+    """삭제된 AudioFile의 UUID를 캐시에서 제거"""
+    if file_uuid:
+        get_file_id_cache().discard(str(file_uuid).strip())
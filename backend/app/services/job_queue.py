@@ -0,0 +1,493 @@
+"""
+처리 작업 큐 (DB 기반)
+
+API 프로세스는 작업을 processing_jobs 테이블에 넣기만 하고, 별도 워커 프로세스(python -m app.worker)가
+가져가 실행합니다. 모델 로드/추론이 API 프로세스의 이벤트 루프와 메모리를 점유하지 않습니다.
+
+- 우선순위(priority 큰 순) → 등록 순으로 가져감 (MySQL: SELECT ... FOR UPDATE SKIP LOCKED)
+- 가져간 워커는 lease를 잡고 heartbeat로 연장. 워커가 죽어 lease가 만료되면 다른 워커가 다시 가져감
+- 실패하면 max_attempts까지 지수 백오프로 재시도 (전처리/STT 결과는 아티팩트 캐시로 재사용)
+- 취소: 대기 중이면 즉시 취소, 실행 중이면 다음 스테이지 시작 전에 중단
+- 스테이지별 동시 실행 수 제한은 공유 디렉토리의 잠금 파일(flock)로 워커 프로세스 간에 적용
+  (프로세스가 죽으면 잠금이 자동으로 풀림)
+"""
+import fcntl
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audio_file import AudioFile, FileStatus
+from app.models.processing_job import ProcessingJob, JobStatus
+from app.services.stage_dag import StageCancelled
+
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+CANCELLED_MESSAGE = "처리 취소됨"
+CANCELLED_ERROR = "사용자가 처리를 취소했습니다."
+LEASE_EXPIRED_ERROR = "워커 응답 없음 (lease 만료)"
+
+
+class JobCancelled(StageCancelled):
+    """작업이 취소되었거나 lease를 잃어 더 진행하면 안 됨"""
+
+
+class LeaseLost(JobCancelled):
+    """lease를 잃음 - 다른 워커가 같은 작업을 실행 중이므로 작업/파일 상태를 건드리지 않고 중단"""
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def set_file_stopped(audio_file: AudioFile, cancelled: bool, error: Optional[str] = None):
+    """
+    작업이 최종 종료(취소/실패)된 파일의 상태 기록 (커밋은 호출 측)
+
+    Args:
+        audio_file: 파일 행
+        cancelled: True면 사용자 취소 문구, False면 error를 오류 메시지로 기록
+        error: 실패 사유
+    """
+    audio_file.status = FileStatus.FAILED
+    audio_file.processing_step = "failed"
+    audio_file.processing_progress = 0
+    audio_file.processing_message = CANCELLED_MESSAGE if cancelled else "오류 발생"
+    audio_file.error_message = CANCELLED_ERROR if cancelled else error
+
+
+def mark_file_stopped(db: Session, audio_file_id: Optional[int], cancelled: bool, error: Optional[str] = None):
+    """audio_file_id로 파일을 찾아 set_file_stopped (없으면 무시, 커밋은 호출 측)"""
+    if not audio_file_id:
+        return
+    audio_file = db.query(AudioFile).filter(AudioFile.id == audio_file_id).first()
+    if audio_file is not None:
+        set_file_stopped(audio_file, cancelled, error)
+
+
+def enqueue_job(
+    db: Session,
+    file_id: str,
+    user_id: int,
+    whisper_mode: str,
+    diarization_mode: str,
+    skip_stt: bool = False,
+    priority: int = 0,
+    audio_file_id: Optional[int] = None,
+) -> Tuple[ProcessingJob, bool]:
+    """
+    작업 등록 (같은 파일의 대기/실행 중 작업이 있으면 그 작업을 반환)
+
+    Returns:
+        (작업, 새로 등록했는지 여부)
+    """
+    existing = get_active_job(db, file_id)
+    if existing is not None:
+        return existing, False
+
+    job = ProcessingJob(
+        audio_file_id=audio_file_id,
+        file_id=file_id,
+        user_id=user_id,
+        whisper_mode=whisper_mode,
+        diarization_mode=diarization_mode,
+        skip_stt=skip_stt,
+        status=JobStatus.QUEUED,
+        priority=priority,
+        available_at=_now(),
+        attempts=0,
+        max_attempts=max(1, settings.JOB_MAX_ATTEMPTS),
+        cancel_requested=False,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job, True
+
+
+def get_active_job(db: Session, file_id: str) -> Optional[ProcessingJob]:
+    """파일의 대기/실행 중 작업 (가장 최근 것)"""
+    return db.query(ProcessingJob).filter(
+        ProcessingJob.file_id == file_id,
+        ProcessingJob.status.in_(ACTIVE_STATUSES)
+    ).order_by(ProcessingJob.id.desc()).first()
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[ProcessingJob]:
+    """
+    실행할 작업 하나를 가져와 lease를 잡음
+
+    대상: 대기 중이고 available_at이 지난 작업, 또는 실행 중이지만 lease가 만료된 작업(워커 비정상 종료)
+
+    Returns:
+        가져온 작업 (없으면 None)
+    """
+    while True:
+        now = _now()
+        job = db.query(ProcessingJob).filter(
+            or_(
+                and_(ProcessingJob.status == JobStatus.QUEUED, ProcessingJob.available_at <= now),
+                and_(ProcessingJob.status == JobStatus.RUNNING, ProcessingJob.lease_expires_at < now),
+            )
+        ).order_by(
+            ProcessingJob.priority.desc(), ProcessingJob.id
+        ).with_for_update(skip_locked=True).first()
+
+        if job is None:
+            db.commit()
+            return None
+
+        if job.status == JobStatus.RUNNING:
+            print(f"⚠️ lease 만료 작업 회수: job={job.id}, 이전 워커={job.worker_id}")
+            # 취소 요청 중이었거나 재시도 횟수를 다 쓴 작업은 다시 실행하지 않음
+            # (파일 행도 같은 트랜잭션에서 종료 상태로 - 아니면 상태 조회가 계속 처리 중으로 보임)
+            if job.cancel_requested or job.attempts >= job.max_attempts:
+                job.status = JobStatus.CANCELLED if job.cancel_requested else JobStatus.FAILED
+                job.error_message = job.error_message or LEASE_EXPIRED_ERROR
+                job.worker_id = None
+                job.lease_expires_at = None
+                job.finished_at = now
+                mark_file_stopped(db, job.audio_file_id, job.cancel_requested, LEASE_EXPIRED_ERROR)
+                db.commit()
+                continue
+
+        # 조건부 UPDATE로 가져감 (SKIP LOCKED를 지원하지 않는 DB에서도 두 워커가 같은 작업을 잡지 않도록)
+        claimed = db.query(ProcessingJob).filter(
+            ProcessingJob.id == job.id,
+            ProcessingJob.status == job.status,
+            ProcessingJob.attempts == job.attempts,
+        ).update({
+            ProcessingJob.status: JobStatus.RUNNING,
+            ProcessingJob.worker_id: worker_id,
+            ProcessingJob.attempts: job.attempts + 1,
+            ProcessingJob.lease_expires_at: now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            ProcessingJob.heartbeat_at: now,
+            ProcessingJob.current_stage: None,
+            ProcessingJob.started_at: job.started_at or now,
+        }, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            continue
+        db.refresh(job)
+        return job
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str) -> Tuple[bool, bool]:
+    """
+    lease 연장
+
+    Returns:
+        (lease 유지 여부, 취소 요청 여부) - lease를 잃었으면 다른 워커가 가져간 것이므로 중단해야 함
+    """
+    now = _now()
+    updated = db.query(ProcessingJob).filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.worker_id == worker_id,
+        ProcessingJob.status == JobStatus.RUNNING,
+    ).update({
+        ProcessingJob.lease_expires_at: now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+        ProcessingJob.heartbeat_at: now,
+    }, synchronize_session=False)
+    db.commit()
+    if not updated:
+        return False, False
+
+    cancel_requested = db.query(ProcessingJob.cancel_requested).filter(ProcessingJob.id == job_id).scalar()
+    return True, bool(cancel_requested)
+
+
+def _finish(db: Session, job_id: int, worker_id: str, values: Dict) -> bool:
+    """lease를 가진 워커만 작업 상태를 바꿈"""
+    values = {
+        ProcessingJob.worker_id: None,
+        ProcessingJob.lease_expires_at: None,
+        **values,
+    }
+    updated = db.query(ProcessingJob).filter(
+        ProcessingJob.id == job_id,
+        ProcessingJob.worker_id == worker_id,
+        ProcessingJob.status == JobStatus.RUNNING,
+    ).update(values, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def complete_job(db: Session, job_id: int, worker_id: str) -> bool:
+    return _finish(db, job_id, worker_id, {
+        ProcessingJob.status: JobStatus.SUCCEEDED,
+        ProcessingJob.finished_at: _now(),
+        ProcessingJob.error_message: None,
+    })
+
+
+def mark_cancelled(db: Session, job_id: int, worker_id: str) -> bool:
+    return _finish(db, job_id, worker_id, {
+        ProcessingJob.status: JobStatus.CANCELLED,
+        ProcessingJob.finished_at: _now(),
+    })
+
+
+def fail_job(db: Session, job: ProcessingJob, worker_id: str, error: str) -> Optional[JobStatus]:
+    """
+    실패 처리: 재시도 횟수가 남았으면 백오프 후 다시 대기열로, 아니면 실패로 종료
+
+    Returns:
+        바뀐 상태 (QUEUED, FAILED 또는 취소 요청이 있었으면 CANCELLED), lease를 잃어 바꾸지 못했으면 None
+    """
+    cancel_requested = db.query(ProcessingJob.cancel_requested).filter(ProcessingJob.id == job.id).scalar()
+    if cancel_requested:
+        status = JobStatus.CANCELLED
+        values = {ProcessingJob.finished_at: _now()}
+    elif job.attempts < job.max_attempts:
+        delay = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+        status = JobStatus.QUEUED
+        values = {
+            ProcessingJob.available_at: _now() + timedelta(seconds=delay),
+            ProcessingJob.current_stage: None,
+        }
+        print(f"🔁 작업 재시도 예약: job={job.id} ({job.attempts}/{job.max_attempts}), {delay:.0f}초 후")
+    else:
+        status = JobStatus.FAILED
+        values = {ProcessingJob.finished_at: _now()}
+        print(f"❌ 작업 실패: job={job.id} ({job.attempts}/{job.max_attempts})")
+
+    values[ProcessingJob.status] = status
+    values[ProcessingJob.error_message] = error
+    if not _finish(db, job.id, worker_id, values):
+        return None
+    return status
+
+
+def will_retry(job: ProcessingJob) -> bool:
+    """이번 실행이 실패하면 다시 대기열로 들어가는지"""
+    return job.attempts < job.max_attempts
+
+
+def cancel_job(db: Session, job: ProcessingJob) -> JobStatus:
+    """
+    작업 취소 (대기 중이면 즉시 CANCELLED, 실행 중이면 취소 요청만 기록하고 워커가 다음 스테이지 전에 중단)
+
+    Returns:
+        취소 후 상태
+    """
+    if job.status == JobStatus.QUEUED:
+        job.status = JobStatus.CANCELLED
+        job.finished_at = _now()
+    elif job.status == JobStatus.RUNNING:
+        job.cancel_requested = True
+    db.commit()
+    return job.status
+
+
+def queue_position(db: Session, job: ProcessingJob) -> int:
+    """대기 중인 작업의 순번 (1부터, 앞에 있는 대기 작업 수 + 1)"""
+    ahead = db.query(func.count(ProcessingJob.id)).filter(
+        ProcessingJob.status == JobStatus.QUEUED,
+        or_(
+            ProcessingJob.priority > job.priority,
+            and_(ProcessingJob.priority == job.priority, ProcessingJob.id < job.id),
+        )
+    ).scalar() or 0
+    return ahead + 1
+
+
+def queue_stats(db: Session) -> Dict:
+    """상태별 작업 수 + 실행 중 작업 목록"""
+    counts = dict(
+        db.query(ProcessingJob.status, func.count(ProcessingJob.id)).group_by(ProcessingJob.status).all()
+    )
+    running = db.query(ProcessingJob).filter(
+        ProcessingJob.status == JobStatus.RUNNING
+    ).order_by(ProcessingJob.id).all()
+    return {
+        "counts": {status.value: counts.get(status, 0) for status in JobStatus},
+        "running": [
+            {
+                "job_id": job.id,
+                "file_id": job.file_id,
+                "worker_id": job.worker_id,
+                "stage": job.current_stage,
+                "attempts": job.attempts,
+                "cancel_requested": job.cancel_requested,
+                "heartbeat_at": job.heartbeat_at,
+            }
+            for job in running
+        ],
+        "stage_limits": parse_stage_limits(settings.JOB_STAGE_CONCURRENCY),
+    }
+
+
+def parse_stage_limits(spec: str) -> Dict[str, int]:
+    """"stt=1,diarization=2" → {"stt": 1, "diarization": 2} (0 이하는 제한 없음으로 간주)"""
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        if name.strip() and int(value) > 0:
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class StageSlots:
+    """
+    스테이지별 동시 실행 슬롯 (워커 프로세스 간 공유)
+
+    스테이지마다 limit개의 잠금 파일을 두고, 비어 있는 파일 하나에 flock을 잡은 동안만 실행합니다.
+    """
+
+    def __init__(self, lock_dir: str, limits: Dict[str, int], poll_interval: float = 0.5):
+        self.lock_dir = Path(lock_dir)
+        self.limits = limits
+        self.poll_interval = poll_interval
+
+    def _try_lock(self, stage: str, slot: int) -> Optional[int]:
+        fd = os.open(str(self.lock_dir / f"{stage}.{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    @contextmanager
+    def acquire(self, stage: str, should_stop: Callable[[], bool] = None):
+        """
+        슬롯을 잡을 때까지 대기 (제한이 없는 스테이지는 바로 통과)
+
+        Args:
+            stage: 스테이지 이름
+            should_stop: 대기 중 True를 반환하면 JobCancelled 발생
+        """
+        limit = self.limits.get(stage)
+        if not limit:
+            yield None
+            return
+
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        while True:
+            for slot in range(limit):
+                fd = self._try_lock(stage, slot)
+                if fd is None:
+                    continue
+                try:
+                    yield slot
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    os.close(fd)
+                return
+            if should_stop and should_stop():
+                raise JobCancelled(f"{stage} 슬롯 대기 중 취소됨")
+            time.sleep(self.poll_interval)
+
+
+_stage_slots_instance: Optional[StageSlots] = None
+
+
+def get_stage_slots() -> StageSlots:
+    """
+    스테이지 슬롯 싱글톤 인스턴스 반환
+    """
+    global _stage_slots_instance
+
+    if _stage_slots_instance is None:
+        _stage_slots_instance = StageSlots(
+            settings.JOB_LOCK_DIR, parse_stage_limits(settings.JOB_STAGE_CONCURRENCY)
+        )
+
+    return _stage_slots_instance
+
+
+class JobLease:
+    """
+    워커가 실행 중인 작업 하나의 lease 관리
+
+    - 백그라운드 스레드가 JOB_HEARTBEAT_SECONDS마다 lease를 연장하고 취소 요청을 확인
+    - gate(stage)는 StageDAG.run(gate=...)에 넘겨 스테이지마다 취소 확인 + 슬롯 획득 + 현재 스테이지 기록
+    """
+
+    def __init__(self, job_id: int, worker_id: str, session_factory: Callable[[], Session]):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.cancelled = threading.Event()
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._heartbeat_loop, name=f"heartbeat-{self.job_id}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            db = self.session_factory()
+            try:
+                owned, cancel_requested = heartbeat(db, self.job_id, self.worker_id)
+            except Exception as e:
+                # DB 일시 장애: lease가 만료되기 전까지 다음 heartbeat에서 다시 시도
+                print(f"⚠️ heartbeat 실패 (job={self.job_id}): {e}")
+                db.rollback()
+                continue
+            finally:
+                db.close()
+
+            if not owned:
+                print(f"⚠️ lease 상실 (job={self.job_id}): 다른 워커가 가져감")
+                self.lost.set()
+                return
+            if cancel_requested and not self.cancelled.is_set():
+                print(f"🛑 취소 요청 수신 (job={self.job_id})")
+                self.cancelled.set()
+
+    def should_stop(self) -> bool:
+        return self.cancelled.is_set() or self.lost.is_set()
+
+    def _record_stage(self, stage: str):
+        db = self.session_factory()
+        try:
+            db.query(ProcessingJob).filter(
+                ProcessingJob.id == self.job_id,
+                ProcessingJob.worker_id == self.worker_id,
+            ).update({ProcessingJob.current_stage: stage}, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            print(f"⚠️ 현재 스테이지 기록 실패 (job={self.job_id}): {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _raise_if_stopped(self, stage: str):
+        if self.lost.is_set():
+            raise LeaseLost(f"{stage} 시작 전 중단 (lease 상실)")
+        if self.cancelled.is_set():
+            raise JobCancelled(f"{stage} 시작 전 중단 (취소 요청)")
+
+    @contextmanager
+    def gate(self, stage: str):
+        self._raise_if_stopped(stage)
+        try:
+            with get_stage_slots().acquire(stage, should_stop=self.should_stop):
+                self._raise_if_stopped(stage)
+                self._record_stage(stage)
+                yield
+        except LeaseLost:
+            raise
+        except JobCancelled:
+            # 슬롯 대기 중 중단된 경우도 lease 상실이면 구분
+            if self.lost.is_set():
+                raise LeaseLost(f"{stage} 중단 (lease 상실)") from None
+            raise
@@ -4,13 +4,15 @@ NER (Named Entity Recognition) Service
 닉네임 태깅도 함께 처리
 """
 import logging
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Union
 import numpy as np
 from scipy.cluster.hierarchy import linkage, fcluster
 from scipy.spatial.distance import squareform
 import Levenshtein
 from transformers import pipeline
 
+from app.services.transcript import Transcript
+
 logger = logging.getLogger(__name__)
 
 
@@ -139,14 +141,14 @@ class NERService:
 
     def process_segments(
         self,
-        segments: List[Dict]
+        segments: Union[Transcript, List[Dict]]
     ) -> Dict:
         """
         STT 세그먼트에서 이름 추출 및 군집화 수행
         닉네임 태깅도 함께 처리
 
         Args:
-            segments: [{"text": str, "start": float, "end": float, "speaker": str}, ...]
+            segments: 병합 Transcript 또는 [{"text": str, "start": float, "end": float, "speaker": str}, ...]
 
         Returns:
             {
@@ -7,10 +7,12 @@ import json
 import hashlib
 import time
 import re
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from pathlib import Path
+import numpy as np
 from openai import OpenAI
 from app.core.config import settings
+from app.services.transcript import Transcript
 from langsmith import traceable
 
 logger = logging.getLogger(__name__)
@@ -228,15 +230,49 @@ class NicknameService:
                     logger.error(f"❌ 닉네임 생성 실패: {speaker_id} - {str(e)[:100]}")
                     return None
 
+    @staticmethod
+    def _group_dicts_by_speaker(segments: List[Dict]) -> Dict[str, List[Dict]]:
+        speakers = {}
+        for i, segment in enumerate(segments):
+            speaker = segment.get('speaker', 'UNKNOWN')
+            if speaker not in speakers:
+                speakers[speaker] = []
+            speakers[speaker].append({
+                'idx': i,
+                'text': segment.get('text', ''),
+                'start': segment.get('start', 0),
+                'end': segment.get('end', 0)
+            })
+        return speakers
+
+    @staticmethod
+    def _group_transcript_by_speaker(transcript: Transcript) -> Dict[str, List[Dict]]:
+        # 화자 코드 배열로 한 번에 그룹화 (첫 등장 순서 유지)
+        groups = transcript.speaker_indices()
+        unknown = np.flatnonzero(transcript.speaker_codes < 0)
+        if len(unknown):
+            groups['UNKNOWN'] = unknown
+        first_seen = sorted(groups.items(), key=lambda item: int(item[1][0]))
+
+        starts = transcript.start_seconds().tolist()
+        ends = transcript.end_seconds().tolist()
+        speakers = {}
+        for speaker, indices in first_seen:
+            speakers[speaker] = [
+                {'idx': i, 'text': transcript.texts[i], 'start': starts[i], 'end': ends[i]}
+                for i in indices.tolist()
+            ]
+        return speakers
+
     def process_speakers_for_nicknames(
         self,
-        segments: List[Dict]
+        segments: Union[Transcript, List[Dict]]
     ) -> Dict[str, Dict]:
         """
         모든 화자에 대해 닉네임 생성
         
         Args:
-            segments: STT 세그먼트 리스트 [{"text": str, "start": float, "end": float, "speaker": str}, ...]
+            segments: 병합 Transcript 또는 STT 세그먼트 리스트 [{"text": str, "start": float, "end": float, "speaker": str}, ...]
             
         Returns:
             {speaker_label: {nickname, nickname_metadata}, ...}
@@ -244,17 +280,10 @@ class NicknameService:
         logger.info(f"닉네임 태깅 시작: {len(segments)}개 세그먼트")
 
         # 1. 화자별로 그룹화
-        speakers = {}
-        for i, segment in enumerate(segments):
-            speaker = segment.get('speaker', 'UNKNOWN')
-            if speaker not in speakers:
-                speakers[speaker] = []
-            speakers[speaker].append({
-                'idx': i,
-                'text': segment.get('text', ''),
-                'start': segment.get('start', 0),
-                'end': segment.get('end', 0)
-            })
+        if isinstance(segments, Transcript):
+            speakers = self._group_transcript_by_speaker(segments)
+        else:
+            speakers = self._group_dicts_by_speaker(segments)
 
         logger.info(f"발견된 화자 수: {len(speakers)}")
 
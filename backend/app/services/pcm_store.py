@@ -0,0 +1,90 @@
+"""
+전처리 PCM 저장소
+
+preprocess_audio가 preprocessed.wav와 함께 raw int16 .npy(preprocessed.pcm.npy)를 한 번 기록하고,
+청크 분할/STT/화자 분리는 np.memmap으로 열어 복사 없이 구간을 잘라 씁니다.
+청크 경계, 길이, 오프셋은 파일 디코딩 대신 샘플 수 계산으로 구합니다.
+"""
+import os
+import uuid
+from pathlib import Path
+import numpy as np
+import soundfile as sf
+
+
+SR = 16000
+
+# WAV → npy 변환 시 한 번에 읽는 샘플 수
+_COPY_BLOCK_SAMPLES = SR * 60
+
+
+def pcm_path_for(preprocessed_wav: Path) -> Path:
+    """전처리 WAV에 대응하는 PCM 저장소 경로"""
+    return preprocessed_wav.with_suffix(".pcm.npy")
+
+
+def write_pcm_store(wav_path: Path) -> Path:
+    """
+    WAV를 int16 .npy로 변환 (블록 단위, WAV와 샘플 단위로 동일)
+
+    Returns:
+        PCM 저장소 경로
+    """
+    npy_path = pcm_path_for(wav_path)
+    # 동시에 변환하는 프로세스/스레드끼리 임시 파일을 공유하지 않도록 고유 이름 (교체는 원자적)
+    tmp_path = npy_path.with_name(f".tmp-{os.getpid()}-{uuid.uuid4().hex}-{npy_path.name}")
+    with sf.SoundFile(str(wav_path)) as f:
+        if f.samplerate != SR or f.channels != 1:
+            raise ValueError(f"PCM 저장소는 16kHz mono만 지원합니다: {wav_path}")
+        out = np.lib.format.open_memmap(str(tmp_path), mode="w+", dtype=np.int16, shape=(f.frames,))
+        pos = 0
+        for block in f.blocks(blocksize=_COPY_BLOCK_SAMPLES, dtype="int16", always_2d=False):
+            out[pos: pos + len(block)] = block
+            pos += len(block)
+        out.flush()
+        del out
+    try:
+        tmp_path.replace(npy_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return npy_path
+
+
+def ensure_pcm_store(preprocessed_wav: Path) -> Path:
+    """
+    PCM 저장소가 없거나 WAV보다 오래됐으면 다시 생성
+
+    STT/화자 분리 스테이지가 병렬로 같은 저장소를 만들지 않도록 전처리 스테이지에서 먼저 호출합니다.
+
+    Returns:
+        PCM 저장소 경로
+    """
+    npy_path = pcm_path_for(preprocessed_wav)
+    if not npy_path.exists() or npy_path.stat().st_mtime < preprocessed_wav.stat().st_mtime:
+        write_pcm_store(preprocessed_wav)
+    return npy_path
+
+
+def open_pcm(preprocessed_wav: Path) -> np.ndarray:
+    """
+    PCM 저장소를 읽기 전용 memmap으로 열기 (없으면 WAV에서 생성)
+
+    Returns:
+        int16 1차원 memmap
+    """
+    return np.load(str(ensure_pcm_store(preprocessed_wav)), mmap_mode="r")
+
+
+def to_float32(pcm_i16: np.ndarray) -> np.ndarray:
+    """int16 구간 → float32 [-1, 1) (soundfile/torchaudio와 같은 32768 스케일)"""
+    return pcm_i16.astype(np.float32) / 32768.0
+
+
+def seconds_to_sample(t: float, sr: int = SR) -> int:
+    return int(round(t * sr))
+
+
+def slice_seconds(pcm: np.ndarray, start: float, end: float, sr: int = SR) -> np.ndarray:
+    """초 단위 구간 슬라이스 (memmap 뷰, 복사 없음)"""
+    return pcm[seconds_to_sample(start, sr): seconds_to_sample(end, sr)]
@@ -4,14 +4,19 @@
 - HPF (고주파 필터)
 - VAD (음성 구간 추출)
 - 정규화
+- 스트리밍 모드: ffmpeg PCM 파이프를 블록 단위로 처리 (녹음 길이와 무관한 메모리 사용)
+- 유지 구간 인덱스 저장 (preprocessed.intervals.npy, app.services.voiced_index)
+- PCM 저장소 저장 (preprocessed.pcm.npy, app.services.pcm_store)
 """
 import subprocess
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, Tuple
 import numpy as np
 import soundfile as sf
-import webrtcvad
-from scipy.signal import butter, sosfiltfilt
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt
+from app.services.vad import VadEngine, dilate_frames, keep_mask
+from app.services.pcm_store import write_pcm_store
+from app.services.voiced_index import VoicedIntervalIndex, intervals_path_for, runs_from_mask
 
 
 # 전처리 설정
@@ -23,6 +28,9 @@ FRAME_MS = 20
 PAD_MS = 150
 TARGET_PEAK = 0.98
 
+# 스트리밍 모드 설정
+STREAM_BLOCK_SECONDS = 30  # ffmpeg 파이프에서 한 번에 읽는 길이
+
 
 def highpass_hz_80(audio: np.ndarray, sr: int) -> np.ndarray:
     """80Hz 고주파 필터 적용"""
@@ -57,37 +65,11 @@ def vad_keep_mask(
 ):
     """
     webrtcvad로 음성 구간만 남기는 마스크 계산
+
+    프레임 분할/에너지 게이트/pad 팽창은 app.services.vad 엔진에서 벡터화 처리
     """
     x_i16 = float_to_int16(audio_f32)
-    vad = webrtcvad.Vad(vad_aggr)
-    frame_iter = list(frame_bytes_from_int16(x_i16, sr, frame_ms))
-    n_frames = len(frame_iter)
-
-    voiced = np.zeros(n_frames, dtype=bool)
-    for i, (start, frame_bytes) in enumerate(frame_iter):
-        if vad.is_speech(frame_bytes, sr):
-            voiced[i] = True
-
-    pad_frames = pad_ms // frame_ms
-    keep = np.zeros_like(voiced)
-    for i, v in enumerate(voiced):
-        if v:
-            s = max(0, i - pad_frames)
-            e = min(n_frames, i + pad_frames + 1)
-            keep[s:e] = True
-
-    frame_len = int(sr * frame_ms / 1000)
-    keep_samples = np.repeat(keep, frame_len)
-    keep_samples = keep_samples[: len(x_i16)]
-    keep_samples = keep_samples[: len(audio_f32)]
-    if len(keep_samples) < len(audio_f32):
-        keep_samples = np.pad(
-            keep_samples,
-            (0, len(audio_f32) - len(keep_samples)),
-            mode="constant",
-        )
-
-    return keep_samples
+    return keep_mask(x_i16, sr, frame_ms, vad_aggr, pad_ms)
 
 
 def peak_normalize(x: np.ndarray, target_peak: float = 0.98) -> np.ndarray:
@@ -99,7 +81,7 @@ def peak_normalize(x: np.ndarray, target_peak: float = 0.98) -> np.ndarray:
 
 
 def preprocess_audio(
-    input_path: Path, output_path: Path
+    input_path: Path, output_path: Path, streaming: bool = False
 ) -> Tuple[Path, float, float]:
     """
     오디오 전처리 파이프라인
@@ -107,10 +89,14 @@ def preprocess_audio(
     Args:
         input_path: 입력 오디오 파일 경로
         output_path: 출력 WAV 파일 경로
+        streaming: True면 블록 단위 스트리밍 모드 사용 (장시간 녹음용)
 
     Returns:
         (output_path, 원본 길이(초), 전처리 후 길이(초))
     """
+    if streaming:
+        return preprocess_audio_streaming(input_path, output_path)
+
     # 1) ffmpeg 변환 (16kHz, mono)
     temp_converted = output_path.parent / f"temp_converted_{output_path.stem}.wav"
     temp_converted.parent.mkdir(parents=True, exist_ok=True)
@@ -153,10 +139,12 @@ def preprocess_audio(
     # VAD 적용
     mask = vad_keep_mask(audio_hpf, SR, FRAME_MS, VAD_AGGR, PAD_MS)
     voiced = audio_hpf[mask]
+    voiced_index = VoicedIntervalIndex.from_mask(mask, SR)
 
     # VAD로 너무 많이 제거된 경우 fallback
     if voiced.size < int(0.1 * len(audio_hpf)) and len(audio_hpf) > 0:
         voiced = audio_hpf
+        voiced_index = VoicedIntervalIndex.full(len(audio_hpf), SR)
 
     # 정규화
     voiced_norm = peak_normalize(voiced, TARGET_PEAK)
@@ -166,9 +154,257 @@ def preprocess_audio(
     # 3) 저장
     output_path.parent.mkdir(parents=True, exist_ok=True)
     sf.write(str(output_path), voiced_norm, SR, subtype="PCM_16")
+    voiced_index.save(intervals_path_for(output_path))
+    write_pcm_store(output_path)
 
     # 임시 파일 삭제
     if temp_converted.exists():
         temp_converted.unlink()
 
     return output_path, original_duration, processed_duration
+
+
+# ===============================
+# 스트리밍 전처리
+# ===============================
+
+def iter_ffmpeg_pcm_blocks(input_path: Path, block_samples: int) -> Iterator[np.ndarray]:
+    """
+    ffmpeg 출력(16kHz, mono, s16le)을 파이프로 받아 고정 크기 블록으로 반환
+
+    Args:
+        input_path: 입력 오디오 파일 경로
+        block_samples: 블록당 샘플 수
+
+    Yields:
+        int16 샘플 배열 (마지막 블록은 더 짧을 수 있음)
+    """
+    proc = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            str(input_path),
+            "-ar",
+            str(SR),
+            "-ac",
+            "1",
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    block_bytes = block_samples * 2
+    try:
+        while True:
+            buf = proc.stdout.read(block_bytes)
+            if not buf:
+                break
+            usable = len(buf) - (len(buf) % 2)
+            if usable:
+                yield np.frombuffer(buf[:usable], dtype=np.int16)
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        returncode = proc.wait()
+
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg 변환 실패: {stderr.decode('utf-8', errors='ignore')}")
+
+
+class StreamingVoicedFilter:
+    """
+    블록 단위 HPF + VAD 상태 머신
+
+    - sosfilt 상태(zi)를 블록 사이에 유지하는 causal HPF
+    - 프레임 경계에 걸친 잔여 샘플을 다음 블록으로 이월
+    - PAD_MS 팽창(dilation)을 위해 pad 프레임만큼 출력을 지연
+    """
+
+    def __init__(
+        self,
+        sr: int = SR,
+        frame_ms: int = FRAME_MS,
+        vad_aggr: int = VAD_AGGR,
+        pad_ms: int = PAD_MS,
+        use_vad: bool = True,
+    ):
+        self.sr = sr
+        self.frame_len = int(sr * frame_ms / 1000)
+        self.pad_frames = pad_ms // frame_ms
+        self.use_vad = use_vad
+        self.vad = VadEngine(sr, frame_ms, vad_aggr)
+
+        self.sos = butter(HPF_ORDER, HPF_CUTOFF, btype="highpass", fs=sr, output="sos")
+        self.zi = None
+
+        self.total_samples = 0
+        self.remainder = np.zeros(0, dtype=np.float32)
+        # 아직 좌우 pad 판정이 끝나지 않은 프레임
+        self.pending_frames = np.zeros((0, self.frame_len), dtype=np.float32)
+        self.pending_voiced = np.zeros(0, dtype=bool)
+        # 이미 출력된 직전 pad 프레임의 voiced 플래그 (좌측 문맥)
+        self.history_voiced = np.zeros(0, dtype=bool)
+
+        # 유지 구간 인덱스용: 판정 완료된 프레임 수, 유지된 원본 샘플 구간
+        self.released_frames = 0
+        self.kept_runs = []
+
+    def _highpass(self, block_f32: np.ndarray) -> np.ndarray:
+        if self.zi is None:
+            self.zi = sosfilt_zi(self.sos) * (block_f32[0] if len(block_f32) else 0.0)
+        y, self.zi = sosfilt(self.sos, block_f32, zi=self.zi)
+        return y.astype(np.float32)
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        if not self.use_vad:
+            return np.ones(len(frames), dtype=bool)
+        return self.vad.classify_frames(float_to_int16(frames))
+
+    def _release(self, final: bool) -> np.ndarray:
+        """판정 가능한 pending 프레임 중 유지할 샘플 반환"""
+        n_pending = len(self.pending_voiced)
+        n_ready = n_pending if final else max(0, n_pending - self.pad_frames)
+        if n_ready == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        context = np.concatenate([self.history_voiced, self.pending_voiced])
+        dilated = dilate_frames(context, self.pad_frames)
+        keep = dilated[len(self.history_voiced): len(self.history_voiced) + n_ready]
+
+        kept = self.pending_frames[:n_ready][keep].reshape(-1)
+        self._record_runs(keep)
+
+        if self.pad_frames:
+            released = np.concatenate([self.history_voiced, self.pending_voiced[:n_ready]])
+            self.history_voiced = released[-self.pad_frames:]
+        self.pending_frames = self.pending_frames[n_ready:]
+        self.pending_voiced = self.pending_voiced[n_ready:]
+        return kept
+
+    def _record_runs(self, keep: np.ndarray):
+        """판정된 프레임의 유지 구간을 원본 샘플 단위로 누적 (인접 구간은 병합)"""
+        for start, end in runs_from_mask(keep, base=self.released_frames):
+            run = (start * self.frame_len, end * self.frame_len)
+            if self.kept_runs and self.kept_runs[-1][1] == run[0]:
+                self.kept_runs[-1] = (self.kept_runs[-1][0], run[1])
+            else:
+                self.kept_runs.append(run)
+        self.released_frames += len(keep)
+
+    def voiced_index(self) -> VoicedIntervalIndex:
+        return VoicedIntervalIndex.from_runs(self.kept_runs, self.sr)
+
+    def process(self, block_i16: np.ndarray) -> np.ndarray:
+        """
+        int16 블록 하나를 처리하고 유지가 확정된 float32 샘플 반환
+        """
+        self.total_samples += len(block_i16)
+        hpf = self._highpass(int16_to_float(block_i16))
+
+        buf = np.concatenate([self.remainder, hpf]) if len(self.remainder) else hpf
+        n_frames = len(buf) // self.frame_len
+        frames = buf[: n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        self.remainder = buf[n_frames * self.frame_len:].copy()
+
+        self.pending_frames = np.concatenate([self.pending_frames, frames])
+        self.pending_voiced = np.concatenate([self.pending_voiced, self._classify(frames)])
+        return self._release(final=False)
+
+    def flush(self) -> np.ndarray:
+        """남은 프레임 판정 (프레임 미만 잔여 샘플은 기존 방식과 동일하게 버림)"""
+        return self._release(final=True)
+
+
+def _stream_voiced_to_raw(
+    input_path: Path, raw_path: Path, use_vad: bool
+) -> Tuple[int, int, float, VoicedIntervalIndex]:
+    """
+    입력을 한 번 디코딩하면서 유지 구간을 float32 raw 파일로 기록
+
+    Returns:
+        (원본 샘플 수, 유지 샘플 수, 유지 구간 피크, 유지 구간 인덱스)
+    """
+    block_samples = SR * STREAM_BLOCK_SECONDS
+    vf = StreamingVoicedFilter(use_vad=use_vad)
+    kept_samples = 0
+    peak = 0.0
+
+    with open(raw_path, "wb") as raw:
+        def write(out: np.ndarray):
+            nonlocal kept_samples, peak
+            if out.size:
+                peak = max(peak, float(np.max(np.abs(out))))
+                kept_samples += out.size
+                raw.write(out.astype(np.float32).tobytes())
+
+        for block in iter_ffmpeg_pcm_blocks(input_path, block_samples):
+            write(vf.process(block))
+        write(vf.flush())
+
+    return vf.total_samples, kept_samples, peak, vf.voiced_index()
+
+
+def preprocess_audio_streaming(
+    input_path: Path, output_path: Path
+) -> Tuple[Path, float, float]:
+    """
+    스트리밍 전처리 파이프라인 (메모리 사용량이 녹음 길이와 무관)
+
+    ffmpeg PCM 출력을 파이프로 STREAM_BLOCK_SECONDS 단위로 읽어
+    causal HPF(sosfilt 상태 유지) → VAD → 유지 구간 기록을 한 번에 처리합니다.
+    피크 정규화는 전체 피크가 필요하므로, 유지 구간만 담긴 임시 float32 파일을
+    블록 단위로 다시 읽으며 게인을 적용해 WAV로 씁니다.
+
+    Note:
+        배치 모드(sosfiltfilt, zero-phase)와 달리 causal 필터이므로
+        출력이 샘플 단위로 완전히 같지는 않습니다.
+
+    Args:
+        input_path: 입력 오디오 파일 경로
+        output_path: 출력 WAV 파일 경로
+
+    Returns:
+        (output_path, 원본 길이(초), 전처리 후 길이(초))
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    raw_path = output_path.parent / f"temp_voiced_{output_path.stem}.f32"
+
+    try:
+        total_samples, kept_samples, peak, voiced_index = _stream_voiced_to_raw(
+            input_path, raw_path, use_vad=True
+        )
+
+        # VAD로 너무 많이 제거된 경우 fallback (드문 경우이므로 한 번 더 디코딩)
+        if kept_samples < int(0.1 * total_samples) and total_samples > 0:
+            total_samples, kept_samples, peak, voiced_index = _stream_voiced_to_raw(
+                input_path, raw_path, use_vad=False
+            )
+
+        original_duration = total_samples / SR
+        processed_duration = kept_samples / SR
+
+        # 정규화 + 저장 (블록 단위)
+        gain = TARGET_PEAK / (peak + 1e-12)
+        block_samples = SR * STREAM_BLOCK_SECONDS
+        with sf.SoundFile(str(output_path), "w", samplerate=SR, channels=1, subtype="PCM_16") as out:
+            if kept_samples:
+                voiced = np.memmap(raw_path, dtype=np.float32, mode="r", shape=(kept_samples,))
+                for start in range(0, kept_samples, block_samples):
+                    block = voiced[start: start + block_samples]
+                    out.write(np.clip(block * gain, -1.0, 1.0).astype(np.float32))
+                del voiced
+        voiced_index.save(intervals_path_for(output_path))
+        write_pcm_store(output_path)
+    finally:
+        if raw_path.exists():
+            raw_path.unlink()
+
+    return output_path, original_duration, processed_duration
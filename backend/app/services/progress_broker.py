@@ -0,0 +1,305 @@
+"""
+처리 진행 상태 브로커 (SSE 구독용)
+
+파이프라인 스테이지가 진행 상태를 publish하면 같은 프로세스의 구독자(SSE 연결)에게 바로 전달합니다.
+작업 큐 모드에서는 파이프라인이 워커 프로세스에서 돌기 때문에 브로커의 폴러 하나가 DB를 확인합니다.
+
+- 폴링 주기마다 구독 중인 모든 파일의 진행 컬럼(audio_files + 활성 processing_jobs)을 쿼리 한 번으로 확인하고,
+  값이 바뀐 파일만 publish (실행 중 작업은 확인한 행으로 바로 상태를 만들고,
+  대기/완료/실패처럼 추가 조회가 필요한 경우만 전체 상태(GET /status/{file_id}와 같은 조회)를 다시 읽음)
+- 같은 파일 구독자가 여럿이어도 조회는 한 번, 구독자는 최신 상태만 받음
+  (느린 구독자 사이에 쌓인 중간 진행률은 합쳐지고, 최종 상태는 항상 전달)
+- publish는 파이프라인 스레드에서도 호출 가능 (이벤트 루프로 call_soon_threadsafe)
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.models.processing_job import JobStatus
+
+
+# 이 상태가 publish되면 스트림 종료
+TERMINAL_STATUSES = {"completed", "failed", "not_found"}
+
+# DB processing_step → 프론트엔드 폴링 상태 (워커 프로세스에서 처리 중일 때)
+LIVE_STATUS_ALIASES = {
+    "preprocessing_complete": "preprocessing",
+    "queued": "preprocessing",
+}
+
+
+def running_job_status(row: Dict) -> Optional[Dict]:
+    """
+    워커에서 실행 중인 작업의 상태 (GET /status/{file_id} 와 브로커의 진행 컬럼 확인에서 공용)
+
+    Args:
+        row: audio_files 진행 컬럼 + 활성 작업 컬럼 (processing_step, processing_message, processing_progress,
+             job_id, job_status, current_stage, attempts, cancel_requested)
+
+    Returns:
+        상태 dict (실행 중인 작업이 아니면 None)
+    """
+    if row.get("job_status") != JobStatus.RUNNING:
+        return None
+    step = row.get("processing_step") or "preprocessing"
+    return {
+        "status": LIVE_STATUS_ALIASES.get(step, step),
+        "step": row.get("processing_message") or "처리 중",
+        "progress": row.get("processing_progress") or 0,
+        "job_id": row["job_id"],
+        "stage": row.get("current_stage"),
+        "attempts": row.get("attempts"),
+        "cancel_requested": row.get("cancel_requested"),
+    }
+
+
+class _Channel:
+    """파일 하나의 최신 상태 + 구독자"""
+
+    __slots__ = (
+        "file_id", "audio_file_id", "fetch", "render", "snapshot", "version", "published_at", "signature",
+        "subscribers",
+    )
+
+    def __init__(
+        self,
+        file_id: str,
+        audio_file_id: Optional[int],
+        fetch: Callable[[str], Dict],
+        render: Optional[Callable[[Dict], Optional[Dict]]],
+    ):
+        self.file_id = file_id
+        self.audio_file_id = audio_file_id
+        self.fetch = fetch
+        self.render = render
+        self.snapshot: Optional[Dict] = None
+        self.version = 0
+        self.published_at = 0.0
+        self.signature = None  # 마지막으로 반영한 진행 컬럼 행
+        self.subscribers: Dict[int, tuple] = {}  # id → (loop, asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.snapshot is not None and self.snapshot.get("status") in TERMINAL_STATUSES
+
+
+class ProgressBroker:
+    """
+    파일별 진행 상태 채널
+
+    Args:
+        session_factory: 진행 컬럼 확인용 세션 팩토리 (기본: app.db.base.SessionLocal)
+        poll_interval: DB 확인 간격 (초)
+    """
+
+    def __init__(self, session_factory: Callable = None, poll_interval: float = None):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval or settings.PROGRESS_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._channels: Dict[str, _Channel] = {}
+        self._next_id = 0
+        self._poller: Optional[asyncio.Task] = None
+        self.stats = {"published": 0, "probes": 0, "rendered": 0, "fetches": 0}
+
+    def publish(self, file_id: str, snapshot: Dict, source: str = "pipeline"):
+        """
+        최신 상태 갱신 후 구독자 깨우기 (구독자가 없는 파일은 무시)
+
+        Args:
+            file_id: 파일 UUID
+            snapshot: GET /status/{file_id} 와 같은 형태의 상태
+            source: "pipeline" (같은 프로세스의 파이프라인) 또는 "poller" (DB 확인)
+        """
+        with self._lock:
+            channel = self._channels.get(file_id)
+            if channel is None or snapshot == channel.snapshot:
+                return
+            channel.snapshot = dict(snapshot)
+            channel.version += 1
+            if source == "pipeline":
+                channel.published_at = time.monotonic()
+            subscribers = list(channel.subscribers.values())
+            self.stats["published"] += 1
+
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘 (연결 종료 중)
+                pass
+
+    async def subscribe(
+        self,
+        file_id: str,
+        fetch: Callable[[str], Dict],
+        audio_file_id: Optional[int] = None,
+        render: Optional[Callable[[Dict], Optional[Dict]]] = None,
+        keepalive: float = None,
+    ):
+        """
+        상태 스트림 (async generator)
+
+        Args:
+            file_id: 파일 UUID (파이프라인이 publish하는 키)
+            fetch: 전체 상태를 읽는 동기 함수 (스레드 풀에서 호출)
+            audio_file_id: 진행 컬럼 확인용 DB ID (없으면 폴링 주기마다 fetch)
+            render: 진행 컬럼 행 → 상태 (None을 돌려주면 fetch로 전체 상태 조회)
+            keepalive: 이 시간 동안 바뀐 상태가 없으면 None을 yield (SSE 주석으로 연결 유지)
+
+        Yields:
+            상태 dict (최종 상태를 보낸 뒤 종료) 또는 None (keepalive)
+        """
+        keepalive = keepalive or settings.PROGRESS_KEEPALIVE_SECONDS
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        with self._lock:
+            channel = self._channels.get(file_id)
+            if channel is None:
+                channel = self._channels[file_id] = _Channel(file_id, audio_file_id, fetch, render)
+            subscriber_id = self._next_id
+            self._next_id += 1
+            channel.subscribers[subscriber_id] = (loop, event)
+            if self._poller is None or self._poller.done():
+                self._poller = loop.create_task(self._poll())
+            if channel.snapshot is not None:
+                event.set()
+
+        seen = 0
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                event.clear()
+                with self._lock:
+                    snapshot, version = channel.snapshot, channel.version
+                if version == seen or snapshot is None:
+                    continue
+                seen = version
+                yield snapshot
+                if snapshot.get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            with self._lock:
+                channel.subscribers.pop(subscriber_id, None)
+                if not channel.subscribers and self._channels.get(file_id) is channel:
+                    del self._channels[file_id]
+
+    def _probe(self, audio_file_ids: List[int]) -> Dict[int, Dict]:
+        """구독 중인 파일들의 진행 컬럼 + 활성 작업 상태 (쿼리 1회)"""
+        from sqlalchemy import and_
+        from app.models.audio_file import AudioFile
+        from app.models.processing_job import ProcessingJob
+
+        if self.session_factory is None:
+            from app.db.base import SessionLocal
+            self.session_factory = SessionLocal
+
+        db = self.session_factory()
+        try:
+            rows = db.query(
+                AudioFile.id,
+                AudioFile.status,
+                AudioFile.processing_step,
+                AudioFile.processing_progress,
+                AudioFile.processing_message,
+                ProcessingJob.id.label("job_id"),
+                ProcessingJob.status.label("job_status"),
+                ProcessingJob.current_stage,
+                ProcessingJob.attempts,
+                ProcessingJob.cancel_requested,
+            ).outerjoin(
+                ProcessingJob,
+                and_(
+                    ProcessingJob.audio_file_id == AudioFile.id,
+                    ProcessingJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+                ),
+            ).filter(AudioFile.id.in_(audio_file_ids)).all()
+            return {row.id: dict(row._mapping) for row in rows}
+        finally:
+            db.close()
+
+    async def _poll(self):
+        """구독자가 있는 동안 진행 컬럼을 확인하고, 바뀐 파일만 publish"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                channels = [c for c in self._channels.values() if not c.finished]
+            if not channels:
+                with self._lock:
+                    if not self._channels:
+                        self._poller = None
+                        return
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            # 같은 프로세스 파이프라인이 publish 중인 파일은 건너뜀 (inline 모드)
+            now = time.monotonic()
+            channels = [
+                c for c in channels
+                if c.snapshot is None or now - c.published_at >= self.poll_interval * 3
+            ]
+
+            ids = [c.audio_file_id for c in channels if c.audio_file_id is not None]
+            signatures = {}
+            if ids:
+                self.stats["probes"] += 1
+                try:
+                    signatures = await loop.run_in_executor(None, self._probe, ids)
+                except Exception as e:
+                    print(f"⚠️ 진행 상태 확인 실패: {e}")
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+            for channel in channels:
+                row = signatures.get(channel.audio_file_id)
+                # 대기 중인 작업은 순번이 다른 작업에 따라 바뀌므로 매번 다시 읽음
+                queued = row is not None and row["job_status"] == JobStatus.QUEUED
+                if (
+                    channel.snapshot is not None and channel.audio_file_id is not None
+                    and row == channel.signature and not queued
+                ):
+                    continue
+                channel.signature = row
+
+                snapshot = channel.render(row) if channel.render and row is not None else None
+                if snapshot is not None:
+                    self.stats["rendered"] += 1
+                    self.publish(channel.file_id, snapshot, source="poller")
+                    continue
+
+                self.stats["fetches"] += 1
+                try:
+                    snapshot = await loop.run_in_executor(None, channel.fetch, channel.file_id)
+                except Exception as e:
+                    print(f"⚠️ 진행 상태 조회 실패: {channel.file_id} ({e})")
+                    channel.signature = None
+                    continue
+                if snapshot is not None:
+                    self.publish(channel.file_id, snapshot, source="poller")
+
+            await asyncio.sleep(self.poll_interval)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+                **self.stats,
+            }
+
+
+_progress_broker_instance: Optional[ProgressBroker] = None
+
+
+def get_progress_broker() -> ProgressBroker:
+    """프로세스 전역 브로커"""
+    global _progress_broker_instance
+    if _progress_broker_instance is None:
+        _progress_broker_instance = ProgressBroker()
+    return _progress_broker_instance
@@ -0,0 +1,353 @@
+"""
+파이프라인 스테이지 DAG 실행기
+
+처리 파이프라인을 의존 관계가 있는 스테이지 그래프로 표현하고, 서로 독립인 스테이지
+(예: STT와 화자 분리)는 병렬로 실행합니다.
+
+- 스테이지마다 필요한 자원(cpu 코어, memory_mb, gpu_memory_mb)을 선언하고,
+  프로세스 공용 ResourceBudget 안에서만 동시에 실행 (여러 작업이 같은 예산을 나눠 씀)
+- 스테이지별 재시도 횟수를 지정하면 실패한 스테이지만 다시 실행 (StageCancelled는 재시도하지 않음)
+- 한 스테이지가 예외로 실패하면 새 스테이지를 시작하지 않고, 실행 중인 스테이지가 끝난 뒤 예외를 다시 발생
+- gate 훅으로 스테이지 실행을 감쌀 수 있음 (작업 큐 워커가 프로세스 간 동시 실행 제한과 취소 확인에 사용)
+- 실행 후 스테이지별 대기/실행 시간과 크리티컬 패스(완료 시각을 결정한 스테이지 체인)를 보고
+"""
+import os
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+
+RESOURCE_KEYS = ("cpu", "memory_mb", "gpu_memory_mb")
+
+
+class StageCancelled(Exception):
+    """스테이지 시작 전에 실행이 취소됨 (재시도하지 않음)"""
+
+
+def detect_capacity() -> Dict[str, float]:
+    """
+    자원 예산 결정 (설정값이 0이면 자동 감지)
+
+    - cpu: 코어 수
+    - memory_mb: 물리 메모리의 75%
+    - gpu_memory_mb: 첫 번째 CUDA 디바이스 메모리의 90% (없으면 0)
+    """
+    cpu = settings.PIPELINE_CPU_BUDGET or (os.cpu_count() or 1)
+
+    memory_mb = settings.PIPELINE_MEMORY_BUDGET_MB
+    if not memory_mb:
+        try:
+            total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+            memory_mb = int(total / 2**20 * 0.75)
+        except (ValueError, OSError, AttributeError):
+            memory_mb = 8192
+
+    gpu_memory_mb = settings.PIPELINE_GPU_MEMORY_BUDGET_MB
+    if not gpu_memory_mb:
+        try:
+            import torch
+            if torch.cuda.is_available():
+                gpu_memory_mb = int(torch.cuda.get_device_properties(0).total_memory / 2**20 * 0.9)
+        except ImportError:
+            pass
+
+    return {"cpu": float(cpu), "memory_mb": float(memory_mb), "gpu_memory_mb": float(gpu_memory_mb or 0)}
+
+
+class ResourceBudget:
+    """
+    자원 예산 (cpu, memory_mb, gpu_memory_mb)
+
+    요청량이 예산 전체보다 크면 예산 전체로 줄여서 받습니다 (혼자 실행될 때는 항상 시작 가능).
+    """
+
+    def __init__(self, capacity: Dict[str, float]):
+        self.capacity = {k: float(capacity.get(k, 0)) for k in RESOURCE_KEYS}
+        self.in_use = {k: 0.0 for k in RESOURCE_KEYS}
+        self._cond = threading.Condition()
+
+    def _clamp(self, demand: Dict[str, float]) -> Dict[str, float]:
+        return {k: min(float(demand.get(k, 0)), self.capacity[k]) for k in RESOURCE_KEYS}
+
+    def _fits(self, demand: Dict[str, float]) -> bool:
+        return all(self.in_use[k] + demand[k] <= self.capacity[k] + 1e-9 for k in RESOURCE_KEYS)
+
+    def acquire(self, demand: Dict[str, float]) -> Dict[str, float]:
+        """
+        자원 확보 (부족하면 대기)
+
+        Returns:
+            실제로 확보한 양 (release에 그대로 전달)
+        """
+        demand = self._clamp(demand)
+        with self._cond:
+            while not self._fits(demand):
+                self._cond.wait()
+            for k in RESOURCE_KEYS:
+                self.in_use[k] += demand[k]
+        return demand
+
+    def release(self, granted: Dict[str, float]):
+        with self._cond:
+            for k in RESOURCE_KEYS:
+                self.in_use[k] = max(0.0, self.in_use[k] - granted[k])
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {"capacity": dict(self.capacity), "in_use": dict(self.in_use)}
+
+
+class Stage:
+    """스테이지 정의 (fn은 의존 스테이지 결과 딕셔너리를 받아 결과를 반환)"""
+
+    __slots__ = ("name", "fn", "deps", "resources", "retries")
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Dict[str, Any]], Any],
+        deps: Iterable[str],
+        resources: Dict[str, float],
+        retries: int = 0,
+    ):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.resources = resources
+        self.retries = retries
+
+
+class StageRecord:
+    """스테이지 실행 기록 (시각은 time.monotonic 기준)"""
+
+    __slots__ = ("name", "deps", "resources", "status", "ready_at", "started_at", "finished_at", "error", "attempts")
+
+    def __init__(self, stage: Stage):
+        self.name = stage.name
+        self.deps = stage.deps
+        self.resources = dict(stage.resources)
+        self.status = "pending"
+        self.ready_at: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.attempts = 0
+
+    @property
+    def wait_seconds(self) -> float:
+        if self.ready_at is None or self.started_at is None:
+            return 0.0
+        return self.started_at - self.ready_at
+
+    @property
+    def run_seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class DAGReport:
+    """실행 결과 보고 (스테이지별 시간 + 크리티컬 패스)"""
+
+    def __init__(self, name: str, records: Dict[str, StageRecord], started_at: float, finished_at: float):
+        self.name = name
+        self.records = records
+        self.started_at = started_at
+        self.finished_at = finished_at
+
+    @property
+    def total_seconds(self) -> float:
+        return self.finished_at - self.started_at
+
+    def critical_path(self) -> List[str]:
+        """
+        가장 늦게 끝난 스테이지에서 시작해, 매번 가장 늦게 끝난 의존 스테이지를 따라 거슬러 올라간 체인
+        (이 체인의 대기 + 실행 시간이 전체 소요 시간을 결정)
+        """
+        finished = [r for r in self.records.values() if r.finished_at is not None]
+        if not finished:
+            return []
+        node = max(finished, key=lambda r: r.finished_at)
+        path = [node.name]
+        while node.deps:
+            deps = [self.records[d] for d in node.deps if self.records[d].finished_at is not None]
+            if not deps:
+                break
+            node = max(deps, key=lambda r: r.finished_at)
+            path.append(node.name)
+        return path[::-1]
+
+    def to_dict(self) -> Dict:
+        path = self.critical_path()
+        busy = sum(r.run_seconds for r in self.records.values())
+        return {
+            "pipeline": self.name,
+            "total_seconds": round(self.total_seconds, 3),
+            "parallelism": round(busy / self.total_seconds, 2) if self.total_seconds > 0 else 0.0,
+            "critical_path": path,
+            "critical_stage": max(path, key=lambda n: self.records[n].run_seconds) if path else None,
+            "stages": [
+                {
+                    "name": r.name,
+                    "deps": list(r.deps),
+                    "status": r.status,
+                    "start": round(r.started_at - self.started_at, 3) if r.started_at is not None else None,
+                    "wait_seconds": round(r.wait_seconds, 3),
+                    "run_seconds": round(r.run_seconds, 3),
+                    "resources": r.resources,
+                    "on_critical_path": r.name in path,
+                    "attempts": r.attempts,
+                    "error": r.error,
+                }
+                for r in self.records.values()
+            ],
+        }
+
+    def summary(self) -> str:
+        """예: preprocess 12.0s → stt 80.1s (+5.0s 대기) → merge 0.2s | 전체 95.0s"""
+        parts = []
+        for name in self.critical_path():
+            r = self.records[name]
+            wait_note = f" (+{r.wait_seconds:.1f}s 대기)" if r.wait_seconds >= 0.05 else ""
+            parts.append(f"{name} {r.run_seconds:.1f}s{wait_note}")
+        return f"{' → '.join(parts)} | 전체 {self.total_seconds:.1f}s"
+
+
+class StageDAG:
+    """
+    스테이지 그래프 + 실행기
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self.report: Optional[DAGReport] = None
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[Dict[str, Any]], Any],
+        deps: Iterable[str] = (),
+        cpu: float = 1,
+        memory_mb: float = 0,
+        gpu_memory_mb: float = 0,
+        retries: int = 0,
+    ) -> str:
+        """
+        스테이지 추가 (의존 스테이지는 먼저 추가되어 있어야 함 → 순환 불가)
+
+        Args:
+            name: 스테이지 이름
+            fn: 실행 함수 (인자: {의존 스테이지 이름: 결과})
+            deps: 의존 스테이지 이름들
+            cpu, memory_mb, gpu_memory_mb: 실행 중 점유할 자원 추정치
+            retries: 실패 시 이 스테이지만 다시 실행할 횟수 (의존 스테이지 결과는 그대로 사용)
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Unknown dependency for {name}: {dep}")
+        resources = {"cpu": cpu, "memory_mb": memory_mb, "gpu_memory_mb": gpu_memory_mb}
+        self.stages[name] = Stage(name, fn, deps, resources, retries)
+        return name
+
+    def run(
+        self,
+        budget: ResourceBudget = None,
+        gate: Callable[[str], Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        전체 실행
+
+        Args:
+            budget: 자원 예산 (None이면 get_pipeline_budget())
+            gate: 스테이지 이름을 받아 context manager를 반환하는 함수 (스테이지 실행 전체를 감쌈,
+                  진입 시 StageCancelled를 발생시키면 해당 스테이지를 실행하지 않음)
+
+        Returns:
+            {스테이지 이름: 결과}
+
+        Raises:
+            실패한 스테이지의 예외 (self.report에는 그때까지의 기록이 남음)
+        """
+        budget = budget or get_pipeline_budget()
+        records = {name: StageRecord(stage) for name, stage in self.stages.items()}
+        results: Dict[str, Any] = {}
+        started_at = time.monotonic()
+        error: Optional[BaseException] = None
+
+        def execute(stage: Stage):
+            record = records[stage.name]
+            with gate(stage.name) if gate else nullcontext():
+                granted = budget.acquire(stage.resources)
+                record.started_at = time.monotonic()
+                try:
+                    while True:
+                        record.attempts += 1
+                        try:
+                            return stage.fn({dep: results[dep] for dep in stage.deps})
+                        except StageCancelled:
+                            raise
+                        except Exception as e:
+                            if record.attempts > stage.retries:
+                                raise
+                            print(f"🔁 스테이지 재시도 ({stage.name} {record.attempts}/{stage.retries}): {type(e).__name__}: {e}")
+                finally:
+                    record.finished_at = time.monotonic()
+                    budget.release(granted)
+
+        remaining = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.stages)), thread_name_prefix=self.name) as executor:
+            while remaining or running:
+                if error is None:
+                    for name, stage in list(remaining.items()):
+                        if all(records[d].status == "done" for d in stage.deps):
+                            records[name].ready_at = time.monotonic()
+                            records[name].status = "running"
+                            running[executor.submit(execute, stage)] = name
+                            del remaining[name]
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        records[name].status = "done"
+                    except BaseException as e:
+                        records[name].status = "failed"
+                        records[name].error = f"{type(e).__name__}: {e}"
+                        if error is None:
+                            error = e
+
+        for name in remaining:
+            records[name].status = "skipped"
+
+        self.report = DAGReport(self.name, records, started_at, time.monotonic())
+        if error is not None:
+            raise error
+        return results
+
+
+_pipeline_budget_instance: Optional[ResourceBudget] = None
+
+
+def get_pipeline_budget() -> ResourceBudget:
+    """
+    파이프라인 자원 예산 싱글톤 (프로세스 내 모든 작업이 공유)
+    """
+    global _pipeline_budget_instance
+
+    if _pipeline_budget_instance is None:
+        _pipeline_budget_instance = ResourceBudget(detect_capacity())
+
+    return _pipeline_budget_instance
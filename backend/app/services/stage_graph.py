@@ -0,0 +1,264 @@
+"""
+스테이지 산출물 그래프 + 선택적 재실행 플래너
+
+각 스테이지는 입력 스테이지와 파라미터를 선언하고, fingerprint = hash(스테이지 버전, 파라미터,
+입력 스테이지 fingerprint)로 산출물을 식별합니다. 실행이 끝나면 작업 디렉토리의
+stage_manifest.json에 fingerprint를 기록하고, 다음 분석 때 플래너가 fingerprint가 바뀌었거나
+산출물이 없는 스테이지(와 그 하류)만 다시 실행하도록 결정합니다.
+
+    preprocess → stt ─────────┬→ keywords
+               └→ diarization ┴→ merge → ner → final_transcript → rag_index
+                                                              └→ efficiency
+
+- final_transcript / rag_index / efficiency는 DB 산출물이라 파이프라인 밖(화자 태깅 확정, RAG 초기화)에서 계획
+- pinned 스테이지는 파라미터가 달라도 기존 산출물을 그대로 사용 (예: 재분석 시 STT 고정)
+"""
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+MANIFEST_FILE = "stage_manifest.json"
+PLAN_FILE = "stage_plan.json"
+
+
+class StageSpec:
+    """스테이지 선언 (outputs: 작업 디렉토리 기준 산출물 파일, DB 산출물이면 비어 있음)"""
+
+    __slots__ = ("name", "inputs", "outputs", "version", "description")
+
+    def __init__(self, name: str, inputs: Tuple[str, ...], outputs: Tuple[str, ...], version: int, description: str):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.version = version
+        self.description = description
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "inputs": list(self.inputs),
+            "outputs": list(self.outputs),
+            "version": self.version,
+            "description": self.description,
+        }
+
+
+# 위상 순서 (스테이지 로직이 바뀌면 version을 올려 기존 산출물을 무효화)
+STAGES: Dict[str, StageSpec] = {
+    spec.name: spec for spec in (
+        StageSpec("preprocess", (), ("preprocessed.wav", "preprocessed.intervals.npy"), 1, "리샘플링 + 필터 + VAD 무음 제거"),
+        StageSpec("stt", ("preprocess",), ("final_transcript.txt",), 1, "Whisper 전사"),
+        StageSpec("diarization", ("preprocess",), ("diarization_result.json",), 1, "화자 분리 (Senko/NeMo)"),
+        StageSpec("keywords", ("stt",), ("keywords.json",), 1, "전문용어 추출 (LLM)"),
+        StageSpec("merge", ("stt", "diarization"), ("merged_result.npz",), 1, "STT 세그먼트 ↔ 화자 구간 정렬"),
+        StageSpec("ner", ("merge",), ("ner_result.json",), 1, "이름 추출 + 닉네임 태깅"),
+        StageSpec("final_transcript", ("merge",), (), 1, "확정 화자명을 적용한 최종 회의록 (DB)"),
+        StageSpec("rag_index", ("final_transcript",), (), 1, "회의록 벡터 DB (ChromaDB)"),
+        StageSpec("efficiency", ("final_transcript",), (), 1, "회의 효율성 분석 (DB)"),
+    )
+}
+
+
+def stage_fingerprint(name: str, params: Dict, upstream: Dict[str, Optional[str]]) -> str:
+    """스테이지 버전 + 파라미터 + 입력 스테이지 fingerprint의 해시"""
+    payload = {
+        "stage": name,
+        "version": STAGES[name].version,
+        "params": params,
+        "inputs": {dep: upstream.get(dep) for dep in STAGES[name].inputs},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class StageManifest:
+    """
+    작업 디렉토리의 스테이지 실행 기록 ({스테이지: {fingerprint, recorded_at, meta}})
+
+    워커 프로세스(파이프라인)와 API 프로세스(태깅 확정, RAG 초기화)가 함께 쓰므로
+    기록할 때마다 파일 잠금 안에서 다시 읽고 갱신합니다.
+    """
+
+    _thread_lock = threading.Lock()
+
+    def __init__(self, work_dir: Path):
+        self.work_dir = Path(work_dir)
+        self.path = self.work_dir / MANIFEST_FILE
+
+    def load(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, name: str) -> Optional[Dict]:
+        return self.load().get(name)
+
+    def fingerprint(self, name: str) -> Optional[str]:
+        entry = self.get(name)
+        return entry["fingerprint"] if entry else None
+
+    @contextmanager
+    def _locked(self):
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(self.path.with_suffix(".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                entries = self.load()
+                yield entries
+                tmp = self.path.with_suffix(f".tmp-{os.getpid()}")
+                tmp.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+                os.replace(tmp, self.path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def record(self, name: str, fingerprint: str, meta: Optional[Dict] = None):
+        with self._locked() as entries:
+            entries[name] = {"fingerprint": fingerprint, "recorded_at": time.time(), "meta": meta or {}}
+
+    def invalidate(self, names: Iterable[str]):
+        with self._locked() as entries:
+            for name in names:
+                entries.pop(name, None)
+
+
+class StageDecision:
+    """플래너 결정 (action: run / reuse / pinned)"""
+
+    __slots__ = ("name", "action", "reason", "fingerprint", "previous")
+
+    def __init__(self, name: str, action: str, reason: str, fingerprint: str, previous: Optional[str]):
+        self.name = name
+        self.action = action
+        self.reason = reason
+        self.fingerprint = fingerprint
+        self.previous = previous
+
+    @property
+    def reuse(self) -> bool:
+        return self.action != "run"
+
+    def to_dict(self) -> Dict:
+        return {
+            "stage": self.name,
+            "action": self.action,
+            "reason": self.reason,
+            "fingerprint": self.fingerprint,
+            "previous_fingerprint": self.previous,
+        }
+
+
+class StagePlan:
+    """스테이지별 결정 모음"""
+
+    def __init__(self, decisions: Dict[str, StageDecision]):
+        self.decisions = decisions
+
+    def __getitem__(self, name: str) -> StageDecision:
+        return self.decisions[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.decisions
+
+    def to_run(self) -> List[str]:
+        return [name for name, d in self.decisions.items() if d.action == "run"]
+
+    def to_dict(self) -> Dict:
+        return {
+            "planned_at": time.time(),
+            "run": self.to_run(),
+            "stages": [d.to_dict() for d in self.decisions.values()],
+        }
+
+    def summary(self) -> str:
+        """예: preprocess=reuse stt=pinned diarization=run(params changed) ..."""
+        return " ".join(
+            f"{d.name}={d.action}" + (f"({d.reason})" if d.action == "run" else "")
+            for d in self.decisions.values()
+        )
+
+
+def plan_stages(
+    manifest: StageManifest,
+    params: Dict[str, Dict],
+    pinned: Iterable[str] = (),
+    available: Dict[str, Callable[[], bool]] = None,
+) -> StagePlan:
+    """
+    실행 계획 수립
+
+    Args:
+        manifest: 작업 디렉토리 실행 기록
+        params: 계획할 스테이지별 파라미터 (여기 없는 입력 스테이지는 manifest의 fingerprint 사용)
+        pinned: 파라미터가 달라도 기존 산출물이 있으면 그대로 쓸 스테이지
+        available: DB 산출물 등 파일로 확인할 수 없는 산출물의 존재 확인 함수
+
+    Returns:
+        StagePlan (다시 실행하는 스테이지의 하류는 모두 다시 실행)
+    """
+    entries = manifest.load()
+    pinned = set(pinned)
+    available = available or {}
+    fingerprints: Dict[str, Optional[str]] = {}
+    decisions: Dict[str, StageDecision] = {}
+
+    for name, spec in STAGES.items():
+        previous = entries.get(name, {}).get("fingerprint")
+        if name not in params:
+            fingerprints[name] = previous
+            continue
+
+        fingerprint = stage_fingerprint(name, params[name], fingerprints)
+        outputs_exist = all((manifest.work_dir / out).exists() for out in spec.outputs)
+        if name in available:
+            outputs_exist = outputs_exist and available[name]()
+        upstream_rerun = [dep for dep in spec.inputs if dep in decisions and decisions[dep].action == "run"]
+
+        if name in pinned and outputs_exist:
+            # 기존 산출물 기준으로 하류를 비교 (기록이 없으면 이번 fingerprint로 간주)
+            action, reason = "pinned", "pinned"
+            fingerprint = previous or fingerprint
+        elif upstream_rerun:
+            action, reason = "run", f"upstream re-run: {', '.join(upstream_rerun)}"
+        elif not outputs_exist:
+            action, reason = "run", "outputs missing"
+        elif previous is None:
+            action, reason = "run", "no previous run"
+        elif previous != fingerprint:
+            action, reason = "run", "fingerprint changed"
+        else:
+            action, reason = "reuse", "fingerprint match"
+
+        fingerprints[name] = fingerprint
+        decisions[name] = StageDecision(name, action, reason, fingerprint, previous)
+
+    return StagePlan(decisions)
+
+
+def save_plan(work_dir: Path, plan: StagePlan):
+    """마지막 실행 계획 기록 (GET /pipeline/{file_id}/stages 에서 조회)"""
+    with open(Path(work_dir) / PLAN_FILE, 'w', encoding='utf-8') as f:
+        json.dump(plan.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def load_plan(work_dir: Path) -> Optional[Dict]:
+    try:
+        return json.loads((Path(work_dir) / PLAN_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def final_transcript_params(names: Dict[str, str]) -> Dict:
+    """final_transcript 파라미터: 화자 레이블 → 확정 이름"""
+    return {"names": {label: name for label, name in sorted(names.items()) if name}}
+
+
+def work_dir_for(audio_file) -> Path:
+    """AudioFile의 작업 디렉토리 (/app/temp/{업로드 UUID})"""
+    return Path("/app/temp") / Path(audio_file.file_path).stem
@@ -2,20 +2,28 @@
 STT 서비스
 
 Whisper API 기반 음성 전사 시스템
-- 청크 분할 (10분 단위)
+- 청크 분할 (목표 10분, 무음 지점 정렬 - app.services.chunk_planner)
 - Whisper API/로컬 전사
 - 타임스탬프 병합
 - 중복 제거 후처리
 """
 import os
 import re
-import math
+import json
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Iterator, List, NamedTuple, Tuple
 from datetime import timedelta
-from pydub import AudioSegment
-from openai import OpenAI
+import numpy as np
+import soundfile as sf
 from app.core.config import settings
+from app.services.pcm_store import open_pcm, to_float32
+from app.services.chunk_planner import ChunkPlan, plan_chunks
+from app.services.chunk_manifest import ChunkManifest
+from app.services.audio_codec import encode_pcm, estimate_bytes_per_second, upload_mimetype, upload_suffix
+from app.services.whisper_api_client import UploadChunk, WhisperAPIDispatcher
+from app.services.transcript import Transcript
+from app.services.transcript_dedup import dedup_keep_flags
+from app.services.voiced_index import VoicedIntervalIndex, intervals_path_for
 
 try:
     import whisper
@@ -39,6 +47,51 @@ re_line = re.compile(
 _whisper_model_cache = {}
 
 
+class Segment(NamedTuple):
+    """전사 세그먼트 레코드 (밀리초 단위)"""
+    start_ms: int
+    end_ms: int
+    text: str
+
+
+def seconds_to_ms(seconds: float) -> int:
+    """초 → 밀리초 (밀리초 이하 버림)"""
+    return int(seconds) * 1000 + int((seconds % 1) * 1000)
+
+
+def format_segment_line(seg: Segment) -> str:
+    """[hh:mm:ss.mmm - hh:mm:ss.mmm] 텍스트"""
+    return f"[{ms_to_srt_time(seg.start_ms)} - {ms_to_srt_time(seg.end_ms)}] {seg.text}"
+
+
+def write_transcript(segments: List[Segment], output_txt: Path) -> Path:
+    """세그먼트 레코드를 타임스탬프 TXT로 저장"""
+    output_txt.parent.mkdir(parents=True, exist_ok=True)
+    output_txt.write_text("\n".join(format_segment_line(seg) for seg in segments), encoding="utf-8")
+    return output_txt
+
+
+def write_srt(segments: List[Segment], srt_path: Path) -> Path:
+    """세그먼트 레코드를 SRT로 저장"""
+    srt_lines = []
+    for i, seg in enumerate(segments, start=1):
+        srt_lines.append(f"{i}")
+        srt_lines.append(f"{ms_to_srt_time(seg.start_ms).replace('.', ',')} --> {ms_to_srt_time(seg.end_ms).replace('.', ',')}")
+        srt_lines.append(seg.text)
+        srt_lines.append("")
+    srt_path.parent.mkdir(parents=True, exist_ok=True)
+    srt_path.write_text("\n".join(srt_lines), encoding="utf-8")
+    return srt_path
+
+
+def segments_from_srt(srt_text: str) -> List[Segment]:
+    """SRT 텍스트 → 세그먼트 레코드"""
+    return [
+        Segment(srt_time_to_ms(st), srt_time_to_ms(et), text.replace("\n", " "))
+        for st, et, text in parse_srt(srt_text)
+    ]
+
+
 def ms_to_srt_time(ms: int) -> str:
     """밀리초 → SRT 시간 형식 변환"""
     td = timedelta(milliseconds=ms)
@@ -124,8 +177,58 @@ def norm_for_compare(s: str) -> str:
     return s
 
 
+def build_chunk_plan(
+    preprocessed_wav: Path,
+    chunk_seconds: float = None,
+    use_local_whisper: bool = True,
+    min_chunks: int = 1,
+) -> ChunkPlan:
+    """
+    전처리 오디오에 대한 무음 정렬 청크 계획 생성
+
+    Args:
+        preprocessed_wav: 전처리된 WAV 파일
+        chunk_seconds: 목표 청크 길이 (None이면 로컬은 settings.STT_CHUNK_SECONDS,
+            API는 settings.STT_API_CHUNK_SECONDS)
+        use_local_whisper: False면 API 업로드 상한(MAX_TARGET_MB)을 인코딩된 바이트 기준으로 적용
+        min_chunks: 최소 청크 수 (병렬 전사 워커 수)
+
+    Returns:
+        ChunkPlan
+    """
+    pcm = open_pcm(preprocessed_wav)
+
+    junctions = None
+    index_path = intervals_path_for(preprocessed_wav)
+    if index_path.exists():
+        junctions = VoicedIntervalIndex.load(index_path).junctions()
+
+    if use_local_whisper:
+        target_seconds = chunk_seconds or settings.STT_CHUNK_SECONDS
+        max_bytes = bytes_per_second = None
+    else:
+        # 업로드 포맷으로 실제 인코딩한 표본 구간에서 바이트레이트 추정
+        target_seconds = chunk_seconds or settings.STT_API_CHUNK_SECONDS
+        max_bytes = MAX_TARGET_MB * 1024 * 1024
+        bytes_per_second = estimate_bytes_per_second(
+            pcm, settings.WHISPER_API_UPLOAD_FORMAT, SAMPLE_RATE, settings.WHISPER_API_OPUS_BITRATE
+        )
+        print(f"📦 업로드 포맷: {settings.WHISPER_API_UPLOAD_FORMAT} (추정 {bytes_per_second / 1024:.1f}KB/s)")
+
+    return plan_chunks(
+        pcm,
+        SAMPLE_RATE,
+        target_seconds=target_seconds,
+        max_bytes=max_bytes,
+        bytes_per_second=bytes_per_second,
+        min_chunks=min_chunks,
+        junctions=junctions,
+    )
+
+
 def split_audio_chunks(
-    preprocessed_wav: Path, chunk_dir: Path, chunk_minutes: int = CHUNK_MINUTES
+    preprocessed_wav: Path, chunk_dir: Path, chunk_minutes: int = CHUNK_MINUTES,
+    plan: ChunkPlan = None, upload_format: str = "wav"
 ) -> List[Path]:
     """
     전처리된 WAV를 청크로 분할
@@ -133,259 +236,418 @@ def split_audio_chunks(
     Args:
         preprocessed_wav: 전처리된 WAV 파일
         chunk_dir: 청크 저장 디렉토리
-        chunk_minutes: 청크 길이(분)
+        chunk_minutes: 청크 길이(분, plan이 없을 때 목표 길이)
+        plan: 청크 계획 (None이면 무음 정렬 계획 생성)
+        upload_format: 청크 파일 포맷 (wav, flac, opus - app.services.audio_codec)
 
     Returns:
         청크 파일 경로 리스트
     """
     chunk_dir.mkdir(parents=True, exist_ok=True)
 
-    audio = AudioSegment.from_file(preprocessed_wav)
-    total_ms = len(audio)
-
-    chunk_ms = chunk_minutes * 60 * 1000
-    n_chunks = math.ceil(total_ms / chunk_ms)
+    # PCM 저장소(memmap)에서 샘플 단위로 잘라 씀 (전체 디코딩/ffmpeg 재인코딩 없음)
+    pcm = open_pcm(preprocessed_wav)
+    if plan is None:
+        plan = build_chunk_plan(preprocessed_wav, chunk_seconds=chunk_minutes * 60)
 
     exported: List[Path] = []
 
-    for i in range(n_chunks):
-        start_ms = i * chunk_ms
-        end_ms = min((i + 1) * chunk_ms, total_ms)
-        seg = audio[start_ms:end_ms]
-
-        wav_path = chunk_dir / f"chunk_{i:04d}.wav"
-        seg.export(wav_path, format="wav", parameters=["-ar", str(SAMPLE_RATE), "-ac", "1"])
+    for chunk in plan:
+        chunk_path = chunk_dir / f"chunk_{chunk.index:04d}{upload_suffix(upload_format)}"
+        if upload_format == "wav":
+            sf.write(str(chunk_path), pcm[chunk.start:chunk.end], SAMPLE_RATE, subtype="PCM_16")
+        else:
+            chunk_path.write_bytes(encode_pcm(
+                pcm[chunk.start:chunk.end], upload_format, SAMPLE_RATE, settings.WHISPER_API_OPUS_BITRATE
+            ))
 
-        size_mb = wav_path.stat().st_size / (1024 * 1024)
+        size_mb = chunk_path.stat().st_size / (1024 * 1024)
         if size_mb >= MAX_TARGET_MB:
-            print(f"⚠️ chunk_{i:04d}.wav: {size_mb:.2f}MB (25MB 근접)")
+            print(f"⚠️ {chunk_path.name}: {size_mb:.2f}MB (25MB 근접)")
 
-        exported.append(wav_path)
+        exported.append(chunk_path)
 
     return exported
 
 
-def transcribe_single_chunk_local(
-    chunk_path: Path, srt_dir: Path, chunk_num: int, total_chunks: int,
-    model_size: str = "large", device: str = "cpu"
-) -> Path:
+# ---------- 로컬 STT 백엔드 ----------
+
+class LocalSTTBackend:
     """
-    단일 청크를 로컬 Whisper로 전사
+    로컬 전사 엔진 인터페이스
 
-    Args:
-        chunk_path: 청크 WAV 파일 경로
-        srt_dir: SRT 저장 디렉토리
-        chunk_num: 청크 번호 (1부터 시작)
-        total_chunks: 전체 청크 개수
-        model_size: Whisper 모델 크기 (tiny, base, small, medium, large)
-        device: 디바이스 (cuda, cpu)
+    float32 16kHz mono 배열을 받아 청크 기준 Segment 리스트를 반환합니다.
+    모델은 인스턴스 생성 시 한 번 로딩되며, get_local_stt_backend가 프로세스별로 캐시합니다.
+    """
+
+    name = ""
+
+    def __init__(self, model_size: str, device: str = "cpu", threads: int = 0):
+        """
+        Args:
+            model_size: Whisper 모델 크기 (tiny, base, small, medium, large, large-v3)
+            device: 디바이스 (cpu, cuda)
+            threads: CPU 추론 스레드 수 (0이면 라이브러리 기본값)
+        """
+        self.model_size = model_size
+        self.device = device
+        self.threads = threads
+
+    def transcribe(self, audio: np.ndarray) -> List[Segment]:
+        raise NotImplementedError
+
+
+class OpenAIWhisperBackend(LocalSTTBackend):
+    """openai-whisper (PyTorch fp32/fp16) - 기존 동작"""
+
+    name = "openai-whisper"
+
+    def __init__(self, model_size: str, device: str = "cpu", threads: int = 0):
+        import torch
+
+        if not LOCAL_WHISPER_AVAILABLE:
+            raise ImportError("openai-whisper is not installed")
+
+        if device == "cuda" and not torch.cuda.is_available():
+            print("⚠️ CUDA requested but not available. Falling back to CPU.")
+            device = "cpu"
+
+        super().__init__(model_size, device, threads)
+        if threads > 0:
+            torch.set_num_threads(threads)
+        self.model = self._load_model()
+
+    def _load_model(self):
+        return whisper.load_model(self.model_size, device=self.device)
+
+    def transcribe(self, audio: np.ndarray) -> List[Segment]:
+        result = self.model.transcribe(audio, language="ko", verbose=False)
+        return [
+            Segment(seconds_to_ms(seg["start"]), seconds_to_ms(seg["end"]), seg["text"].strip())
+            for seg in result["segments"]
+        ]
+
+
+class TorchInt8WhisperBackend(OpenAIWhisperBackend):
+    """
+    openai-whisper + torch 동적 양자화 (CPU 전용)
+
+    Linear 가중치를 int8로 양자화합니다 (활성값은 추론 시 동적 양자화).
+    openai-whisper의 레이어는 nn.Linear의 하위 클래스(whisper.model.Linear)이고
+    quantize_dynamic은 모듈 타입을 정확히 비교하므로, 먼저 같은 가중치를 쓰는 nn.Linear로 바꾼 뒤 양자화합니다.
+    디코딩 로직은 openai-whisper 그대로이므로 세그먼트 레코드 형식이 같습니다.
+    """
+
+    name = "torch-int8"
+
+    def __init__(self, model_size: str, device: str = "cpu", threads: int = 0):
+        if device != "cpu":
+            print(f"⚠️ {self.name} 백엔드는 CPU 전용입니다. CPU로 실행합니다.")
+        super().__init__(model_size, "cpu", threads)
+
+    def _load_model(self):
+        import torch
+
+        model = whisper.load_model(self.model_size, device="cpu")
+        linear_count = _to_plain_linear(model)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        quantized = sum(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules())
+        if quantized == 0:
+            raise RuntimeError(f"{self.name}: 양자화된 Linear 레이어가 없습니다 (Linear {linear_count}개)")
+        print(f"🔢 {self.name}: Linear {quantized}/{linear_count}개 int8 양자화")
+        return model
+
+
+def _to_plain_linear(module) -> int:
+    """
+    nn.Linear 하위 클래스 모듈을 같은 가중치를 공유하는 nn.Linear로 교체 (quantize_dynamic 대상이 되도록)
 
     Returns:
-        SRT 파일 경로
+        모델의 Linear 레이어 수
     """
-    import time
     import torch
 
-    if not LOCAL_WHISPER_AVAILABLE:
-        raise ImportError("openai-whisper is not installed")
+    count = 0
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear):
+            count += 1
+            if type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(
+                    child.in_features, child.out_features, bias=child.bias is not None, device="meta"
+                )
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+        else:
+            count += _to_plain_linear(child)
+    return count
 
-    if device == "cuda" and not torch.cuda.is_available():
-        print("⚠️ CUDA requested but not available. Falling back to CPU.")
-        device = "cpu"
 
-    size_mb = chunk_path.stat().st_size / (1024 * 1024)
-    print(f"▶️ {chunk_num}/{total_chunks} Local Whisper 전사 시작: {chunk_path.name} ({size_mb:.2f}MB, device: {device})")
+class FasterWhisperBackend(LocalSTTBackend):
+    """
+    faster-whisper (CTranslate2) - CPU 기본 int8
 
-    try:
-        start_time = time.time()
+    디코딩 옵션은 openai-whisper 기본값(greedy, 온도 fallback, 이전 텍스트 조건부)에 맞춥니다.
+    """
+
+    name = "faster-whisper"
 
-        model_key = f"{model_size}_{device}"
-        if model_key not in _whisper_model_cache:
-            print(f"📥 모델 로딩: {model_size} ({device})")
-            _whisper_model_cache[model_key] = whisper.load_model(model_size, device=device)
+    def __init__(self, model_size: str, device: str = "cpu", threads: int = 0):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError("faster-whisper is not installed. Install with: pip install faster-whisper")
 
-        model = _whisper_model_cache[model_key]
+        super().__init__(model_size, device, threads)
+        compute_type = settings.WHISPER_COMPUTE_TYPE if device == "cpu" else "float16"
+        self.model = WhisperModel(
+            model_size, device=device, compute_type=compute_type, cpu_threads=threads
+        )
 
-        result = model.transcribe(
-            str(chunk_path),
+    def transcribe(self, audio: np.ndarray) -> List[Segment]:
+        segments, _ = self.model.transcribe(
+            audio,
             language="ko",
-            verbose=False
+            beam_size=1,
+            best_of=5,
+            temperature=[0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+            condition_on_previous_text=True,
+            vad_filter=False,
         )
+        return [
+            Segment(seconds_to_ms(seg.start), seconds_to_ms(seg.end), seg.text.strip())
+            for seg in segments
+        ]
 
-        srt_lines = []
-        segment_num = 1
-        for segment in result["segments"]:
-            start = format_timestamp(segment["start"])
-            end = format_timestamp(segment["end"])
-            text = segment["text"].strip()
 
-            srt_lines.append(f"{segment_num}")
-            srt_lines.append(f"{start} --> {end}")
-            srt_lines.append(text)
-            srt_lines.append("")
-            segment_num += 1
+LOCAL_STT_BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    TorchInt8WhisperBackend.name: TorchInt8WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
 
-        srt_text = "\n".join(srt_lines)
 
-        elapsed = time.time() - start_time
-        print(f"✅ {chunk_path.name} 완료 ({elapsed:.1f}초)")
+def resolve_local_backend(backend: str = None) -> str:
+    """백엔드 이름 확인 (None이면 settings.WHISPER_LOCAL_BACKEND)"""
+    backend = backend or settings.WHISPER_LOCAL_BACKEND
+    if backend not in LOCAL_STT_BACKENDS:
+        raise ValueError(
+            f"Unknown local STT backend: {backend} (choices: {', '.join(LOCAL_STT_BACKENDS)})"
+        )
+    return backend
+
 
-        srt_path = srt_dir / f"{chunk_path.stem}.srt"
-        srt_path.write_text(srt_text, encoding="utf-8")
-        return srt_path
+def get_local_stt_backend(
+    model_size: str, device: str = "cpu", backend: str = None, threads: int = 0
+) -> LocalSTTBackend:
+    """
+    로컬 STT 백엔드 인스턴스 반환 (프로세스별 캐시, 모델 1회 로딩)
+    """
+    backend = resolve_local_backend(backend)
+    model_key = f"{backend}_{model_size}_{device}"
+    if model_key not in _whisper_model_cache:
+        print(f"📥 모델 로딩: {model_size} ({backend}, {device})")
+        _whisper_model_cache[model_key] = LOCAL_STT_BACKENDS[backend](model_size, device, threads)
+    return _whisper_model_cache[model_key]
 
-    except Exception as e:
-        print(f"❌ {chunk_path.name} 전사 실패: {e}")
-        raise
 
+def _init_local_whisper_worker(model_size: str, device: str, threads: int, backend: str):
+    """프로세스 풀 워커 초기화: torch 스레드 수 설정 + 모델 1회 로딩 (워커 수명 동안 상주)"""
+    import torch
 
-def format_timestamp(seconds: float) -> str:
-    """초를 SRT 타임스탬프 형식으로 변환"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+    if threads > 0:
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
 
+    print(f"📥 [worker {os.getpid()}] threads={threads}")
+    get_local_stt_backend(model_size, device, backend, threads)
 
-def transcribe_chunks_with_local_whisper(
-    chunk_files: List[Path], srt_dir: Path,
-    model_size: str = "large", device: str = "cpu"
-) -> List[Path]:
-    """
-    청크들을 로컬 Whisper로 순차 전사
 
-    Note: GPU 메모리 사용량이 높아 병렬 처리 대신 순차 처리
+# 상주 프로세스 풀 (같은 설정이면 요청 간 재사용 → 워커별 모델 재로딩 없음)
+_local_whisper_pool = None
+_local_whisper_pool_key = None
 
-    Args:
-        chunk_files: 청크 WAV 파일 리스트
-        srt_dir: SRT 저장 디렉토리
-        model_size: Whisper 모델 크기
-        device: 디바이스 (cuda, cpu)
 
-    Returns:
-        SRT 파일 경로 리스트 (순서 보장)
+def get_local_whisper_pool(model_size: str, device: str, workers: int, threads: int, backend: str = None):
     """
-    import time
+    로컬 Whisper 프로세스 풀 반환 (설정이 바뀌면 기존 풀 종료 후 재생성)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing as mp
+
+    global _local_whisper_pool, _local_whisper_pool_key
+
+    backend = resolve_local_backend(backend)
+    pool_key = (backend, model_size, device, workers, threads)
+    if _local_whisper_pool is not None and _local_whisper_pool_key != pool_key:
+        _local_whisper_pool.shutdown(wait=True)
+        _local_whisper_pool = None
+
+    if _local_whisper_pool is None:
+        # torch는 fork 이후 스레드 풀이 꼬일 수 있으므로 spawn 사용
+        _local_whisper_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_local_whisper_worker,
+            initargs=(model_size, device, threads, backend),
+        )
+        _local_whisper_pool_key = pool_key
 
-    srt_dir.mkdir(parents=True, exist_ok=True)
+    return _local_whisper_pool
 
-    print(f"🚀 로컬 전사 시작: {len(chunk_files)}개 청크 (모델: {model_size}, 디바이스: {device})")
-    start_time = time.time()
 
-    srt_files = []
-    for i, chunk_path in enumerate(chunk_files):
-        srt_path = transcribe_single_chunk_local(
-            chunk_path, srt_dir, i + 1, len(chunk_files), model_size, device
-        )
-        srt_files.append(srt_path)
+def resolve_local_workers(device: str, workers: int = None) -> Tuple[int, int]:
+    """
+    (워커 수, 워커당 torch 스레드 수) 결정
+
+    GPU에서는 메모리 사용량 때문에 항상 1개 워커(요청 프로세스 내 순차 처리)
+    """
+    if device != "cpu":
+        return 1, 0
+    workers = max(1, workers or settings.WHISPER_LOCAL_WORKERS)
+    threads = settings.WHISPER_THREADS_PER_WORKER or max(1, (os.cpu_count() or 1) // workers)
+    return workers, threads
 
-    elapsed = time.time() - start_time
-    print(f"✅ 전체 전사 완료 ({elapsed:.1f}초)")
 
-    return srt_files
+# Whisper 모델 크기별 대략적인 메모리 사용량 (MB, 워커 1개 기준)
+WHISPER_MODEL_MEMORY_MB = {
+    "tiny": 400, "base": 500, "small": 1000, "medium": 2500,
+    "large": 4500, "large-v2": 4500, "large-v3": 4500, "turbo": 3000,
+}
 
 
-def transcribe_single_chunk(
-    chunk_path: Path, srt_dir: Path, openai_api_key: str, chunk_num: int, total_chunks: int
-) -> Path:
+def estimate_stt_resources(use_local_whisper: bool, model_size: str, device: str) -> Tuple[float, int, int]:
     """
-    단일 청크를 Whisper API로 전사
+    STT 스테이지가 점유할 자원 추정 (파이프라인 스테이지 스케줄링용)
 
-    Args:
-        chunk_path: 청크 WAV 파일 경로
-        srt_dir: SRT 저장 디렉토리
-        openai_api_key: OpenAI API 키
-        chunk_num: 청크 번호 (1부터 시작)
-        total_chunks: 전체 청크 개수
+    Returns:
+        (cpu 코어 수, memory_mb, gpu_memory_mb)
+    """
+    if not use_local_whisper:
+        # API 모드: 인코딩/업로드만 로컬에서 수행
+        return 1.0, 512, 0
+    model_mb = WHISPER_MODEL_MEMORY_MB.get(model_size, 4500)
+    workers, threads = resolve_local_workers(device)
+    if device == "cpu":
+        return float(workers * threads), model_mb * workers, 0
+    return 1.0, 1024, model_mb
+
+
+def transcribe_array_local(
+    audio: np.ndarray, model_size: str = "large", device: str = "cpu", backend: str = None
+) -> List[Segment]:
+    """
+    float32 오디오 배열(16kHz)을 로컬 STT 백엔드로 전사 (파일/ffmpeg 디코딩 없음)
 
     Returns:
-        SRT 파일 경로
+        청크 기준 세그먼트 레코드 리스트
     """
-    import time
+    return get_local_stt_backend(model_size, device, backend).transcribe(audio)
 
-    client = OpenAI(api_key=openai_api_key, timeout=1800.0)
-    size_mb = chunk_path.stat().st_size / (1024 * 1024)
 
-    print(f"▶️ {chunk_num}/{total_chunks} Whisper 전사 시작: {chunk_path.name} ({size_mb:.2f}MB)")
+def _transcribe_span_local(args) -> List[Segment]:
+    """PCM 저장소의 [start, end) 구간 전사 (워커/요청 프로세스 공용)"""
+    import time
 
-    try:
-        start_time = time.time()
-        with chunk_path.open("rb") as f:
-            srt_text = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=(chunk_path.name, f, "audio/wav"),
-                language="ko",
-                response_format="srt"
-            )
-        elapsed = time.time() - start_time
-        print(f"✅ {chunk_path.name} 완료 ({elapsed:.1f}초)")
+    preprocessed_wav, start, end, chunk_num, total_chunks, model_size, device, backend = args
+    print(f"▶️ {chunk_num}/{total_chunks} Local Whisper 전사 시작: {(end - start) / SAMPLE_RATE:.0f}초 (device: {device})")
+    start_time = time.time()
 
-        srt_path = srt_dir / f"{chunk_path.stem}.srt"
-        srt_path.write_text(srt_text, encoding="utf-8")
-        return srt_path
+    audio = to_float32(open_pcm(preprocessed_wav)[start:end])
+    segments = transcribe_array_local(audio, model_size, device, backend)
 
-    except Exception as e:
-        print(f"❌ {chunk_path.name} 전사 실패: {e}")
-        raise
+    print(f"✅ {chunk_num}/{total_chunks} 완료 ({time.time() - start_time:.1f}초, {len(segments)}개 세그먼트)")
+    return segments
 
 
-def transcribe_chunks_with_whisper(
-    chunk_files: List[Path], srt_dir: Path, openai_api_key: str
-) -> List[Path]:
+def iter_local_chunk_segments(
+    preprocessed_wav: Path, plan: ChunkPlan,
+    model_size: str = "large", device: str = "cpu", workers: int = None,
+    backend: str = None, total_chunks: int = None
+) -> Iterator[Tuple[int, List[Segment]]]:
     """
-    청크들을 Whisper API로 병렬 전사
+    청크 계획대로 로컬 Whisper 전사 (메모리 내 경로)
+
+    청크 오디오는 PCM 저장소(memmap)에서 잘라 배열로 바로 넘기므로
+    청크 WAV/SRT 파일을 만들지 않습니다. 워커 풀을 쓰는 경우 워커가 memmap을 직접 엽니다.
 
     Args:
-        chunk_files: 청크 WAV 파일 리스트
-        srt_dir: SRT 저장 디렉토리
-        openai_api_key: OpenAI API 키
+        total_chunks: 진행 로그의 전체 청크 수 (재개 시 남은 청크만 넘기면 전체 계획의 청크 수, None이면 len(plan))
 
-    Returns:
-        SRT 파일 경로 리스트 (순서 보장)
+    Yields:
+        (청크 인덱스, 청크 기준 세그먼트 리스트) - 청크 순서대로
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    import time
+    backend = resolve_local_backend(backend)
+    workers, threads = resolve_local_workers(device, workers)
+    workers = min(workers, max(1, len(plan)))
+    total_chunks = total_chunks or len(plan)
+    tasks = [
+        (preprocessed_wav, c.start, c.end, c.index + 1, total_chunks, model_size, device, backend)
+        for c in plan
+    ]
+
+    if workers > 1:
+        pool = get_local_whisper_pool(model_size, device, workers, threads, backend)
+        results = pool.map(_transcribe_span_local, tasks, chunksize=1)
+    else:
+        results = map(_transcribe_span_local, tasks)
+
+    for chunk, segments in zip(plan, results):
+        yield chunk.index, segments
+
 
-    os.environ["OPENAI_API_KEY"] = openai_api_key
-    srt_dir.mkdir(parents=True, exist_ok=True)
+def transcribe_plan_with_local_whisper(
+    preprocessed_wav: Path, plan: ChunkPlan,
+    model_size: str = "large", device: str = "cpu", workers: int = None,
+    backend: str = None
+) -> List[List[Segment]]:
+    """청크별 세그먼트 리스트 (순서 보장)"""
+    import time
 
-    print(f"🚀 병렬 전사 시작: {len(chunk_files)}개 청크")
+    backend = resolve_local_backend(backend)
+    print(f"🚀 로컬 전사 시작: {len(plan)}개 청크 (모델: {model_size}, 백엔드: {backend}, 디바이스: {device})")
     start_time = time.time()
+    chunk_segments = [
+        segs for _, segs in iter_local_chunk_segments(preprocessed_wav, plan, model_size, device, workers, backend)
+    ]
+    print(f"✅ 전체 전사 완료 ({time.time() - start_time:.1f}초)")
+    return chunk_segments
 
-    srt_files_dict = {}
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        future_to_chunk = {
-            executor.submit(
-                transcribe_single_chunk,
-                cp,
-                srt_dir,
-                openai_api_key,
-                i + 1,
-                len(chunk_files)
-            ): (i, cp)
-            for i, cp in enumerate(chunk_files)
-        }
 
-        for future in as_completed(future_to_chunk):
-            idx, chunk_path = future_to_chunk[future]
-            try:
-                srt_path = future.result()
-                srt_files_dict[idx] = srt_path
-            except Exception as e:
-                print(f"❌ 전사 실패: {chunk_path.name} - {e}")
-                raise
+_UPLOAD_MIMETYPES = {upload_suffix(fmt): upload_mimetype(fmt) for fmt in ("wav", "flac", "opus")}
 
-    srt_files = [srt_files_dict[i] for i in sorted(srt_files_dict.keys())]
 
-    elapsed = time.time() - start_time
-    print(f"✅ 전체 전사 완료 ({elapsed:.1f}초)")
+def upload_chunks_for(chunk_files: List[Path]) -> List[UploadChunk]:
+    """청크 파일 → 업로드 청크 (데이터는 요청 직전에 읽음)"""
+    return [
+        UploadChunk(cp.name, cp, _UPLOAD_MIMETYPES.get(cp.suffix, "audio/wav"))
+        for cp in chunk_files
+    ]
 
-    return srt_files
+
+def iter_whisper_api_srt(chunk_files: List[Path], openai_api_key: str) -> Iterator[Tuple[int, str]]:
+    """
+    청크 파일을 Whisper API로 전사하며 (청크 순번, SRT 텍스트)를 순서대로 반환
+
+    앞 청크부터 끝나는 대로 반환하므로 뒤 청크가 진행 중이어도 결과를 먼저 처리할 수 있습니다.
+    """
+    dispatcher = WhisperAPIDispatcher(openai_api_key)
+    yield from dispatcher.iter_transcribe(upload_chunks_for(chunk_files))
+    print(f"📊 API 통계: {dispatcher.stats()}")
+
+
+def merge_chunk_segments(chunk_segments: List[List[Segment]], offsets_ms: List[int]) -> List[Segment]:
+    """청크 기준 세그먼트 → 전체 기준 세그먼트 (청크 오프셋 더함)"""
+    merged = []
+    for segments, off in zip(chunk_segments, offsets_ms):
+        merged.extend(Segment(seg.start_ms + off, seg.end_ms + off, seg.text) for seg in segments)
+    return merged
 
 
 def merge_timestamps(
-    chunk_files: List[Path], srt_files: List[Path], output_txt: Path
+    chunk_files: List[Path], srt_files: List[Path], output_txt: Path,
+    plan: ChunkPlan = None
 ) -> Path:
     """
     청크별 SRT를 하나의 타임스탬프 TXT로 병합
@@ -394,34 +656,56 @@ def merge_timestamps(
         chunk_files: 청크 WAV 파일 리스트
         srt_files: 청크별 SRT 파일 리스트
         output_txt: 출력 TXT 경로
+        plan: 청크 계획 (있으면 오프셋을 샘플 수로 계산)
 
     Returns:
         병합된 TXT 경로
     """
-    offsets = []
-    acc = 0
-    for cp in chunk_files:
-        dur_ms = len(AudioSegment.from_file(cp))
-        offsets.append(acc)
-        acc += dur_ms
-
-    all_lines = []
-    for idx, srt_path in enumerate(srt_files):
-        srt_text = srt_path.read_text(encoding="utf-8")
-        cues = parse_srt(srt_text)
-        off = offsets[idx]
-
-        for st, et, text in cues:
-            st_ms = srt_time_to_ms(st) + off
-            et_ms = srt_time_to_ms(et) + off
-            clean_text = text.replace('\n', ' ')
-            one_line = f"[{ms_to_srt_time(st_ms)} - {ms_to_srt_time(et_ms)}] {clean_text}"
-            all_lines.append(one_line)
+    if plan is not None:
+        offsets = plan.offsets_ms()
+    else:
+        # 청크 길이는 WAV 헤더의 샘플 수로 계산 (디코딩 없음)
+        offsets = []
+        acc = 0
+        for cp in chunk_files:
+            dur_ms = round(sf.info(str(cp)).frames * 1000 / SAMPLE_RATE)
+            offsets.append(acc)
+            acc += dur_ms
 
-    output_txt.parent.mkdir(parents=True, exist_ok=True)
-    output_txt.write_text("\n".join(all_lines), encoding="utf-8")
+    chunk_segments = [segments_from_srt(p.read_text(encoding="utf-8")) for p in srt_files]
+    return write_transcript(merge_chunk_segments(chunk_segments, offsets), output_txt)
 
-    return output_txt
+
+def postprocess_segments(segments: List[Segment], window: int = None) -> List[Segment]:
+    """
+    세그먼트 레코드 후처리 (라인 내부 중복 축약 + 중복 라인 제거)
+
+    Args:
+        segments: 세그먼트 레코드 리스트
+        window: 중복 비교 대상 최근 라인 수 (None이면 settings.STT_DEDUP_WINDOW, 0이면 전체)
+
+    Returns:
+        남은 세그먼트 리스트
+    """
+    if window is None:
+        window = settings.STT_DEDUP_WINDOW
+
+    entries = [Segment(seg.start_ms, seg.end_ms, dedup_inside_line(seg.text)) for seg in segments]
+    keep = dedup_keep_flags([norm_for_compare(e.text) for e in entries], window=window)
+    kept = [e for e, k in zip(entries, keep) if k]
+
+    print(f"[후처리] 입력: {len(entries)}, 제거: {len(entries) - len(kept)}, 남음: {len(kept)}")
+
+    return kept
+
+
+def segments_from_transcript(text: str) -> List[Segment]:
+    """타임스탬프 TXT → 세그먼트 레코드 (형식이 아닌 라인은 0초로 처리)"""
+    segments = []
+    for ln in text.splitlines():
+        st, et, tx = parse_line(ln)
+        segments.append(Segment(srt_time_to_ms(st) if st else 0, srt_time_to_ms(et) if et else 0, tx))
+    return segments
 
 
 def postprocess_transcript(input_txt: Path, output_txt: Path) -> Path:
@@ -435,94 +719,238 @@ def postprocess_transcript(input_txt: Path, output_txt: Path) -> Path:
     Returns:
         후처리된 TXT 경로
     """
-    raw_lines = input_txt.read_text(encoding="utf-8", errors="ignore").splitlines()
-    entries = []
-    for ln in raw_lines:
-        st, et, tx = parse_line(ln)
-        tx = dedup_inside_line(tx)
-        entries.append({"start": st, "end": et, "text": tx})
-
-    kept = []
-    removed = 0
-    for cur in entries:
-        cur_txt = cur["text"]
-        cur_norm = norm_for_compare(cur_txt)
-
-        dup = False
-        for prev in kept:
-            prev_norm = norm_for_compare(prev["text"])
-            if cur_norm == prev_norm:
-                dup = True
-                break
-            if cur_norm in prev_norm or prev_norm in cur_norm:
-                dup = True
-                break
+    segments = segments_from_transcript(input_txt.read_text(encoding="utf-8", errors="ignore"))
+    return write_transcript(postprocess_segments(segments), output_txt)
 
-        if dup:
-            removed += 1
-        else:
-            kept.append(cur)
 
-    out_lines = []
-    for e in kept:
-        st = e["start"] or "00:00:00.000"
-        et = e["end"] or "00:00:00.000"
-        out_lines.append(f"[{st} - {et}] {e['text']}")
+def final_transcript_npz_path(work_dir: Path) -> Path:
+    """최종 전사의 컬럼형 저장 파일 (Transcript.save)"""
+    return work_dir / "final_transcript.npz"
 
-    output_txt.parent.mkdir(parents=True, exist_ok=True)
-    output_txt.write_text("\n".join(out_lines), encoding="utf-8")
 
-    print(f"[후처리] 입력: {len(entries)}, 제거: {removed}, 남음: {len(kept)}")
+def load_final_transcript(work_dir: Path, final_txt: Path = None) -> Transcript:
+    """
+    최종 전사 로드 (final_transcript.npz 우선, 없으면 타임스탬프 TXT 파싱)
 
-    return output_txt
+    Args:
+        work_dir: 작업 디렉토리
+        final_txt: npz가 없을 때 읽을 TXT (None이면 work_dir/final_transcript.txt)
+    """
+    final_txt = final_txt or work_dir / "final_transcript.txt"
+    npz_path = final_transcript_npz_path(work_dir)
+    # TXT보다 오래된 npz는 다른 실행의 결과일 수 있으므로 사용하지 않음
+    if (
+        final_txt.name == "final_transcript.txt"
+        and npz_path.exists()
+        and (not final_txt.exists() or npz_path.stat().st_mtime >= final_txt.stat().st_mtime)
+    ):
+        try:
+            return Transcript.load(npz_path)
+        except (OSError, ValueError, KeyError):
+            pass
+    return Transcript.from_file(final_txt)
+
+
+def partial_transcript_path(work_dir: Path) -> Path:
+    """STT 진행 중 청크별 세그먼트를 누적하는 임시 전사 파일 (JSON Lines)"""
+    return work_dir / "partial_transcript.jsonl"
+
+
+def append_partial_transcript(path: Path, chunk_index: int, segments: List[Segment]):
+    """청크 하나의 세그먼트(전체 기준 시간)를 임시 전사 파일에 추가"""
+    with open(path, "a", encoding="utf-8") as f:
+        for seg in segments:
+            f.write(json.dumps(
+                {"chunk": chunk_index, "start_ms": seg.start_ms, "end_ms": seg.end_ms, "text": seg.text},
+                ensure_ascii=False,
+            ) + "\n")
+        f.flush()
+
+
+def read_partial_transcript(work_dir: Path, offset: int = 0) -> List[dict]:
+    """
+    임시 전사 파일 읽기
+
+    Args:
+        work_dir: 작업 디렉토리
+        offset: 건너뛸 세그먼트 수 (폴링 시 이미 받은 개수)
+
+    Returns:
+        [{"chunk", "start_ms", "end_ms", "text"}, ...]
+    """
+    path = partial_transcript_path(work_dir)
+    if not path.exists():
+        return []
+    segments = []
+    with open(path, encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            if i < offset:
+                continue
+            try:
+                segments.append(json.loads(line))
+            except ValueError:
+                # 쓰는 중인 마지막 라인
+                break
+    return segments
 
 
-def run_stt_pipeline(
+def iter_stt_pipeline(
     preprocessed_wav: Path, work_dir: Path, openai_api_key: str = None,
     use_local_whisper: bool = True, model_size: str = "large",
-    device: str = "cpu"
-) -> Path:
+    device: str = "cpu", write_chunk_srt: bool = False, backend: str = None
+) -> Iterator[Tuple[int, int, List[Segment]]]:
     """
-    STT 전체 파이프라인 실행
+    STT 파이프라인 (청크 단위 generator)
+
+    청크 결과는 chunks/manifest.json 체크포인트에 기록되며, 같은 오디오/설정으로 다시 실행하면
+    완료된 청크는 건너뛰고 누락/무효 청크만 전사합니다.
+    청크 전사가 끝나는 대로 (청크 순서대로) 전체 기준 시간으로 옮긴 세그먼트를 내보내고,
+    partial_transcript.jsonl에 누적합니다. 모든 청크가 끝나면
+    merged_transcript.txt / final_transcript.txt와 final_transcript.npz(컬럼형 Transcript)를 기록합니다.
 
     Args:
-        preprocessed_wav: 전처리된 WAV 파일
-        work_dir: 작업 디렉토리
-        openai_api_key: OpenAI API 키 (use_local_whisper=False일 때 필요)
-        use_local_whisper: 로컬 Whisper 사용 여부 (기본값: True)
-        model_size: 로컬 Whisper 모델 크기 (tiny, base, small, medium, large)
-        device: 디바이스 (cpu, cuda)
+        run_stt_pipeline과 동일
 
-    Returns:
-        최종 전사 TXT 파일 경로
+    Yields:
+        (청크 인덱스, 전체 청크 수, 전체 기준 세그먼트 리스트)
     """
     chunk_dir = work_dir / "chunks"
     srt_dir = work_dir / "srt"
     merged_txt = work_dir / "merged_transcript.txt"
     final_txt = work_dir / "final_transcript.txt"
+    final_npz = final_transcript_npz_path(work_dir)
+    partial_path = partial_transcript_path(work_dir)
 
     print("[STT Step 1] 청크 분할...")
-    chunk_files = split_audio_chunks(preprocessed_wav, chunk_dir)
-    print(f"✅ {len(chunk_files)}개 청크 생성")
-
+    pcm = open_pcm(preprocessed_wav)
     if use_local_whisper:
+        model = {
+            "mode": "local",
+            "model_size": model_size,
+            "backend": resolve_local_backend(backend),
+            "device": device,
+            "chunk_seconds": settings.STT_CHUNK_SECONDS,
+        }
+    else:
+        model = {
+            "mode": "api",
+            "model": "whisper-1",
+            "upload_format": settings.WHISPER_API_UPLOAD_FORMAT,
+            "chunk_seconds": settings.STT_API_CHUNK_SECONDS,
+        }
+        if settings.WHISPER_API_UPLOAD_FORMAT == "opus":
+            model["bitrate"] = settings.WHISPER_API_OPUS_BITRATE
+
+    # 로컬 병렬 전사 시 워커 수 이상으로 청크를 나눠 코어를 모두 사용
+    min_chunks = resolve_local_workers(device)[0] if use_local_whisper else 1
+    manifest = ChunkManifest.resume_or_create(
+        work_dir, pcm, model,
+        lambda: build_chunk_plan(preprocessed_wav, use_local_whisper=use_local_whisper, min_chunks=min_chunks),
+    )
+    plan = manifest.plan
+    plan.save(chunk_dir / "plan.json")
+    print(f"✅ {len(plan)}개 청크 계획 (길이: {', '.join(f'{d:.0f}s' for d in plan.durations_sec())})")
+
+    # 이전 실행에서 완료된 청크 재사용 (결과 파일/오디오 해시가 유효한 것만)
+    done_segments = {}
+    for chunk in plan:
+        stored = manifest.load_segments(chunk.index, pcm)
+        if stored is None:
+            manifest.mark_pending(chunk.index)
+        else:
+            done_segments[chunk.index] = [Segment(int(st), int(et), tx) for st, et, tx in stored]
+    pending = ChunkPlan([c for c in plan if c.index not in done_segments], plan.sr, plan.total_samples)
+    if done_segments:
+        print(f"♻️ 체크포인트 재사용: {len(done_segments)}/{len(plan)}개 청크 완료, {len(pending)}개 전사")
+
+    if not len(pending):
+        pending_results = iter(())
+    elif use_local_whisper:
+        # 청크 오디오는 memmap에서 배열로 바로 전달 (청크 WAV/SRT 왕복 없음)
         print(f"[STT Step 2] Local Whisper 전사 (모델: {model_size}, 디바이스: {device})...")
-        srt_files = transcribe_chunks_with_local_whisper(
-            chunk_files, srt_dir, model_size, device
+        pending_results = iter_local_chunk_segments(
+            preprocessed_wav, pending, model_size, device, backend=backend, total_chunks=len(plan)
         )
     else:
         print("[STT Step 2] OpenAI Whisper 전사...")
         if not openai_api_key:
             raise ValueError("OpenAI API key is required when use_local_whisper=False")
-        srt_files = transcribe_chunks_with_whisper(chunk_files, srt_dir, openai_api_key)
-    print(f"✅ {len(srt_files)}개 SRT 생성")
+        chunk_files = split_audio_chunks(
+            preprocessed_wav, chunk_dir, plan=pending, upload_format=settings.WHISPER_API_UPLOAD_FORMAT
+        )
+        srt_dir.mkdir(parents=True, exist_ok=True)
+
+        def api_results():
+            # 청크가 끝나는 대로 SRT 저장 + 세그먼트 변환 (청크 순서대로)
+            for (_, srt_text), chunk, chunk_path in zip(
+                iter_whisper_api_srt(chunk_files, openai_api_key), pending, chunk_files
+            ):
+                (srt_dir / f"{chunk_path.stem}.srt").write_text(srt_text, encoding="utf-8")
+                yield chunk.index, segments_from_srt(srt_text)
+
+        pending_results = api_results()
+
+    partial_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path.write_text("", encoding="utf-8")
+    offsets = plan.offsets_ms()
+    segments = []
+    for chunk in plan:
+        if chunk.index in done_segments:
+            chunk_segments = done_segments[chunk.index]
+        else:
+            # pending 청크는 인덱스 순서대로 전사됨
+            chunk_index, chunk_segments = next(pending_results)
+            manifest.mark_done(chunk_index, chunk_segments)
+            if use_local_whisper and write_chunk_srt:
+                write_srt(chunk_segments, srt_dir / f"chunk_{chunk_index:04d}.srt")
+        merged = merge_chunk_segments([chunk_segments], [offsets[chunk.index]])
+        append_partial_transcript(partial_path, chunk.index, merged)
+        segments.extend(merged)
+        yield chunk.index, len(plan), merged
+    print(f"✅ {len(plan)}개 청크 전사 완료")
 
     print("[STT Step 3] 타임스탬프 병합...")
-    merge_timestamps(chunk_files, srt_files, merged_txt)
+    write_transcript(segments, merged_txt)
     print(f"✅ 병합 완료 → {merged_txt}")
 
     print("[STT Step 4] 후처리 (중복 제거)...")
-    postprocess_transcript(merged_txt, final_txt)
+    final_segments = postprocess_segments(segments)
+    write_transcript(final_segments, final_txt)
+    Transcript.from_segments(final_segments).save(final_npz)
     print(f"✅ 최종 전사 완료 → {final_txt}")
 
-    return final_txt
+
+def run_stt_pipeline(
+    preprocessed_wav: Path, work_dir: Path, openai_api_key: str = None,
+    use_local_whisper: bool = True, model_size: str = "large",
+    device: str = "cpu", write_chunk_srt: bool = False, backend: str = None,
+    on_chunk: Callable[[int, int, List[Segment]], None] = None
+) -> Path:
+    """
+    STT 전체 파이프라인 실행
+
+    세그먼트는 (start_ms, end_ms, text) 레코드로 병합/후처리까지 메모리에서 처리하고,
+    merged_transcript.txt / final_transcript.txt는 마지막에 한 번만 기록합니다.
+
+    Args:
+        preprocessed_wav: 전처리된 WAV 파일
+        work_dir: 작업 디렉토리
+        openai_api_key: OpenAI API 키 (use_local_whisper=False일 때 필요)
+        use_local_whisper: 로컬 Whisper 사용 여부 (기본값: True)
+        model_size: 로컬 Whisper 모델 크기 (tiny, base, small, medium, large)
+        device: 디바이스 (cpu, cuda)
+        write_chunk_srt: 로컬 전사 시 청크별 SRT도 저장할지 여부 (디버깅용)
+        backend: 로컬 STT 백엔드 (openai-whisper, torch-int8, faster-whisper, None이면 settings.WHISPER_LOCAL_BACKEND)
+        on_chunk: 청크 완료 시 호출 (청크 인덱스, 전체 청크 수, 전체 기준 세그먼트)
+
+    Returns:
+        최종 전사 TXT 파일 경로
+    """
+    for chunk_index, total_chunks, segments in iter_stt_pipeline(
+        preprocessed_wav, work_dir, openai_api_key, use_local_whisper,
+        model_size, device, write_chunk_srt, backend
+    ):
+        if on_chunk:
+            on_chunk(chunk_index, total_chunks, segments)
+
+    return work_dir / "final_transcript.txt"
@@ -0,0 +1,328 @@
+"""
+컬럼형 전사 데이터 (STT → 화자 병합 → NER → DB 저장 공통 표현)
+
+세그먼트를 dict 리스트 대신 컬럼 배열로 보관합니다.
+- start_ms, end_ms: int64 (밀리초, 압축 시간 기준)
+- speaker_codes: int32 (speakers 라벨 인덱스, -1 = 화자 없음)
+- texts: 문자열 리스트
+
+시간/화자 조건 조회는 numpy 마스크로 처리하고, 세그먼트 단위 접근은 __slots__ 뷰
+(TranscriptSegment)로 제공합니다. 뷰는 segment.get('text') 같은 dict 방식 접근도 지원하므로
+기존 dict 리스트를 받던 코드(NER, 닉네임, 키워드)에 그대로 넘길 수 있습니다.
+
+저장 형식: .npz (pickle 없이 로드 가능하도록 텍스트는 UTF-8 바이트 + 오프셋 배열로 저장)
+"""
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+NO_SPEAKER = -1
+
+re_transcript_line = re.compile(
+    r"^\[(\d{2}:\d{2}:\d{2}\.\d{3}) - (\d{2}:\d{2}:\d{2}\.\d{3})\] (.+)$", re.M
+)
+
+# hh:mm:ss.mmm 문자열의 숫자 위치와 자릿값 (밀리초)
+_TS_DIGITS = np.array([0, 1, 3, 4, 6, 7, 9, 10, 11])
+_TS_WEIGHTS = np.array(
+    [36_000_000, 3_600_000, 600_000, 60_000, 10_000, 1000, 100, 10, 1], dtype=np.int64
+)
+
+
+def _timestamps_to_ms(values: Sequence[str]) -> np.ndarray:
+    """고정 폭 hh:mm:ss.mmm 문자열 리스트 → 밀리초 배열 (문자 단위 벡터 연산)"""
+    if not values:
+        return np.zeros(0, dtype=np.int64)
+    chars = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8).reshape(len(values), 12)
+    return (chars[:, _TS_DIGITS].astype(np.int64) - ord("0")) @ _TS_WEIGHTS
+
+
+def _pack_strings(values: Sequence[str]):
+    """문자열 리스트 → (UTF-8 바이트 배열, 오프셋 배열)"""
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[s:e].decode("utf-8") for s, e in zip(bounds[:-1], bounds[1:])]
+
+
+class TranscriptSegment:
+    """
+    Transcript의 세그먼트 하나에 대한 뷰 (데이터는 복사하지 않음)
+
+    start/end는 초(float), start_ms/end_ms는 밀리초(int)입니다.
+    text를 수정하면 원본 Transcript에 반영됩니다.
+    """
+
+    __slots__ = ("_transcript", "_index")
+
+    def __init__(self, transcript: "Transcript", index: int):
+        self._transcript = transcript
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def start_ms(self) -> int:
+        return int(self._transcript.start_ms[self._index])
+
+    @property
+    def end_ms(self) -> int:
+        return int(self._transcript.end_ms[self._index])
+
+    @property
+    def start(self) -> float:
+        return self.start_ms / 1000.0
+
+    @property
+    def end(self) -> float:
+        return self.end_ms / 1000.0
+
+    @property
+    def speaker(self) -> Optional[str]:
+        code = int(self._transcript.speaker_codes[self._index])
+        return self._transcript.speakers[code] if code != NO_SPEAKER else None
+
+    @property
+    def text(self) -> str:
+        return self._transcript.texts[self._index]
+
+    @text.setter
+    def text(self, value: str):
+        self._transcript.texts[self._index] = value
+
+    # dict 방식 접근 (기존 List[Dict] 소비 코드 호환)
+    _KEYS = ("speaker", "start", "end", "text")
+
+    def get(self, key: str, default=None):
+        if key not in self._KEYS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        if key not in self._KEYS or (key == "speaker" and self.speaker is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key != "text":
+            raise KeyError(key)
+        self.text = value
+
+    def to_dict(self) -> Dict:
+        d = {"start": self.start, "end": self.end, "text": self.text}
+        speaker = self.speaker
+        if speaker is not None:
+            d = {"speaker": speaker, **d}
+        return d
+
+    def __repr__(self):
+        return f"<TranscriptSegment #{self._index} [{self.start_ms}-{self.end_ms}] {self.speaker}: {self.text[:20]!r}>"
+
+
+class Transcript:
+    """
+    컬럼형 전사 (start_ms, end_ms, speaker_codes 배열 + texts 리스트)
+    """
+
+    __slots__ = ("start_ms", "end_ms", "speaker_codes", "texts", "speakers")
+
+    def __init__(
+        self,
+        start_ms: np.ndarray,
+        end_ms: np.ndarray,
+        texts: List[str],
+        speaker_codes: np.ndarray = None,
+        speakers: List[str] = None,
+    ):
+        """
+        Args:
+            start_ms: 시작 시간 배열 (밀리초)
+            end_ms: 종료 시간 배열 (밀리초)
+            texts: 텍스트 리스트
+            speaker_codes: 화자 코드 배열 (None이면 전부 NO_SPEAKER)
+            speakers: 화자 코드 → 라벨 (예: ["speaker_00", "speaker_01"])
+        """
+        self.start_ms = np.asarray(start_ms, dtype=np.int64)
+        self.end_ms = np.asarray(end_ms, dtype=np.int64)
+        self.texts = list(texts)
+        if speaker_codes is None:
+            speaker_codes = np.full(len(self.texts), NO_SPEAKER, dtype=np.int32)
+        self.speaker_codes = np.asarray(speaker_codes, dtype=np.int32)
+        self.speakers = list(speakers or [])
+        if not (len(self.start_ms) == len(self.end_ms) == len(self.texts) == len(self.speaker_codes)):
+            raise ValueError("Transcript columns must have the same length")
+
+    # ---------- 생성 ----------
+
+    @classmethod
+    def empty(cls) -> "Transcript":
+        return cls(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), [])
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Sequence]) -> "Transcript":
+        """(start_ms, end_ms, text) 레코드 (stt.Segment) → Transcript"""
+        segments = list(segments)
+        if not segments:
+            return cls.empty()
+        return cls(
+            np.fromiter((s[0] for s in segments), dtype=np.int64, count=len(segments)),
+            np.fromiter((s[1] for s in segments), dtype=np.int64, count=len(segments)),
+            [s[2] for s in segments],
+        )
+
+    @classmethod
+    def from_dicts(cls, segments: Iterable[Dict]) -> "Transcript":
+        """[{"speaker", "start", "end", "text"}, ...] (초 단위) → Transcript"""
+        segments = list(segments)
+        labels: Dict[str, int] = {}
+        codes = []
+        for seg in segments:
+            speaker = seg.get("speaker")
+            codes.append(NO_SPEAKER if speaker is None else labels.setdefault(speaker, len(labels)))
+        return cls(
+            np.round(np.array([seg.get("start", 0.0) for seg in segments], dtype=np.float64) * 1000),
+            np.round(np.array([seg.get("end", 0.0) for seg in segments], dtype=np.float64) * 1000),
+            [seg.get("text", "") for seg in segments],
+            np.array(codes, dtype=np.int32),
+            list(labels),
+        )
+
+    @classmethod
+    def from_text(cls, text: str) -> "Transcript":
+        """
+        타임스탬프 TXT ([hh:mm:ss.mmm - hh:mm:ss.mmm] 텍스트) → Transcript
+
+        형식에 맞지 않는 라인은 건너뜁니다.
+        """
+        rows = re_transcript_line.findall(text)
+        if not rows:
+            return cls.empty()
+        starts, ends, texts = zip(*rows)
+        return cls(_timestamps_to_ms(starts), _timestamps_to_ms(ends), list(texts))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Transcript":
+        """.npz 또는 타임스탬프 TXT 파일 로드"""
+        if path.suffix == ".npz":
+            return cls.load(path)
+        return cls.from_text(path.read_text(encoding="utf-8"))
+
+    # ---------- 저장/로드 ----------
+
+    def save(self, path: Path) -> Path:
+        """.npz로 저장 (압축)"""
+        text_blob, text_offsets = _pack_strings(self.texts)
+        speaker_blob, speaker_offsets = _pack_strings(self.speakers)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                start_ms=self.start_ms,
+                end_ms=self.end_ms,
+                speaker_codes=self.speaker_codes,
+                text_blob=text_blob,
+                text_offsets=text_offsets,
+                speaker_blob=speaker_blob,
+                speaker_offsets=speaker_offsets,
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "Transcript":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["start_ms"],
+                data["end_ms"],
+                _unpack_strings(data["text_blob"], data["text_offsets"]),
+                data["speaker_codes"],
+                _unpack_strings(data["speaker_blob"], data["speaker_offsets"]),
+            )
+
+    # ---------- 변환 ----------
+
+    def to_dicts(self) -> List[Dict]:
+        """[{"speaker", "start", "end", "text"}, ...] (화자 없는 세그먼트는 speaker 생략)"""
+        return [seg.to_dict() for seg in self]
+
+    def start_seconds(self) -> np.ndarray:
+        return self.start_ms / 1000.0
+
+    def end_seconds(self) -> np.ndarray:
+        return self.end_ms / 1000.0
+
+    def speaker_labels(self, unknown: str = "UNKNOWN") -> List[str]:
+        """세그먼트별 화자 라벨 리스트"""
+        labels = self.speakers + [unknown]  # NO_SPEAKER(-1) → unknown
+        return [labels[c] for c in self.speaker_codes.tolist()]
+
+    def speaker_code(self, label: str) -> int:
+        """화자 라벨 → 코드 (없으면 NO_SPEAKER)"""
+        try:
+            return self.speakers.index(label)
+        except ValueError:
+            return NO_SPEAKER
+
+    # ---------- 조회 ----------
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[TranscriptSegment]:
+        return (TranscriptSegment(self, i) for i in range(len(self.texts)))
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]):
+        """
+        정수 → 세그먼트 뷰, 슬라이스/인덱스 배열/bool 마스크 → 새 Transcript (화자 라벨 공유)
+        """
+        if isinstance(key, (int, np.integer)):
+            index = int(key)
+            if index < 0:
+                index += len(self.texts)
+            if not 0 <= index < len(self.texts):
+                raise IndexError(key)
+            return TranscriptSegment(self, index)
+        indices = np.arange(len(self.texts))[key]
+        return Transcript(
+            self.start_ms[indices],
+            self.end_ms[indices],
+            [self.texts[i] for i in indices.tolist()],
+            self.speaker_codes[indices],
+            self.speakers,
+        )
+
+    def between(self, start: float, end: float) -> "Transcript":
+        """[start, end) 초 구간과 겹치는 세그먼트"""
+        start_ms, end_ms = round(start * 1000), round(end * 1000)
+        return self[(self.start_ms < end_ms) & (self.end_ms > start_ms)]
+
+    def for_speaker(self, *labels: str) -> "Transcript":
+        """지정한 화자(들)의 세그먼트"""
+        codes = [self.speaker_code(label) for label in labels]
+        return self[np.isin(self.speaker_codes, codes)]
+
+    def speaker_indices(self) -> Dict[str, np.ndarray]:
+        """화자 라벨 → 세그먼트 인덱스 배열 (등장 순서, 화자 없는 세그먼트 제외)"""
+        order = np.argsort(self.speaker_codes, kind="stable")
+        codes = self.speaker_codes[order]
+        bounds = np.searchsorted(codes, np.arange(len(self.speakers) + 1))
+        return {
+            label: order[bounds[code]:bounds[code + 1]]
+            for code, label in enumerate(self.speakers)
+            if bounds[code + 1] > bounds[code]
+        }
+
+    def __repr__(self):
+        return f"<Transcript segments={len(self)} speakers={len(self.speakers)}>"
@@ -0,0 +1,153 @@
+"""
+전사 라인 중복 제거 인덱스 (STT Step 4 보조)
+
+기존 후처리는 새 라인마다 남은 라인 전체와 비교했습니다 (매번 재정규화, 양방향 부분 문자열 검사, O(n²)).
+이 인덱스는 라인마다 정규화를 한 번만 하고, 같은 판정(완전 일치 또는 어느 한쪽이 다른 쪽에 포함)을
+해시 조회로 처리합니다.
+
+- 완전 일치: set
+- 남은 라인 p가 현재 라인에 포함 (p in cur): p마다 가장 드문 q-gram 하나(anchor)로 색인 →
+  현재 라인의 q-gram으로 후보 p만 조회 후 검증
+- 현재 라인이 남은 라인에 포함 (cur in p): q-gram → 라인 집합 색인에서
+  현재 라인의 가장 드문 q-gram (후보가 많으면 두 번째로 드문 q-gram과의 교집합)만 검증
+- q보다 짧은 라인은 길이별 set / 짧은 부분 문자열 set으로 처리
+
+window를 주면 최근 window개 남은 라인과만 비교합니다 (기존 동작과 달라질 수 있음, 메모리/시간 상한용).
+"""
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+
+Q = 3  # q-gram 길이
+_INTERSECT_MIN = 16  # 후보가 이보다 많으면 두 번째로 드문 q-gram과 교집합
+
+
+class DedupIndex:
+    """
+    남은(kept) 라인 정규화 문자열 색인
+
+    is_duplicate(cur)는 기존 후처리의 판정과 같습니다:
+        남은 라인 중 하나라도 cur == p, cur in p, p in cur 이면 중복
+    """
+
+    def __init__(self, q: int = Q):
+        self.q = q
+        self.kept: List[str] = []
+        self.exact: Set[str] = set()
+        self.has_empty = False
+
+        # q-gram → 그 q-gram을 포함한 남은 라인 id (cur in p 검사)
+        self.postings: Dict[str, Set[int]] = {}
+        # q-gram → 그 q-gram을 anchor로 가진 남은 라인 id (p in cur 검사)
+        self.anchors: Dict[str, List[int]] = {}
+        # q보다 짧은 남은 라인 (길이 → set)
+        self.short_kept: Dict[int, Set[str]] = {}
+        # 남은 라인들의 길이 q 미만 부분 문자열 전체
+        self.short_subs: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.kept)
+
+    def _grams(self, s: str) -> Set[str]:
+        q = self.q
+        return {s[i: i + q] for i in range(len(s) - q + 1)}
+
+    def _contains_kept(self, cur: str) -> bool:
+        """남은 라인 중 cur의 부분 문자열인 것이 있는지 (p in cur)"""
+        n = len(cur)
+        for length, strings in self.short_kept.items():
+            if length <= n and any(cur[i: i + length] in strings for i in range(n - length + 1)):
+                return True
+        if n < self.q:
+            return False
+        kept = self.kept
+        for g in self._grams(cur):
+            for pid in self.anchors.get(g, ()):
+                if kept[pid] in cur:
+                    return True
+        return False
+
+    def _contained_in_kept(self, cur: str) -> bool:
+        """cur이 남은 라인 중 하나의 부분 문자열인지 (cur in p)"""
+        if len(cur) < self.q:
+            return cur in self.short_subs
+        lists = []
+        for g in self._grams(cur):
+            ids = self.postings.get(g)
+            if not ids:
+                # 어떤 남은 라인에도 없는 q-gram → 포함될 수 없음
+                return False
+            lists.append(ids)
+        lists.sort(key=len)
+        candidates = lists[0]
+        if len(lists) > 1 and len(candidates) > _INTERSECT_MIN:
+            # 가장 드문 두 q-gram을 모두 가진 라인만 검증
+            candidates = candidates & lists[1]
+        kept = self.kept
+        return any(cur in kept[pid] for pid in candidates)
+
+    def is_duplicate(self, cur: str) -> bool:
+        if not self.kept:
+            return False
+        # 빈 문자열은 모든 문자열에 포함됨 (기존 `in` 판정과 동일)
+        if self.has_empty or not cur:
+            return True
+        if cur in self.exact:
+            return True
+        return self._contains_kept(cur) or self._contained_in_kept(cur)
+
+    def add(self, cur: str):
+        pid = len(self.kept)
+        self.kept.append(cur)
+        self.exact.add(cur)
+        if not cur:
+            self.has_empty = True
+            return
+
+        n = len(cur)
+        for length in range(1, min(self.q - 1, n) + 1):
+            self.short_subs.update(cur[i: i + length] for i in range(n - length + 1))
+
+        if n < self.q:
+            self.short_kept.setdefault(n, set()).add(cur)
+            return
+
+        grams = self._grams(cur)
+        anchor = min(grams, key=lambda g: (len(self.postings.get(g, ())), g))
+        self.anchors.setdefault(anchor, []).append(pid)
+        for g in grams:
+            self.postings.setdefault(g, set()).add(pid)
+
+
+class WindowDedup:
+    """최근 window개 남은 라인과만 비교 (기존 판정식 그대로, O(n · window))"""
+
+    def __init__(self, window: int):
+        self.recent: Deque[str] = deque(maxlen=window)
+
+    def is_duplicate(self, cur: str) -> bool:
+        return any(cur == p or cur in p or p in cur for p in self.recent)
+
+    def add(self, cur: str):
+        self.recent.append(cur)
+
+
+def dedup_keep_flags(norms: List[str], window: Optional[int] = None) -> List[bool]:
+    """
+    정규화된 라인 리스트 → 라인별 유지 여부
+
+    Args:
+        norms: norm_for_compare를 거친 라인 문자열
+        window: 최근 남은 라인 비교 개수 (None/0이면 전체와 비교, 기존 동작과 동일)
+
+    Returns:
+        norms와 같은 길이의 bool 리스트 (True면 유지)
+    """
+    index = WindowDedup(window) if window else DedupIndex()
+    flags = []
+    for cur in norms:
+        dup = index.is_duplicate(cur)
+        if not dup:
+            index.add(cur)
+        flags.append(not dup)
+    return flags
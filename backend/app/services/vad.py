@@ -0,0 +1,159 @@
+"""
+VAD 엔진 (전처리 Step 2 보조)
+- int16 배열을 복사 없이 프레임 단위 2차원 뷰로 변환
+- RMS 에너지 게이트: 명백한 무음 프레임은 webrtcvad 호출 생략
+- pad 팽창(dilation)은 컨볼루션 한 번으로 처리
+"""
+from typing import Optional
+import numpy as np
+import webrtcvad
+
+
+# 이 값보다 조용한 프레임(dBFS, RMS 기준)은 webrtcvad에 넘기지 않고 무음 처리
+# None이면 게이트 비활성화 (모든 프레임을 webrtcvad로 판정, 기존 동작과 동일)
+ENERGY_GATE_DBFS = -60.0
+
+# 무음 구간이 시작된 뒤 이 프레임 수까지는 webrtcvad로 넘김
+# (webrtcvad의 hangover가 무음 구간 초반에도 voiced를 유지하므로, 이를 소진시킨 뒤부터 게이트 적용)
+GATE_HANGOVER_FRAMES = 10
+
+# RMS 계산 시 한 번에 float로 변환할 프레임 수 (메모리 상한)
+_RMS_BLOCK_FRAMES = 65536
+
+
+def frame_view(x_i16: np.ndarray, frame_len: int) -> np.ndarray:
+    """
+    int16 배열을 (n_frames, frame_len) 뷰로 변환 (복사 없음)
+
+    마지막 프레임 미만의 잔여 샘플은 제외됩니다.
+    """
+    n_frames = len(x_i16) // frame_len
+    x = np.ascontiguousarray(x_i16)
+    return np.lib.stride_tricks.as_strided(
+        x,
+        shape=(n_frames, frame_len),
+        strides=(x.strides[0] * frame_len, x.strides[0]),
+        writeable=False,
+    )
+
+
+def frame_rms_dbfs(frames_i16: np.ndarray) -> np.ndarray:
+    """프레임별 RMS 에너지 (dBFS)"""
+    rms = np.empty(len(frames_i16), dtype=np.float32)
+    for start in range(0, len(frames_i16), _RMS_BLOCK_FRAMES):
+        block = frames_i16[start: start + _RMS_BLOCK_FRAMES].astype(np.float32)
+        rms[start: start + len(block)] = np.sqrt(np.mean(block * block, axis=1))
+    return 20.0 * np.log10(rms / 32768.0 + 1e-12)
+
+
+def dilate_frames(voiced: np.ndarray, pad_frames: int) -> np.ndarray:
+    """voiced 프레임 앞뒤로 pad_frames만큼 유지 구간 확장 (배열 경계에서 잘림)"""
+    if pad_frames <= 0 or voiced.size == 0:
+        return voiced.copy()
+    padded = np.pad(voiced.astype(np.int32), pad_frames)
+    window = np.ones(2 * pad_frames + 1, dtype=np.int32)
+    return np.convolve(padded, window, mode="valid") > 0
+
+
+class VadEngine:
+    """
+    webrtcvad 래퍼 (프레임 분류 전용)
+
+    webrtcvad.Vad는 내부 상태(잡음 모델)를 가지므로, 스트리밍 처리 시에는
+    같은 인스턴스로 classify를 연속 호출해야 합니다.
+    """
+
+    def __init__(
+        self,
+        sr: int = 16000,
+        frame_ms: int = 20,
+        vad_aggr: int = 2,
+        energy_gate_dbfs: Optional[float] = ENERGY_GATE_DBFS,
+    ):
+        """
+        Args:
+            sr: 샘플레이트 (webrtcvad 지원: 8000, 16000, 32000, 48000)
+            frame_ms: 프레임 길이 (10, 20, 30ms)
+            vad_aggr: webrtcvad 공격성 (0~3)
+            energy_gate_dbfs: 에너지 게이트 임계값 (None이면 비활성화)
+        """
+        self.sr = sr
+        self.frame_len = int(sr * frame_ms / 1000)
+        self.energy_gate_dbfs = energy_gate_dbfs
+        self.vad = webrtcvad.Vad(vad_aggr)
+
+        # 직전 호출 끝에서 이어지는 무음 프레임 수 (스트리밍 시 게이트 연속성 유지)
+        self.quiet_run = 0
+
+        # 통계 (벤치마크/로그용)
+        self.frames_total = 0
+        self.frames_gated = 0
+
+    def _gate(self, frames_i16: np.ndarray) -> np.ndarray:
+        """webrtcvad 호출 없이 무음으로 확정할 프레임 (hangover 소진 이후의 조용한 프레임)"""
+        quiet = frame_rms_dbfs(frames_i16) < self.energy_gate_dbfs
+        k = GATE_HANGOVER_FRAMES
+        carry = min(self.quiet_run, k)
+        context = np.concatenate([np.ones(carry, dtype=np.int32), quiet.astype(np.int32)])
+        # 자신 포함 직전 k+1 프레임이 모두 조용하면 게이트
+        run = np.convolve(context, np.ones(k + 1, dtype=np.int32), mode="full")[: len(context)]
+        gated = run[carry:] == k + 1
+
+        if quiet.all():
+            self.quiet_run += len(quiet)
+        else:
+            self.quiet_run = len(quiet) - 1 - int(np.flatnonzero(~quiet)[-1])
+        return gated
+
+    def classify_frames(self, frames_i16: np.ndarray) -> np.ndarray:
+        """
+        (n_frames, frame_len) int16 프레임 배열 → 프레임별 voiced 여부
+        """
+        n_frames = len(frames_i16)
+        voiced = np.zeros(n_frames, dtype=bool)
+        if n_frames == 0:
+            return voiced
+
+        if self.energy_gate_dbfs is None:
+            candidates = np.arange(n_frames)
+        else:
+            candidates = np.flatnonzero(~self._gate(frames_i16))
+
+        # uint8 뷰로 넘겨 프레임마다 bytes 복사 없이 webrtcvad 호출 (len(buf)가 바이트 수여야 함)
+        frame_bytes = np.ascontiguousarray(frames_i16).view(np.uint8)
+        is_speech = self.vad.is_speech
+        sr = self.sr
+        for i in candidates:
+            if is_speech(frame_bytes[i], sr):
+                voiced[i] = True
+
+        self.frames_total += n_frames
+        self.frames_gated += n_frames - len(candidates)
+        return voiced
+
+    def classify(self, x_i16: np.ndarray) -> np.ndarray:
+        """int16 샘플 배열 → 전체 프레임별 voiced 여부 (잔여 샘플 제외)"""
+        return self.classify_frames(frame_view(x_i16, self.frame_len))
+
+
+def keep_mask(
+    x_i16: np.ndarray,
+    sr: int,
+    frame_ms: int,
+    vad_aggr: int,
+    pad_ms: int,
+    energy_gate_dbfs: Optional[float] = ENERGY_GATE_DBFS,
+) -> np.ndarray:
+    """
+    int16 오디오 → 샘플 단위 유지 마스크
+
+    Returns:
+        len(x_i16) 길이의 bool 배열 (프레임 미만 잔여 샘플은 False)
+    """
+    engine = VadEngine(sr, frame_ms, vad_aggr, energy_gate_dbfs)
+    voiced = engine.classify(x_i16)
+    keep = dilate_frames(voiced, pad_ms // frame_ms)
+
+    mask = np.zeros(len(x_i16), dtype=bool)
+    mask[: len(keep) * engine.frame_len] = np.repeat(keep, engine.frame_len)
+    return mask
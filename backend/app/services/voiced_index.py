@@ -0,0 +1,145 @@
+"""
+유지 구간 인덱스 (전처리 Step 2 산출물)
+
+전처리는 VAD로 유지된 샘플만 이어 붙이므로, 이후 모든 타임스탬프(STT, 화자 분리)는
+"압축 시간" 기준입니다. 이 인덱스는 원본에서 유지된 구간을 기록해 두어
+오디오를 다시 읽지 않고도 압축 시간 ↔ 원본 시간을 O(log n)으로 변환합니다.
+
+저장 형식: preprocessed.wav 옆의 preprocessed.intervals.npy
+    int64 배열 (n, 3) = [orig_start, orig_end, condensed_offset] (샘플 단위)
+"""
+from pathlib import Path
+from typing import List, Tuple, Union
+import numpy as np
+
+
+SR = 16000
+
+Number = Union[int, float]
+
+
+def intervals_path_for(preprocessed_wav: Path) -> Path:
+    """전처리 WAV에 대응하는 인덱스 파일 경로"""
+    return preprocessed_wav.with_suffix(".intervals.npy")
+
+
+def runs_from_mask(mask: np.ndarray, base: int = 0) -> List[Tuple[int, int]]:
+    """bool 배열에서 연속된 True 구간 [(start, end), ...] 추출 (base만큼 평행 이동)"""
+    if mask.size == 0:
+        return []
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [(int(s) + base, int(e) + base) for s, e in zip(starts, ends)]
+
+
+class VoicedIntervalIndex:
+    """
+    원본 유지 구간 ↔ 압축 오프셋 매핑
+
+    변환 함수는 스칼라(float 초)와 numpy 배열 모두 받으며,
+    내부적으로 np.searchsorted(이진 탐색)를 사용합니다.
+    """
+
+    def __init__(self, intervals: np.ndarray, sr: int = SR):
+        """
+        Args:
+            intervals: (n, 3) int64 배열 [orig_start, orig_end, condensed_offset] (샘플 단위)
+            sr: 샘플레이트
+        """
+        self.intervals = np.asarray(intervals, dtype=np.int64).reshape(-1, 3)
+        self.sr = sr
+        self.orig_start = self.intervals[:, 0]
+        self.orig_end = self.intervals[:, 1]
+        self.condensed_offset = self.intervals[:, 2]
+
+    # ---------- 생성 ----------
+
+    @classmethod
+    def from_runs(cls, runs: List[Tuple[int, int]], sr: int = SR) -> "VoicedIntervalIndex":
+        """원본 샘플 구간 리스트 [(start, end), ...] → 인덱스 (압축 오프셋은 누적 길이)"""
+        if not runs:
+            return cls(np.zeros((0, 3), dtype=np.int64), sr)
+        arr = np.asarray(runs, dtype=np.int64)
+        lengths = arr[:, 1] - arr[:, 0]
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return cls(np.column_stack([arr, offsets]), sr)
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, sr: int = SR) -> "VoicedIntervalIndex":
+        """샘플 단위 유지 마스크 → 인덱스"""
+        return cls.from_runs(runs_from_mask(mask), sr)
+
+    @classmethod
+    def full(cls, total_samples: int, sr: int = SR) -> "VoicedIntervalIndex":
+        """전체 유지 (VAD fallback 시)"""
+        return cls.from_runs([(0, total_samples)] if total_samples > 0 else [], sr)
+
+    # ---------- 저장/로드 ----------
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(str(path), self.intervals)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, sr: int = SR) -> "VoicedIntervalIndex":
+        return cls(np.load(str(path)), sr)
+
+    @classmethod
+    def for_preprocessed(cls, preprocessed_wav: Path, sr: int = SR) -> "VoicedIntervalIndex":
+        """preprocessed.wav 옆의 인덱스 로드"""
+        return cls.load(intervals_path_for(preprocessed_wav), sr)
+
+    # ---------- 정보 ----------
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    @property
+    def condensed_samples(self) -> int:
+        if len(self.intervals) == 0:
+            return 0
+        return int(self.condensed_offset[-1] + self.orig_end[-1] - self.orig_start[-1])
+
+    @property
+    def condensed_duration(self) -> float:
+        return self.condensed_samples / self.sr
+
+    def junctions(self) -> np.ndarray:
+        """압축 오디오에서 구간이 이어 붙여진 지점 (샘플 단위, 첫 구간 제외)"""
+        return self.condensed_offset[1:].copy()
+
+    # ---------- 시간 변환 ----------
+
+    def condensed_to_original(self, t: Union[Number, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        압축 시간(초) → 원본 시간(초)
+
+        압축 오디오 길이를 넘는 값은 마지막 구간 끝으로 고정됩니다.
+        """
+        if len(self.intervals) == 0:
+            return t
+        c = np.round(np.asarray(t, dtype=np.float64) * self.sr).astype(np.int64)
+        i = np.clip(np.searchsorted(self.condensed_offset, c, side="right") - 1, 0, len(self.intervals) - 1)
+        orig = self.orig_start[i] + (c - self.condensed_offset[i])
+        orig = np.clip(orig, self.orig_start[i], self.orig_end[i])
+        result = orig / self.sr
+        return float(result) if np.ndim(result) == 0 else result
+
+    def original_to_condensed(self, t: Union[Number, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        원본 시간(초) → 압축 시간(초)
+
+        제거된 구간(무음)에 속한 시각은 다음 유지 구간의 시작으로 매핑됩니다.
+        """
+        if len(self.intervals) == 0:
+            return t
+        o = np.round(np.asarray(t, dtype=np.float64) * self.sr).astype(np.int64)
+        i = np.searchsorted(self.orig_end, o, side="right")
+        past_end = i >= len(self.intervals)
+        i = np.minimum(i, len(self.intervals) - 1)
+        within = np.clip(o - self.orig_start[i], 0, self.orig_end[i] - self.orig_start[i])
+        condensed = np.where(past_end, self.condensed_samples, self.condensed_offset[i] + within)
+        result = condensed / self.sr
+        return float(result) if np.ndim(result) == 0 else result
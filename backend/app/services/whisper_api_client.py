@@ -0,0 +1,299 @@
+"""
+Whisper API 전사 디스패처 (asyncio)
+
+- httpx.AsyncClient 하나로 연결 풀 공유 (청크마다 클라이언트를 새로 만들지 않음)
+- 적응형 동시성 (AIMD): 성공이 이어지면 +1, 429를 받으면 절반으로 줄이고 Retry-After 동안 전체 대기
+- 청크별 재시도: 429/5xx/타임아웃/연결 오류는 지터 포함 지수 백오프 후 재시도
+- 결과는 청크 순서대로 반환 (한 청크가 실패해도 나머지 청크는 끝까지 진행)
+- API 키는 요청 헤더로만 전달 (os.environ을 변경하지 않음)
+"""
+import asyncio
+import email.utils
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from app.core.config import settings
+
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# 429를 받았던 동시성으로 다시 올리기 전에 필요한 연속 성공 배수
+PROBE_FACTOR = 8
+
+
+class UploadChunk(NamedTuple):
+    """업로드할 청크 (파일명, 데이터 또는 파일 경로, MIME 타입)"""
+    filename: str
+    data: Union[bytes, Path]
+    mimetype: str
+
+
+class WhisperAPIError(RuntimeError):
+    """재시도 후에도 실패한 청크"""
+
+    def __init__(self, index: int, message: str, status_code: Optional[int] = None):
+        super().__init__(f"chunk {index}: {message}")
+        self.index = index
+        self.status_code = status_code
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더 (초 또는 HTTP 날짜) → 대기 초"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_MAX_SECONDS) -> float:
+    """지수 백오프 + full jitter (0 ~ min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 동시성 제한
+
+    - 성공: 현재 한도만큼 연속 성공하면 한도 +1 (max까지)
+      단, 마지막으로 429를 받았던 한도에 다시 도달하려면 PROBE_FACTOR배 더 많은 연속 성공 필요
+    - 429: 한도 절반 (min까지), Retry-After 동안 새 요청 시작 중단
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: Optional[int] = None):
+        self.limit = max(minimum, initial)
+        self.minimum = minimum
+        self.maximum = maximum or initial
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._ceiling: Optional[int] = None  # 마지막 429 당시 한도
+        self._cond = asyncio.Condition()
+
+        # 통계
+        self.rate_limited = 0
+        self.peak_in_flight = 0
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.limit:
+                    break
+                await self._cond.wait()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def on_success(self):
+        async with self._cond:
+            self._successes += 1
+            needed = self.limit
+            if self._ceiling is not None and self.limit + 1 >= self._ceiling:
+                needed *= PROBE_FACTOR
+            if self._successes >= needed and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    async def on_rate_limited(self, retry_after: Optional[float]):
+        async with self._cond:
+            self.rate_limited += 1
+            now = time.monotonic()
+            # 동시에 받은 429 여러 개로 한도가 연쇄적으로 줄지 않도록 한 번만 감소
+            if now - self._last_decrease > (retry_after or 1.0):
+                self._ceiling = self.limit
+                self.limit = max(self.minimum, self.limit // 2)
+                self._last_decrease = now
+            self._successes = 0
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            self._cond.notify_all()
+
+
+class WhisperAPIDispatcher:
+    """
+    Whisper API 비동기 전사 디스패처
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        model: str = "whisper-1",
+        language: str = "ko",
+    ):
+        """
+        Args:
+            api_key: OpenAI API 키
+            base_url: API 베이스 URL (None이면 settings.OPENAI_BASE_URL)
+            max_concurrency: 최대 동시 요청 수 (None이면 settings.WHISPER_API_CONCURRENCY)
+            max_retries: 청크별 최대 재시도 횟수 (None이면 settings.WHISPER_API_MAX_RETRIES)
+            timeout: 요청 타임아웃 (초, None이면 settings.WHISPER_API_TIMEOUT)
+        """
+        self.api_key = api_key
+        self.base_url = (base_url or settings.OPENAI_BASE_URL).rstrip("/")
+        self.max_concurrency = max_concurrency or settings.WHISPER_API_CONCURRENCY
+        self.max_retries = settings.WHISPER_API_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = timeout or settings.WHISPER_API_TIMEOUT
+        self.model = model
+        self.language = language
+
+        # 통계
+        self.attempts = 0
+        self.retries = 0
+        self.limiter: Optional[AdaptiveLimiter] = None
+
+    async def _post(self, client: httpx.AsyncClient, chunk: UploadChunk) -> httpx.Response:
+        # 파일 경로면 요청 직전에 읽음 (동시에 메모리에 올라가는 청크 수 = 동시 요청 수)
+        data = chunk.data.read_bytes() if isinstance(chunk.data, Path) else chunk.data
+        return await client.post(
+            f"{self.base_url}/audio/transcriptions",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            files={"file": (chunk.filename, data, chunk.mimetype)},
+            data={"model": self.model, "language": self.language, "response_format": "srt"},
+        )
+
+    async def _transcribe_one(self, client: httpx.AsyncClient, index: int, chunk: UploadChunk) -> str:
+        limiter = self.limiter
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            retry_after = None
+            status = None
+
+            await limiter.acquire()
+            self.attempts += 1
+            try:
+                resp = await self._post(client, chunk)
+                status = resp.status_code
+                if status == 200:
+                    await limiter.on_success()
+                    return resp.text
+                error = f"HTTP {status}: {resp.text[:200]}"
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = f"{type(e).__name__}: {e}"
+            finally:
+                await limiter.release()
+
+            if status == 429:
+                await limiter.on_rate_limited(retry_after)
+            elif status is not None and status not in RETRYABLE_STATUS:
+                raise WhisperAPIError(index, error, status)
+
+            if attempt == self.max_retries:
+                raise WhisperAPIError(index, f"{error} (재시도 {self.max_retries}회 초과)", status)
+
+            # Retry-After가 있으면 그 시간 + 지터 (동시에 깨어나 다시 429를 받지 않도록)
+            delay = retry_after + backoff_delay(0) if retry_after is not None else backoff_delay(attempt)
+            print(f"🔁 청크 {index} 재시도 {attempt + 1}/{self.max_retries} ({error}, {delay:.1f}초 후)")
+            await asyncio.sleep(delay)
+
+    async def transcribe_async(self, chunks: Sequence[UploadChunk], results: "queue.Queue" = None) -> List:
+        """
+        청크 전체 전사
+
+        Args:
+            chunks: 업로드 청크 리스트
+            results: 지정하면 청크가 끝날 때마다 (인덱스, SRT 또는 예외)를 넣음
+
+        Returns:
+            청크 순서대로 SRT 텍스트 또는 WhisperAPIError
+        """
+        self.limiter = AdaptiveLimiter(self.max_concurrency, maximum=self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            async def run(index: int, chunk: UploadChunk):
+                try:
+                    result = await self._transcribe_one(client, index, chunk)
+                except WhisperAPIError as e:
+                    result = e
+                except Exception as e:
+                    result = WhisperAPIError(index, f"{type(e).__name__}: {e}")
+                if results is not None:
+                    results.put((index, result))
+                return result
+
+            return await asyncio.gather(*(run(i, c) for i, c in enumerate(chunks)))
+
+    def transcribe(self, chunks: Sequence[UploadChunk]) -> List[str]:
+        """
+        동기 호출용: 모든 청크 전사 후 순서대로 SRT 반환 (실패 청크가 있으면 첫 실패 예외)
+        """
+        results = asyncio.run(self.transcribe_async(chunks))
+        for r in results:
+            if isinstance(r, Exception):
+                raise r
+        return results
+
+    def iter_transcribe(self, chunks: Sequence[UploadChunk]) -> Iterator[Tuple[int, str]]:
+        """
+        백그라운드 스레드의 이벤트 루프에서 전사하면서, 앞 청크부터 끝나는 대로 순서대로 반환
+
+        실패한 청크 차례가 되면 WhisperAPIError를 발생시킵니다 (이전 청크는 이미 반환된 상태).
+        """
+        results: "queue.Queue" = queue.Queue()
+
+        def run_loop():
+            try:
+                asyncio.run(self.transcribe_async(chunks, results))
+            except Exception as e:
+                results.put((None, e))
+
+        thread = threading.Thread(target=run_loop, daemon=True)
+        thread.start()
+
+        pending: Dict[int, object] = {}
+        next_index = 0
+        while next_index < len(chunks):
+            while next_index not in pending:
+                index, result = results.get()
+                if index is None:
+                    raise result
+                pending[index] = result
+            result = pending.pop(next_index)
+            if isinstance(result, Exception):
+                raise result
+            yield next_index, result
+            next_index += 1
+        thread.join()
+
+    def stats(self) -> Dict:
+        limiter = self.limiter
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "rate_limited": limiter.rate_limited if limiter else 0,
+            "final_concurrency": limiter.limit if limiter else self.max_concurrency,
+            "peak_in_flight": limiter.peak_in_flight if limiter else 0,
+        }
@@ -0,0 +1,135 @@
+"""
+처리 작업 워커 프로세스
+
+사용법:
+    python -m app.worker
+    python -m app.worker --concurrency 2 --worker-id gpu-0
+
+DB 작업 큐(processing_jobs)에서 작업을 가져와 process_audio_pipeline을 실행합니다.
+여러 워커(컨테이너/프로세스)를 띄우면 작업을 나눠 가져가고, 스테이지별 동시 실행 수는
+JOB_STAGE_CONCURRENCY로 전체 워커에 걸쳐 제한됩니다. SIGTERM/SIGINT를 받으면 새 작업을 가져가지 않고
+실행 중인 작업이 끝난 뒤 종료합니다 (강제 종료되면 lease 만료 후 다른 워커가 이어서 실행).
+"""
+import app.patch_torch  # noqa: F401  (API 서버와 같은 torch 패치 먼저 적용)
+
+import argparse
+import os
+import signal
+import socket
+import threading
+import traceback
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.api.v1.processing import process_audio_pipeline
+from app.models.processing_job import JobStatus
+from app.services.job_queue import (
+    JobCancelled, JobLease, LeaseLost, claim_next_job, complete_job, fail_job, mark_cancelled,
+    mark_file_stopped, will_retry,
+)
+
+
+def run_job(job, worker_id: str):
+    """
+    작업 하나 실행 (lease heartbeat + 스테이지 gate)
+    """
+    lease = JobLease(job.id, worker_id, SessionLocal)
+    lease.start()
+    print(f"▶️ 작업 시작: job={job.id}, file_id={job.file_id} ({job.attempts}/{job.max_attempts}회차)")
+
+    db = SessionLocal()
+    try:
+        process_audio_pipeline(
+            job.file_id,
+            job.user_id,
+            job.whisper_mode,
+            job.diarization_mode,
+            skip_stt=job.skip_stt,
+            stage_gate=lease.gate,
+            final_attempt=not will_retry(job),
+        )
+        complete_job(db, job.id, worker_id)
+        print(f"✅ 작업 완료: job={job.id}")
+    except LeaseLost as e:
+        # 다른 워커가 작업을 가져갔으므로 작업 행은 건드리지 않음
+        print(f"⚠️ 작업 중단 (lease 상실): job={job.id} ({e})")
+    except JobCancelled as e:
+        if not lease.lost.is_set() and mark_cancelled(db, job.id, worker_id):
+            mark_file_stopped(db, job.audio_file_id, cancelled=True)
+            db.commit()
+        print(f"🛑 작업 중단: job={job.id} ({e})")
+    except Exception as e:
+        traceback.print_exc()
+        status = fail_job(db, job, worker_id, f"{type(e).__name__}: {e}")
+        # 재시도 예정이던 실행 중에 취소 요청이 들어왔으면 파이프라인은 "재시도 대기 중"만 기록하므로
+        # 작업이 최종 종료되면 파일도 취소 API와 같은 상태로 맞춤
+        if status in (JobStatus.CANCELLED, JobStatus.FAILED):
+            mark_file_stopped(db, job.audio_file_id, status == JobStatus.CANCELLED, str(e))
+            db.commit()
+    finally:
+        lease.stop()
+        db.close()
+
+
+def worker_loop(worker_id: str, stop: threading.Event):
+    """작업 가져오기 → 실행 반복 (대기 작업이 없으면 JOB_POLL_INTERVAL만큼 대기)"""
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, worker_id)
+        except Exception as e:
+            print(f"⚠️ 작업 조회 실패: {e}")
+            db.rollback()
+            job = None
+        finally:
+            db.close()
+
+        if job is None:
+            stop.wait(settings.JOB_POLL_INTERVAL)
+            continue
+
+        try:
+            run_job(job, worker_id)
+        except Exception:
+            # 작업 상태 기록 자체가 실패해도 루프는 유지 (lease 만료 후 재시도됨)
+            traceback.print_exc()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 작업 수 (기본: JOB_WORKER_CONCURRENCY)")
+    parser.add_argument("--worker-id", default=None, help="워커 이름 (기본: 호스트명-PID)")
+    args = parser.parse_args()
+
+    concurrency = max(1, args.concurrency or settings.JOB_WORKER_CONCURRENCY)
+    base_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+    stop = threading.Event()
+
+    def handle_signal(signum, _frame):
+        print(f"🛑 종료 신호 수신 ({signal.Signals(signum).name}): 실행 중인 작업이 끝나면 종료합니다")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    print(f"👷 워커 시작: {base_id} (동시 작업 {concurrency}개, 스테이지 제한 {settings.JOB_STAGE_CONCURRENCY})")
+    threads = [
+        threading.Thread(
+            target=worker_loop,
+            args=(base_id if concurrency == 1 else f"{base_id}/{i}", stop),
+            name=f"worker-{i}",
+        )
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        # join()은 신호 처리를 막으므로 짧게 나눠서 대기
+        while thread.is_alive():
+            thread.join(timeout=1.0)
+    print("👋 워커 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+STT ↔ 화자 구간 정렬 벤치마크: 기존 포인터 병합 / REST 이중 루프 vs searchsorted 정렬 엔진
+
+사용법:
+    python benchmarks/bench_alignment.py --segments 50000 --speakers 6
+    python benchmarks/bench_alignment.py --segments 50000 --jitter 0.5 --rest-sample 2000
+
+합성 타임라인:
+- 실제 화자 구간(정답)을 만들고, STT 세그먼트는 화자 구간과 무관하게 잘라 일부가 화자 경계에 걸치도록 함
+- 화자 분리 결과는 정답 구간 경계를 ±--jitter초 흔든 것 (인접 구간끼리 겹치거나 틈이 생김)
+
+측정 항목:
+- 시간: 기존 merge 포인터 루프, REST 엔드포인트 이중 루프 (고르게 뽑은 --rest-sample개 세그먼트로 측정 후 전체로 환산),
+  assign_turns, merge_stt_with_diarization (분할 없음/화자 경계 분할)
+- 누락 단어 수 (기존 포인터 병합은 구간 시작 전에 시작한 세그먼트를 버림)
+- 화자 정확도: 세그먼트별 배정 화자 == 정답 구간 중 가장 많이 겹친 화자
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.alignment import assign_turns  # noqa: E402
+from app.services.transcript import Transcript  # noqa: E402
+
+WORDS = ["회의", "일정", "예산", "검토", "다음", "주", "보고서", "정리", "민서", "씨", "확인", "부탁드립니다"]
+
+
+def make_timeline(n_segments: int, n_speakers: int, jitter: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+
+    # STT 세그먼트 (밀리초)
+    durations = rng.integers(800, 6000, n_segments)
+    gaps = rng.integers(0, 400, n_segments)
+    seg_start = np.cumsum(np.concatenate(([0], (durations + gaps)[:-1])))
+    seg_end = seg_start + durations
+    texts = [" ".join(rng.choice(WORDS, rng.integers(2, 12))) for _ in range(n_segments)]
+    transcript = Transcript(seg_start, seg_end, texts)
+
+    # 정답 화자 구간: 세그먼트와 무관한 길이로 교대
+    total = int(seg_end[-1])
+    turn_lengths = rng.integers(1500, 15000, total // 1500 + 2)
+    bounds = np.concatenate(([0], np.cumsum(turn_lengths)))
+    bounds = bounds[: np.searchsorted(bounds, total) + 1]
+    true_codes = np.zeros(len(bounds) - 1, dtype=np.int64)
+    for i in range(1, len(true_codes)):
+        true_codes[i] = (true_codes[i - 1] + rng.integers(1, n_speakers)) % n_speakers
+
+    # 화자 분리 결과: 경계를 흔들어 겹침/틈 생성
+    shake = (rng.uniform(-jitter, jitter, (len(true_codes), 2)) * 1000).astype(np.int64)
+    diar_start = np.maximum(bounds[:-1] + shake[:, 0], 0)
+    diar_end = np.maximum(bounds[1:] + shake[:, 1], diar_start + 100)
+    turns = [
+        {"speaker_label": f"speaker_{int(c):02d}", "start": float(s) / 1000, "end": float(e) / 1000}
+        for s, e, c in zip(diar_start, diar_end, true_codes)
+    ]
+
+    truth_idx = assign_turns(seg_start, seg_end, bounds[:-1], bounds[1:], true_codes)
+    truth = [f"speaker_{int(c):02d}" for c in true_codes[truth_idx]]
+    return transcript, {"turns": turns, "embeddings": {}}, truth
+
+
+def legacy_pointer_merge(segments, diarization_result):
+    """기존 merge_stt_with_diarization (구간별 포인터)"""
+    merged = []
+    stt_idx = 0
+    for turn in diarization_result["turns"]:
+        parts = []
+        while stt_idx < len(segments):
+            stt = segments[stt_idx]
+            if turn["start"] <= stt["start"] < turn["end"]:
+                parts.append(stt["text"].strip())
+                stt_idx += 1
+            elif stt["start"] >= turn["end"]:
+                break
+            else:
+                stt_idx += 1
+        if parts:
+            merged.append({"speaker": turn["speaker_label"], "text": " ".join(parts)})
+    return merged
+
+
+def legacy_rest_labels(segments, turns):
+    """기존 REST 엔드포인트 (세그먼트마다 전체 구간 탐색)"""
+    labels = []
+    for stt in segments:
+        speaker_label = "UNKNOWN"
+        for diar in turns:
+            if diar["start"] <= stt["start"] < diar["end"]:
+                speaker_label = diar["speaker_label"]
+                break
+        labels.append(speaker_label)
+    return labels
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def word_count(texts):
+    return sum(len(text.split()) for text in texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=50000)
+    parser.add_argument("--speakers", type=int, default=6)
+    parser.add_argument("--jitter", type=float, default=0.3, help="화자 분리 경계 오차 (초)")
+    parser.add_argument("--rest-sample", type=int, default=2000, help="REST 이중 루프 측정 세그먼트 수")
+    args = parser.parse_args()
+
+    # merge_stt_with_diarization은 diarization 모듈(torch 패치 포함)에 있으므로 필요할 때 import
+    from app.services.diarization import merge_stt_with_diarization
+
+    transcript, diarization_result, truth = make_timeline(args.segments, args.speakers, args.jitter)
+    turns = diarization_result["turns"]
+    segments = transcript.to_dicts()
+    total_words = word_count(transcript.texts)
+    print(f"세그먼트: {len(transcript)}, 화자 구간: {len(turns)}, 단어: {total_words}")
+    print(f"{'method':>24} {'time(s)':>9} {'dropped words':>14} {'accuracy':>9}")
+
+    merged, t = timed(legacy_pointer_merge, segments, diarization_result)
+    print(f"{'legacy merge':>24} {t:>9.3f} {total_words - word_count(m['text'] for m in merged):>14}")
+
+    # 앞쪽 세그먼트일수록 탐색이 빨리 끝나므로 전체에서 고르게 샘플링
+    step = max(1, len(segments) // max(1, args.rest_sample))
+    sample = segments[::step]
+    labels, t = timed(legacy_rest_labels, sample, turns)
+    t_full = t * len(segments) / max(1, len(sample))
+    accuracy = np.mean([a == b for a, b in zip(labels, truth[::step])])
+    print(f"{'legacy REST loop (est.)':>24} {t_full:>9.3f} {'-':>14} {accuracy:>9.3f}")
+
+    codes = {}
+    turn_codes = [codes.setdefault(turn["speaker_label"], len(codes)) for turn in turns]
+    names = list(codes)
+    turn_starts = [turn["start"] for turn in turns]
+    turn_ends = [turn["end"] for turn in turns]
+    turn_idx, t = timed(
+        assign_turns, transcript.start_seconds(), transcript.end_seconds(), turn_starts, turn_ends, turn_codes
+    )
+    accuracy = np.mean([names[turn_codes[i]] == b for i, b in zip(turn_idx.tolist(), truth)])
+    print(f"{'assign_turns':>24} {t:>9.3f} {0:>14} {accuracy:>9.3f}")
+
+    for split in (False, True):
+        merged, t = timed(merge_stt_with_diarization, transcript, diarization_result, split_at_turns=split)
+        label = "merge (split)" if split else "merge"
+        print(f"{label:>24} {t:>9.3f} {total_words - word_count(merged.texts):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Whisper API 디스패처 테스트: 지연/429/5xx를 주입하는 로컬 스텁 서버
+
+사용법:
+    python benchmarks/bench_api_dispatcher.py --chunks 40 --capacity 3 --latency 0.3 --error-rate 0.1
+    python benchmarks/bench_api_dispatcher.py --serve 8765   # 스텁 서버만 실행 (OPENAI_BASE_URL=http://127.0.0.1:8765/v1)
+
+스텁 서버 동작:
+- 요청마다 --latency초(±50%) 지연 후 업로드 파일명을 담은 SRT 반환
+- 동시 처리 중인 요청이 --capacity개 이상이면 429 + Retry-After: --retry-after
+- --error-rate 확률로 500 반환
+
+확인 항목:
+- 모든 청크가 순서대로 반환되는지 (SRT 안의 파일명으로 확인)
+- 시도/재시도/429 횟수, 최종 동시성, 최대 동시 요청 수, 소요 시간
+"""
+import argparse
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.whisper_api_client import UploadChunk, WhisperAPIDispatcher  # noqa: E402
+
+
+class StubWhisperHandler(BaseHTTPRequestHandler):
+    capacity = 3
+    latency = 0.3
+    error_rate = 0.0
+    retry_after = 1
+
+    active = 0
+    stats = {"requests": 0, "ok": 0, "429": 0, "500": 0}
+    lock = threading.Lock()
+
+    def _reply(self, status: int, body: str, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = StubWhisperHandler
+        with cls.lock:
+            cls.stats["requests"] += 1
+            over = cls.active >= cls.capacity
+            if not over:
+                cls.active += 1
+        if over:
+            with cls.lock:
+                cls.stats["429"] += 1
+            self._reply(429, "rate limited", {"Retry-After": str(cls.retry_after)})
+            return
+        try:
+            time.sleep(cls.latency * random.uniform(0.5, 1.5))
+            if random.random() < cls.error_rate:
+                with cls.lock:
+                    cls.stats["500"] += 1
+                self._reply(500, "server error")
+                return
+            m = re.search(rb'filename="([^"]+)"', body)
+            name = m.group(1).decode() if m else "?"
+            with cls.lock:
+                cls.stats["ok"] += 1
+            self._reply(200, f"1\n00:00:00,000 --> 00:00:01,000\n{name}\n")
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub(port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubWhisperHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--chunk-kb", type=int, default=256)
+    parser.add_argument("--capacity", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--serve", type=int, help="스텁 서버만 이 포트로 실행")
+    args = parser.parse_args()
+
+    StubWhisperHandler.capacity = args.capacity
+    StubWhisperHandler.latency = args.latency
+    StubWhisperHandler.error_rate = args.error_rate
+    StubWhisperHandler.retry_after = args.retry_after
+
+    if args.serve:
+        server = start_stub(args.serve)
+        print(f"스텁 서버: http://127.0.0.1:{args.serve}/v1 (Ctrl+C로 종료)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    server = start_stub()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    payload = bytes(args.chunk_kb * 1024)
+    chunks = [UploadChunk(f"chunk_{i:04d}.flac", payload, "audio/flac") for i in range(args.chunks)]
+    dispatcher = WhisperAPIDispatcher(
+        "test-key", base_url=base_url, max_concurrency=args.concurrency, max_retries=8, timeout=30.0
+    )
+
+    start = time.perf_counter()
+    results = list(dispatcher.iter_transcribe(chunks))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    in_order = [i for i, _ in results] == list(range(args.chunks)) and all(
+        c.filename in srt for c, (_, srt) in zip(chunks, results)
+    )
+    print(f"청크: {args.chunks}, 서버 용량: {args.capacity}, 시작 동시성: {args.concurrency}")
+    print(f"소요 시간: {elapsed:.2f}초 (이상적: {args.chunks / args.capacity * args.latency:.2f}초)")
+    print(f"디스패처: {dispatcher.stats()}")
+    print(f"서버: {StubWhisperHandler.stats}")
+    print("✅ 순서/내용 일치" if in_order else "❌ 순서/내용 불일치")
+    sys.exit(0 if in_order else 1)
+
+
+if __name__ == "__main__":
+    main()
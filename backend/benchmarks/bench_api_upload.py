@@ -0,0 +1,125 @@
+"""
+Whisper API 업로드 포맷 벤치마크: wav vs flac vs opus (로컬 모의 전사 서버)
+
+사용법:
+    python benchmarks/bench_api_upload.py --input /app/temp/<file_id>/preprocessed.wav \\
+        --formats wav flac opus --bitrate 32k
+
+--input이 없으면 합성 회의 오디오(--minutes)를 사용합니다 (benchmarks/bench_preprocessing.py와 같은 생성기).
+
+측정 항목 (포맷별):
+- 청크 수 (인코딩 바이트 기준 25MB 상한으로 계획)
+- 전송 바이트 합계와 wav 대비 비율
+- 인코딩 시간, 모의 서버 업로드 시간
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.audio_codec import encode_chunk, estimate_bytes_per_second  # noqa: E402
+from app.services.chunk_planner import plan_chunks  # noqa: E402
+from app.services.pcm_store import open_pcm  # noqa: E402
+
+SR = 16000
+MAX_BYTES = 25 * 1024 * 1024
+FAKE_SRT = "1\n00:00:00,000 --> 00:00:01,000\n테스트\n"
+
+
+class MockTranscriptionHandler(BaseHTTPRequestHandler):
+    """POST /v1/audio/transcriptions → 본문을 읽고 고정 SRT 반환"""
+
+    received_bytes = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        with self.lock:
+            MockTranscriptionHandler.received_bytes += len(body)
+        if len(body) > MAX_BYTES + 64 * 1024:
+            self.send_response(413)
+            self.end_headers()
+            return
+        data = FAKE_SRT.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="전처리된 16kHz mono WAV")
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--formats", nargs="+", default=["wav", "flac", "opus"])
+    parser.add_argument("--bitrate", default="32k")
+    parser.add_argument("--target-seconds", type=float, default=1500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockTranscriptionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/audio/transcriptions"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = args.input
+        if input_path is None:
+            from bench_preprocessing import make_synthetic_meeting
+
+            input_path = Path(tmp) / "synthetic.wav"
+            make_synthetic_meeting(input_path, args.minutes)
+
+        pcm = open_pcm(input_path)
+        print(f"오디오 길이: {len(pcm) / SR / 60:.1f}분")
+        print(f"{'format':>7} {'B/s(est)':>9} {'chunks':>7} {'MB sent':>9} {'vs wav':>7} {'encode(s)':>10} {'upload(s)':>10}")
+
+        wav_bytes = None
+        with httpx.Client(timeout=300.0) as client:
+            for fmt in args.formats:
+                bps = estimate_bytes_per_second(pcm, fmt, SR, args.bitrate)
+                plan = plan_chunks(
+                    pcm, SR, target_seconds=args.target_seconds, max_bytes=MAX_BYTES, bytes_per_second=bps
+                )
+
+                MockTranscriptionHandler.received_bytes = 0
+                encode_s = upload_s = 0.0
+                for chunk in plan:
+                    start = time.perf_counter()
+                    enc = encode_chunk(pcm[chunk.start:chunk.end], f"chunk_{chunk.index:04d}", fmt, SR, args.bitrate)
+                    encode_s += time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    resp = client.post(
+                        url,
+                        files={"file": (enc.filename, enc.data, enc.mimetype)},
+                        data={"model": "whisper-1", "language": "ko", "response_format": "srt"},
+                    )
+                    resp.raise_for_status()
+                    upload_s += time.perf_counter() - start
+
+                if fmt == "wav":
+                    wav_bytes = MockTranscriptionHandler.received_bytes
+                ratio = f"{MockTranscriptionHandler.received_bytes / wav_bytes:.2f}" if wav_bytes else "-"
+                print(
+                    f"{fmt:>7} {bps:>9.0f} {len(plan):>7} {MockTranscriptionHandler.received_bytes / 2**20:>9.1f} "
+                    f"{ratio:>7} {encode_s:>10.2f} {upload_s:>10.2f}"
+                )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
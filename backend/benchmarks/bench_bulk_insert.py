@@ -0,0 +1,165 @@
+"""
+분석 결과 저장 벤치마크: ORM 객체 add vs BulkWriter (insert executemany 배치)
+
+사용법:
+    python benchmarks/bench_bulk_insert.py
+    python benchmarks/bench_bulk_insert.py --segments 20000 --batch-size 500
+    python benchmarks/bench_bulk_insert.py --url "mysql+pymysql://user:pw@localhost:3306/bench"
+
+- 긴 회의 하나 분량의 STT 세그먼트 / 화자 구간(임베딩 JSON) / 감지된 이름(문맥 JSON) / 최종 회의록을 생성
+- 같은 데이터를 (1) 행마다 db.add(Model(...)) 후 커밋, (2) BulkWriter.replace 후 커밋 으로 저장해
+  테이블별 시간과 행/초 비교 (기본은 SQLite 파일 DB, --url로 MySQL 지정 가능)
+- 검증: 두 방식의 저장 결과가 같은지, 삭제 + insert 도중 실패하면 롤백으로 기존 행이 그대로 남는지
+"""
+import argparse
+import importlib
+import pkgutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+
+def make_rows(segments: int, speakers: int, seed: int = 0):
+    """모델별 (컬럼, 행 튜플) 생성"""
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.uniform(0.5, 4.0, segments))
+    ends = starts + rng.uniform(0.3, 3.0, segments)
+    texts = [f"세그먼트 {i} 회의 발화 내용 " + "가나다" * int(n) for i, n in enumerate(rng.integers(1, 20, segments))]
+    labels = [f"SPEAKER_{i % speakers:02d}" for i in rng.integers(0, speakers, segments)]
+    embeddings = {f"SPEAKER_{i:02d}": rng.standard_normal(192).round(5).tolist() for i in range(speakers)}
+
+    stt = (
+        ("word_index", "text", "start_time", "end_time"),
+        [(i, texts[i], float(starts[i]), float(ends[i])) for i in range(segments)],
+    )
+    diar = (
+        ("speaker_label", "start_time", "end_time", "embedding"),
+        [(labels[i], float(starts[i]), float(ends[i]), embeddings[labels[i]]) for i in range(0, segments, 2)],
+    )
+    context = [{"index": -1, "speaker": "SPEAKER_00", "text": "안녕하세요", "time": 1.0}] * 5
+    names = (
+        ("detected_name", "speaker_label", "time_detected", "context_before", "context_after"),
+        [(f"이름{i % 7}씨", labels[i], float(starts[i]), context, context) for i in range(0, segments, 50)],
+    )
+    final = (
+        ("segment_index", "speaker_name", "start_time", "end_time", "text"),
+        [(i, f"참석자{labels[i][-2:]}", float(starts[i]), float(ends[i]), texts[i]) for i in range(segments)],
+    )
+    return stt, diar, names, final
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=10000, help="STT 세그먼트 수 (3시간 회의 ≈ 5,000~10,000)")
+    parser.add_argument("--speakers", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=None, help="배치 크기 (기본: BULK_INSERT_BATCH_SIZE)")
+    parser.add_argument("--url", default=None, help="DB URL (기본: 임시 SQLite 파일)")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import app.models
+    from app.db.base import Base
+    from app.models.audio_file import AudioFile
+    from app.models.user import User
+    from app.models.stt import STTResult
+    from app.models.diarization import DiarizationResult
+    from app.models.tagging import DetectedName
+    from app.models.transcript import FinalTranscript
+    from app.services.bulk_writer import BulkWriter
+
+    # AudioFile relationship 대상 모델을 모두 등록
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+    url = args.url or f"sqlite:///{Path(tempfile.mkdtemp(prefix='bench_bulk_')) / 'bulk.db'}"
+    engine = create_engine(url)
+    models = [STTResult, DiarizationResult, DetectedName, FinalTranscript]
+    Base.metadata.create_all(engine, tables=[User.__table__, AudioFile.__table__] + [m.__table__ for m in models])
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    db = SessionLocal()
+    user = User(email="bench@example.com", full_name="bench")
+    db.add(user)
+    db.flush()
+    files = []
+    for name in ("orm", "bulk"):
+        audio_file = AudioFile(
+            user_id=user.id, original_filename=f"{name}.wav",
+            file_path=f"/app/uploads/{name}.wav", file_size=0, mimetype="audio/wav",
+        )
+        db.add(audio_file)
+        files.append(audio_file)
+    db.commit()
+    orm_file, bulk_file = (f.id for f in files)
+
+    datasets = dict(zip(models, make_rows(args.segments, args.speakers)))
+    print(f"세그먼트 {args.segments}개, 화자 {args.speakers}명, DB: {engine.dialect.name}")
+    print(f"{'table':>20} {'rows':>7} {'orm(ms)':>9} {'bulk(ms)':>9} {'orm 행/초':>11} {'bulk 행/초':>11} {'speedup':>8}")
+
+    totals = {"orm": 0.0, "bulk": 0.0}
+    for model, (columns, rows) in datasets.items():
+        # (1) 행마다 ORM 객체 add (기존 방식)
+        started = time.perf_counter()
+        db.query(model).filter(model.audio_file_id == orm_file).delete()
+        for row in rows:
+            db.add(model(audio_file_id=orm_file, **dict(zip(columns, row))))
+        db.commit()
+        orm_seconds = time.perf_counter() - started
+        db.expunge_all()
+
+        # (2) BulkWriter (삭제 + 배치 insert, 같은 트랜잭션)
+        writer = BulkWriter(db, batch_size=args.batch_size)
+        started = time.perf_counter()
+        writer.replace(model, bulk_file, columns, rows)
+        db.commit()
+        bulk_seconds = time.perf_counter() - started
+
+        totals["orm"] += orm_seconds
+        totals["bulk"] += bulk_seconds
+        print(
+            f"{model.__tablename__:>20} {len(rows):>7} {orm_seconds * 1000:>9.1f} {bulk_seconds * 1000:>9.1f} "
+            f"{len(rows) / orm_seconds:>11,.0f} {len(rows) / bulk_seconds:>11,.0f} {orm_seconds / bulk_seconds:>7.1f}x"
+        )
+
+    total_rows = sum(len(rows) for _, rows in datasets.values())
+    print(f"{'total':>20} {total_rows:>7} {totals['orm'] * 1000:>9.1f} {totals['bulk'] * 1000:>9.1f} "
+          f"{total_rows / totals['orm']:>11,.0f} {total_rows / totals['bulk']:>11,.0f} {totals['orm'] / totals['bulk']:>7.1f}x")
+
+    # 검증 1: 두 방식의 저장 결과가 같은지 (id/created_at 제외)
+    same = True
+    for model, (columns, _) in datasets.items():
+        def snapshot(audio_file_id):
+            order = model.start_time if hasattr(model, "start_time") else model.time_detected
+            return [
+                tuple(getattr(r, c) for c in columns)
+                for r in db.query(model).filter(model.audio_file_id == audio_file_id).order_by(order, model.id).all()
+            ]
+        same = same and snapshot(orm_file) == snapshot(bulk_file)
+        db.expunge_all()
+
+    # 검증 2: 삭제 + insert 도중 실패하면 기존 행이 그대로 남는지
+    before = db.query(STTResult).filter(STTResult.audio_file_id == bulk_file).count()
+    columns, rows = datasets[STTResult]
+    broken = rows[:10] + [(10, None, 0.0, 1.0)]  # text NOT NULL 위반
+    try:
+        BulkWriter(db, batch_size=4).replace(STTResult, bulk_file, columns, broken)
+        db.commit()
+        rolled_back = False
+    except Exception:
+        db.rollback()
+        rolled_back = db.query(STTResult).filter(STTResult.audio_file_id == bulk_file).count() == before
+
+    print(f"검증: 결과 동일={'OK' if same else 'FAIL'}, 실패 시 롤백={'OK' if rolled_back else 'FAIL'}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
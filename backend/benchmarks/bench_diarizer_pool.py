@@ -0,0 +1,78 @@
+"""
+상주 화자 분리 모델 풀 벤치마크: 연속 회의에서 모델 로드 vs 추론 시간
+
+사용법:
+    python benchmarks/bench_diarizer_pool.py --input /app/temp/<file_id>/preprocessed.wav --mode senko --runs 3
+    python benchmarks/bench_diarizer_pool.py --fake --runs 5 --idle-timeout 2 --gap 3
+
+- 실제 모드: 같은 파일로 run_diarization을 --runs번 연속 실행 (첫 실행만 모델 로드, 이후 재사용)
+- --fake: 모델 없이 풀 동작만 확인 (로드 --fake-load초, 추론 --fake-infer초).
+  --gap을 --idle-timeout보다 길게 주면 실행 사이에 모델이 해제되어 다시 로드됩니다.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.diarizer_pool import DiarizerPool  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="전처리된 16kHz mono WAV")
+    parser.add_argument("--mode", default="senko", choices=["senko", "nemo"])
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--idle-timeout", type=float, default=None, help="풀 유휴 해제 시간 (기본: settings)")
+    parser.add_argument("--gap", type=float, default=0.0, help="실행 사이 대기 (초)")
+    parser.add_argument("--fake", action="store_true")
+    parser.add_argument("--fake-load", type=float, default=1.0)
+    parser.add_argument("--fake-infer", type=float, default=0.2)
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services import diarizer_pool
+
+    if args.idle_timeout is not None:
+        settings.DIARIZER_IDLE_TIMEOUT = args.idle_timeout
+    pool = DiarizerPool(settings.DIARIZER_IDLE_TIMEOUT)
+    diarizer_pool._diarizer_pool_instance = pool
+
+    if args.fake:
+        def run_once():
+            with pool.use("fake", "cpu", lambda: time.sleep(args.fake_load) or object()):
+                time.sleep(args.fake_infer)
+    else:
+        if args.input is None:
+            parser.error("--input is required unless --fake")
+        from app.services.diarization import run_diarization
+
+        def run_once():
+            run_diarization(args.input, device=args.device, mode=args.mode)
+
+    print(f"{'run':>4} {'model':>14} {'reused':>7} {'load(s)':>8} {'infer(s)':>9} {'total(s)':>9}")
+    for i in range(args.runs):
+        if i and args.gap:
+            time.sleep(args.gap)
+        start = time.perf_counter()
+        run_once()
+        total = time.perf_counter() - start
+        for timing in pool.last_timing.values():
+            print(
+                f"{i + 1:>4} {timing['model']:>14} {str(timing['reused']):>7} "
+                f"{timing['load_seconds']:>8.2f} {timing['inference_seconds']:>9.2f} {total:>9.2f}"
+            )
+
+    stats = pool.stats()
+    print(
+        f"📊 로드 {stats['loads']}회 ({stats['load_seconds']:.2f}s), 재사용 {stats['reuses']}회, "
+        f"해제 {stats['evictions']}회, 누적 추론 {stats['inference_seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+file_id 조회 벤치마크: LIKE '%uuid%' 스캔 vs file_uuid 인덱스 vs 프로세스 내 LRU
+
+사용법:
+    python benchmarks/bench_file_lookup.py
+    python benchmarks/bench_file_lookup.py --rows 100000 --lookups 2000
+    python benchmarks/bench_file_lookup.py --url "mysql+pymysql://user:pw@localhost:3306/bench"
+
+- audio_files에 업로드 UUID 파일 --rows개 생성 (/app/uploads/{uuid}.wav, file_uuid 채움)
+- 무작위 UUID --lookups개를 (1) 기존 LIKE 조회 (file_path/original_filename),
+  (2) get_audio_file (캐시 없이 file_uuid 인덱스), (3) get_audio_file (LRU 적중 + PK 조회),
+  (4) resolve_audio_file_id (LRU 적중, DB 조회 없음) 로 찾아 p50/p99 지연 비교
+  (기본은 SQLite 파일 DB, --url로 MySQL 지정 가능)
+- 검증: 네 방식이 같은 행을 찾는지, 숫자 ID/없는 UUID/삭제된 파일의 캐시가 올바르게 처리되는지
+"""
+import argparse
+import importlib
+import pkgutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+
+def measure(lookup, file_ids):
+    """조회 함수를 file_id마다 실행해 (결과 id 목록, 지연 ms 배열)"""
+    found = []
+    latencies = np.empty(len(file_ids))
+    for i, file_id in enumerate(file_ids):
+        started = time.perf_counter()
+        found.append(lookup(file_id))
+        latencies[i] = (time.perf_counter() - started) * 1000
+    return found, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="audio_files 행 수")
+    parser.add_argument("--lookups", type=int, default=1000, help="조회 횟수 (방식마다)")
+    parser.add_argument("--like-lookups", type=int, default=200, help="LIKE 조회 횟수 (느리므로 따로 지정)")
+    parser.add_argument("--url", default=None, help="DB URL (기본: 임시 SQLite 파일)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import app.models
+    from app.db.base import Base
+    from app.models.audio_file import AudioFile, FileStatus
+    from app.models.user import User
+    from app.services.file_resolver import (
+        forget_file_id, get_audio_file, get_file_id_cache, resolve_audio_file_id,
+    )
+
+    # AudioFile relationship 대상 모델을 모두 등록
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+    url = args.url or f"sqlite:///{Path(tempfile.mkdtemp(prefix='bench_lookup_')) / 'lookup.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[User.__table__, AudioFile.__table__])
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    db = SessionLocal()
+    user = User(email="bench@example.com", full_name="bench")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    rng = np.random.default_rng(args.seed)
+    uuids = [str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(args.rows)]
+    started = time.perf_counter()
+    statement = AudioFile.__table__.insert()
+    for start in range(0, args.rows, 5000):
+        db.execute(statement, [
+            {
+                "user_id": user_id, "file_uuid": file_uuid, "original_filename": f"회의_{start + i}.m4a",
+                "file_path": f"/app/uploads/{file_uuid}.wav", "file_size": 0, "mimetype": "audio/wav",
+                "status": FileStatus.COMPLETED,
+            }
+            for i, file_uuid in enumerate(uuids[start:start + 5000])
+        ])
+    db.commit()
+    ids = {u: i for u, i in db.query(AudioFile.file_uuid, AudioFile.id)}
+    print(f"audio_files {args.rows:,}행 생성 ({time.perf_counter() - started:.1f}s), DB: {engine.dialect.name}")
+
+    picks = [uuids[i] for i in rng.integers(0, args.rows, args.lookups)]
+    like_picks = picks[:args.like_lookups]
+    cache = get_file_id_cache()
+
+    def like_lookup(file_id):
+        audio_file = db.query(AudioFile).filter(
+            (AudioFile.file_path.like(f"%{file_id}%")) |
+            (AudioFile.original_filename.like(f"%{file_id}%"))
+        ).first()
+        return audio_file.id if audio_file else None
+
+    def indexed_lookup(file_id):
+        cache.clear()
+        audio_file = get_audio_file(db, file_id)
+        return audio_file.id if audio_file else None
+
+    def cached_lookup(file_id):
+        audio_file = get_audio_file(db, file_id)
+        return audio_file.id if audio_file else None
+
+    def resolve_lookup(file_id):
+        return resolve_audio_file_id(db, file_id)
+
+    results = {}
+    results["LIKE '%uuid%'"] = measure(like_lookup, like_picks)
+    db.expunge_all()
+    results["file_uuid 인덱스"] = measure(indexed_lookup, picks)
+    db.expunge_all()
+    for file_id in picks:
+        resolve_audio_file_id(db, file_id)  # LRU 채우기
+    results["LRU + PK 조회"] = measure(cached_lookup, picks)
+    db.expunge_all()
+    results["LRU (ID만)"] = measure(resolve_lookup, picks)
+
+    baseline = np.median(results["LIKE '%uuid%'"][1])
+    print(f"{'방식':>16} {'조회':>6} {'p50(ms)':>9} {'p99(ms)':>9} {'조회/초':>10} {'vs LIKE':>8}")
+    for name, (_, latencies) in results.items():
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(
+            f"{name:>16} {len(latencies):>6} {p50:>9.3f} {p99:>9.3f} "
+            f"{len(latencies) / (latencies.sum() / 1000):>10,.0f} {baseline / p50:>7.0f}x"
+        )
+    print(f"캐시: {cache.summary()}")
+
+    # 검증 1: 모든 방식이 같은 행을 찾는지
+    expected = [ids[u] for u in picks]
+    same = all(found == expected[:len(found)] for found, _ in results.values())
+
+    # 검증 2: 숫자 ID는 그대로, 없는 UUID는 None
+    some_id = expected[0]
+    numeric_ok = get_audio_file(db, str(some_id)).id == some_id and resolve_audio_file_id(db, some_id) == some_id
+    missing_ok = get_audio_file(db, str(uuid.uuid4())) is None
+
+    # 검증 3: 다른 프로세스에서 삭제된 파일 (캐시에만 남음) → None, 같은 UUID로 다시 만들면 새 행
+    victim = picks[0]
+    resolve_audio_file_id(db, victim)
+    db.query(AudioFile).filter(AudioFile.id == ids[victim]).delete()
+    db.commit()
+    stale_ok = get_audio_file(db, victim) is None
+    recreated = AudioFile(
+        user_id=user_id, file_uuid=victim, original_filename="재업로드.m4a",
+        file_path=f"/app/uploads/{victim}.wav", file_size=0, mimetype="audio/wav",
+    )
+    db.add(recreated)
+    db.commit()
+    stale_ok = stale_ok and get_audio_file(db, victim).id == recreated.id
+    forget_file_id(victim)
+
+    print(
+        f"검증: 결과 동일={'OK' if same else 'FAIL'}, 숫자 ID={'OK' if numeric_ok else 'FAIL'}, "
+        f"없는 UUID={'OK' if missing_ok else 'FAIL'}, 삭제된 파일 캐시={'OK' if stale_ok else 'FAIL'}"
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
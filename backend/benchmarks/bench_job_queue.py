@@ -0,0 +1,273 @@
+"""
+작업 큐 벤치마크/검증: 워커 프로세스 + lease 회수 + 우선순위 + 취소 + 스테이지 동시 실행 제한
+
+사용법:
+    python benchmarks/bench_job_queue.py
+    python benchmarks/bench_job_queue.py --jobs 30 --workers 3 --stage-seconds 0.3
+
+- SQLite 파일 DB에 processing_jobs 테이블만 만들어 app.services.job_queue를 그대로 사용
+  (운영에서는 같은 코드가 MySQL에서 SELECT ... FOR UPDATE SKIP LOCKED로 동작)
+- 워커 프로세스마다 가짜 파이프라인(preprocess → {stt, diarization} → save, 스테이지는 순수 파이썬 연산)을
+  StageDAG + JobLease.gate로 실행
+- 실행 중 워커 하나를 SIGKILL → lease 만료 후 다른 워커가 그 작업을 다시 가져가는지 확인
+- 대기 작업 1개와 실행 중 작업 1개를 취소
+- 검증: 모든 작업이 최종 상태, 취소 외 작업은 모두 성공, 전체 워커에서 stt 동시 실행 수 ≤ 제한,
+  같은 시점에 대기 중이던 작업은 우선순위 순으로 시작
+- API 응답성: 같은 부하를 API 프로세스 스레드(inline)에서 돌릴 때와 워커 프로세스(queue)로 보낼 때
+  API 프로세스의 짧은 요청 처리 지연(p50/p99)을 비교
+"""
+import argparse
+import importlib
+import json
+import multiprocessing as mp
+import os
+import pkgutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+
+def configure(db_path: str, lock_dir: str, stage_limits: str):
+    """각 프로세스에서 settings를 벤치마크용으로 조정하고 세션 팩토리 반환"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.config import settings
+    import app.models
+
+    # AudioFile relationship 대상 모델을 모두 등록
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+    settings.JOB_LEASE_SECONDS = 2.0
+    settings.JOB_HEARTBEAT_SECONDS = 0.3
+    settings.JOB_RETRY_BACKOFF = 0.2
+    settings.JOB_LOCK_DIR = lock_dir
+    settings.JOB_STAGE_CONCURRENCY = stage_limits
+
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"timeout": 30, "check_same_thread": False})
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def busy(seconds: float):
+    """GIL을 잡는 순수 파이썬 연산 (모델 추론의 CPU 부하 흉내)"""
+    end = time.perf_counter() + seconds
+    x = 0
+    while time.perf_counter() < end:
+        for i in range(1000):
+            x += i * i
+    return x
+
+
+def fake_pipeline(stage_seconds: float, gate=None, log=None):
+    from app.services.stage_dag import ResourceBudget, StageDAG
+
+    def make(name, seconds):
+        def fn(_):
+            started = time.time()
+            busy(seconds)
+            if log is not None:
+                log(name, started, time.time())
+        return fn
+
+    dag = StageDAG("fake")
+    dag.add("preprocess", make("preprocess", stage_seconds * 0.5))
+    dag.add("stt", make("stt", stage_seconds), ["preprocess"])
+    dag.add("diarization", make("diarization", stage_seconds), ["preprocess"])
+    dag.add("save", make("save", stage_seconds * 0.2), ["stt", "diarization"])
+    dag.run(budget=ResourceBudget({"cpu": 64, "memory_mb": 1e9, "gpu_memory_mb": 1e9}), gate=gate)
+
+
+def worker_main(worker_id: str, db_path: str, lock_dir: str, stage_limits: str, stage_seconds: float, log_path: str):
+    from app.services.job_queue import (
+        JobCancelled, JobLease, claim_next_job, complete_job, fail_job, mark_cancelled,
+    )
+    SessionLocal = configure(db_path, lock_dir, stage_limits)
+    log_lock = threading.Lock()
+
+    def log(event: dict):
+        with log_lock, open(log_path, "a") as f:
+            f.write(json.dumps(event) + "\n")
+
+    idle_since = None
+    while True:
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, worker_id)
+        finally:
+            db.close()
+        if job is None:
+            idle_since = idle_since or time.time()
+            if time.time() - idle_since > 5:
+                return
+            time.sleep(0.05)
+            continue
+        idle_since = None
+        log({"event": "start", "job": job.id, "priority": job.priority, "worker": worker_id, "t": time.time()})
+
+        lease = JobLease(job.id, worker_id, SessionLocal)
+        lease.start()
+        db = SessionLocal()
+        try:
+            fake_pipeline(
+                stage_seconds, gate=lease.gate,
+                log=lambda name, s, e: log({"event": "stage", "job": job.id, "stage": name, "start": s, "end": e}),
+            )
+            complete_job(db, job.id, worker_id)
+        except JobCancelled:
+            mark_cancelled(db, job.id, worker_id)
+        except Exception as e:
+            fail_job(db, job, worker_id, str(e))
+        finally:
+            lease.stop()
+            db.close()
+
+
+def request_latency(duration: float) -> np.ndarray:
+    """
+    API 프로세스의 짧은 요청 처리 지연 측정 (ms)
+
+    5ms마다 깨어나 작은 응답(JSON 직렬화)을 만드는 데 걸린 시간에서 예정된 대기 시간을 뺀 값.
+    같은 프로세스에서 GIL을 잡는 작업이 돌면 깨어난 뒤 GIL을 얻기까지 기다리는 시간이 더해짐
+    """
+    latencies = []
+    end = time.perf_counter() + duration
+    payload = {"status": "stt", "progress": 42, "segments": list(range(200))}
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        time.sleep(0.005)
+        json.dumps(payload)
+        latencies.append((time.perf_counter() - start - 0.005) * 1000)
+    return np.array(latencies)
+
+
+def responsiveness(stage_seconds: float, jobs: int, workers: int, db_path: str, lock_dir: str):
+    """inline(API 프로세스 스레드) vs queue(워커 프로세스) 동안의 API 요청 지연"""
+    results = {}
+
+    threads = [threading.Thread(target=fake_pipeline, args=(stage_seconds,)) for _ in range(jobs)]
+    for t in threads:
+        t.start()
+    lat = request_latency(stage_seconds * 1.5)
+    for t in threads:
+        t.join()
+    results["inline"] = lat
+
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=busy, args=(stage_seconds * 2.5,)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    time.sleep(0.5)  # 프로세스 기동 이후 구간만 측정
+    lat = request_latency(stage_seconds * 1.5)
+    for p in procs:
+        p.join()
+    results["queue"] = lat
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--stage-seconds", type=float, default=0.4)
+    parser.add_argument("--stt-limit", type=int, default=1, help="전체 워커에서 stt 스테이지 동시 실행 수")
+    args = parser.parse_args()
+
+    from app.db.base import Base
+    from app.models.processing_job import ProcessingJob, JobStatus
+    from app.services.job_queue import enqueue_job, cancel_job, get_active_job
+
+    work = Path(tempfile.mkdtemp(prefix="bench_job_queue_"))
+    db_path, lock_dir, log_path = str(work / "jobs.db"), str(work / "locks"), str(work / "events.jsonl")
+    stage_limits = f"stt={args.stt_limit}"
+    SessionLocal = configure(db_path, lock_dir, stage_limits)
+    Base.metadata.create_all(SessionLocal.kw["bind"], tables=[ProcessingJob.__table__])
+
+    rng = np.random.default_rng(0)
+    db = SessionLocal()
+    enqueue_started = time.perf_counter()
+    for i in range(args.jobs):
+        enqueue_job(db, f"file-{i:03d}", 1, "local", "senko", priority=int(rng.integers(0, 3)))
+    enqueue_ms = (time.perf_counter() - enqueue_started) * 1000 / args.jobs
+    cancel_job(db, get_active_job(db, f"file-{args.jobs - 1:03d}"))  # 대기 중 취소
+
+    ctx = mp.get_context("spawn")
+    procs = {}
+    started = time.perf_counter()
+    for i in range(args.workers):
+        worker_id = f"w{i}"
+        procs[worker_id] = ctx.Process(
+            target=worker_main,
+            args=(worker_id, db_path, lock_dir, stage_limits, args.stage_seconds, log_path),
+        )
+        procs[worker_id].start()
+
+    # 첫 번째 워커가 작업을 잡으면 강제 종료 (lease 회수 확인용), 다른 실행 중 작업 하나는 취소
+    killed_job = cancelled_job = None
+    while killed_job is None or cancelled_job is None:
+        db.expire_all()
+        running = db.query(ProcessingJob).filter(ProcessingJob.status == JobStatus.RUNNING).all()
+        for job in running:
+            if killed_job is None and job.worker_id == "w0" and job.current_stage:
+                os.kill(procs["w0"].pid, signal.SIGKILL)
+                killed_job = job.id
+            elif cancelled_job is None and job.worker_id != "w0" and job.current_stage:
+                cancel_job(db, job)
+                cancelled_job = job.id
+        time.sleep(0.02)
+
+    for p in procs.values():
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    db.expire_all()
+    jobs = db.query(ProcessingJob).order_by(ProcessingJob.id).all()
+    counts = {}
+    for job in jobs:
+        counts[job.status.value] = counts.get(job.status.value, 0) + 1
+    events = [json.loads(line) for line in open(log_path)]
+
+    # stt 동시 실행 수 (시작/종료 이벤트 스윕)
+    marks = sorted(
+        [(e["start"], 1) for e in events if e["event"] == "stage" and e["stage"] == "stt"] +
+        [(e["end"], -1) for e in events if e["event"] == "stage" and e["stage"] == "stt"]
+    )
+    max_stt = int(np.max(np.cumsum([m for _, m in marks]))) if marks else 0
+
+    # 우선순위: 시작 순서대로 본 priority가 처음 몇 개(모두 대기 중이던 구간)에서 내림차순인지
+    starts = sorted((e for e in events if e["event"] == "start"), key=lambda e: e["t"])
+    first_priorities = [e["priority"] for e in starts[:args.jobs // 2]]
+
+    killed = next(j for j in jobs if j.id == killed_job)
+    print(f"작업 {args.jobs}개, 워커 {args.workers}개 (w0 강제 종료), 총 {elapsed:.1f}초, 등록 {enqueue_ms:.2f}ms/건")
+    print(f"최종 상태: {counts}")
+    print(f"강제 종료된 작업 job={killed_job}: {killed.status.value}, 시도 {killed.attempts}회")
+    print(f"실행 중 취소 job={cancelled_job}: {next(j for j in jobs if j.id == cancelled_job).status.value}")
+    print(f"stt 최대 동시 실행: {max_stt} (제한 {args.stt_limit})")
+    print(f"시작 순 우선순위 (앞쪽 절반): {first_priorities}")
+
+    ok = (
+        all(j.status in (JobStatus.SUCCEEDED, JobStatus.CANCELLED) for j in jobs)
+        and counts.get("cancelled", 0) == 2
+        and killed.status == JobStatus.SUCCEEDED and killed.attempts == 2
+        and max_stt <= args.stt_limit
+        and first_priorities == sorted(first_priorities, reverse=True)
+    )
+    print(f"검증: {'OK' if ok else 'FAIL'}")
+
+    lat = responsiveness(args.stage_seconds, args.workers, args.workers, db_path, lock_dir)
+    print(f"{'backend':>8} {'p50(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for name, values in lat.items():
+        print(f"{name:>8} {np.percentile(values, 50):>9.3f} {np.percentile(values, 99):>9.3f} {values.max():>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+전처리 벤치마크: 배치 모드 vs 스트리밍 모드
+
+사용법:
+    python benchmarks/bench_preprocessing.py --minutes 60 120 180
+
+측정 항목:
+- 최대 메모리 사용량 (RSS, 자식 프로세스별로 측정)
+- 처리 시간 (wall time)
+"""
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+SR = 16000
+
+
+def make_synthetic_meeting(path: Path, minutes: int, seed: int = 0):
+    """발화/침묵이 번갈아 나오는 합성 회의 오디오 생성 (블록 단위로 기록)"""
+    rng = np.random.default_rng(seed)
+    total = SR * 60 * minutes
+    with sf.SoundFile(str(path), "w", samplerate=SR, channels=1, subtype="PCM_16") as f:
+        written = 0
+        while written < total:
+            length = min(int(rng.integers(SR // 2, SR * 4)), total - written)
+            if rng.random() < 0.6:
+                t = np.arange(length) / SR
+                tone = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+                block = tone + 0.05 * rng.standard_normal(length)
+            else:
+                block = 0.002 * rng.standard_normal(length)
+            f.write(block.astype(np.float32))
+            written += length
+
+
+def _run(mode: str, input_path: str, output_path: str, queue):
+    from app.services.preprocessing import preprocess_audio
+
+    start = time.perf_counter()
+    _, original, processed = preprocess_audio(
+        Path(input_path), Path(output_path), streaming=(mode == "streaming")
+    )
+    elapsed = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((elapsed, peak_rss_mb, original, processed))
+
+
+def run_mode(mode: str, input_path: Path, work_dir: Path):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(mode, str(input_path), str(work_dir / f"{mode}.wav"), queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[10, 60])
+    args = parser.parse_args()
+
+    print(f"{'minutes':>8} {'mode':>10} {'wall(s)':>9} {'peakRSS(MB)':>12} {'orig(s)':>9} {'proc(s)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        for minutes in args.minutes:
+            input_path = work_dir / f"meeting_{minutes}m.wav"
+            make_synthetic_meeting(input_path, minutes)
+            for mode in ("batch", "streaming"):
+                elapsed, rss, original, processed = run_mode(mode, input_path, work_dir)
+                print(f"{minutes:>8} {mode:>10} {elapsed:>9.1f} {rss:>12.1f} {original:>9.1f} {processed:>9.1f}")
+            input_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+진행 상태 부하 테스트: 클라이언트별 상태 폴링 vs 진행 스트림(ProgressBroker, SSE)
+
+사용법:
+    python benchmarks/bench_progress_stream.py
+    python benchmarks/bench_progress_stream.py --clients 50 --files 10 --duration 20
+
+- SQLite 파일 DB에 처리 중인 파일 --files개 (audio_files + processing_jobs)를 만들고,
+  가짜 워커 스레드가 파일마다 processing_progress를 주기적으로 올림 (워커 프로세스가 DB에 기록하는 것과 같음)
+- polling: 클라이언트 --clients명이 각자 2초마다 GET /status/{file_id}와 같은 쿼리 실행
+  (LIKE로 AudioFile 조회 → 활성 작업 조회 → 대기 순번, 완료 시 화자 수/이름/닉네임 조회)
+- push: 같은 클라이언트가 ProgressBroker.subscribe로 구독 → 브로커가 주기마다 구독 중인 파일 전체의 진행 컬럼을
+  쿼리 한 번으로 확인하고, 바뀐 파일만 갱신 (실행 중 작업은 확인한 행으로, 완료 시에만 전체 조회)
+- 비교: 초당 DB 쿼리 수, 진행률 변경이 클라이언트에 보이기까지의 지연 (p50/p95)
+- 같은 프로세스 파이프라인이 publish하는 경우(inline 모드)의 전달 지연도 측정
+"""
+import argparse
+import asyncio
+import importlib
+import pkgutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+POLL_SECONDS = 2.0  # 프론트엔드 폴링 간격
+
+
+def setup(db_path: str, files: int):
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    import app.models
+    from app.db.base import Base
+    from app.models.audio_file import AudioFile, FileStatus
+    from app.models.user import User
+    from app.models.processing_job import ProcessingJob, JobStatus
+    from app.models.tagging import DetectedName, SpeakerMapping
+
+    # AudioFile relationship 대상 모델을 모두 등록
+    for module in pkgutil.iter_modules(app.models.__path__):
+        importlib.import_module(f"app.models.{module.name}")
+
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine, tables=[
+        User.__table__, AudioFile.__table__, ProcessingJob.__table__,
+        DetectedName.__table__, SpeakerMapping.__table__,
+    ])
+
+    # 조회 쿼리만 집계 (가짜 워커의 쓰기는 두 모드가 같으므로 제외)
+    counter = {"queries": 0, "worker": 0}
+    lock = threading.Lock()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        key = "worker" if threading.current_thread().name == "fake-worker" else "queries"
+        with lock:
+            counter[key] += 1
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    db = SessionLocal()
+    user = User(email="bench@example.com", full_name="bench")
+    db.add(user)
+    db.flush()
+    file_ids = {}
+    for i in range(files):
+        file_id = str(uuid.uuid4())
+        audio_file = AudioFile(
+            user_id=user.id, original_filename=f"meeting_{i}.wav", file_path=f"/app/uploads/{file_id}.wav",
+            file_size=0, mimetype="audio/wav", status=FileStatus.PROCESSING,
+            processing_step="stt", processing_progress=0, processing_message="STT 진행 중...",
+        )
+        db.add(audio_file)
+        db.flush()
+        db.add(ProcessingJob(
+            audio_file_id=audio_file.id, file_id=file_id, user_id=user.id, whisper_mode="local",
+            diarization_mode="senko", status=JobStatus.RUNNING, worker_id="w0", current_stage="stt",
+        ))
+        file_ids[file_id] = audio_file.id
+    db.commit()
+    db.close()
+    return SessionLocal, counter, file_ids
+
+
+def status_queries(db, file_id: str):
+    """GET /status/{file_id} 가 작업 큐 모드에서 실행하는 쿼리와 같은 조회"""
+    from sqlalchemy import func
+    from app.models.audio_file import AudioFile
+    from app.models.processing_job import JobStatus
+    from app.models.tagging import DetectedName, SpeakerMapping
+    from app.services.job_queue import get_active_job, queue_position
+    from app.services.progress_broker import running_job_status
+
+    audio_file = db.query(AudioFile).filter(
+        (AudioFile.file_path.like(f"%{file_id}%")) |
+        (AudioFile.original_filename.like(f"%{file_id}%"))
+    ).first()
+    job = get_active_job(db, file_id)
+    if job is not None:
+        if job.status == JobStatus.QUEUED:
+            return {
+                "status": "queued",
+                "step": audio_file.processing_message,
+                "progress": audio_file.processing_progress,
+                "job_id": job.id,
+                "queue_position": queue_position(db, job),
+            }
+        return running_job_status({
+            "processing_step": audio_file.processing_step,
+            "processing_message": audio_file.processing_message,
+            "processing_progress": audio_file.processing_progress,
+            "job_id": job.id,
+            "job_status": job.status,
+            "current_stage": job.current_stage,
+            "attempts": job.attempts,
+            "cancel_requested": job.cancel_requested,
+        })
+
+    speaker_count = db.query(func.count(SpeakerMapping.id)).filter(
+        SpeakerMapping.audio_file_id == audio_file.id
+    ).scalar() or 0
+    names = db.query(DetectedName.detected_name).filter(DetectedName.audio_file_id == audio_file.id).distinct().all()
+    mappings = db.query(SpeakerMapping).filter(SpeakerMapping.audio_file_id == audio_file.id).all()
+    return {
+        "status": audio_file.status.value,
+        "progress": 100,
+        "speaker_count": speaker_count,
+        "detected_names": [n[0] for n in names],
+        "detected_nicknames": [m.nickname for m in mappings if m.nickname],
+    }
+
+
+def fake_worker(SessionLocal, file_ids, duration: float, step_seconds: float, written: dict, stop: threading.Event):
+    """파일마다 step_seconds 간격으로 진행률 +1, 마지막에 완료 처리 (진행률별 기록 시각 저장)"""
+    from app.models.audio_file import AudioFile, FileStatus
+    from app.models.processing_job import ProcessingJob, JobStatus
+
+    db = SessionLocal()
+    steps = int(duration / step_seconds)
+    for step in range(1, steps + 1):
+        if stop.is_set():
+            break
+        started = time.perf_counter()
+        for file_id in file_ids:
+            audio_file = db.query(AudioFile).filter(AudioFile.file_path.like(f"%{file_id}%")).first()
+            audio_file.processing_progress = step
+            if step == steps:
+                audio_file.status = FileStatus.COMPLETED
+                audio_file.processing_step = "completed"
+                db.query(ProcessingJob).filter(ProcessingJob.file_id == file_id).update(
+                    {ProcessingJob.status: JobStatus.SUCCEEDED}
+                )
+        db.commit()
+        now = time.time()
+        for file_id in file_ids:
+            written[(file_id, step)] = now
+        time.sleep(max(0.0, step_seconds - (time.perf_counter() - started)))
+    db.close()
+
+
+def staleness(written: dict, seen: list) -> np.ndarray:
+    """진행률 변경이 기록된 뒤 클라이언트가 처음 본 시각까지 (ms)"""
+    first = {}
+    for client, file_id, _, progress, t in seen:
+        first.setdefault((client, file_id, progress), t)
+    delays = [
+        (t - written[(file_id, progress)]) * 1000
+        for (client, file_id, progress), t in first.items()
+        if (file_id, progress) in written
+    ]
+    return np.array(delays) if delays else np.array([0.0])
+
+
+async def run_polling(SessionLocal, file_ids, clients: int, duration: float):
+    seen = []
+    loop = asyncio.get_running_loop()
+
+    def poll(file_id):
+        db = SessionLocal()
+        try:
+            return status_queries(db, file_id)
+        finally:
+            db.close()
+
+    async def client(index: int):
+        file_id = list(file_ids)[index % len(file_ids)]
+        await asyncio.sleep(POLL_SECONDS * index / clients)  # 클라이언트마다 시작 시점 분산
+        end = time.time() + duration * 2
+        while time.time() < end:
+            snapshot = await loop.run_in_executor(None, poll, file_id)
+            seen.append((index, file_id, snapshot["status"], snapshot["progress"], time.time()))
+            if snapshot["status"] == "completed":
+                return
+            await asyncio.sleep(POLL_SECONDS)
+
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return seen
+
+
+async def run_push(SessionLocal, file_ids, clients: int, duration: float, broker):
+    from app.services.progress_broker import running_job_status
+
+    seen = []
+
+    def fetch(file_id):
+        db = SessionLocal()
+        try:
+            return status_queries(db, file_id)
+        finally:
+            db.close()
+
+    async def client(index: int):
+        file_id = list(file_ids)[index % len(file_ids)]
+        async for snapshot in broker.subscribe(
+            file_id, fetch, audio_file_id=file_ids[file_id], render=running_job_status, keepalive=duration
+        ):
+            if snapshot is None:
+                continue
+            seen.append((index, file_id, snapshot["status"], snapshot["progress"], time.time()))
+
+    await asyncio.wait_for(asyncio.gather(*(client(i) for i in range(clients))), timeout=duration * 2)
+    return seen
+
+
+async def run_inline(clients: int, updates: int, broker):
+    """같은 프로세스 파이프라인 스레드가 publish → 구독자 수신까지 지연 (ms)"""
+    file_id = "inline-file"
+    received = []
+    written = {}
+
+    async def client():
+        async for snapshot in broker.subscribe(file_id, lambda _: None, keepalive=60):
+            if snapshot is None:
+                continue
+            received.append((snapshot["progress"], time.perf_counter()))
+            if snapshot["status"] == "completed":
+                return
+
+    def pipeline():
+        for progress in range(1, updates + 1):
+            status = "completed" if progress == updates else "stt"
+            written[progress] = time.perf_counter()
+            broker.publish(file_id, {"status": status, "step": "STT 진행 중...", "progress": progress})
+            time.sleep(0.005)
+
+    tasks = [asyncio.create_task(client()) for _ in range(clients)]
+    # async generator는 첫 __anext__ 에서 구독하므로 잠시 양보
+    await asyncio.sleep(0.1)
+    thread = threading.Thread(target=pipeline)
+    thread.start()
+    await asyncio.gather(*tasks)
+    thread.join()
+    return np.array([(t - written[p]) * 1000 for p, t in received])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50, help="동시에 진행 화면을 보는 클라이언트 수")
+    parser.add_argument("--files", type=int, default=50, help="처리 중인 파일 수 (클라이언트 수와 같으면 파일마다 1명)")
+    parser.add_argument("--duration", type=float, default=15.0, help="모드별 측정 시간 (초)")
+    parser.add_argument("--step-seconds", type=float, default=1.0, help="가짜 워커의 진행률 갱신 간격 (초)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="브로커 DB 확인 간격 (PROGRESS_POLL_INTERVAL)")
+    args = parser.parse_args()
+
+    from app.services.progress_broker import ProgressBroker
+
+    results = {}
+    for mode in ("polling", "push"):
+        db_path = str(Path(tempfile.mkdtemp(prefix="bench_progress_")) / "progress.db")
+        SessionLocal, counter, file_ids = setup(db_path, args.files)
+        written, stop = {}, threading.Event()
+        broker = ProgressBroker(session_factory=SessionLocal, poll_interval=args.poll_interval)
+
+        baseline = counter["queries"]
+        worker = threading.Thread(
+            target=fake_worker, args=(SessionLocal, file_ids, args.duration, args.step_seconds, written, stop),
+            name="fake-worker",
+        )
+        started = time.time()
+        worker.start()
+        if mode == "polling":
+            seen = asyncio.run(run_polling(SessionLocal, file_ids, args.clients, args.duration))
+        else:
+            seen = asyncio.run(run_push(SessionLocal, file_ids, args.clients, args.duration, broker))
+        stop.set()
+        worker.join()
+        elapsed = time.time() - started
+
+        completed = len({(c, f) for c, f, status, _, _ in seen if status == "completed"})
+        results[mode] = {
+            "qps": (counter["queries"] - baseline) / elapsed,
+            "delay": staleness(written, seen),
+            "completed": completed,
+            "broker": broker.stats,
+        }
+
+    print(f"클라이언트 {args.clients}명, 처리 중 파일 {args.files}개, 진행률 갱신 {args.step_seconds}초마다, {args.duration:.0f}초")
+    print(f"{'mode':>8} {'조회 쿼리/초':>12} {'완료 수신':>9} {'지연 p50(ms)':>13} {'지연 p95(ms)':>13}")
+    for mode, r in results.items():
+        print(
+            f"{mode:>8} {r['qps']:>12.1f} {r['completed']:>5}/{args.clients:<3} "
+            f"{np.percentile(r['delay'], 50):>13.0f} {np.percentile(r['delay'], 95):>13.0f}"
+        )
+    print(f"DB 조회 감소: {results['polling']['qps'] / max(results['push']['qps'], 1e-9):.1f}x "
+          f"(push: 진행 컬럼 확인 {results['push']['broker']['probes']}회, 확인 행으로 갱신 {results['push']['broker']['rendered']}회, "
+          f"전체 조회 {results['push']['broker']['fetches']}회)")
+
+    inline = asyncio.run(run_inline(args.clients, 200, ProgressBroker()))
+    print(f"inline publish → 구독자 {args.clients}명 전달 지연: p50 {np.percentile(inline, 50):.2f}ms, "
+          f"p95 {np.percentile(inline, 95):.2f}ms")
+
+    ok = all(r["completed"] == args.clients for r in results.values())
+    print(f"검증: 모든 클라이언트가 완료 상태 수신={'OK' if ok else 'FAIL'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+로컬 STT 백엔드 벤치마크: openai-whisper vs torch-int8 vs faster-whisper
+
+사용법:
+    python benchmarks/bench_stt_backends.py --input /app/temp/<file_id>/preprocessed.wav \\
+        --model large-v3 --seconds 300 --backends openai-whisper torch-int8 faster-whisper
+
+측정 항목 (백엔드마다 별도 프로세스에서 측정):
+- 모델 로딩 시간
+- 전사 시간과 RTF (real-time factor = 전사 시간 / 오디오 길이, 낮을수록 빠름)
+- 최대 메모리 사용량 (peak RSS)
+- 첫 번째 백엔드 대비 전사 텍스트 일치율 (문자 단위, difflib)
+"""
+import argparse
+import difflib
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+SR = 16000
+
+
+def _run(backend: str, input_path: str, seconds: float, model_size: str, threads: int, queue):
+    from app.services.pcm_store import open_pcm, to_float32
+    from app.services.stt import get_local_stt_backend
+
+    pcm = open_pcm(Path(input_path))
+    audio = to_float32(pcm[: int(seconds * SR)] if seconds else pcm[:])
+
+    try:
+        start = time.perf_counter()
+        engine = get_local_stt_backend(model_size, "cpu", backend, threads)
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        segments = engine.transcribe(audio)
+        infer_s = time.perf_counter() - start
+    except Exception as e:
+        queue.put(e)
+        return
+
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((load_s, infer_s, peak_rss_mb, len(audio) / SR, [tuple(seg) for seg in segments]))
+
+
+def run_backend(backend: str, args):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(
+        target=_run, args=(backend, str(args.input), args.seconds, args.model, args.threads, queue)
+    )
+    proc.start()
+    result = queue.get()
+    proc.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, type=Path, help="전처리된 16kHz mono WAV")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--seconds", type=float, default=300, help="앞에서부터 전사할 길이 (0이면 전체)")
+    parser.add_argument("--threads", type=int, default=0, help="CPU 스레드 수 (0이면 라이브러리 기본값)")
+    parser.add_argument(
+        "--backends", nargs="+", default=["openai-whisper", "torch-int8", "faster-whisper"]
+    )
+    args = parser.parse_args()
+
+    print(f"모델: {args.model}")
+    print(f"{'backend':>16} {'load(s)':>8} {'infer(s)':>9} {'RTF':>7} {'peakRSS(MB)':>12} {'segs':>6} {'agree':>7}")
+
+    reference_text = None
+    for backend in args.backends:
+        try:
+            load_s, infer_s, rss, audio_s, segments = run_backend(backend, args)
+        except Exception as e:
+            print(f"{backend:>16} 실패: {e}")
+            continue
+
+        text = " ".join(seg[2] for seg in segments)
+        if reference_text is None:
+            reference_text = text
+        agree = difflib.SequenceMatcher(None, reference_text, text, autojunk=False).ratio()
+        print(
+            f"{backend:>16} {load_s:>8.1f} {infer_s:>9.1f} {infer_s / audio_s:>7.3f} "
+            f"{rss:>12.1f} {len(segments):>6} {agree:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+전사 데이터 표현 벤치마크: dict 리스트 + 정규식 재파싱 + JSON(indent=2) vs 컬럼형 Transcript + npz
+
+사용법:
+    python benchmarks/bench_transcript.py --segments 50000 --speakers 6
+
+측정 항목:
+- final_transcript.txt 파싱 (기존 라인별 re.match vs Transcript.from_text)
+- STT + 화자 분리 병합 (기존 merge 루프 vs merge_stt_with_diarization)
+- 병합 결과 저장/로드 (merged_result.json indent=2 vs merged_result.npz) 시간과 크기
+- 시간 구간/화자 조회 (dict 리스트 필터 vs Transcript.between/for_speaker)
+
+두 경로의 결과(텍스트, 화자, 밀리초 시간)가 같은지도 확인합니다.
+"""
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.transcript import Transcript  # noqa: E402
+
+WORDS = ["회의", "일정", "예산", "검토", "다음", "주", "보고서", "정리", "민서", "씨", "확인", "부탁드립니다"]
+
+
+def fmt_ms(ms: int) -> str:
+    h, rem = divmod(ms, 3600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+def make_data(n_segments: int, n_speakers: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    durations = rng.integers(800, 6000, n_segments)
+    gaps = rng.integers(1, 400, n_segments)
+    starts = np.cumsum(np.concatenate(([0], (durations + gaps)[:-1])))
+    ends = starts + durations
+    lines = [
+        f"[{fmt_ms(int(s))} - {fmt_ms(int(e))}] " + " ".join(rng.choice(WORDS, rng.integers(2, 12)))
+        for s, e in zip(starts, ends)
+    ]
+
+    # 화자 구간: 세그먼트 1~4개 단위로 화자 교대
+    # (±0.4ms 여유, 구간끼리 겹치지 않음 → 기존 병합의 부동소수점 경계 누락 없이 두 방식 결과가 같아야 함)
+    turns = []
+    i = 0
+    while i < n_segments:
+        k = int(rng.integers(1, 5))
+        j = min(n_segments, i + k)
+        turns.append({
+            "speaker_label": f"speaker_{int(rng.integers(0, n_speakers)):02d}",
+            "start": float(starts[i]) / 1000 - 0.0004,
+            "end": float(ends[j - 1]) / 1000 + 0.0004,
+        })
+        i = j
+    return "\n".join(lines), {"turns": turns, "embeddings": {}}
+
+
+def legacy_parse(text: str):
+    stt_segments = []
+    for line in text.splitlines():
+        if line.strip():
+            match = re.match(r'\[(\d{2}:\d{2}:\d{2}\.\d{3}) - (\d{2}:\d{2}:\d{2}\.\d{3})\] (.+)', line)
+            if match:
+                start_str, end_str, text = match.groups()
+
+                def time_to_seconds(t):
+                    h, m, s = t.split(':')
+                    return int(h) * 3600 + int(m) * 60 + float(s)
+
+                stt_segments.append({
+                    "text": text,
+                    "start": time_to_seconds(start_str),
+                    "end": time_to_seconds(end_str)
+                })
+    return stt_segments
+
+
+def legacy_merge(stt_segments, diarization_result):
+    merged = []
+    stt_idx = 0
+    for turn in diarization_result['turns']:
+        speaker = turn['speaker_label']
+        start_turn = turn['start']
+        end_turn = turn['end']
+        segment_text = ""
+        while stt_idx < len(stt_segments):
+            stt = stt_segments[stt_idx]
+            start_stt = stt['start']
+            if start_stt >= start_turn and start_stt < end_turn:
+                segment_text += stt['text'].strip() + " "
+                stt_idx += 1
+            elif start_stt >= end_turn:
+                break
+            else:
+                stt_idx += 1
+        if segment_text.strip():
+            merged.append({"speaker": speaker, "start": start_turn, "end": end_turn, "text": segment_text.strip()})
+    return merged
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=50000)
+    parser.add_argument("--speakers", type=int, default=6)
+    args = parser.parse_args()
+
+    # merge_stt_with_diarization은 diarization 모듈(torch 패치 포함)에 있으므로 필요할 때 import
+    from app.services.diarization import merge_stt_with_diarization
+
+    text, diarization_result = make_data(args.segments, args.speakers)
+    print(f"세그먼트: {args.segments}, 화자 구간: {len(diarization_result['turns'])}")
+    print(f"{'step':>14} {'legacy(s)':>10} {'transcript(s)':>14}")
+
+    legacy_segments, t_old = timed(legacy_parse, text)
+    transcript, t_new = timed(Transcript.from_text, text)
+    print(f"{'parse':>14} {t_old:>10.3f} {t_new:>14.3f}")
+
+    legacy_merged, t_old = timed(legacy_merge, legacy_segments, diarization_result)
+    merged, t_new = timed(merge_stt_with_diarization, transcript, diarization_result)
+    print(f"{'merge':>14} {t_old:>10.3f} {t_new:>14.3f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "merged_result.json"
+        npz_path = Path(tmp) / "merged_result.npz"
+
+        def save_json():
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(legacy_merged, f, ensure_ascii=False, indent=2)
+
+        _, t_old = timed(save_json)
+        _, t_new = timed(merged.save, npz_path)
+        print(f"{'save':>14} {t_old:>10.3f} {t_new:>14.3f}")
+
+        _, t_old = timed(lambda: json.loads(json_path.read_text(encoding="utf-8")))
+        loaded, t_new = timed(Transcript.load, npz_path)
+        print(f"{'load':>14} {t_old:>10.3f} {t_new:>14.3f}")
+        print(f"{'size(KB)':>14} {json_path.stat().st_size / 1024:>10.0f} {npz_path.stat().st_size / 1024:>14.0f}")
+
+    window = (0.4 * merged.end_ms[-1] / 1000, 0.6 * merged.end_ms[-1] / 1000) if len(merged) else (0.0, 0.0)
+    _, t_old = timed(lambda: [s for s in legacy_merged if s["start"] < window[1] and s["end"] > window[0]])
+    _, t_new = timed(merged.between, *window)
+    print(f"{'between':>14} {t_old:>10.4f} {t_new:>14.4f}")
+    _, t_old = timed(lambda: [s for s in legacy_merged if s["speaker"] == "speaker_01"])
+    _, t_new = timed(merged.for_speaker, "speaker_01")
+    print(f"{'for_speaker':>14} {t_old:>10.4f} {t_new:>14.4f}")
+
+    same = (
+        len(legacy_merged) == len(loaded)
+        and [s["text"] for s in legacy_merged] == loaded.texts
+        and [s["speaker"] for s in legacy_merged] == loaded.speaker_labels()
+        and np.array_equal(np.round(np.array([s["start"] for s in legacy_merged]) * 1000), loaded.start_ms)
+        and np.array_equal(np.round(np.array([s["end"] for s in legacy_merged]) * 1000), loaded.end_ms)
+    )
+    print(f"결과 일치: {same}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
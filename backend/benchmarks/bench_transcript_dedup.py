@@ -0,0 +1,110 @@
+"""
+전사 후처리 중복 제거 벤치마크: 기존 O(n²) 비교 vs DedupIndex
+
+사용법:
+    python benchmarks/bench_transcript_dedup.py --lines 1000 10000 100000 --legacy-max 10000
+
+측정 항목:
+- 라인 수별 처리 시간 (기존 방식은 --legacy-max 이하에서만 실행)
+- 유지 라인 수, 기존 방식과 결과 일치 여부
+- --window 지정 시 최근 window 라인 비교 모드도 함께 측정
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.transcript_dedup import dedup_keep_flags  # noqa: E402
+
+
+# stt.norm_for_compare와 같은 정규화 (stt import 시 openai/whisper 의존성을 피하기 위해 복제)
+def norm_for_compare(s: str) -> str:
+    s = s.lower().strip()
+    s = re.sub(r"\s+", " ", s)
+    s = re.sub(r"(\.){2,}$", ".", s)
+    return s
+
+
+def legacy_keep_flags(texts):
+    """기존 postprocess_transcript의 비교 루프 (매 비교마다 재정규화)"""
+    kept = []
+    flags = []
+    for cur_txt in texts:
+        cur_norm = norm_for_compare(cur_txt)
+        dup = False
+        for prev_txt in kept:
+            prev_norm = norm_for_compare(prev_txt)
+            if cur_norm == prev_norm:
+                dup = True
+                break
+            if cur_norm in prev_norm or prev_norm in cur_norm:
+                dup = True
+                break
+        if not dup:
+            kept.append(cur_txt)
+        flags.append(not dup)
+    return flags
+
+
+WORDS = (
+    "네 그 저 이번 회의 안건 일정 예산 검토 진행 확인 부탁 드립니다 감사합니다 "
+    "다음 주 금요일 까지 자료 공유 하겠습니다 그래서 결론 적으로 담당 팀장 님 의견 "
+    "프로젝트 마감 리스크 개발 디자인 테스트 배포 고객 요청 사항 정리 문서"
+).split()
+
+
+def make_lines(n: int, seed: int = 0):
+    """Whisper 반복/환각을 흉내낸 합성 전사 라인 (일부 라인은 이전 라인의 반복/부분)"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        r = rng.random()
+        if lines and r < 0.1:
+            lines.append(rng.choice(lines))
+        elif lines and r < 0.15:
+            words = rng.choice(lines).split()
+            i = rng.randrange(len(words))
+            lines.append(" ".join(words[i: i + rng.randint(1, 3)]))
+        else:
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 14))))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-max", type=int, default=10000)
+    parser.add_argument("--window", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'method':>10} {'time(s)':>9} {'kept':>8} {'match':>6}")
+    for n in args.lines:
+        texts = make_lines(n)
+
+        start = time.perf_counter()
+        flags = dedup_keep_flags([norm_for_compare(t) for t in texts])
+        elapsed = time.perf_counter() - start
+        legacy = None
+        if n <= args.legacy_max:
+            start = time.perf_counter()
+            legacy = legacy_keep_flags(texts)
+            legacy_elapsed = time.perf_counter() - start
+            print(f"{n:>8} {'legacy':>10} {legacy_elapsed:>9.3f} {sum(legacy):>8} {'-':>6}")
+        match = "-" if legacy is None else ("yes" if legacy == flags else "NO")
+        print(f"{n:>8} {'index':>10} {elapsed:>9.3f} {sum(flags):>8} {match:>6}")
+
+        if args.window:
+            start = time.perf_counter()
+            windowed = dedup_keep_flags([norm_for_compare(t) for t in texts], window=args.window)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>8} {f'window{args.window}':>10} {elapsed:>9.3f} {sum(windowed):>8} {'-':>6}")
+
+
+if __name__ == "__main__":
+    main()
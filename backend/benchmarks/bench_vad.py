@@ -0,0 +1,102 @@
+"""
+VAD 엔진 벤치마크 + 기존 구현과의 일치도 검사
+
+사용법:
+    python benchmarks/bench_vad.py --minutes 60
+
+비교 대상:
+- legacy: 기존 vad_keep_mask (프레임별 bytes 리스트 + Python 루프 팽창)
+- engine(gate off): app.services.vad (게이트 비활성화, 기존과 완전히 같아야 함)
+- engine(gate on): 에너지 게이트 적용 (무음 프레임 webrtcvad 호출 생략)
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import webrtcvad
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.preprocessing import SR, FRAME_MS, VAD_AGGR, PAD_MS  # noqa: E402
+from app.services.vad import ENERGY_GATE_DBFS, VadEngine, dilate_frames  # noqa: E402
+
+
+def make_synthetic_meeting(minutes: int, seed: int = 0) -> np.ndarray:
+    """발화/저잡음 무음이 번갈아 나오는 합성 int16 오디오"""
+    rng = np.random.default_rng(seed)
+    n = SR * 60 * minutes
+    x = np.empty(n, dtype=np.float32)
+    t = 0
+    while t < n:
+        length = min(int(rng.integers(SR // 2, SR * 4)), n - t)
+        if rng.random() < 0.6:
+            tt = np.arange(length) / SR
+            x[t:t + length] = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 300) * tt) + 0.05 * rng.standard_normal(length)
+        else:
+            x[t:t + length] = 0.0005 * rng.standard_normal(length)
+        t += length
+    return (np.clip(x, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def legacy_voiced_and_keep(x_i16: np.ndarray):
+    """기존 vad_keep_mask의 프레임 판정 + 팽창 로직 (비교용 사본)"""
+    frame_len = int(SR * FRAME_MS / 1000)
+    vad = webrtcvad.Vad(VAD_AGGR)
+    frames = [x_i16[i:i + frame_len].tobytes() for i in range(0, len(x_i16) - frame_len + 1, frame_len)]
+    voiced = np.zeros(len(frames), dtype=bool)
+    for i, fb in enumerate(frames):
+        if vad.is_speech(fb, SR):
+            voiced[i] = True
+
+    pad_frames = PAD_MS // FRAME_MS
+    keep = np.zeros_like(voiced)
+    for i, v in enumerate(voiced):
+        if v:
+            keep[max(0, i - pad_frames): min(len(voiced), i + pad_frames + 1)] = True
+    return voiced, keep
+
+
+def engine_voiced_and_keep(x_i16: np.ndarray, gate):
+    engine = VadEngine(SR, FRAME_MS, VAD_AGGR, energy_gate_dbfs=gate)
+    voiced = engine.classify(x_i16)
+    return voiced, dilate_frames(voiced, PAD_MS // FRAME_MS), engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=30)
+    args = parser.parse_args()
+
+    x_i16 = make_synthetic_meeting(args.minutes)
+
+    start = time.perf_counter()
+    ref_voiced, ref_keep = legacy_voiced_and_keep(x_i16)
+    legacy_elapsed = time.perf_counter() - start
+    n_frames = len(ref_voiced)
+
+    print(f"{'impl':>16} {'frames/s':>12} {'speedup':>8} {'voiced agree':>13} {'keep agree':>11} {'gated':>7}")
+    print(f"{'legacy':>16} {n_frames / legacy_elapsed:>12.0f} {1.0:>8.2f} {'-':>13} {'-':>11} {'-':>7}")
+
+    for label, gate in (("engine(gate off)", None), ("engine(gate on)", ENERGY_GATE_DBFS)):
+        start = time.perf_counter()
+        voiced, keep, engine = engine_voiced_and_keep(x_i16, gate)
+        elapsed = time.perf_counter() - start
+        voiced_agree = float(np.mean(voiced == ref_voiced))
+        keep_agree = float(np.mean(keep == ref_keep))
+        gated = engine.frames_gated / max(engine.frames_total, 1)
+        print(
+            f"{label:>16} {n_frames / elapsed:>12.0f} {legacy_elapsed / elapsed:>8.2f} "
+            f"{voiced_agree:>13.5f} {keep_agree:>11.5f} {gated:>7.1%}"
+        )
+        if gate is None and not (np.array_equal(voiced, ref_voiced) and np.array_equal(keep, ref_keep)):
+            raise SystemExit("❌ gate off 결과가 기존 구현과 다릅니다")
+
+    print("✅ gate off 결과가 기존 구현과 동일")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+로컬 Whisper 병렬 전사 확장성 벤치마크
+
+사용법:
+    python benchmarks/bench_whisper_scaling.py --input /app/temp/<file_id>/preprocessed.wav \\
+        --model small --workers 1 2 4 8 [--path memory|file]
+
+측정 항목:
+- 워커 수별 처리 시간과 RTF (real-time factor = 처리 시간 / 오디오 길이, 낮을수록 빠름)
+- 첫 실행은 워커별 모델 로딩 시간을 포함하므로, 같은 풀로 한 번 더 돌린 값(warm)도 함께 출력
+- --path file: 청크 WAV 분할 → SRT 저장 → SRT 재파싱 병합 (기존 경로)
+  --path memory: memmap 구간을 배열로 바로 전사 → 세그먼트 레코드 병합 (파일 왕복 없음)
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import soundfile as sf  # noqa: E402
+
+from app.services.pcm_store import open_pcm  # noqa: E402
+from app.services.stt import (  # noqa: E402
+    SAMPLE_RATE,
+    build_chunk_plan,
+    get_local_whisper_pool,
+    merge_chunk_segments,
+    merge_timestamps,
+    resolve_local_workers,
+    split_audio_chunks,
+    transcribe_array_local,
+    transcribe_plan_with_local_whisper,
+    write_srt,
+)
+
+
+def _transcribe_chunk_file(args) -> Path:
+    """청크 WAV 1개 전사 → SRT 저장 (기존 파일 경로 재현용, 워커/메인 프로세스 공용)"""
+    chunk_path, srt_dir, model_size = args
+    audio, _ = sf.read(str(chunk_path), dtype="float32")
+    segments = transcribe_array_local(audio, model_size, device="cpu")
+    return write_srt(segments, srt_dir / f"{chunk_path.stem}.srt")
+
+
+def transcribe_chunk_files(chunk_files, srt_dir: Path, model_size: str, workers: int):
+    """청크 WAV들을 같은 상주 프로세스 풀로 전사 (SRT 경로 리스트, 순서 보장)"""
+    workers, threads = resolve_local_workers("cpu", workers)
+    workers = min(workers, max(1, len(chunk_files)))
+    tasks = [(chunk_path, srt_dir, model_size) for chunk_path in chunk_files]
+    if workers > 1:
+        pool = get_local_whisper_pool(model_size, "cpu", workers, threads)
+        return list(pool.map(_transcribe_chunk_file, tasks, chunksize=1))
+    return list(map(_transcribe_chunk_file, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, type=Path, help="전처리된 16kHz mono WAV")
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", choices=["memory", "file"], default="memory")
+    args = parser.parse_args()
+
+    audio_seconds = len(open_pcm(args.input)) / SAMPLE_RATE
+    print(f"오디오 길이: {audio_seconds:.1f}초, 모델: {args.model}, 경로: {args.path}")
+    print(f"{'workers':>8} {'chunks':>7} {'cold(s)':>9} {'cold RTF':>9} {'warm(s)':>9} {'warm RTF':>9}")
+
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = Path(tmp)
+            plan = build_chunk_plan(args.input, min_chunks=workers)
+
+            timings = []
+            for _ in range(2):
+                shutil.rmtree(work_dir / "chunks", ignore_errors=True)
+                shutil.rmtree(work_dir / "srt", ignore_errors=True)
+                start = time.perf_counter()
+                if args.path == "file":
+                    chunk_files = split_audio_chunks(args.input, work_dir / "chunks", plan=plan)
+                    srt_files = transcribe_chunk_files(chunk_files, work_dir / "srt", args.model, workers)
+                    merge_timestamps(chunk_files, srt_files, work_dir / "merged.txt", plan=plan)
+                else:
+                    chunk_segments = transcribe_plan_with_local_whisper(
+                        args.input, plan, model_size=args.model, device="cpu", workers=workers
+                    )
+                    merge_chunk_segments(chunk_segments, plan.offsets_ms())
+                timings.append(time.perf_counter() - start)
+
+            cold, warm = timings
+            print(
+                f"{workers:>8} {len(plan):>7} {cold:>9.1f} {cold / audio_seconds:>9.3f} "
+                f"{warm:>9.1f} {warm / audio_seconds:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
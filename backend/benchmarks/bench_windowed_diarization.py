@@ -0,0 +1,157 @@
+"""
+윈도우 화자 분리 벤치마크: 전체 파일 한 번에 vs 겹치는 윈도우 + 전역 화자 연결
+
+사용법:
+    python benchmarks/bench_windowed_diarization.py --input /app/temp/<file_id>/preprocessed.wav --mode senko
+    python benchmarks/bench_windowed_diarization.py --input ... --window 600 --overlap 30 --workers 4
+    python benchmarks/bench_windowed_diarization.py --fake --hours 8 --speakers 12
+
+- 실제 모드: 같은 파일을 전체/윈도우 방식으로 각각 화자 분리해 시간, 최대 메모리(RSS), 화자 수,
+  두 결과의 프레임 일치율(화자 라벨 최적 매칭 후)을 출력
+- --fake: 모델 없이 연결 단계만 검증. 정답 타임라인과 화자별 임베딩을 만들고, 윈도우마다 지역 라벨을
+  섞고 임베딩에 잡음을 더한 "윈도우 결과"를 stitch_window_results로 합쳐 정답과 비교
+"""
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.diarization_windowed import plan_windows, stitch_window_results  # noqa: E402
+
+FRAME = 0.1  # 일치율 계산 프레임 (초)
+
+
+def frame_labels(turns, duration: float):
+    labels = np.full(int(np.ceil(duration / FRAME)), -1, dtype=np.int64)
+    names = {}
+    for turn in turns:
+        code = names.setdefault(turn["speaker_label"], len(names))
+        labels[int(turn["start"] / FRAME): int(np.ceil(turn["end"] / FRAME))] = code
+    return labels, len(names)
+
+
+def frame_agreement(reference, hypothesis, duration: float) -> float:
+    """화자 라벨을 최적 매칭(헝가리안)한 뒤 프레임 일치 비율 (정답에 화자가 있는 프레임 기준)"""
+    ref, n_ref = frame_labels(reference, duration)
+    hyp, n_hyp = frame_labels(hypothesis, duration)
+    mask = (ref >= 0) & (hyp >= 0)
+    if not mask.any() or (ref >= 0).sum() == 0:
+        return 0.0
+    counts = np.zeros((n_ref, n_hyp), dtype=np.int64)
+    np.add.at(counts, (ref[mask], hyp[mask]), 1)
+    rows, cols = linear_sum_assignment(-counts)
+    return counts[rows, cols].sum() / (ref >= 0).sum()
+
+
+def make_fake(hours: float, n_speakers: int, window: float, overlap: float, noise: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    duration = hours * 3600
+    voices = rng.normal(size=(n_speakers, 192))
+
+    # 정답 타임라인: 2~20초 발화, 화자 교대
+    turns, t, speaker = [], 0.0, 0
+    while t < duration:
+        length = float(rng.uniform(2, 20))
+        turns.append({"speaker_label": f"true_{speaker:02d}", "start": t, "end": min(t + length, duration)})
+        t += length + float(rng.uniform(0, 0.5))
+        speaker = (speaker + int(rng.integers(1, n_speakers))) % n_speakers
+
+    windows = plan_windows(duration, window, overlap)
+    window_results = []
+    for start, end in windows:
+        local = {}
+        local_turns = []
+        for turn in turns:
+            if turn["end"] <= start or turn["start"] >= end:
+                continue
+            true_idx = int(turn["speaker_label"][5:])
+            label = local.setdefault(true_idx, f"speaker_{int(rng.integers(0, 1000)):03d}_{len(local)}")
+            local_turns.append({
+                "speaker_label": label,
+                "start": max(turn["start"], start) - start,
+                "end": min(turn["end"], end) - start,
+            })
+        embeddings = {
+            label: (voices[true_idx] + rng.normal(scale=noise, size=192)).tolist()
+            for true_idx, label in local.items()
+        }
+        window_results.append({"turns": local_turns, "embeddings": embeddings})
+    return duration, turns, windows, window_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, help="전처리된 16kHz mono WAV")
+    parser.add_argument("--mode", default="senko", choices=["senko", "nemo"])
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--window", type=float, default=None, help="윈도우 길이 (초, 기본: settings)")
+    parser.add_argument("--overlap", type=float, default=None, help="윈도우 겹침 (초, 기본: settings)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--fake", action="store_true")
+    parser.add_argument("--hours", type=float, default=8.0)
+    parser.add_argument("--speakers", type=int, default=12)
+    parser.add_argument("--noise", type=float, default=0.3, help="--fake 임베딩 잡음 (화자 벡터 표준편차 1 기준)")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+
+    window = args.window or settings.DIARIZATION_WINDOW_SECONDS
+    overlap = settings.DIARIZATION_WINDOW_OVERLAP if args.overlap is None else args.overlap
+
+    if args.fake:
+        duration, truth, windows, window_results = make_fake(
+            args.hours, args.speakers, window, overlap, args.noise
+        )
+        start = time.perf_counter()
+        result = stitch_window_results(window_results, windows)
+        elapsed = time.perf_counter() - start
+        local_speakers = sum(len(r["embeddings"]) for r in window_results)
+        print(f"길이 {args.hours:.1f}시간, 윈도우 {len(windows)}개, 지역 화자 {local_speakers}명")
+        print(f"연결: {elapsed:.3f}초, 전역 화자 {len(result['embeddings'])}명 (정답 {args.speakers}명)")
+        print(f"프레임 일치율: {frame_agreement(truth, result['turns'], duration):.4f}")
+        return
+
+    if args.input is None:
+        parser.error("--input is required unless --fake")
+
+    import soundfile as sf
+    from app.services.diarization import run_diarization
+    from app.services.diarization_windowed import run_diarization_windowed
+
+    duration = sf.info(str(args.input)).duration
+    print(f"길이 {duration / 60:.1f}분")
+    print(f"{'method':>10} {'time(s)':>9} {'peak RSS(MB)':>13} {'speakers':>9} {'turns':>7}")
+
+    results = {}
+    for method in ("full", "windowed"):
+        start = time.perf_counter()
+        if method == "full":
+            result = run_diarization(args.input, device=args.device, mode=args.mode, windowed=False)
+        else:
+            result = run_diarization_windowed(
+                args.input, args.device, mode=args.mode,
+                window=window, overlap=overlap, workers=args.workers
+            )
+        elapsed = time.perf_counter() - start
+        # ru_maxrss: Linux는 KB (자식 프로세스는 워커 중 최댓값)
+        peak = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        ) / 1024
+        results[method] = result
+        print(f"{method:>10} {elapsed:>9.1f} {peak:>13.0f} {len(result['embeddings']):>9} {len(result['turns']):>7}")
+
+    agreement = frame_agreement(results["full"]["turns"], results["windowed"]["turns"], duration)
+    print(f"전체 대비 프레임 일치율: {agreement:.4f}")
+
+
+if __name__ == "__main__":
+    main()
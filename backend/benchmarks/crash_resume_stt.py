@@ -0,0 +1,139 @@
+"""
+STT 청크 체크포인트 크래시/재개 테스트
+
+사용법:
+    python benchmarks/crash_resume_stt.py --minutes 12 --chunk-seconds 60 --kill-after 5
+
+동작:
+1. 합성 전처리 오디오(preprocessed.wav) 생성
+2. 가짜 STT 백엔드(청크당 --delay초 대기)로 run_stt_pipeline 실행,
+   매니페스트상 완료 청크가 --kill-after개가 되면 프로세스를 SIGKILL
+3. 같은 work_dir로 다시 실행 → 전사한 청크 수가 (전체 - 완료)인지 확인
+4. 중단 없이 처음부터 실행한 결과와 final_transcript.txt가 같은지 확인
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# 백엔드 app을 import할 수 있도록 경로 추가
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+SR = 16000
+
+
+def make_audio(path: Path, minutes: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    n = int(SR * 60 * minutes)
+    audio = 0.1 * rng.standard_normal(n)
+    # 30초마다 1초 무음 (청크 경계 후보)
+    for s in range(0, n, SR * 30):
+        audio[s: s + SR] *= 0.001
+    sf.write(str(path), audio.astype(np.float32), SR, subtype="PCM_16")
+
+
+def _run_pipeline(wav: str, work_dir: str, log_path: str, chunk_seconds: int, delay: float):
+    from app.core.config import settings
+    from app.services import stt
+
+    class FakeSTTBackend(stt.LocalSTTBackend):
+        """청크 길이/에너지로 결정되는 세그먼트 반환 (전사 호출마다 로그 1줄)"""
+
+        name = "fake"
+
+        def transcribe(self, audio):
+            time.sleep(delay)
+            with open(log_path, "a") as f:
+                f.write(f"{len(audio)}\n")
+            seconds = len(audio) / SR
+            return [
+                stt.Segment(int(t * 1000), int(min(t + 5, seconds) * 1000), f"{float(np.abs(audio[int(t * SR)]).round(4))}")
+                for t in np.arange(0, seconds, 5.0)
+            ]
+
+    stt.LOCAL_STT_BACKENDS[FakeSTTBackend.name] = FakeSTTBackend
+    settings.WHISPER_LOCAL_WORKERS = 1
+    settings.STT_CHUNK_SECONDS = chunk_seconds
+    stt.run_stt_pipeline(Path(wav), Path(work_dir), model_size="fake", device="cpu", backend="fake")
+
+
+def start(wav: Path, work_dir: Path, log_path: Path, args):
+    ctx = mp.get_context("spawn")
+    proc = ctx.Process(
+        target=_run_pipeline, args=(str(wav), str(work_dir), str(log_path), args.chunk_seconds, args.delay)
+    )
+    proc.start()
+    return proc
+
+
+def done_chunks(work_dir: Path) -> int:
+    try:
+        data = json.loads((work_dir / "chunks" / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return 0
+    return sum(1 for c in data["chunks"] if c["status"] == "done")
+
+
+def count_calls(log_path: Path) -> int:
+    return len(log_path.read_text().splitlines()) if log_path.exists() else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=12)
+    parser.add_argument("--chunk-seconds", type=int, default=60)
+    parser.add_argument("--kill-after", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        work_dir = tmp / "resumed"
+        work_dir.mkdir()
+        wav = work_dir / "preprocessed.wav"
+        make_audio(wav, args.minutes)
+
+        # 1) 중단 실행
+        log1 = tmp / "run1.log"
+        proc = start(wav, work_dir, log1, args)
+        while done_chunks(work_dir) < args.kill_after and proc.is_alive():
+            time.sleep(0.05)
+        os.kill(proc.pid, 9)
+        proc.join()
+        done_at_kill = done_chunks(work_dir)
+        total = len(json.loads((work_dir / "chunks" / "manifest.json").read_text())["chunks"])
+        print(f"💥 kill: 완료 {done_at_kill}/{total}개 청크 (전사 호출 {count_calls(log1)}회)")
+
+        # 2) 재개 실행
+        log2 = tmp / "run2.log"
+        proc = start(wav, work_dir, log2, args)
+        proc.join()
+        resumed_calls = count_calls(log2)
+        print(f"🔁 재개: 전사 호출 {resumed_calls}회 (기대값 {total - done_at_kill}회)")
+
+        # 3) 중단 없는 기준 실행
+        ref_dir = tmp / "reference"
+        ref_dir.mkdir()
+        ref_wav = ref_dir / "preprocessed.wav"
+        make_audio(ref_wav, args.minutes)
+        proc = start(ref_wav, ref_dir, tmp / "ref.log", args)
+        proc.join()
+
+        same = (work_dir / "final_transcript.txt").read_text() == (ref_dir / "final_transcript.txt").read_text()
+        print(f"📄 최종 전사 일치: {same}")
+
+        ok = resumed_calls == total - done_at_kill and same
+        print("✅ PASS" if ok else "❌ FAIL")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from app.db.base import SessionLocal
-from app.models.audio_file import AudioFile
 from app.models.stt import STTResult
 from app.models.diarization import DiarizationResult
 from app.models.tagging import DetectedName, SpeakerMapping
 from app.models.user_confirmation import UserConfirmation
+from app.services.file_resolver import get_audio_file
 
 file_id = "8e6f389b-45dc-4cb3-b30c-d656b5e0bbe7"
 
@@ -19,10 +19,7 @@ db = SessionLocal()
 
 try:
     # AudioFile 조회
-    audio_file = db.query(AudioFile).filter(
-        (AudioFile.file_path.like(f"%{file_id}%")) |
-        (AudioFile.original_filename.like(f"%{file_id}%"))
-    ).first()
+    audio_file = get_audio_file(db, file_id)
 
     if not audio_file:
         print(f"파일을 찾을 수 없습니다: {file_id}")
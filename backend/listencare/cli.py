@@ -63,12 +63,25 @@ def stt(input, output, model, device):
 
 
 @cli.command()
-@click.option('--input', '-i', required=True, type=click.Path(exists=True), help='입력 오디오 파일 (WAV)')
-@click.option('--output', '-o', required=True, type=click.Path(), help='출력 JSON 파일')
+@click.option('--input', '-i', 'inputs', required=True, multiple=True, type=click.Path(exists=True),
+              help='입력 오디오 파일 (WAV). --batch에서는 여러 번 지정 가능, 디렉토리면 하위 preprocessed.wav 전체')
+@click.option('--output', '-o', required=True, type=click.Path(), help='출력 JSON 파일 (--batch에서는 출력 디렉토리)')
 @click.option('--model', '-m', default='senko', type=click.Choice(['senko', 'nemo']), help='화자 분리 모델')
 @click.option('--device', '-d', default='cpu', help='디바이스 (cpu/cuda)')
-def diarize(input, output, model, device):
+@click.option('--batch', is_flag=True, help='여러 파일을 한 번에 처리 (NeMo: 매니페스트 1개, 모델 1회 로드)')
+@click.option('--windowed/--no-windowed', default=None,
+              help='겹치는 윈도우 단위로 화자 분리 후 전역 화자 연결 (기본: 길이가 DIARIZATION_WINDOWED_MIN_SECONDS 이상이면 사용)')
+def diarize(inputs, output, model, device, batch, windowed):
     """화자 분리 - 오디오에서 화자별 구간 감지"""
+    if batch:
+        _diarize_batch(inputs, Path(output), model, device)
+        return
+
+    if len(inputs) != 1:
+        click.echo("❌ Error: 여러 입력은 --batch와 함께 사용하세요.", err=True)
+        sys.exit(1)
+    input = inputs[0]
+
     click.echo(f"🎤 Diarization 시작: {input}")
     click.echo(f"모델: {model}, 디바이스: {device}")
 
@@ -76,7 +89,8 @@ def diarize(input, output, model, device):
         result = run_diarization(
             audio_path=Path(input),
             device=device,
-            mode=model
+            mode=model,
+            windowed=windowed
         )
 
         # JSON 저장
@@ -93,6 +107,49 @@ def diarize(input, output, model, device):
         sys.exit(1)
 
 
+def _diarize_batch(inputs, output_dir: Path, model, device):
+    """diarize --batch: 입력 파일 전체를 한 번에 화자 분리하고 파일별 JSON 저장"""
+    from app.services.diarization import run_diarization_batch
+    from app.services.diarization_nemo import batch_file_ids
+
+    audio_paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            audio_paths.extend(sorted(path.rglob("preprocessed.wav")))
+        else:
+            audio_paths.append(path)
+
+    if not audio_paths:
+        click.echo("❌ Error: 처리할 WAV 파일이 없습니다.", err=True)
+        sys.exit(1)
+
+    click.echo(f"🎤 배치 Diarization 시작: {len(audio_paths)}개 파일")
+    click.echo(f"모델: {model}, 디바이스: {device}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        results = run_diarization_batch(audio_paths, device=device, mode=model, work_dir=output_dir / "nemo_batch")
+    except Exception as e:
+        click.echo(f"❌ Error: {e}", err=True)
+        sys.exit(1)
+
+    failed = 0
+    for audio_path, uid, result in zip(audio_paths, batch_file_ids(audio_paths), results):
+        if isinstance(result, Exception):
+            failed += 1
+            click.echo(f"❌ {audio_path}: {result}", err=True)
+            continue
+        output_path = output_dir / f"{uid}_diarization.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        click.echo(f"✅ {audio_path}: 화자 {len(result['embeddings'])}명, 세그먼트 {len(result['turns'])}개 → {output_path.name}")
+
+    click.echo(f"✅ 완료: {len(audio_paths) - failed}/{len(audio_paths)}개 파일 → {output_dir}")
+    if failed:
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--text', '-t', required=True, type=click.Path(exists=True), help='입력 텍스트 파일')
 @click.option('--output', '-o', required=True, type=click.Path(), help='출력 JSON 파일')
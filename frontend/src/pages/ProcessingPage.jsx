@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { useParams, useNavigate, useLocation } from 'react-router-dom';
-import { startProcessing, getProcessingStatus } from '../services/api';
+import { startProcessing, getProcessingStatus, subscribeProcessingStatus } from '../services/api';
 
 const ProcessingPage = () => {
   const { fileId } = useParams();
@@ -30,6 +30,73 @@ const ProcessingPage = () => {
     hasStartedProcessing.current = true;
 
     let pollingInterval = null;
+    let unsubscribe = null;
+    let finished = false;
+
+    const stopWatching = () => {
+      finished = true;
+      if (unsubscribe) {
+        unsubscribe();
+        unsubscribe = null;
+      }
+      if (pollingInterval) {
+        clearInterval(pollingInterval);
+        pollingInterval = null;
+      }
+    };
+
+    // 상태에 따라 진행률 및 메시지 업데이트 (스트림/폴링 공통)
+    const handleStatus = (status) => {
+      if (status.status === 'preprocessing') {
+        setProgress(30);
+        setCurrentStep('음성 전처리 중...');
+      } else if (status.status === 'stt') {
+        setProgress(50);
+        setCurrentStep('STT 분석 중...');
+      } else if (status.status === 'diarization') {
+        setProgress(70);
+        setCurrentStep('화자 분리 중...');
+      } else if (status.status === 'ner') {
+        setProgress(80);
+        setCurrentStep(status.step || '이름 및 닉네임 추출 중...');
+      } else if (status.status === 'saving') {
+        setProgress(90);
+        setCurrentStep('결과 저장 중...');
+      } else if (status.status === 'completed') {
+        setProgress(100);
+        setCurrentStep('완료!');
+        stopWatching();
+
+        // 완료 후 화자 정보 확인 페이지로 이동
+        setTimeout(() => {
+          navigate(`/confirm/${fileId}`);
+        }, 1000);
+      } else if (status.status === 'failed') {
+        setError(status.error || '처리 중 오류가 발생했습니다.');
+        stopWatching();
+      } else if (status.status === 'not_found') {
+        stopWatching();
+        setError('파일을 찾을 수 없습니다. 대시보드로 이동합니다.');
+        setTimeout(() => navigate('/'), 2000);
+      }
+    };
+
+    // 스트림을 쓸 수 없으면 상태 폴링 (2초마다)
+    const startPolling = () => {
+      if (finished || pollingInterval) return;
+      pollingInterval = setInterval(async () => {
+        try {
+          const status = await getProcessingStatus(fileId);
+          handleStatus(status);
+        } catch (err) {
+          console.error('Status polling error:', err);
+          // 404 에러 처리 (파일이 없는 경우)
+          if (err.response && err.response.status === 404) {
+            handleStatus({ status: 'not_found' });
+          }
+        }
+      }, 2000);
+    };
 
     const initiateProcessing = async () => {
       try {
@@ -42,50 +109,20 @@ const ProcessingPage = () => {
           await startProcessing(fileId, whisperMode, diarizationMode);
         }
 
-        // 상태 폴링 시작 (2초마다)
-        pollingInterval = setInterval(async () => {
-          try {
-            const status = await getProcessingStatus(fileId);
-
-            // 상태에 따라 진행률 및 메시지 업데이트
-            if (status.status === 'preprocessing') {
-              setProgress(30);
-              setCurrentStep('음성 전처리 중...');
-            } else if (status.status === 'stt') {
-              setProgress(50);
-              setCurrentStep('STT 분석 중...');
-            } else if (status.status === 'diarization') {
-              setProgress(70);
-              setCurrentStep('화자 분리 중...');
-            } else if (status.status === 'ner') {
-              setProgress(80);
-              setCurrentStep(status.step || '이름 및 닉네임 추출 중...');
-            } else if (status.status === 'saving') {
-              setProgress(90);
-              setCurrentStep('결과 저장 중...');
-            } else if (status.status === 'completed') {
-              setProgress(100);
-              setCurrentStep('완료!');
-              clearInterval(pollingInterval);
-
-              // 완료 후 화자 정보 확인 페이지로 이동
-              setTimeout(() => {
-                navigate(`/confirm/${fileId}`);
-              }, 1000);
-            } else if (status.status === 'failed') {
-              setError(status.error || '처리 중 오류가 발생했습니다.');
-              clearInterval(pollingInterval);
+        // 상태 스트림 구독 (SSE), 연결이 끊기면 폴링으로 전환
+        if (typeof EventSource !== 'undefined') {
+          unsubscribe = subscribeProcessingStatus(fileId, handleStatus, () => {
+            if (finished) return;
+            console.warn('Status stream disconnected, falling back to polling');
+            if (unsubscribe) {
+              unsubscribe();
+              unsubscribe = null;
             }
-          } catch (err) {
-            console.error('Status polling error:', err);
-            // 404 에러 처리 (파일이 없는 경우)
-            if (err.response && err.response.status === 404) {
-              clearInterval(pollingInterval);
-              setError('파일을 찾을 수 없습니다. 대시보드로 이동합니다.');
-              setTimeout(() => navigate('/'), 2000);
-            }
-          }
-        }, 2000);
+            startPolling();
+          });
+        } else {
+          startPolling();
+        }
 
       } catch (err) {
         console.error('Processing error:', err);
@@ -100,11 +137,9 @@ const ProcessingPage = () => {
 
     initiateProcessing();
 
-    // 컴포넌트 언마운트 시 폴링 중지
+    // 컴포넌트 언마운트 시 구독/폴링 중지
     return () => {
-      if (pollingInterval) {
-        clearInterval(pollingInterval);
-      }
+      stopWatching();
     };
   }, [fileId, navigate, whisperMode, diarizationMode]);
 
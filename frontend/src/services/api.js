@@ -73,6 +73,21 @@ export const getProcessingStatus = async (fileId) => {
   return response.data;
 };
 
+// 처리 상태 구독 (Server-Sent Events) - 상태가 바뀔 때마다 onStatus 호출, 반환값으로 구독 해제
+export const subscribeProcessingStatus = (fileId, onStatus, onError) => {
+  const source = new EventSource(`${API_BASE_URL}/api/v1/status/${fileId}/stream`);
+
+  source.addEventListener('progress', (event) => {
+    onStatus(JSON.parse(event.data));
+  });
+  source.onerror = (event) => {
+    // 서버가 최종 상태를 보내고 연결을 닫은 경우에도 호출되므로 구독자가 판단
+    if (onError) onError(event);
+  };
+
+  return () => source.close();
+};
+
 // 최종 결과 조회
 export const getTranscript = async (fileId) => {
   const response = await api.get(`/api/v1/transcript/${fileId}`);